@@ -0,0 +1,3 @@
+"""
+Pruebas de carga sintéticas de los manejadores más usados del bot (ver benchmarks/run.py).
+"""
@@ -0,0 +1,282 @@
+"""
+Objetos de Discord falsos y ligeros para las pruebas de carga.
+
+Solo tienen los atributos y métodos que usan los manejadores medidos (tubería de mensajes,
+anti-spam, hilos y reacciones de reportes). Las llamadas que en el bot real irían a la API
+no hacen ninguna petición: se cuentan en `FakeGuild.calls` y esperan `FakeGuild.api_latency`
+segundos, para que los manejadores cedan el bucle de eventos como lo harían con la API real.
+Los mensajes se guardan en su canal, pero `fetch_message` devuelve una copia, igual que la
+API construye un objeto nuevo en cada consulta.
+"""
+import asyncio
+import collections
+import itertools
+
+import discord # type: ignore
+
+# IDs con el mismo tamaño que los snowflakes reales
+_ids = itertools.count(400000000000000000)
+
+
+def next_id():
+    return next(_ids)
+
+
+class FakeResponse:
+    """Respuesta mínima para construir las excepciones HTTP de discord.py."""
+
+    def __init__(self, status, reason):
+        self.status = status
+        self.reason = reason
+
+
+class FakeRole:
+    def __init__(self, guild, name, position=1):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.position = position
+
+    @property
+    def mention(self):
+        return f"<@&{self.id}>"
+
+    def __repr__(self):
+        return f"<FakeRole id={self.id} name={self.name!r}>"
+
+
+class FakeMember:
+    def __init__(self, guild, name, permissions=None, bot=False):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.display_name = name
+        self.bot = bot
+        self.roles = []
+        self.guild_permissions = permissions or discord.Permissions.none()
+
+    @property
+    def mention(self):
+        return f"<@{self.id}>"
+
+    async def add_roles(self, *roles, reason=None):
+        await self.guild.api_call("add_roles")
+        self.roles.extend(role for role in roles if role not in self.roles)
+
+    async def remove_roles(self, *roles, reason=None):
+        await self.guild.api_call("remove_roles")
+        self.roles = [role for role in self.roles if role not in roles]
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return f"<FakeMember id={self.id} name={self.name!r}>"
+
+
+class FakePartialMessage:
+    def __init__(self, channel, message_id):
+        self.channel = channel
+        self.id = message_id
+
+    async def delete(self):
+        await self.channel.guild.api_call("delete_message")
+        self.channel.forget(self.id)
+
+
+class FakeMessage:
+    def __init__(self, channel, author, content="", mentions=(), role_mentions=(), mention_everyone=False,
+                 attachments=(), embeds=(), message_id=None):
+        self.id = message_id or next_id()
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.mentions = list(mentions)
+        self.role_mentions = list(role_mentions)
+        self.mention_everyone = mention_everyone
+        self.attachments = list(attachments)
+        self.embeds = list(embeds)
+
+    def copy(self):
+        """Copia con embeds nuevos, como la que devolvería la API al pedir el mensaje."""
+        return FakeMessage(
+            self.channel, self.author, self.content, self.mentions, self.role_mentions, self.mention_everyone,
+            self.attachments, [discord.Embed.from_dict(embed.to_dict()) for embed in self.embeds], self.id
+        )
+
+    async def delete(self):
+        await self.guild.api_call("delete_message")
+        self.channel.forget(self.id)
+
+    async def edit(self, content=None, embed=None, **kwargs):
+        await self.guild.api_call("edit_message")
+        if content is not None:
+            self.content = content
+        if embed is not None:
+            self.embeds = [embed]
+        return self
+
+    async def add_reaction(self, emoji):
+        await self.guild.api_call("add_reaction")
+
+    async def clear_reactions(self):
+        await self.guild.api_call("clear_reactions")
+
+    def __repr__(self):
+        return f"<FakeMessage id={self.id} channel={self.channel.id}>"
+
+
+class FakeMessageable:
+    """Métodos comunes a los canales de texto y los hilos falsos."""
+
+    __slots__ = ()
+
+    def _setup(self, guild, name, history_size):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.recent = collections.OrderedDict()  # message_id: FakeMessage (los más recientes al final)
+        self.history_size = history_size
+
+    @property
+    def mention(self):
+        return f"<#{self.id}>"
+
+    def remember(self, message):
+        """Guarda un mensaje como enviado al canal (sin pasar por la API)."""
+        self.recent[message.id] = message
+        if len(self.recent) > self.history_size:
+            self.recent.popitem(last=False)
+
+    def forget(self, message_id):
+        self.recent.pop(message_id, None)
+
+    async def send(self, content=None, embed=None, **kwargs):
+        await self.guild.api_call("send_message")
+        message = FakeMessage(self, self.guild.me, content or "", embeds=[embed] if embed else ())
+        self.remember(message)
+        return message
+
+    async def fetch_message(self, message_id):
+        await self.guild.api_call("fetch_message")
+        message = self.recent.get(message_id)
+        if message is None:
+            raise discord.NotFound(FakeResponse(404, "Not Found"), "Unknown Message")
+        return message.copy()
+
+    def get_partial_message(self, message_id):
+        return FakePartialMessage(self, message_id)
+
+    async def history(self, limit=100):
+        await self.guild.api_call("history")
+        for message in reversed(list(self.recent.values())[-limit:]):
+            yield message
+
+    async def set_permissions(self, target, **overwrites):
+        await self.guild.api_call("set_permissions")
+
+
+class FakeTextChannel(FakeMessageable):
+    def __init__(self, guild, name, history_size=100):
+        self._setup(guild, name, history_size)
+
+    def __repr__(self):
+        return f"<FakeTextChannel id={self.id} name={self.name!r}>"
+
+
+class FakeThread(FakeMessageable, discord.Thread):
+    """Hilo falso; hereda de `discord.Thread` para que las comprobaciones con `isinstance` lo acepten."""
+
+    def __init__(self, guild, name, parent, history_size=100):
+        self._setup(guild, name, history_size)
+        self.parent_id = parent.id
+
+    def __repr__(self):
+        return f"<FakeThread id={self.id} name={self.name!r}>"
+
+
+class FakeGuild:
+    def __init__(self, name="Servidor de pruebas", api_latency=0.0):
+        self.id = next_id()
+        self.name = name
+        self.api_latency = api_latency
+        self.calls = collections.Counter()  # método de la API simulado: llamadas
+        self.chunked = True
+        self.members_by_id = {}
+        self.roles = []
+        self.channels = []
+        self.threads = []
+        self.channels_by_id = {}
+        self.me = self.add_member("FlexBot", discord.Permissions.all(), bot=True)
+
+    async def api_call(self, name):
+        self.calls[name] += 1
+        await asyncio.sleep(self.api_latency)
+
+    @property
+    def members(self):
+        return list(self.members_by_id.values())
+
+    @property
+    def member_count(self):
+        return len(self.members_by_id)
+
+    def add_member(self, name, permissions=None, bot=False):
+        member = FakeMember(self, name, permissions, bot)
+        self.members_by_id[member.id] = member
+        return member
+
+    def add_text_channel(self, name, history_size=100):
+        channel = FakeTextChannel(self, name, history_size)
+        self.channels.append(channel)
+        self.channels_by_id[channel.id] = channel
+        return channel
+
+    def add_thread(self, name, parent):
+        thread = FakeThread(self, name, parent)
+        self.threads.append(thread)
+        self.channels_by_id[thread.id] = thread
+        return thread
+
+    def get_member(self, member_id):
+        return self.members_by_id.get(member_id)
+
+    def get_channel(self, channel_id):
+        channel = self.channels_by_id.get(channel_id)
+        return None if isinstance(channel, FakeThread) else channel
+
+    def get_channel_or_thread(self, channel_id):
+        return self.channels_by_id.get(channel_id)
+
+    def get_role(self, role_id):
+        return discord.utils.get(self.roles, id=role_id)
+
+    async def fetch_member(self, member_id):
+        await self.api_call("fetch_member")
+        member = self.members_by_id.get(member_id)
+        if member is None:
+            raise discord.NotFound(FakeResponse(404, "Not Found"), "Unknown Member")
+        return member
+
+    async def create_role(self, name, reason=None, **kwargs):
+        await self.api_call("create_role")
+        role = FakeRole(self, name, position=len(self.roles) + 1)
+        self.roles.append(role)
+        return role
+
+    def __repr__(self):
+        return f"<FakeGuild id={self.id} name={self.name!r}>"
+
+
+class FakeReactionPayload:
+    """Equivalente a `discord.RawReactionActionEvent` para reacciones en servidores."""
+
+    def __init__(self, member, channel, message_id, emoji):
+        self.member = member
+        self.user_id = member.id
+        self.guild_id = channel.guild.id
+        self.channel_id = channel.id
+        self.message_id = message_id
+        self.emoji = emoji
+        self.event_type = "REACTION_ADD"
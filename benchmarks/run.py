@@ -0,0 +1,480 @@
+"""
+Pruebas de carga sintéticas de los manejadores más usados del bot, con objetos de Discord
+falsos (benchmarks/fakes.py): sin conexión, sin token y sin tocar los archivos de data/.
+
+Escenarios:
+    anti_spam        etapa anti-spam de Moderation (mensajes normales y ráfagas de spammers)
+    thread_tracking  etapa de ThreadManager que registra a los participantes de los hilos
+    pipeline         tubería de mensajes completa (filtro, enlaces, anti-spam e hilos)
+    reactions        Reports.on_raw_reaction_add (resolver, descartar y moderar reportes)
+
+Cada evento se atiende en su propia tarea, como hace discord.py. Con `--rate` los eventos
+llegan a ritmo fijo y la latencia se mide desde la llegada (incluye la espera si el bucle va
+retrasado); con `--rate 0` se envían uno tras otro lo más rápido posible. Se mide el
+rendimiento, la latencia (p50/p90/p99/máx.), las llamadas a la API simuladas y el tamaño de
+las cachés de los cogs al terminar. Como tracemalloc ralentiza mucho los manejadores, el
+crecimiento de la memoria se mide en una segunda pasada del mismo escenario, sin pausa
+entre eventos.
+
+Uso:
+    python -m benchmarks.run --scenario all --output antes.json
+    python -m benchmarks.run --scenario all --compare antes.json
+"""
+import argparse
+import asyncio
+import datetime
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import discord # type: ignore
+from discord.ext import commands # type: ignore
+
+from benchmarks.fakes import FakeGuild, FakeMessage, FakeReactionPayload
+from cogs.content_filter import ContentFilter
+from cogs.link_scanner import LinkScanner
+from cogs.moderation import Moderation
+from cogs.reports import Reports
+from cogs.thread_manager import ThreadManager
+from utils.guild_config import guild_config
+from utils.link_scanner import StaticResolver
+from utils.logs import setup_logging
+from utils.message_pipeline import MessageContext, pipeline
+
+logger = logging.getLogger(__name__)
+
+SCENARIOS = ("anti_spam", "thread_tracking", "pipeline", "reactions")
+
+# Tamaño del servidor simulado (los usuarios y reportes se configuran desde la línea de comandos)
+CHANNELS = 10
+THREADS = 20
+MODERATORS = 5
+SPAMMERS = 10
+
+WORDS = (
+    "hola", "buenas", "alguien", "sabe", "cómo", "funciona", "el", "nuevo", "parche", "mañana",
+    "partida", "esta", "noche", "gracias", "por", "la", "ayuda", "mirad", "esto", "qué", "opináis",
+    "del", "torneo", "me", "apunto", "quién", "juega", "ranked", "ayer", "perdimos", "ganamos",
+    "servidor", "canal", "música", "vídeo", "directo", "clip", "jajaja", "vale", "perfecto",
+)
+SPAM_TEXTS = (
+    "Nitro gratis para los primeros 100 https://nitro-gratis.example/regalo",
+    "Compra seguidores baratos en https://seguidores.example ahora mismo",
+    "Únete a mi servidor de sorteos diarios https://sorteos.example/entrar",
+)
+# Reparto de las reacciones: (emoji o None para una reacción fuera del canal de reportes, probabilidad acumulada)
+REACTION_MIX = (("✅", 0.4), ("❌", 0.8), ("🔨", 0.9), (None, 1.0))
+
+
+class World:
+    """Servidor simulado (miembros, canales, hilos gestionados y reportes) y generador de eventos."""
+
+    def __init__(self, args, rng):
+        self.rng = rng
+        self.spam_ratio = args.spam_ratio
+        self.guild = guild = FakeGuild(api_latency=args.api_latency / 1000)
+        self.users = [guild.add_member(f"usuario{i}") for i in range(args.users)]
+        self.moderators = [
+            guild.add_member(f"moderador{i}", discord.Permissions(manage_messages=True)) for i in range(MODERATORS)
+        ]
+        self.spammers = [guild.add_member(f"spammer{i}") for i in range(SPAMMERS)]
+        self.channels = [guild.add_text_channel(f"general-{i}") for i in range(CHANNELS)]
+        self.threads = [guild.add_thread(f"hilo-{i}", self.channels[i % CHANNELS]) for i in range(THREADS)]
+        # El canal de reportes conserva todos sus mensajes para que `fetch_message` los encuentre
+        reports_name = guild_config.get(guild.id)["reports_channel_name"]
+        self.reports_channel = guild.add_text_channel(reports_name, history_size=args.reports + args.events + args.warmup)
+        self.reports, self.report_messages = self.create_reports(args.reports)
+
+    def active_threads(self):
+        """Hilos gestionados abiertos y con notificaciones, en el formato de data/active_threads.json."""
+        now = datetime.datetime.utcnow()
+        return {
+            str(thread.id): {
+                "guild_id": self.guild.id,
+                "channel_id": thread.parent_id,
+                "name": thread.name,
+                "status": "open",
+                "notify_enabled": True,
+                "participants_to_notify": [],
+                "created_at": now.isoformat(),
+                "archive_at": (now + datetime.timedelta(days=1)).isoformat(),
+            }
+            for thread in self.threads
+        }
+
+    def create_reports(self, count):
+        """Reportes pendientes y sus mensajes en el canal de reportes, con el footer que lee el cog."""
+        reports = []
+        messages = []
+        for number in range(1, count + 1):
+            reported = self.rng.choice(self.users)
+            reports.append({
+                "reported_user": reported.id,
+                "reported_by": self.rng.choice(self.users).id,
+                "reason": " ".join(self.rng.choices(WORDS, k=8)),
+                "status": "pendiente",
+                "timestamp": datetime.datetime.utcnow().isoformat(),
+                "channel_id": self.channels[0].id,
+            })
+            embed = discord.Embed(title="Nuevo Reporte", description=f"Usuario reportado: {reported.mention}")
+            embed.set_footer(text=f"ID del Reporte: {number}")
+            message = FakeMessage(self.reports_channel, self.guild.me, embeds=[embed])
+            self.reports_channel.remember(message)
+            messages.append(message)
+        return {str(self.guild.id): reports}, messages
+
+    def message(self, channel):
+        """Mensaje nuevo en `channel`: de un spammer con probabilidad `spam_ratio` o de un usuario cualquiera."""
+        rng = self.rng
+        mentions = ()
+        if rng.random() < self.spam_ratio:
+            author = rng.choice(self.spammers)
+            content = rng.choice(SPAM_TEXTS)
+            mentions = rng.sample(self.users, min(3, len(self.users)))
+        else:
+            author = rng.choice(self.users)
+            content = " ".join(rng.choices(WORDS, k=rng.randint(2, 15)))
+            roll = rng.random()
+            if roll < 0.05:
+                content += f" https://ejemplo.example/{rng.randint(1, 10**6)}"
+            elif roll < 0.10:
+                mentions = (rng.choice(self.users),)
+        message = FakeMessage(channel, author, content, mentions=mentions)
+        channel.remember(message)
+        return message
+
+    def channel_message(self):
+        return self.message(self.rng.choice(self.channels))
+
+    def thread_message(self):
+        return self.message(self.rng.choice(self.threads))
+
+    def reaction(self):
+        """Reacción de un moderador a un reporte (o, según REACTION_MIX, en otro canal)."""
+        moderator = self.rng.choice(self.moderators)
+        roll = self.rng.random()
+        emoji = next(emoji for emoji, cumulative in REACTION_MIX if roll < cumulative)
+        if emoji is None:
+            return FakeReactionPayload(moderator, self.rng.choice(self.channels), 0, "👍")
+        message = self.rng.choice(self.report_messages)
+        return FakeReactionPayload(moderator, self.reports_channel, message.id, emoji)
+
+
+class BenchBot(commands.Bot):
+    """Bot sin conexión: el usuario del bot y los canales salen del servidor simulado."""
+
+    def __init__(self, world):
+        intents = discord.Intents.default()
+        intents.message_content = True
+        intents.members = True
+        super().__init__(command_prefix="!flex ", intents=intents)
+        self.world = world
+
+    @property
+    def user(self):
+        return self.world.guild.me
+
+    def get_channel(self, channel_id):
+        return self.world.guild.get_channel_or_thread(channel_id)
+
+    def get_guild(self, guild_id):
+        return self.world.guild if guild_id == self.world.guild.id else None
+
+
+# Cada escenario carga sus cogs y devuelve (generar evento, atender evento, tamaño de las cachés)
+
+async def setup_anti_spam(bot, world):
+    moderation = Moderation(bot)
+    await bot.add_cog(moderation)
+
+    async def handle(message):
+        await moderation.anti_spam_stage(MessageContext(message, False))
+
+    return world.channel_message, handle, lambda: moderation_state(moderation)
+
+
+async def setup_thread_tracking(bot, world):
+    thread_manager = ThreadManager(bot)
+    await bot.add_cog(thread_manager)
+    thread_manager.active_threads = world.active_threads()
+
+    async def handle(message):
+        await thread_manager.thread_stage(MessageContext(message, False))
+
+    return world.thread_message, handle, lambda: thread_state(thread_manager)
+
+
+async def setup_pipeline(bot, world):
+    await bot.add_cog(ContentFilter(bot))
+    await bot.add_cog(LinkScanner(bot, StaticResolver()))
+    moderation = Moderation(bot)
+    await bot.add_cog(moderation)
+    thread_manager = ThreadManager(bot)
+    await bot.add_cog(thread_manager)
+    thread_manager.active_threads = world.active_threads()
+
+    def make_event():
+        return world.thread_message() if world.rng.random() < 0.2 else world.channel_message()
+
+    def state():
+        return dict(moderation_state(moderation), **thread_state(thread_manager))
+
+    return make_event, pipeline.run, state
+
+
+async def setup_reactions(bot, world):
+    reports = Reports(bot)
+    await bot.add_cog(reports)
+    reports.reports = world.reports
+    return world.reaction, reports.on_raw_reaction_add, lambda: {"pending_actions": len(reports.pending_actions)}
+
+
+def moderation_state(moderation):
+    return {
+        "user_messages": len(moderation.user_messages),
+        "content_hashes": sum(map(len, moderation.content_hashes.values())),
+        "mute_tasks": len(moderation.mute_tasks),
+    }
+
+
+def thread_state(thread_manager):
+    return {"thread_participants": sum(len(info["participants_to_notify"]) for info in thread_manager.active_threads.values())}
+
+
+SETUPS = {
+    "anti_spam": setup_anti_spam,
+    "thread_tracking": setup_thread_tracking,
+    "pipeline": setup_pipeline,
+    "reactions": setup_reactions,
+}
+
+
+async def drive(make_event, handle, count, rate):
+    """
+    Lanza `count` eventos, cada uno en su tarea, a `rate` eventos por segundo (0 = sin pausa,
+    esperando a que termine cada uno). Devuelve (latencias en segundos, errores, duración).
+    """
+    latencies = []
+    errors = 0
+
+    async def run_one(event, arrival):
+        nonlocal errors
+        try:
+            await handle(event)
+        except Exception as e:
+            errors += 1
+            if errors == 1:
+                logger.exception("Error atendiendo un evento: %s", e)
+        latencies.append(time.perf_counter() - arrival)
+
+    start = time.perf_counter()
+    if rate > 0:
+        tasks = []
+        for i in range(count):
+            arrival = start + i / rate
+            delay = arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(run_one(make_event(), arrival)))
+        await asyncio.gather(*tasks)
+    else:
+        for _ in range(count):
+            event = make_event()
+            await asyncio.create_task(run_one(event, time.perf_counter()))
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_scenario(name, args, traced=False):
+    """
+    Ejecuta un escenario con su propio bot y servidor simulado y devuelve sus resultados.
+    Con `traced` los eventos se envían sin pausa y se mide la memoria con tracemalloc.
+    """
+    world = World(args, random.Random(args.seed))
+    bot = BenchBot(world)
+    # Como en main.py, el cliente se inicializa antes de cargar los cogs
+    async with bot:
+        make_event, handle, state = await SETUPS[name](bot, world)
+        try:
+            return await measure(name, args, world, make_event, handle, state, traced)
+        finally:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            for cog_name in list(bot.cogs):
+                await bot.remove_cog(cog_name)
+            pipeline.invalidate_guild(world.guild.id)
+
+
+async def measure(name, args, world, make_event, handle, state, traced):
+    """Calentamiento y medición de un escenario ya cargado."""
+    rate = 0 if traced else args.rate
+    if traced:
+        tracemalloc.start()
+    await drive(make_event, handle, args.warmup, rate)
+
+    # Solo se mide lo que ocurre después del calentamiento
+    world.guild.calls.clear()
+    pipeline.reset_stats()
+    gc.collect()
+    memory_before = tracemalloc.get_traced_memory()[0] if traced else 0
+    if traced and hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+
+    latencies, errors, seconds = await drive(make_event, handle, args.events, rate)
+
+    if traced:
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {"growth_kib": round((current - memory_before) / 1024, 1), "peak_kib": round((peak - memory_before) / 1024, 1)}
+
+    ordered = sorted(latencies)
+    result = {
+        "events": len(latencies),
+        "errors": errors,
+        "seconds": round(seconds, 3),
+        "throughput": round(len(latencies) / seconds, 1) if seconds else None,
+        "latency_ms": {
+            "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+            "p50": round(percentile(ordered, 0.5) * 1000, 3),
+            "p90": round(percentile(ordered, 0.9) * 1000, 3),
+            "p99": round(percentile(ordered, 0.99) * 1000, 3),
+            "max": round(ordered[-1] * 1000, 3),
+        },
+        "memory": None,
+        "api_calls": dict(world.guild.calls),
+        "state": state(),
+    }
+    if name == "pipeline":
+        result["stages_us"] = {
+            stage.name: round(stage.total_ns / stage.calls / 1000, 1) for stage in pipeline.stages if stage.calls
+        }
+    return result
+
+
+def format_result(name, result):
+    latency = result["latency_ms"]
+    lines = [
+        f"== {name}: {result['events']} eventos en {result['seconds']} s ({result['throughput']} eventos/s), {result['errors']} errores",
+        f"   latencia (ms): media {latency['mean']} · p50 {latency['p50']} · p90 {latency['p90']} · p99 {latency['p99']} · máx. {latency['max']}",
+    ]
+    if result["memory"]:
+        lines.append(f"   memoria: +{result['memory']['growth_kib']} KiB al terminar · pico +{result['memory']['peak_kib']} KiB")
+    if result["api_calls"]:
+        lines.append("   API: " + ", ".join(f"{call} {count}" for call, count in sorted(result["api_calls"].items())))
+    lines.append("   cachés: " + ", ".join(f"{key} {value}" for key, value in result["state"].items()))
+    if result.get("stages_us"):
+        lines.append("   etapas (µs de media): " + ", ".join(f"{stage} {us}" for stage, us in result["stages_us"].items()))
+    return "\n".join(lines)
+
+
+def format_comparison(name, before, after):
+    """Diferencias de rendimiento, latencia y memoria de un escenario respecto a una ejecución anterior."""
+    def change(old, new, lower_is_better=True):
+        if old in (None, 0) or new is None:
+            return f"{old} -> {new}"
+        percent = (new - old) / old * 100
+        better = percent < 0 if lower_is_better else percent > 0
+        return f"{old} -> {new} ({percent:+.1f}%{' mejor' if better and abs(percent) >= 1 else ''})"
+
+    lines = [
+        f"== {name} (comparado con la ejecución anterior)",
+        f"   eventos/s: {change(before['throughput'], after['throughput'], lower_is_better=False)}",
+        f"   p50 (ms): {change(before['latency_ms']['p50'], after['latency_ms']['p50'])}",
+        f"   p99 (ms): {change(before['latency_ms']['p99'], after['latency_ms']['p99'])}",
+    ]
+    if before.get("memory") and after.get("memory"):
+        lines.append(f"   memoria (KiB): {change(before['memory']['growth_kib'], after['memory']['growth_kib'])}")
+    return "\n".join(lines)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args):
+    results = {}
+    for name in SCENARIOS if args.scenario == "all" else (args.scenario,):
+        results[name] = await run_scenario(name, args)
+        if args.memory:
+            # Segunda pasada del mismo escenario, con tracemalloc
+            results[name]["memory"] = await run_scenario(name, args, traced=True)
+        print(format_result(name, results[name]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pruebas de carga sintéticas de los manejadores del bot.")
+    parser.add_argument("--scenario", choices=SCENARIOS + ("all",), default="all", help="Escenario a ejecutar (por defecto: all)")
+    parser.add_argument("--events", type=int, default=3000, help="Eventos medidos por escenario (por defecto: 3000)")
+    parser.add_argument("--warmup", type=int, default=200, help="Eventos de calentamiento, sin medir (por defecto: 200)")
+    parser.add_argument("--rate", type=float, default=1000, help="Eventos por segundo; 0 = lo más rápido posible (por defecto: 1000)")
+    parser.add_argument("--users", type=int, default=1000, help="Usuarios que escriben (por defecto: 1000)")
+    parser.add_argument("--spam-ratio", type=float, default=0.02, help="Fracción de mensajes de spammers (por defecto: 0.02)")
+    parser.add_argument("--reports", type=int, default=500, help="Reportes guardados en el servidor (por defecto: 500)")
+    parser.add_argument("--api-latency", type=float, default=0, help="Latencia simulada de cada llamada a la API en ms (por defecto: 0)")
+    parser.add_argument("--seed", type=int, default=1, help="Semilla de los eventos generados (por defecto: 1)")
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="No hacer la segunda pasada que mide la memoria con tracemalloc")
+    parser.add_argument("--output", help="Guarda los resultados en este archivo JSON")
+    parser.add_argument("--compare", help="Archivo JSON de una ejecución anterior con el que comparar")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    previous = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            previous = json.load(f)
+
+    # Los cogs leen y escriben en data/ con rutas relativas: se trabaja en un directorio temporal
+    listener = setup_logging(level="WARNING", log_file=None)
+    logging.getLogger("discord").setLevel(logging.ERROR)  # Avisos de voz sin PyNaCl, etc.
+    original_dir = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix="flexbot-bench-")
+    os.makedirs(os.path.join(work_dir, "data"))
+    revision = git_revision()
+    os.chdir(work_dir)
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        os.chdir(original_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        listener.stop()
+
+    if previous:
+        for name, result in results.items():
+            if name in previous.get("scenarios", {}):
+                print(format_comparison(name, previous["scenarios"][name], result))
+
+    if output:
+        report = {
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": revision,
+            "python": platform.python_version(),
+            "discord_py": discord.__version__,
+            "options": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+            "scenarios": results,
+        }
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+        print(f"Resultados guardados en {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Lanzador del bot en modo clúster: ejecuta varios procesos de `main.py`, cada uno con un
+rango de shards, para repartir los eventos de todos los servidores entre varios núcleos.
+
+Uso:
+    python cluster.py --procesos 4 [--shards 16]
+
+Sin `--shards` se usa el número de shards recomendado por Discord. Cada proceso recibe
+CLUSTER_ID, SHARD_COUNT y SHARD_IDS por variables de entorno (ver utils/cluster.py); los
+datos de `data/` se comparten entre procesos y cada uno guarda solo los de sus servidores.
+Si un proceso termina con error se vuelve a lanzar.
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+from dotenv import load_dotenv # type: ignore
+
+from utils.logs import setup_logging_from_env
+
+logger = logging.getLogger("cluster")
+
+GATEWAY_BOT_URL = "https://discord.com/api/v10/gateway/bot"
+# Espera antes de relanzar un proceso caído (se duplica con cada caída seguida, hasta el máximo)
+RESTART_DELAY = 5
+MAX_RESTART_DELAY = 300
+# Si un proceso aguanta este tiempo en marcha, la espera vuelve al valor inicial
+STABLE_SECONDS = 600
+
+
+def recommended_shards(token):
+    """Número de shards que recomienda Discord para el bot."""
+    request = urllib.request.Request(GATEWAY_BOT_URL, headers={
+        "Authorization": f"Bot {token}",
+        "User-Agent": "DiscordBot (cluster.py, 1.0)"
+    })
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read().decode())["shards"]
+
+
+def split_shards(shard_count, processes):
+    """Reparte los shards en `processes` rangos consecutivos de tamaño lo más parecido posible."""
+    base, extra = divmod(shard_count, processes)
+    ranges = []
+    start = 0
+    for index in range(processes):
+        size = base + (1 if index < extra else 0)
+        ranges.append(range(start, start + size))
+        start += size
+    return ranges
+
+
+class Worker:
+    """Un proceso de `main.py` con su rango de shards."""
+
+    def __init__(self, cluster_id, shard_ids, shard_count):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.process = None
+        self.started_at = 0.0
+        self.restart_delay = RESTART_DELAY
+        self.restart_at = None
+
+    def start(self):
+        env = dict(os.environ,
+                   CLUSTER_ID=str(self.cluster_id),
+                   SHARD_COUNT=str(self.shard_count),
+                   SHARD_IDS=f"{self.shard_ids[0]}-{self.shard_ids[-1]}")
+        self.process = subprocess.Popen([sys.executable, "main.py"], env=env)
+        self.started_at = time.monotonic()
+        self.restart_at = None
+        logger.info("Clúster %s: iniciado (PID %s, shards %s-%s).", self.cluster_id, self.process.pid, self.shard_ids[0], self.shard_ids[-1])
+
+    def check(self):
+        """Relanza el proceso si terminó con error. Devuelve False si terminó correctamente."""
+        if self.restart_at is not None:
+            if time.monotonic() >= self.restart_at:
+                self.start()
+            return True
+
+        code = self.process.poll()
+        if code is None:
+            return True
+        if code == 0:
+            logger.info("Clúster %s: terminado correctamente.", self.cluster_id)
+            return False
+
+        if time.monotonic() - self.started_at >= STABLE_SECONDS:
+            self.restart_delay = RESTART_DELAY
+        logger.warning("Clúster %s: terminó con código %s; se relanza en %s s.", self.cluster_id, code, self.restart_delay)
+        self.restart_at = time.monotonic() + self.restart_delay
+        self.restart_delay = min(self.restart_delay * 2, MAX_RESTART_DELAY)
+        return True
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ejecuta el bot repartido en varios procesos por rangos de shards.")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1, help="Número de procesos (por defecto, uno por núcleo).")
+    parser.add_argument("--shards", type=int, default=None, help="Número total de shards (por defecto, el recomendado por Discord).")
+    args = parser.parse_args()
+
+    if os.name != "posix":
+        parser.error("El modo clúster necesita un sistema POSIX (bloqueos de archivo entre procesos).")
+
+    load_dotenv()
+    log_listener = setup_logging_from_env(os.environ, default_file="logs/cluster.log")
+    shard_count = args.shards or recommended_shards(os.getenv("DISCORD_TOKEN"))
+    processes = max(1, min(args.procesos, shard_count))
+    workers = [
+        Worker(cluster_id, shard_ids, shard_count)
+        for cluster_id, shard_ids in enumerate(split_shards(shard_count, processes))
+    ]
+    logger.info("Iniciando %d proceso(s) con %d shard(s) en total.", processes, shard_count)
+
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    for worker in workers:
+        worker.start()
+
+    while not stopping and workers:
+        time.sleep(1)
+        workers = [worker for worker in workers if worker.check()]
+
+    for worker in workers:
+        worker.stop()
+    for worker in workers:
+        if worker.process is None:
+            continue
+        try:
+            worker.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            worker.process.kill()
+    log_listener.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import discord # type: ignore
+from discord.ext import commands # type: ignore
+import datetime
+import asyncio
+import logging
+
+from utils.case_log import CaseLog
+
+logger = logging.getLogger(__name__)
+
+CASES_PER_PAGE = 10
+ACTION_LABELS = {
+    "ban": "🔨 Baneo",
+    "unban": "🔓 Desbaneo",
+    "kick": "👢 Expulsión",
+    "mute": "🔇 Silencio",
+    "unmute": "🔊 Fin de silencio",
+    "warn": "⚠️ Advertencia"
+}
+
+
+class Cases(commands.Cog):
+    """
+    Registro unificado de casos de moderación.
+    Los cogs de Moderación, Advertencias y Reportes registran aquí cada acción aplicada.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.case_log = CaseLog()
+
+    async def cog_load(self):
+        # La lectura del registro se hace fuera del bucle de eventos para no retrasar el arranque
+        await asyncio.get_running_loop().run_in_executor(None, self.case_log.load)
+
+    def record_case(self, guild_id, action, target_id, moderator_id, reason, duration=None):
+        """Registra un caso de moderación. Devuelve el caso creado."""
+        try:
+            return self.case_log.record(guild_id, action, target_id, moderator_id, reason, duration)
+        except IOError as e:
+            logger.error("No se pudo registrar el caso (%s sobre %s): %s", action, target_id, e)
+            return None
+
+    def build_cases_embed(self, title, cases, page):
+        """Crea el embed con una página de casos."""
+        total_pages = max(1, (len(cases) + CASES_PER_PAGE - 1) // CASES_PER_PAGE)
+        page = max(1, min(page, total_pages))
+        start = (page - 1) * CASES_PER_PAGE
+
+        embed = discord.Embed(title=title, color=discord.Color.blue(), timestamp=datetime.datetime.utcnow())
+        for case in cases[start:start + CASES_PER_PAGE]:
+            date = datetime.datetime.fromisoformat(case["timestamp"]).strftime('%d/%m/%Y %H:%M')
+            value = (f"**Usuario:** <@{case['target_id']}>\n"
+                     f"**Moderador:** <@{case['moderator_id']}>\n"
+                     f"**Razón:** {case['reason']}\n")
+            if case.get("duration"):
+                value += f"**Duración:** {case['duration']}\n"
+            value += f"**Fecha:** {date}"
+            embed.add_field(
+                name=f"Caso #{case['case']} · {ACTION_LABELS.get(case['action'], case['action'])}",
+                value=value,
+                inline=False
+            )
+        embed.set_footer(text=f"Página {page}/{total_pages} · {len(cases)} caso(s)")
+        return embed
+
+    @commands.hybrid_command(name="cases", aliases=["casos"])
+    @commands.has_permissions(manage_messages=True)
+    @commands.guild_only()
+    async def cases(self, ctx, user: discord.User, page: int = 1):
+        """
+        Muestra el historial de casos de moderación de un usuario, del más reciente al más antiguo.
+
+        Parámetros:
+        -----------
+        user: discord.User
+            El usuario (mención o ID; también funciona con usuarios que ya no están en el servidor)
+        page: int, opcional
+            Página de resultados (10 casos por página)
+
+        Ejemplo:
+        --------
+        !flex cases @usuario
+        !flex cases 123456789 2
+        """
+        cases = self.case_log.cases_for_target(ctx.guild.id, user.id)
+        if not cases:
+            await ctx.send(f"{user.mention} no tiene casos de moderación registrados en este servidor.")
+            return
+        await ctx.send(embed=self.build_cases_embed(f"Historial de {user}", cases, page))
+
+    @commands.hybrid_command(name="modcases", aliases=["casosmod"])
+    @commands.has_permissions(manage_messages=True)
+    @commands.guild_only()
+    async def mod_cases(self, ctx, moderator: discord.User, page: int = 1):
+        """
+        Muestra los casos de moderación aplicados por un moderador.
+
+        Ejemplo:
+        --------
+        !flex modcases @moderador
+        """
+        cases = self.case_log.cases_by_moderator(ctx.guild.id, moderator.id)
+        if not cases:
+            await ctx.send(f"{moderator.mention} no ha aplicado ninguna acción registrada en este servidor.")
+            return
+        await ctx.send(embed=self.build_cases_embed(f"Casos aplicados por {moderator}", cases, page))
+
+
+async def setup(bot):
+    await bot.add_cog(Cases(bot))
@@ -0,0 +1,374 @@
+import discord # type: ignore
+from discord.ext import commands # type: ignore
+import logging
+import re
+
+from utils.aho_corasick import AhoCorasick
+from utils.confusables import normalize_confusables
+from utils.guild_config import guild_config, parse_value
+from utils.message_pipeline import CONTENT_FILTER_ORDER, pipeline
+from utils.safe_regex import MAX_TOTAL_COST, pattern_cost
+
+logger = logging.getLogger(__name__)
+
+FILTER_ACTIONS = {"delete": "Eliminar el mensaje", "warn": "Eliminar y advertir", "mute": "Eliminar y silenciar"}
+MAX_TERMS = 1000
+MAX_PATTERNS = 50
+MAX_PATTERN_LENGTH = 200
+
+
+def is_boundary(text, index):
+    """True si en `index` no continúa una palabra (inicio/fin del texto o carácter no alfanumérico)."""
+    return index < 0 or index >= len(text) or not text[index].isalnum()
+
+
+class ContentFilter(commands.Cog):
+    """
+    Filtro de términos prohibidos y expresiones regulares por servidor.
+
+    Los términos de cada servidor se compilan en un autómata de Aho-Corasick, de modo que
+    revisar un mensaje cuesta lo mismo con diez términos que con mil. Los términos y los
+    mensajes se normalizan igual (minúsculas, sin acentos ni caracteres confundibles).
+    Se ejecuta como etapa de la tubería de mensajes, antes del anti-spam.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.automata = {}  # guild_id: AhoCorasick con los términos normalizados
+        self.patterns = {}  # guild_id: (patrones, expresión compilada o None)
+        guild_config.add_listener(self.on_config_change)
+        pipeline.register("content_filter", self.filter_stage, CONTENT_FILTER_ORDER)
+
+    def cog_unload(self):
+        guild_config.remove_listener(self.on_config_change)
+        pipeline.unregister("content_filter")
+
+    def on_config_change(self, guild_id, key):
+        """Descarta los autómatas que ya no coinciden con la configuración."""
+        if key is None:
+            self.automata.clear()
+            self.patterns.clear()
+        elif key == "filter_terms":
+            guild_id = int(guild_id)
+            automaton = self.automata.get(guild_id)
+            # Los comandos de este cog ya actualizan el autómata de forma incremental;
+            # solo se reconstruye si la lista cambió por otro medio (p. ej. `config reset`).
+            if automaton is not None and automaton.terms != self.normalized_terms(guild_config.get(guild_id)):
+                del self.automata[guild_id]
+        elif key == "filter_patterns":
+            self.patterns.pop(int(guild_id), None)
+
+    def normalized_terms(self, config):
+        terms = (normalize_confusables(term).strip() for term in config["filter_terms"])
+        return {term for term in terms if term}
+
+    def get_automaton(self, guild_id, config):
+        automaton = self.automata.get(guild_id)
+        if automaton is None:
+            automaton = self.automata[guild_id] = AhoCorasick(self.normalized_terms(config))
+        return automaton
+
+    def get_pattern(self, guild_id, config):
+        """
+        Une las expresiones regulares del servidor en una sola alternativa compilada.
+        Se descartan las que no son seguras (ver utils/safe_regex.py), que solo pueden llegar
+        aquí si se editó el archivo de configuración a mano, y las que superan el coste total.
+        """
+        cached = self.patterns.get(guild_id)
+        patterns = tuple(config["filter_patterns"])
+        if cached is None or cached[0] != patterns:
+            valid = []
+            total_cost = 0
+            for pattern in patterns:
+                try:
+                    cost = pattern_cost(pattern)
+                except ValueError as e:
+                    logger.warning("Expresión regular descartada en el servidor %s: %s (%s)", guild_id, pattern, e)
+                    continue
+                if total_cost + cost > MAX_TOTAL_COST:
+                    logger.warning("Expresión regular descartada en el servidor %s: %s (coste total superado)", guild_id, pattern)
+                    continue
+                total_cost += cost
+                valid.append(f"(?:{pattern})")
+            compiled = re.compile("|".join(valid), re.IGNORECASE) if valid else None
+            cached = self.patterns[guild_id] = (patterns, compiled)
+        return cached[1]
+
+    def safe_cost(self, pattern):
+        try:
+            return pattern_cost(pattern)
+        except ValueError:
+            return 0  # Se descarta al compilar, no cuenta
+
+    def find_violation(self, guild_id, content, normalized=None):
+        """
+        Devuelve el término o patrón prohibido que aparece en `content`, o None.
+        Se puede pasar el contenido ya normalizado para no repetir el trabajo.
+        """
+        config = guild_config.get(guild_id)
+        if not config["filter_terms"] and not config["filter_patterns"]:
+            return None
+
+        if normalized is None:
+            normalized = normalize_confusables(content)
+        if config["filter_terms"]:
+            for start, end, term in self.get_automaton(guild_id, config).iter_matches(normalized):
+                # Solo palabras completas: "ass" no debe coincidir dentro de "class"
+                if (not term[0].isalnum() or is_boundary(normalized, start - 1)) and \
+                        (not term[-1].isalnum() or is_boundary(normalized, end)):
+                    return term
+
+        if config["filter_patterns"]:
+            pattern = self.get_pattern(guild_id, config)
+            if pattern:
+                match = pattern.search(content) or pattern.search(normalized)
+                if match:
+                    return match.group(0)
+        return None
+
+    async def filter_stage(self, ctx) -> bool:
+        """
+        Etapa de la tubería: aplica la acción configurada si el mensaje contiene contenido prohibido.
+        Devuelve True si el mensaje se filtró.
+        """
+        config = ctx.config
+        if not ctx.message.content or (not config["filter_terms"] and not config["filter_patterns"]):
+            return False
+        if not self.find_violation(ctx.guild.id, ctx.message.content, ctx.normalized_content):
+            return False
+        await self.enforce(ctx.message, "Filtro de contenido: mensaje con contenido prohibido")
+        return True
+
+    async def enforce(self, message, reason):
+        """
+        Elimina el mensaje y aplica la acción configurada en `filter_action` (advertir o silenciar).
+        También lo usa el escáner de enlaces para sancionar igual los enlaces bloqueados.
+        """
+        guild = message.guild
+        member = message.author
+        config = guild_config.get(guild.id)
+        action = config["filter_action"]
+
+        try:
+            await message.delete()
+        except discord.NotFound:
+            pass
+        except discord.HTTPException as e:
+            logger.warning("No se pudo eliminar un mensaje en %s: %s", guild.name, e)
+
+        try:
+            if action == "warn":
+                warnings_cog = self.bot.get_cog("Warnings")
+                if warnings_cog:
+                    warning_count = warnings_cog.add_warning(guild.id, member.id, reason, self.bot.user.id)
+                    await message.channel.send(
+                        f"⚠️ {member.mention}, tu mensaje se ha eliminado por contener contenido no permitido. "
+                        f"Has recibido una advertencia ({warning_count} activas)."
+                    )
+                    await warnings_cog.apply_escalation(guild, message.channel, member, warning_count)
+                    return
+            elif action == "mute":
+                moderation_cog = self.bot.get_cog("Moderation")
+                if moderation_cog:
+                    minutes = config["filter_mute_minutes"]
+                    muted_role = await moderation_cog.mute_member(
+                        guild, member, minutes * 60, reason, self.bot.user.id, f"{minutes}m",
+                        notify_channel=message.channel,
+                        unmute_notice=f"{member.mention} ha sido desilenciado automáticamente."
+                    )
+                    if muted_role:
+                        await message.channel.send(
+                            f"🔇 {member.mention} ha sido silenciado {minutes} minutos por enviar contenido no permitido."
+                        )
+                        return
+
+            await message.channel.send(
+                f"🚫 {member.mention}, tu mensaje se ha eliminado por contener contenido no permitido.",
+                delete_after=10
+            )
+        except discord.HTTPException as e:
+            logger.error("Error aplicando la acción '%s' en %s: %s", action, guild.name, e)
+
+    @commands.hybrid_group(name="filtro", aliases=["filter"], invoke_without_command=True, fallback="ver")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def content_filter(self, ctx):
+        """
+        Muestra el filtro de contenido del servidor.
+
+        Subcomandos:
+        ------------
+        !flex filtro agregar <término>
+        !flex filtro quitar <término>
+        !flex filtro regex <patrón>
+        !flex filtro quitarregex <patrón>
+        !flex filtro accion <delete|warn|mute>
+        !flex filtro probar <texto>
+        """
+        config = guild_config.get(ctx.guild.id)
+        embed = discord.Embed(
+            title="🧹 Filtro de Contenido",
+            description=f"**Acción:** {FILTER_ACTIONS[config['filter_action']]}"
+                        + (f" ({config['filter_mute_minutes']} min)" if config["filter_action"] == "mute" else ""),
+            color=discord.Color.blue()
+        )
+        # Los términos se muestran ocultos (spoiler) para no reproducirlos en el canal
+        terms = ", ".join(f"||{term}||" for term in config["filter_terms"]) or "Ninguno"
+        if len(terms) > 1000:
+            terms = terms[:1000].rsplit(",", 1)[0] + ", ..."
+        embed.add_field(name=f"Términos ({len(config['filter_terms'])})", value=terms, inline=False)
+        patterns = "\n".join(f"`{pattern}`" for pattern in config["filter_patterns"]) or "Ninguno"
+        if len(patterns) > 1000:
+            patterns = patterns[:1000].rsplit("\n", 1)[0] + "\n..."
+        embed.add_field(name=f"Expresiones regulares ({len(config['filter_patterns'])})", value=patterns, inline=False)
+        embed.set_footer(text="Los moderadores están exentos del filtro.")
+        await ctx.send(embed=embed)
+
+    @content_filter.command(name="agregar", aliases=["add"])
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def filter_add(self, ctx, *, termino: str):
+        """
+        Añade un término prohibido.
+        Se detecta aunque se escriba con mayúsculas, acentos o caracteres parecidos.
+        Ejemplo: !flex filtro agregar palabra
+        """
+        # Se guarda normalizado, como se compara: "Palabra" y "pálabra" son el mismo término
+        normalized = normalize_confusables(termino).strip()
+        if not normalized:
+            await ctx.send("El término no puede estar vacío.")
+            return
+
+        config = guild_config.get(ctx.guild.id)
+        terms = list(config["filter_terms"])
+        if normalized in self.normalized_terms(config):
+            await ctx.send("Ese término ya está en el filtro.")
+            return
+        if len(terms) >= MAX_TERMS:
+            await ctx.send(f"El filtro admite como máximo {MAX_TERMS} términos.")
+            return
+
+        terms.append(normalized)
+        automaton = self.automata.get(ctx.guild.id)
+        if automaton is not None:
+            automaton.add(normalized)
+        guild_config.set(ctx.guild.id, "filter_terms", terms)
+        await ctx.send(f"Término añadido al filtro ({len(terms)} en total).")
+
+    @content_filter.command(name="quitar", aliases=["remove"])
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def filter_remove(self, ctx, *, termino: str):
+        """
+        Quita un término prohibido.
+        Ejemplo: !flex filtro quitar palabra
+        """
+        normalized = normalize_confusables(termino).strip()
+        terms = guild_config.get(ctx.guild.id)["filter_terms"]
+        # También quita las variantes guardadas sin normalizar por versiones anteriores
+        remaining = [term for term in terms if normalize_confusables(term).strip() != normalized]
+        if not normalized or len(remaining) == len(terms):
+            await ctx.send("Ese término no está en el filtro.")
+            return
+
+        terms = remaining
+        automaton = self.automata.get(ctx.guild.id)
+        if automaton is not None:
+            automaton.remove(normalized)
+        guild_config.set(ctx.guild.id, "filter_terms", terms)
+        await ctx.send(f"Término quitado del filtro ({len(terms)} restantes).")
+
+    @content_filter.command(name="regex")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def filter_add_pattern(self, ctx, *, patron: str):
+        """
+        Añade una expresión regular prohibida (no distingue mayúsculas).
+        Los cuantificadores sin límite (`*`, `+`) solo se admiten al final de la expresión.
+        Ejemplo: !flex filtro regex discord\\.gg/\\w+
+        """
+        patron = patron.strip()
+        if len(patron) > MAX_PATTERN_LENGTH:
+            await ctx.send(f"La expresión no puede superar los {MAX_PATTERN_LENGTH} caracteres.")
+            return
+        # Las expresiones se evalúan con cada mensaje: solo se admiten las de coste acotado
+        try:
+            cost = pattern_cost(patron)
+        except ValueError as e:
+            await ctx.send(str(e))
+            return
+
+        patterns = list(guild_config.get(ctx.guild.id)["filter_patterns"])
+        if patron in patterns:
+            await ctx.send("Esa expresión ya está en el filtro.")
+            return
+        if len(patterns) >= MAX_PATTERNS:
+            await ctx.send(f"El filtro admite como máximo {MAX_PATTERNS} expresiones regulares.")
+            return
+        total_cost = sum(self.safe_cost(pattern) for pattern in patterns)
+        if total_cost + cost > MAX_TOTAL_COST:
+            await ctx.send(f"Las expresiones del filtro superarían el coste total permitido ({MAX_TOTAL_COST}). Quita o simplifica alguna antes.")
+            return
+
+        patterns.append(patron)
+        guild_config.set(ctx.guild.id, "filter_patterns", patterns)
+        await ctx.send(f"Expresión añadida al filtro: `{patron}`")
+
+    @content_filter.command(name="quitarregex")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def filter_remove_pattern(self, ctx, *, patron: str):
+        """
+        Quita una expresión regular del filtro.
+        Ejemplo: !flex filtro quitarregex discord\\.gg/\\w+
+        """
+        patron = patron.strip()
+        patterns = list(guild_config.get(ctx.guild.id)["filter_patterns"])
+        if patron not in patterns:
+            await ctx.send("Esa expresión no está en el filtro.")
+            return
+
+        patterns.remove(patron)
+        guild_config.set(ctx.guild.id, "filter_patterns", patterns)
+        await ctx.send(f"Expresión quitada del filtro: `{patron}`")
+
+    @content_filter.command(name="accion")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def filter_action(self, ctx, accion: str, minutos: int = None):
+        """
+        Establece qué se hace con los mensajes filtrados: delete, warn o mute.
+        Ejemplo: !flex filtro accion mute 30
+        """
+        try:
+            action = parse_value("filter_action", accion)
+        except ValueError as e:
+            await ctx.send(str(e))
+            return
+
+        if minutos is not None and minutos < 1:
+            await ctx.send("La duración del silencio debe ser de al menos 1 minuto.")
+            return
+
+        guild_config.set(ctx.guild.id, "filter_action", action)
+        if action == "mute" and minutos is not None:
+            guild_config.set(ctx.guild.id, "filter_mute_minutes", minutos)
+        await ctx.send(f"Acción del filtro establecida: {FILTER_ACTIONS[action]}.")
+
+    @content_filter.command(name="probar", aliases=["test"])
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def filter_test(self, ctx, *, texto: str):
+        """
+        Comprueba si un texto sería filtrado, sin aplicar ninguna acción.
+        Ejemplo: !flex filtro probar texto de ejemplo
+        """
+        match = self.find_violation(ctx.guild.id, texto)
+        if match:
+            await ctx.send(f"🚫 El texto sería filtrado (coincide con ||{match}||).")
+        else:
+            await ctx.send("✅ El texto no contiene contenido prohibido.")
+
+
+async def setup(bot):
+    await bot.add_cog(ContentFilter(bot))
@@ -0,0 +1,98 @@
+import discord # type: ignore
+from discord.ext import commands # type: ignore
+import os
+
+from utils.gateway_trace import gateway_trace
+from utils.loop_monitor import DEFAULT_SLOW_THRESHOLD, loop_monitor
+
+# Bloqueos y código más lento que se muestran en `!flex diag`
+SHOWN_SPANS = 5
+SHOWN_HANDLERS = 5
+
+
+class Diagnostics(commands.Cog):
+    """
+    Vigilancia del bucle de eventos (ver utils/loop_monitor.py).
+
+    El umbral a partir del cual un retraso cuenta como bloqueo se configura con LOOP_SLOW_MS
+    (100 ms por defecto). Con LOOP_DEBUG=1 se activa además el modo debug de asyncio, que
+    registra cada callback más lento que el umbral; tiene un coste apreciable, así que solo
+    conviene usarlo mientras se investiga un problema.
+
+    Con GATEWAY_TRACE=ruta graba además los eventos del gateway para reproducirlos con el
+    arnés sin conexión (ver utils/gateway_trace.py).
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        threshold = float(os.getenv("LOOP_SLOW_MS", DEFAULT_SLOW_THRESHOLD * 1000)) / 1000
+        debug = os.getenv("LOOP_DEBUG", "").lower() in ("1", "true", "si", "sí")
+        loop_monitor.start(self.bot, threshold, debug)
+        if os.getenv("GATEWAY_TRACE"):
+            gateway_trace.start(os.getenv("GATEWAY_TRACE"))
+
+    async def cog_unload(self):
+        await loop_monitor.stop()
+        gateway_trace.stop()
+
+    @commands.Cog.listener()
+    async def on_socket_raw_receive(self, raw):
+        # Solo se despacha si el bot se creó con enable_debug_events (config/config.py)
+        gateway_trace.record(raw)
+
+    @commands.hybrid_command(name="diag", aliases=["diagnostico"])
+    @commands.has_permissions(administrator=True)
+    async def diagnostics(self, ctx, accion: str = None):
+        """
+        Muestra el retraso del bucle de eventos y qué código lo ha bloqueado.
+        Usa `!flex diag reset` para reiniciar las estadísticas.
+        """
+        if accion == "reset":
+            loop_monitor.reset()
+            await ctx.send("Estadísticas del bucle de eventos reiniciadas.")
+            return
+
+        current, average, p99, maximum = loop_monitor.lag_summary()
+        embed = discord.Embed(
+            title="🩺 Diagnóstico del Bucle de Eventos",
+            description=f"Umbral de bloqueo: {loop_monitor.threshold * 1000:.0f} ms · "
+                        f"Modo debug de asyncio: {'activado' if loop_monitor.debug else 'desactivado'}"
+                        f"{'' if loop_monitor.running else ' · ⚠️ Vigilante detenido'}",
+            color=discord.Color.blue()
+        )
+        embed.add_field(
+            name="Retraso del bucle",
+            value=f"Actual: {current * 1000:.1f} ms · Media: {average * 1000:.1f} ms\n"
+                  f"p99: {p99 * 1000:.1f} ms · Máx: {maximum * 1000:.1f} ms",
+            inline=False
+        )
+
+        slowest = sorted(loop_monitor.by_handler.items(), key=lambda item: item[1][1], reverse=True)[:SHOWN_HANDLERS]
+        embed.add_field(
+            name="Código que más ha bloqueado",
+            value="\n".join(
+                f"`{handler}` · {count} bloqueo(s), {total * 1000:.0f} ms en total, máx. {worst * 1000:.0f} ms"
+                f"{f' · {location}' if location else ''}"
+                for handler, (count, total, worst, location) in slowest
+            ) or "Ningún bloqueo registrado.",
+            inline=False
+        )
+
+        recent = list(loop_monitor.spans)[-SHOWN_SPANS:]
+        if recent:
+            embed.add_field(
+                name="Últimos bloqueos",
+                value="\n".join(
+                    f"<t:{int(span.at)}:R> {span.seconds * 1000:.0f} ms · `{span.handler}`"
+                    f"{f' · {span.location}' if span.location else ''}"
+                    for span in reversed(recent)
+                ),
+                inline=False
+            )
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(Diagnostics(bot))
@@ -0,0 +1,71 @@
+import discord # type: ignore
+from discord.ext import commands # type: ignore
+import asyncio
+import logging
+import os
+
+from utils.export import FORMATS, export_guild
+
+logger = logging.getLogger(__name__)
+
+
+class Export(commands.Cog):
+    """
+    Exportación del historial de moderación (reportes, advertencias, casos e hilos) de un servidor.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.hybrid_command(name="export", aliases=["exportar"])
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    @commands.cooldown(1, 60, commands.BucketType.guild)
+    async def export(self, ctx, formato: str = "jsonl"):
+        """
+        Exporta el historial de moderación del servidor a un archivo comprimido (gzip).
+        Si el archivo supera el límite de subida del servidor, se guarda en el disco del bot.
+
+        Parámetros:
+        -----------
+        formato: str, opcional
+            "jsonl" (por defecto) o "csv"
+
+        Ejemplo:
+        --------
+        !flex export csv
+        """
+        formato = formato.lower()
+        if formato not in FORMATS:
+            await ctx.send(f"Formato no válido. Usa uno de: {', '.join(FORMATS)}.")
+            return
+
+        async with ctx.typing():
+            try:
+                # La escritura del archivo se hace fuera del bucle de eventos
+                path, count = await asyncio.get_running_loop().run_in_executor(None, export_guild, ctx.guild.id, formato)
+            except Exception as e:
+                await ctx.send(f"No se pudo generar la exportación. Error: {e}")
+                logger.exception("Error en el comando export: %s", e)
+                return
+
+        size = os.path.getsize(path)
+        if size <= ctx.guild.filesize_limit:
+            try:
+                await ctx.send(
+                    f"📦 Exportación completada: {count} registro(s).",
+                    file=discord.File(path, filename=os.path.basename(path))
+                )
+                os.remove(path)
+                return
+            except discord.HTTPException as e:
+                logger.warning("No se pudo subir la exportación %s: %s", path, e)
+
+        await ctx.send(
+            f"📦 Exportación completada: {count} registro(s), {size / (1024 * 1024):.1f} MB. "
+            f"El archivo es demasiado grande para subirlo y se ha guardado en el servidor del bot: `{path}`"
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(Export(bot))
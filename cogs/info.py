@@ -1,6 +1,8 @@
 import discord # type: ignore
 from discord.ext import commands # type: ignore
 
+from utils.guild_config import DEFAULTS, guild_config
+
 class Info(commands.Cog):
     """
     Sistema de información del bot.
@@ -10,7 +12,7 @@ class Info(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @commands.command(name="info")
+    @commands.hybrid_command(name="info")
     async def user_info(self, ctx):
         """
         Muestra información sobre los comandos disponibles para usuarios.
@@ -35,11 +37,11 @@ class Info(commands.Cog):
         )
 
         # Pie de página con información adicional
-        embed.set_footer(text="Si necesitas reportar algún problema, usa !flex report")
+        embed.set_footer(text="Si necesitas reportar algún problema, usa !flex report o /report")
         
         await ctx.send(embed=embed)
 
-    @commands.command(name="info2")
+    @commands.hybrid_command(name="info2")
     @commands.has_permissions(manage_messages=True)
     async def mod_info(self, ctx):
         """
@@ -49,6 +51,8 @@ class Info(commands.Cog):
         Uso:
         !flex info2
         """
+        config = guild_config.get(ctx.guild.id) if ctx.guild else DEFAULTS
+
         embed = discord.Embed(
             title="🛡️ Comandos de Moderación",
             description="Lista de comandos disponibles para el equipo de moderación",
@@ -64,6 +68,12 @@ class Info(commands.Cog):
                 "**!flex unban ID_usuario [razón]** - Desbanea a un usuario\n"
                 "**!flex mute @usuario [duración] [razón]** - Silencia a un usuario\n"
                 "**!flex unmute @usuario [razón]** - Remueve el silencio de un usuario\n"
+                "**!flex cases @usuario** - Muestra el historial de casos de moderación de un usuario\n"
+                "**!flex modcases @moderador** - Muestra los casos aplicados por un moderador\n"
+                "**!flex escalado** - Muestra o configura el escalado automático de advertencias (`set`/`quitar`)\n"
+                "**!flex caducidad [días]** - Muestra o establece tras cuántos días caducan las advertencias\n"
+                "**!flex lockdown [razón]** - Impide escribir a @everyone en todos los canales de texto\n"
+                "**!flex unlock** - Restaura los permisos guardados por `lockdown`\n"
             ),
             inline=False
         )
@@ -75,6 +85,8 @@ class Info(commands.Cog):
                 "**!flex reports** - Muestra los reportes pendientes\n"
                 "**!flex reports resuelto** - Muestra los reportes resueltos\n"
                 "**!flex reports todos** - Muestra todos los reportes\n"
+                "**!flex search texto [usuario:@usuario] [estado:X] [tipo:X] [pagina:N]** - Busca en reportes y advertencias\n"
+                "**!flex export [jsonl|csv]** - Exporta el historial de moderación a un archivo (administradores)\n"
             ),
             inline=False
         )
@@ -96,9 +108,17 @@ class Info(commands.Cog):
             name="⚙️ Configuración y Anti-Spam",
             value=(
                 "El sistema anti-spam está activo automáticamente:\n"
-                "• Detecta spam (5 mensajes en 3 segundos)\n"
+                f"• Detecta spam ({config['spam_threshold']} mensajes en {config['spam_interval']} segundos; las menciones, enlaces y adjuntos cuentan más)\n"
+                f"• Detecta mensajes repetidos ({config['duplicate_threshold']} copias en {config['duplicate_window']} segundos, en cualquier canal)\n"
                 "• Silencia automáticamente por 5 minutos\n"
                 "• Los moderadores están exentos\n"
+                "**!flex config** - Muestra y modifica la configuración del servidor (`set`/`reset`/`reload`)\n"
+                "**!flex pipeline** - Tiempos de cada etapa de la revisión de mensajes (administradores)\n"
+                "**!flex diag** - Retraso del bucle de eventos y código que lo bloquea (administradores)\n"
+                "**!flex reload <cog>** - Recarga un cog conservando su estado en memoria (propietario del bot)\n"
+                "**!flex raid [on [duración]|off]** - Estado de la protección anti-raid y modo bloqueo (administradores)\n"
+                "**!flex filtro** - Filtro de términos prohibidos (`agregar`/`quitar`/`regex`/`quitarregex`/`accion`/`probar`)\n"
+                "**!flex enlaces** - Dominios bloqueados/permitidos e invitaciones (`bloquear`/`permitir`/`quitar`/`invitaciones`)\n"
             ),
             inline=False
         )
@@ -108,14 +128,14 @@ class Info(commands.Cog):
             name="💡 Consejos para Moderadores",
             value=(
                 "• Siempre proporciona una razón al tomar acciones de moderación\n"
-                "• Revisa regularmente el canal #reportes\n"
+                f"• Revisa regularmente el canal #{config['reports_channel_name']}\n"
                 "• Documenta las acciones tomadas en el canal de logs\n"
                 "• Sigue el protocolo de moderación establecido\n"
             ),
             inline=False
         )
 
-        embed.set_footer(text="Recuerda: Con el poder viene la responsabilidad. Usa estos comandos sabiamente.")
+        embed.set_footer(text="Todos los comandos también están disponibles con / · Recuerda: Con el poder viene la responsabilidad.")
         
         # Enviar el mensaje en el canal actual
         await ctx.send(embed=embed)
@@ -0,0 +1,323 @@
+import discord # type: ignore
+from discord.ext import commands # type: ignore
+import aiohttp # type: ignore
+import asyncio
+import logging
+from urllib.parse import urljoin
+
+from utils.guild_config import guild_config, parse_value
+from utils.link_scanner import (
+    MISSING, SHORTENER_DOMAINS, PublicOnlyResolver, TTLCache, check_redirect_target, domain_in, extract_links
+)
+from utils.message_pipeline import LINK_SCANNER_ORDER, pipeline
+
+logger = logging.getLogger(__name__)
+
+# Tiempo de vida en caché de cada resolución (segundos)
+INVITE_TTL = 6 * 3600
+REDIRECT_TTL = 24 * 3600
+FAILED_TTL = 600  # Invitaciones inválidas o errores: se reintenta antes
+RESOLUTION_CACHE_SIZE = 4096
+VERDICT_CACHE_SIZE = 4096
+RESOLVE_TIMEOUT = 5
+# Redirecciones que se siguen como mucho desde un acortador
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+# Mensajes que esperan la misma resolución (el resto se revisa igualmente al volver a aparecer)
+MAX_WAITING_MESSAGES = 20
+
+
+def clean_domain(text):
+    """Extrae el dominio de lo que escribe un administrador (acepta URLs completas)."""
+    text = text.strip().lower()
+    if "://" in text:
+        text = text.split("://", 1)[1]
+    text = text.split("/", 1)[0].split(":", 1)[0]
+    if text.startswith("www."):
+        text = text[4:]
+    return text
+
+
+class DiscordResolver:
+    """Resuelve invitaciones con la API de Discord y acortadores siguiendo sus redirecciones."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.session = None
+
+    async def resolve_invite(self, code):
+        """Devuelve el ID del servidor de la invitación o None si no es válida."""
+        try:
+            invite = await self.bot.fetch_invite(code, with_counts=False)
+        except discord.NotFound:
+            return None
+        return invite.guild.id if invite.guild else None
+
+    async def resolve_redirect(self, url):
+        """
+        Devuelve el dominio final tras seguir las redirecciones de `url`. Cada salto se comprueba
+        antes de pedirlo (solo http(s) y direcciones públicas, ver utils/link_scanner.py) para que
+        un enlace no pueda usar al bot para acceder a su red interna; lanza ValueError si no se admite.
+        """
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(resolver=PublicOnlyResolver()),
+                timeout=aiohttp.ClientTimeout(total=RESOLVE_TIMEOUT)
+            )
+        for _ in range(MAX_REDIRECTS + 1):
+            check_redirect_target(url)
+            async with self.session.head(url, allow_redirects=False) as response:
+                location = response.headers.get("Location")
+                if response.status not in REDIRECT_STATUSES or not location:
+                    domain = (response.url.host or "").lower()
+                    return domain[4:] if domain.startswith("www.") else domain
+            url = urljoin(str(response.url), location)
+        raise ValueError(f"Más de {MAX_REDIRECTS} redirecciones")
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class LinkScanner(commands.Cog):
+    """
+    Escáner de enlaces: dominios permitidos/bloqueados e invitaciones a otros servidores.
+
+    Los dominios se comprueban al momento. Las invitaciones y los acortadores necesitan una
+    petición HTTP, que nunca se espera en la tubería de mensajes: si la resolución no está en caché,
+    el mensaje pasa, la resolución se lanza en segundo plano y, al terminar, el mensaje se
+    revisa de nuevo (y se sanciona si procede). Las resoluciones se guardan en una caché LRU
+    con caducidad, así que cada invitación o enlace acortado se resuelve una vez por periodo.
+    """
+
+    def __init__(self, bot, resolver=None):
+        self.bot = bot
+        # El resolutor se puede sustituir (p. ej. utils.link_scanner.StaticResolver en pruebas)
+        self.resolver = resolver or DiscordResolver(bot)
+        self.resolutions = TTLCache(RESOLUTION_CACHE_SIZE)  # ("invite", código) | ("redirect", url): resultado
+        self.verdicts = TTLCache(VERDICT_CACHE_SIZE)        # (guild_id, dominio): True si está bloqueado
+        self.domain_sets = {}  # guild_id: (dominios permitidos, dominios bloqueados)
+        self.pending = {}      # clave de resolución: asyncio.Task
+        self.waiting = {}      # clave de resolución: [mensajes pendientes de revisar]
+        guild_config.add_listener(self.on_config_change)
+        pipeline.register("link_scanner", self.scan_stage, LINK_SCANNER_ORDER)
+
+    async def cog_unload(self):
+        guild_config.remove_listener(self.on_config_change)
+        pipeline.unregister("link_scanner")
+        for task in self.pending.values():
+            task.cancel()
+        if hasattr(self.resolver, "close"):
+            await self.resolver.close()
+
+    def export_state(self):
+        """Las resoluciones en caché se conservan al recargar para no repetir las peticiones HTTP."""
+        return {"resolutions": self.resolutions}
+
+    def import_state(self, state):
+        self.resolutions = state["resolutions"]
+
+    def on_config_change(self, guild_id, key):
+        """Descarta los veredictos en caché si cambian las listas de dominios."""
+        if key is None or key in ("links_allowed_domains", "links_blocked_domains"):
+            self.domain_sets.clear()
+            self.verdicts.clear()
+
+    def is_blocked(self, guild_id, domain, config):
+        verdict = self.verdicts.get((guild_id, domain))
+        if verdict is MISSING:
+            sets = self.domain_sets.get(guild_id)
+            if sets is None:
+                sets = self.domain_sets[guild_id] = (
+                    frozenset(config["links_allowed_domains"]), frozenset(config["links_blocked_domains"])
+                )
+            allowed, blocked = sets
+            verdict = not domain_in(domain, allowed) and domain_in(domain, blocked)
+            self.verdicts.set((guild_id, domain), verdict)
+        return verdict
+
+    def scan(self, guild_id, content, config):
+        """
+        Revisa los enlaces de un texto usando solo datos en caché.
+        Devuelve (motivo del bloqueo o None, claves que faltan por resolver).
+        """
+        pending = []
+        for domain, url, invite_code in extract_links(content):
+            if invite_code is not None:
+                if not config["links_block_invites"]:
+                    continue
+                invite_guild = self.resolutions.get(("invite", invite_code))
+                if invite_guild is MISSING:
+                    pending.append(("invite", invite_code))
+                elif invite_guild is not None and invite_guild != guild_id:
+                    return "Invitación a otro servidor", pending
+                continue
+
+            if self.is_blocked(guild_id, domain, config):
+                return f"Dominio bloqueado: {domain}", pending
+
+            if domain in SHORTENER_DOMAINS and config["links_blocked_domains"]:
+                final_domain = self.resolutions.get(("redirect", url))
+                if final_domain is MISSING:
+                    pending.append(("redirect", url))
+                elif final_domain and self.is_blocked(guild_id, final_domain, config):
+                    return f"Enlace acortado a un dominio bloqueado: {final_domain}", pending
+        return None, pending
+
+    async def scan_stage(self, ctx) -> bool:
+        """Etapa de la tubería: revisa los enlaces de un mensaje. Devuelve True si el mensaje se sancionó."""
+        message = ctx.message
+        config = ctx.config
+        if not message.content or (not config["links_block_invites"] and not config["links_blocked_domains"]):
+            return False
+
+        reason, pending = self.scan(message.guild.id, message.content, config)
+        if reason:
+            await self.punish(message, reason)
+            return True
+        for key in pending:
+            self.schedule(key, message)
+        return False
+
+    def schedule(self, key, message):
+        """Apunta el mensaje a la espera de `key` y lanza la resolución si no está ya en curso."""
+        waiting = self.waiting.setdefault(key, [])
+        if len(waiting) < MAX_WAITING_MESSAGES:
+            waiting.append(message)
+        if key not in self.pending:
+            self.pending[key] = asyncio.create_task(self.resolve(key))
+
+    async def resolve(self, key):
+        kind, value = key
+        try:
+            if kind == "invite":
+                result = await self.resolver.resolve_invite(value)
+                self.resolutions.set(key, result, INVITE_TTL if result is not None else FAILED_TTL)
+            else:
+                result = await self.resolver.resolve_redirect(value)
+                self.resolutions.set(key, result, REDIRECT_TTL if result else FAILED_TTL)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("No se pudo resolver %s: %s", value, e)
+            self.resolutions.set(key, None, FAILED_TTL)
+        finally:
+            self.pending.pop(key, None)
+
+        for message in self.waiting.pop(key, []):
+            config = guild_config.get(message.guild.id)
+            reason, _ = self.scan(message.guild.id, message.content, config)
+            if reason:
+                # Un mensaje con varios enlaces pendientes solo se sanciona una vez
+                for waiting in self.waiting.values():
+                    if message in waiting:
+                        waiting.remove(message)
+                await self.punish(message, reason)
+
+    async def punish(self, message, reason):
+        """Sanciona con la acción del filtro de contenido o, si no está cargado, solo elimina el mensaje."""
+        content_filter = self.bot.get_cog("ContentFilter")
+        if content_filter:
+            await content_filter.enforce(message, f"Escáner de enlaces: {reason}")
+            return
+        try:
+            await message.delete()
+            await message.channel.send(f"🚫 {message.author.mention}, tu mensaje se ha eliminado: {reason}.", delete_after=10)
+        except discord.HTTPException as e:
+            logger.warning("No se pudo eliminar un mensaje en %s: %s", message.guild.name, e)
+
+    @commands.hybrid_group(name="enlaces", aliases=["links"], invoke_without_command=True, fallback="ver")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def links(self, ctx):
+        """
+        Muestra la configuración del escáner de enlaces.
+
+        Subcomandos:
+        ------------
+        !flex enlaces bloquear <dominio>
+        !flex enlaces permitir <dominio>
+        !flex enlaces quitar <dominio>
+        !flex enlaces invitaciones <si|no>
+        """
+        config = guild_config.get(ctx.guild.id)
+        embed = discord.Embed(title="🔗 Escáner de Enlaces", color=discord.Color.blue())
+        embed.add_field(name="Bloquear invitaciones a otros servidores", value="Sí" if config["links_block_invites"] else "No", inline=False)
+        embed.add_field(name="Dominios bloqueados", value=", ".join(config["links_blocked_domains"])[:1000] or "Ninguno", inline=False)
+        embed.add_field(name="Dominios permitidos", value=", ".join(config["links_allowed_domains"])[:1000] or "Ninguno", inline=False)
+        embed.set_footer(text=f"Caché: {len(self.resolutions)} resoluciones · {self.resolutions.hits} aciertos / {self.resolutions.misses} fallos")
+        await ctx.send(embed=embed)
+
+    async def add_domain(self, ctx, key, dominio):
+        domain = clean_domain(dominio)
+        if not domain or "." not in domain:
+            await ctx.send("Dominio no válido. Ejemplo: `ejemplo.com`")
+            return None
+        domains = list(guild_config.get(ctx.guild.id)[key])
+        if domain not in domains:
+            domains.append(domain)
+            guild_config.set(ctx.guild.id, key, domains)
+        return domain
+
+    @links.command(name="bloquear", aliases=["block"])
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def links_block(self, ctx, dominio: str):
+        """
+        Bloquea un dominio y sus subdominios (también tras un acortador).
+        Ejemplo: !flex enlaces bloquear estafa.com
+        """
+        domain = await self.add_domain(ctx, "links_blocked_domains", dominio)
+        if domain:
+            await ctx.send(f"Dominio bloqueado: `{domain}`")
+
+    @links.command(name="permitir", aliases=["allow"])
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def links_allow(self, ctx, dominio: str):
+        """
+        Permite un dominio aunque coincida con uno bloqueado (p. ej. un subdominio).
+        Ejemplo: !flex enlaces permitir docs.ejemplo.com
+        """
+        domain = await self.add_domain(ctx, "links_allowed_domains", dominio)
+        if domain:
+            await ctx.send(f"Dominio permitido: `{domain}`")
+
+    @links.command(name="quitar", aliases=["remove"])
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def links_remove(self, ctx, dominio: str):
+        """
+        Quita un dominio de las listas de bloqueados y permitidos.
+        Ejemplo: !flex enlaces quitar estafa.com
+        """
+        domain = clean_domain(dominio)
+        config = guild_config.get(ctx.guild.id)
+        removed = False
+        for key in ("links_blocked_domains", "links_allowed_domains"):
+            if domain in config[key]:
+                guild_config.set(ctx.guild.id, key, [d for d in config[key] if d != domain])
+                config = guild_config.get(ctx.guild.id)
+                removed = True
+        await ctx.send(f"Dominio quitado: `{domain}`" if removed else f"`{domain}` no está en ninguna lista.")
+
+    @links.command(name="invitaciones", aliases=["invites"])
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def links_invites(self, ctx, valor: str):
+        """
+        Activa o desactiva el bloqueo de invitaciones a otros servidores.
+        Ejemplo: !flex enlaces invitaciones si
+        """
+        try:
+            value = parse_value("links_block_invites", valor)
+        except ValueError as e:
+            await ctx.send(str(e))
+            return
+        guild_config.set(ctx.guild.id, "links_block_invites", value)
+        await ctx.send("Invitaciones a otros servidores bloqueadas." if value else "Invitaciones a otros servidores permitidas.")
+
+
+async def setup(bot):
+    await bot.add_cog(LinkScanner(bot))
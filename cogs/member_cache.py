@@ -0,0 +1,63 @@
+import discord # type: ignore
+from discord.ext import commands # type: ignore
+import asyncio
+import logging
+
+from utils.member_cache import members
+from utils.message_pipeline import MEMBER_CACHE_ORDER, pipeline
+
+logger = logging.getLogger(__name__)
+
+# Tiempo máximo que un comando espera a que se descarguen los miembros del servidor;
+# si tarda más, el comando sigue y la descarga termina en segundo plano
+CHUNK_WAIT_SECONDS = 5
+
+
+class MemberCache(commands.Cog):
+    """
+    Política de caché de miembros `lazy` (variable de entorno MEMBER_CACHE=lazy).
+
+    Los servidores no se descargan al arrancar: cada uno se descarga con su primer comando
+    y, hasta entonces, se guardan los autores de los mensajes (sin límite para los moderadores).
+    Con la política `full` (por defecto) este cog no hace nada.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        if members.lazy:
+            # Antes que el resto de etapas, para que los autores estén disponibles al sancionar
+            pipeline.register("member_cache", self.remember_stage, MEMBER_CACHE_ORDER, include_mods=True)
+
+    def cog_unload(self):
+        pipeline.unregister("member_cache")
+
+    async def remember_stage(self, ctx) -> bool:
+        members.remember(ctx.author, pinned=ctx.is_mod)
+        return False
+
+    async def bot_check(self, ctx):
+        """Comprobación global: descarga los miembros del servidor antes de su primer comando."""
+        if not members.lazy or ctx.guild is None:
+            return True
+        task = members.ensure_chunked(ctx.guild)
+        if task is None:
+            return True
+        try:
+            await asyncio.wait_for(asyncio.shield(task), CHUNK_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        except (discord.HTTPException, discord.ClientException) as e:
+            logger.warning("No se pudieron descargar los miembros de %s: %s", ctx.guild.name, e)
+        return True
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        members.forget(member.guild.id, member.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        members.forget_guild(guild.id)
+
+
+async def setup(bot):
+    await bot.add_cog(MemberCache(bot))
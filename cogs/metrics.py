@@ -0,0 +1,151 @@
+import logging
+import math
+import os
+import time
+
+import discord # type: ignore
+from discord.ext import commands # type: ignore
+
+from utils.cluster import cluster
+from utils.logs import bind_context, context_from, reset_context
+from utils.member_cache import members
+from utils.message_pipeline import pipeline
+from utils.metrics import command_seconds, current_handler, gateway_events, metrics
+
+logger = logging.getLogger(__name__)
+
+# Cachés en memoria de los cogs que se exponen como `flexbot_cache_entries{cache="..."}`
+CACHE_GAUGES = (
+    ("Moderation", "user_messages"),
+    ("Moderation", "content_hashes"),
+    ("Polls", "active_polls"),
+    ("Reports", "pending_actions"),
+    ("ThreadManager", "active_threads"),
+    ("LinkScanner", "resolutions"),
+)
+
+# Métricas calculadas al consultarlas que registra este cog (se quitan al descargarlo)
+CALLBACK_METRICS = (
+    "flexbot_guilds",
+    "flexbot_cached_members",
+    "flexbot_cache_entries",
+    "flexbot_gateway_latency_seconds",
+    "flexbot_pipeline_messages_total",
+    "flexbot_pipeline_stage_calls_total",
+    "flexbot_pipeline_stage_seconds_total",
+    "flexbot_pipeline_stage_stops_total",
+    "flexbot_pipeline_stage_errors_total",
+)
+
+
+class Metrics(commands.Cog):
+    """
+    Métricas del bot en formato Prometheus.
+
+    Mide la duración de cada comando con los hooks globales `before_invoke`/`after_invoke`
+    (prefijo y barra), que también fijan el contexto de los logs del comando; cuenta los eventos del gateway y publica el tamaño de las cachés de
+    los cogs y las estadísticas de la tubería de mensajes. Las peticiones a la API las cuenta
+    el `http_trace` del bot (ver config/config.py) y los listeners, `timed_listener`.
+
+    Con METRICS_PORT en el `.env` se sirven en http://METRICS_HOST:METRICS_PORT/metrics
+    (por defecto solo en 127.0.0.1); en modo clúster cada proceso usa METRICS_PORT + su número.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        self.bot.before_invoke(self.before_command)
+        self.bot.after_invoke(self.after_command)
+        self.register_callbacks()
+
+        port = os.getenv("METRICS_PORT")
+        if not port:
+            return
+        host = os.getenv("METRICS_HOST", "127.0.0.1")
+        port = int(port) + (int(cluster.cluster_id) if cluster.enabled and cluster.cluster_id else 0)
+        try:
+            await metrics.start_server(host, port)
+            logger.info("Métricas disponibles en http://%s:%s/metrics", host, port)
+        except OSError as e:
+            logger.error("No se pudo abrir el puerto %s para las métricas: %s", port, e)
+
+    async def cog_unload(self):
+        if self.bot._before_invoke == self.before_command:
+            self.bot._before_invoke = None
+        if self.bot._after_invoke == self.after_command:
+            self.bot._after_invoke = None
+        for name in CALLBACK_METRICS:
+            metrics.unregister(name)
+        await metrics.stop_server()
+
+    def register_callbacks(self):
+        metrics.callback("flexbot_guilds", "Servidores atendidos por este proceso.", lambda: len(self.bot.guilds))
+        metrics.callback("flexbot_cached_members", "Miembros en memoria (caché de discord.py y vistos recientemente).",
+                         lambda: members.cached_count(self.bot.guilds))
+        metrics.callback("flexbot_cache_entries", "Entradas en las cachés en memoria de los cogs.", self.cache_sizes, ("cache",))
+        metrics.callback("flexbot_gateway_latency_seconds", "Latencia del heartbeat con el gateway.", self.gateway_latency)
+
+        metrics.callback("flexbot_pipeline_messages_total", "Mensajes que han pasado el prefiltro de la tubería.",
+                         lambda: pipeline.messages, kind="counter")
+        metrics.callback("flexbot_pipeline_stage_calls_total", "Ejecuciones de cada etapa de la tubería de mensajes.",
+                         lambda: {(stage.name,): stage.calls for stage in pipeline.stages}, ("stage",), kind="counter")
+        metrics.callback("flexbot_pipeline_stage_seconds_total", "Tiempo total en cada etapa de la tubería de mensajes.",
+                         lambda: {(stage.name,): stage.total_ns / 1e9 for stage in pipeline.stages}, ("stage",), kind="counter")
+        metrics.callback("flexbot_pipeline_stage_stops_total", "Mensajes detenidos por cada etapa (p. ej. eliminados).",
+                         lambda: {(stage.name,): stage.stops for stage in pipeline.stages}, ("stage",), kind="counter")
+        metrics.callback("flexbot_pipeline_stage_errors_total", "Excepciones en cada etapa de la tubería de mensajes.",
+                         lambda: {(stage.name,): stage.errors for stage in pipeline.stages}, ("stage",), kind="counter")
+
+    def cache_sizes(self):
+        sizes = {}
+        for cog_name, attribute in CACHE_GAUGES:
+            cog = self.bot.get_cog(cog_name)
+            if cog is not None:
+                sizes[(attribute,)] = len(getattr(cog, attribute))
+        sizes[("pipeline_exemptions",)] = sum(map(len, pipeline.exemptions.values()))
+        return sizes
+
+    def gateway_latency(self):
+        latency = self.bot.latency
+        return latency if math.isfinite(latency) else None
+
+    # Duración de los comandos (los mismos hooks añaden el comando al contexto de los logs)
+
+    async def before_command(self, ctx):
+        ctx.metrics_start = time.perf_counter()
+        ctx.metrics_token = current_handler.set(ctx.command.qualified_name)
+        ctx.log_token = bind_context(**context_from(ctx))
+
+    async def after_command(self, ctx):
+        reset_context(ctx.log_token)
+        current_handler.reset(ctx.metrics_token)
+        self.record_command(ctx, "error" if ctx.command_failed else "ok")
+
+    def record_command(self, ctx, status):
+        start = getattr(ctx, "metrics_start", None)
+        if start is None:
+            return
+        ctx.metrics_start = None
+        command_seconds.observe(time.perf_counter() - start, ctx.command.qualified_name, status)
+
+    @commands.Cog.listener()
+    async def on_command_error(self, ctx, error):
+        # Los comandos de barra híbridos que fallan no llaman a after_invoke (su tarea termina igualmente)
+        self.record_command(ctx, "error")
+
+    @commands.Cog.listener()
+    async def on_app_command_completion(self, interaction, command):
+        # Los comandos solo de barra no pasan por los hooks; se mide desde que se creó la interacción
+        if getattr(command, "__commands_is_hybrid_app_command__", False):
+            return
+        elapsed = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+        command_seconds.observe(max(elapsed, 0.0), command.qualified_name, "ok")
+
+    @commands.Cog.listener()
+    async def on_socket_event_type(self, event_type):
+        gateway_events.inc(event_type)
+
+
+async def setup(bot):
+    await bot.add_cog(Metrics(bot))
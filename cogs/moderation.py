@@ -1,7 +1,25 @@
 import discord # type: ignore
 from discord.ext import commands # type: ignore
 import asyncio # type: ignore
-import datetime
+import collections
+import hashlib
+import logging
+import time
+
+from utils.concurrency import run_bounded
+from utils.converters import Snowflake
+from utils.durations import parse_duration
+from utils.guild_config import guild_config
+from utils.link_scanner import INVITE_RE
+from utils.member_cache import members
+from utils.message_pipeline import ANTI_SPAM_ORDER, pipeline
+
+logger = logging.getLogger(__name__)
+
+# Contenidos distintos recordados por servidor para detectar mensajes repetidos (LRU)
+DUPLICATE_CACHE_SIZE = 500
+# Apariciones recordadas de un mismo contenido
+DUPLICATE_OCCURRENCES = 20
 
 class Moderation(commands.Cog):
     """
@@ -12,27 +30,130 @@ class Moderation(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         # Diccionario para rastrear mensajes de usuarios para el sistema anti-spam
+        # La configuración anti-spam (umbral, intervalo, rol) se lee por servidor desde guild_config
+        # Cada mensaje de la ventana guarda su puntuación: user_id: deque[(tiempo, puntuación)]
         self.user_messages = {}
-        # Configuración anti-spam
-        self.spam_threshold = 5  # Número de mensajes
-        self.spam_interval = 3   # Segundos
-        self.muted_role_name = "Muted"
+        # Suma de las puntuaciones de la ventana de cada usuario: user_id: float
+        self.user_scores = {}
+        # Mensajes repetidos: guild_id: OrderedDict(hash del contenido normalizado: deque[(tiempo, user_id, canal, message_id)])
+        self.content_hashes = {}
+        # Tareas que quitan el silencio al cumplirse el tiempo: (guild_id, member_id): asyncio.Task
+        self.mute_tasks = {}
+        # Datos de cada temporizador para reprogramarlo tras una recarga en caliente:
+        # (guild_id, member_id): (miembro, rol, fin en time.monotonic(), canal de aviso, aviso)
+        self.scheduled_unmutes = {}
+        pipeline.register("anti_spam", self.anti_spam_stage, ANTI_SPAM_ORDER)
+
+    def cog_unload(self):
+        pipeline.unregister("anti_spam")
+        for task in self.mute_tasks.values():
+            task.cancel()
+        self.mute_tasks.clear()
+
+    def export_state(self):
+        """Estado en memoria que se conserva al recargar el cog (ver utils/hot_reload.py)."""
+        return {
+            "user_messages": self.user_messages,
+            "user_scores": self.user_scores,
+            "content_hashes": self.content_hashes,
+            "scheduled_unmutes": dict(self.scheduled_unmutes)
+        }
+
+    def import_state(self, state):
+        self.user_messages.update(state["user_messages"])
+        self.user_scores.update(state["user_scores"])
+        self.content_hashes.update(state["content_hashes"])
+        # Los temporizadores de silencio se reprograman con el tiempo que les quedaba
+        now = time.monotonic()
+        for member, muted_role, ends_at, notify_channel, unmute_notice in state["scheduled_unmutes"].values():
+            self.schedule_unmute(member, muted_role, max(0, ends_at - now), notify_channel, unmute_notice)
 
     async def get_or_create_muted_role(self, guild: discord.Guild) -> discord.Role:
-        """Obtiene o crea el rol 'Muted' y configura sus permisos."""
-        muted_role = discord.utils.get(guild.roles, name=self.muted_role_name)
+        """Obtiene o crea el rol de silenciado configurado (por defecto 'Muted') y configura sus permisos."""
+        muted_role_name = guild_config.get(guild.id)["muted_role_name"]
+        muted_role = discord.utils.get(guild.roles, name=muted_role_name)
         if muted_role is None:
-            muted_role = await guild.create_role(name=self.muted_role_name, reason="Rol para silenciar usuarios")
-            for channel in guild.channels:
-                try:
-                    await channel.set_permissions(muted_role, send_messages=False, speak=False, add_reactions=False)
-                except discord.Forbidden:
-                    print(f"No se pudieron establecer permisos para el rol Muted en el canal {channel.name}")
-                except Exception as e:
-                    print(f"Error estableciendo permisos para Muted en {channel.name}: {e}")
+            muted_role = await guild.create_role(name=muted_role_name, reason="Rol para silenciar usuarios")
+
+            async def deny_channel(channel):
+                await channel.set_permissions(muted_role, send_messages=False, speak=False, add_reactions=False)
+
+            # Los canales se configuran en paralelo (con un límite) en lugar de uno detrás de otro
+            for channel, error in await run_bounded(guild.channels, deny_channel):
+                if isinstance(error, discord.Forbidden):
+                    logger.warning("No se pudieron establecer permisos para el rol Muted en el canal %s", channel.name)
+                elif error:
+                    logger.error("Error estableciendo permisos para Muted en %s: %s", channel.name, error)
         return muted_role
 
-    @commands.command()
+    def record_case(self, guild, action, target_id, moderator_id, reason, duration=None):
+        """Registra la acción en el historial de casos si el cog de Casos está cargado."""
+        cases_cog = self.bot.get_cog("Cases")
+        if cases_cog:
+            cases_cog.record_case(guild.id, action, target_id, moderator_id, reason, duration)
+
+    async def ban_member(self, guild, member, reason, moderator_id):
+        """Banea a un miembro y registra el caso. Las excepciones de Discord se propagan al llamador."""
+        await member.ban(reason=reason)
+        self.record_case(guild, "ban", member.id, moderator_id, reason)
+
+    async def kick_member(self, guild, member, reason, moderator_id):
+        """Expulsa a un miembro y registra el caso. Las excepciones de Discord se propagan al llamador."""
+        await member.kick(reason=reason)
+        self.record_case(guild, "kick", member.id, moderator_id, reason)
+
+    async def mute_member(self, guild, member, seconds, reason, moderator_id, duration_label, notify_channel=None, unmute_notice=None):
+        """
+        Silencia a un miembro, registra el caso y programa el fin del silencio.
+        Si se indica `notify_channel`, al terminar el silencio se envía allí `unmute_notice`.
+        Devuelve el rol de silenciado o None si no se pudo obtener.
+        """
+        muted_role = await self.get_or_create_muted_role(guild)
+        if not muted_role:
+            return None
+
+        await member.add_roles(muted_role, reason=reason)
+        self.record_case(guild, "mute", member.id, moderator_id, reason, duration_label)
+        self.schedule_unmute(member, muted_role, seconds, notify_channel, unmute_notice)
+        return muted_role
+
+    def schedule_unmute(self, member, muted_role, seconds, notify_channel=None, unmute_notice=None):
+        """Programa la retirada del rol de silenciado, reemplazando cualquier temporizador anterior."""
+        key = (member.guild.id, member.id)
+        previous_task = self.mute_tasks.pop(key, None)
+        if previous_task:
+            previous_task.cancel()
+        self.scheduled_unmutes[key] = (member, muted_role, time.monotonic() + seconds, notify_channel, unmute_notice)
+        self.mute_tasks[key] = asyncio.create_task(
+            self.unmute_after(key, member, muted_role, seconds, notify_channel, unmute_notice)
+        )
+
+    def cancel_unmute(self, member):
+        """Cancela el temporizador de fin de silencio de un miembro, si existe."""
+        key = (member.guild.id, member.id)
+        self.scheduled_unmutes.pop(key, None)
+        task = self.mute_tasks.pop(key, None)
+        if task:
+            task.cancel()
+
+    async def unmute_after(self, key, member, muted_role, seconds, notify_channel, unmute_notice):
+        """Espera el tiempo indicado y quita el silencio si el miembro aún lo tiene."""
+        try:
+            await asyncio.sleep(seconds)
+            if muted_role in member.roles:
+                await member.remove_roles(muted_role, reason="Tiempo de silencio cumplido")
+                if notify_channel and unmute_notice:
+                    await notify_channel.send(unmute_notice)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Error al quitar el silencio automáticamente a %s: %s", member, e)
+        finally:
+            if self.mute_tasks.get(key) is asyncio.current_task():
+                del self.mute_tasks[key]
+                self.scheduled_unmutes.pop(key, None)
+
+    @commands.hybrid_command()
     @commands.has_permissions(ban_members=True)
     async def ban(self, ctx, member: discord.Member, *, reason="No se proporcionó razón"):
         """
@@ -50,7 +171,7 @@ class Moderation(commands.Cog):
         !flex ban @usuario Spam excesivo
         """
         try:
-            await member.ban(reason=reason)
+            await self.ban_member(ctx.guild, member, reason, ctx.author.id)
             embed = discord.Embed(
                 title="Usuario Baneado",
                 description=f"{member.mention} ha sido baneado del servidor.",
@@ -62,7 +183,7 @@ class Moderation(commands.Cog):
         except Exception as e:
             await ctx.send(f"No se pudo banear al usuario. Error: {e}")
 
-    @commands.command()
+    @commands.hybrid_command()
     @commands.has_permissions(kick_members=True)
     async def kick(self, ctx, member: discord.Member, *, reason="No se proporcionó razón"):
         """
@@ -80,7 +201,7 @@ class Moderation(commands.Cog):
         !flex kick @usuario Comportamiento inadecuado
         """
         try:
-            await member.kick(reason=reason)
+            await self.kick_member(ctx.guild, member, reason, ctx.author.id)
             embed = discord.Embed(
                 title="Usuario Expulsado",
                 description=f"{member.mention} ha sido expulsado del servidor.",
@@ -92,7 +213,7 @@ class Moderation(commands.Cog):
         except Exception as e:
             await ctx.send(f"No se pudo expulsar al usuario. Error: {e}")
 
-    @commands.command()
+    @commands.hybrid_command()
     @commands.has_permissions(manage_roles=True)
     async def mute(self, ctx, member: discord.Member, duration: str = "10m", *, reason="No se proporcionó razón"):
         """
@@ -115,35 +236,25 @@ class Moderation(commands.Cog):
         !flex mute @usuario 30m
         !flex mute @usuario 2d Comportamiento tóxico
         """
-        muted_role = await self.get_or_create_muted_role(ctx.guild)
-        if not muted_role:
-            await ctx.send("No se pudo obtener o crear el rol 'Muted'. Verifica los permisos del bot y los logs para más detalles.")
-            return
-
+        await ctx.defer()
         # Parsear la duración del silencio
-        time_unit = duration[-1].lower()
         try:
-            time_value = int(duration[:-1])
-        except ValueError:
-            await ctx.send("Formato de duración incorrecto. Usa un número seguido de 's', 'm', 'h' o 'd' (ej: 10m, 1h, 2d).")
-            return
-
-        # Convertir la duración a segundos
-        if time_unit == 's':
-            seconds = time_value
-        elif time_unit == 'm':
-            seconds = time_value * 60
-        elif time_unit == 'h':
-            seconds = time_value * 3600
-        elif time_unit == 'd':
-            seconds = time_value * 86400
-        else:
-            await ctx.send("Unidad de tiempo no válida. Usa 's' (segundos), 'm' (minutos), 'h' (horas) o 'd' (días).")
+            seconds = parse_duration(duration)
+        except ValueError as e:
+            await ctx.send(str(e))
             return
 
         try:
-            # Aplicar el rol de silenciado
-            await member.add_roles(muted_role, reason=reason)
+            # Aplicar el rol de silenciado y programar su retirada
+            muted_role = await self.mute_member(
+                ctx.guild, member, seconds, reason, ctx.author.id, duration,
+                notify_channel=ctx.channel,
+                unmute_notice=f"{member.mention} ha sido desilenciado automáticamente después de cumplir el tiempo."
+            )
+            if not muted_role:
+                await ctx.send("No se pudo obtener o crear el rol 'Muted'. Verifica los permisos del bot y los logs para más detalles.")
+                return
+
             embed = discord.Embed(
                 title="Usuario Silenciado",
                 description=f"{member.mention} ha sido silenciado por {duration}.",
@@ -153,18 +264,10 @@ class Moderation(commands.Cog):
             embed.add_field(name="Duración", value=duration)
             embed.set_footer(text=f"Silenciado por {ctx.author.name}")
             await ctx.send(embed=embed)
-
-            # Esperar el tiempo especificado
-            await asyncio.sleep(seconds)
-
-            # Remover el rol si aún lo tiene
-            if muted_role in member.roles:
-                await member.remove_roles(muted_role, reason="Tiempo de silencio cumplido")
-                await ctx.send(f"{member.mention} ha sido desilenciado automáticamente después de cumplir el tiempo.")
         except Exception as e:
             await ctx.send(f"No se pudo silenciar al usuario. Error: {e}")
 
-    @commands.command()
+    @commands.hybrid_command()
     @commands.has_permissions(manage_roles=True)
     async def unmute(self, ctx, member: discord.Member, *, reason="No se proporcionó razón"):
         """
@@ -181,9 +284,10 @@ class Moderation(commands.Cog):
         --------
         !flex unmute @usuario Ha aprendido la lección
         """
-        muted_role = discord.utils.get(ctx.guild.roles, name=self.muted_role_name)
+        muted_role_name = guild_config.get(ctx.guild.id)["muted_role_name"]
+        muted_role = discord.utils.get(ctx.guild.roles, name=muted_role_name)
         if not muted_role:
-            await ctx.send(f"No existe el rol '{self.muted_role_name}' en este servidor. No se puede desilenciar.")
+            await ctx.send(f"No existe el rol '{muted_role_name}' en este servidor. No se puede desilenciar.")
             return
 
         if muted_role not in member.roles:
@@ -192,6 +296,8 @@ class Moderation(commands.Cog):
 
         try:
             await member.remove_roles(muted_role, reason=reason)
+            self.cancel_unmute(member)
+            self.record_case(ctx.guild, "unmute", member.id, ctx.author.id, reason)
             embed = discord.Embed(
                 title="Usuario Desilenciado",
                 description=f"Se ha quitado el silencio a {member.mention}.",
@@ -203,9 +309,9 @@ class Moderation(commands.Cog):
         except Exception as e:
             await ctx.send(f"No se pudo quitar el silencio al usuario. Error: {e}")
 
-    @commands.command()
+    @commands.hybrid_command()
     @commands.has_permissions(ban_members=True)
-    async def unban(self, ctx, user_id: int, *, reason="No se proporcionó razón"):
+    async def unban(self, ctx, user_id: Snowflake, *, reason="No se proporcionó razón"):
         """
         Desbanea a un usuario usando su ID.
 
@@ -230,6 +336,7 @@ class Moderation(commands.Cog):
                 return
 
             await ctx.guild.unban(banned_user.user, reason=reason)
+            self.record_case(ctx.guild, "unban", user_id, ctx.author.id, reason)
             embed = discord.Embed(
                 title="Usuario Desbaneado",
                 description=f"Se ha desbaneado a {banned_user.user.name}#{banned_user.user.discriminator}.",
@@ -242,45 +349,177 @@ class Moderation(commands.Cog):
         except Exception as e:
             await ctx.send(f"No se pudo desbanear al usuario. Error: {e}")
 
+    def has_spam_signal(self, message) -> bool:
+        """True si el mensaje lleva enlaces, invitaciones o menciones (lo habitual en el spam coordinado)."""
+        return bool(
+            message.mentions or message.role_mentions or message.mention_everyone
+            or "://" in message.content or INVITE_RE.search(message.content)
+        )
+
+    def track_duplicate(self, message, config, normalized):
+        """
+        Registra el contenido del mensaje y devuelve las apariciones recientes que se deben sancionar
+        si se ha alcanzado el umbral de repeticiones (en cualquier canal), o None.
+
+        Varias personas pueden escribir lo mismo sin ser spam ("buenos días a todos"), así que las
+        copias de distintas cuentas solo cuentan juntas si el mensaje lleva enlaces o menciones o si
+        el servidor activa `duplicate_cross_account`; si no, solo cuentan las de la misma cuenta.
+        """
+        if len(normalized) < config["duplicate_min_length"]:
+            return None
+
+        content_hash = hashlib.blake2b(normalized.encode(), digest_size=8).digest()
+        recent_contents = self.content_hashes.get(message.guild.id)
+        if recent_contents is None:
+            recent_contents = self.content_hashes[message.guild.id] = collections.OrderedDict()
+
+        occurrences = recent_contents.get(content_hash)
+        if occurrences is None:
+            occurrences = recent_contents[content_hash] = collections.deque(maxlen=DUPLICATE_OCCURRENCES)
+            if len(recent_contents) > DUPLICATE_CACHE_SIZE:
+                recent_contents.popitem(last=False) # Descartar el contenido usado hace más tiempo
+        else:
+            recent_contents.move_to_end(content_hash)
+
+        now = time.monotonic()
+        while occurrences and now - occurrences[0][0] > config["duplicate_window"]:
+            occurrences.popleft()
+        occurrences.append((now, message.author.id, message.channel.id, message.id))
+
+        threshold = config["duplicate_threshold"]
+        if len(occurrences) < threshold:
+            return None
+        if config["duplicate_cross_account"] or self.has_spam_signal(message):
+            del recent_contents[content_hash] # Empezar de cero tras actuar
+            return list(occurrences)
+
+        author_id = message.author.id
+        own = [occurrence for occurrence in occurrences if occurrence[1] == author_id]
+        if len(own) < threshold:
+            return None
+        # Las copias del resto de cuentas se siguen contando por separado
+        recent_contents[content_hash] = collections.deque(
+            (occurrence for occurrence in occurrences if occurrence[1] != author_id), maxlen=DUPLICATE_OCCURRENCES
+        )
+        return own
+
+    async def check_duplicate(self, message, config, normalized) -> bool:
+        """Silencia a las cuentas que repiten el mismo mensaje y elimina las copias. Devuelve True si actuó."""
+        occurrences = self.track_duplicate(message, config, normalized)
+        if not occurrences:
+            return False
+
+        guild = message.guild
+        reason = "Anti-Spam: Mismo mensaje repetido en poco tiempo"
+        muted = []
+        for user_id in dict.fromkeys(user_id for _, user_id, _, _ in occurrences):
+            try:
+                member = await members.get_member(guild, user_id)
+                if member is None:
+                    continue
+                if await self.mute_member(guild, member, 300, reason, self.bot.user.id, "5m"):
+                    muted.append(member)
+            except discord.HTTPException as e:
+                logger.warning("Anti-Spam: No se pudo silenciar a %s por mensajes repetidos: %s", user_id, e)
+
+        for _, _, channel_id, message_id in occurrences:
+            channel = guild.get_channel_or_thread(channel_id)
+            if channel is None:
+                continue
+            try:
+                await channel.get_partial_message(message_id).delete()
+            except discord.HTTPException:
+                pass # Ya eliminado o sin permisos
+
+        channels = {channel_id for _, _, channel_id, _ in occurrences}
+        embed = discord.Embed(
+            title="Anti-Spam | Mensaje Repetido",
+            description=f"Se eliminaron {len(occurrences)} copias del mismo mensaje en {len(channels)} canal(es).",
+            color=discord.Color.red()
+        )
+        if muted:
+            embed.add_field(name="Silenciados (5 minutos)", value=" ".join(member.mention for member in muted), inline=False)
+        try:
+            await message.channel.send(embed=embed)
+        except discord.HTTPException as e:
+            logger.warning("Anti-Spam: No se pudo enviar el aviso de mensajes repetidos: %s", e)
+        return True
+
+    def message_score(self, message, config) -> float:
+        """
+        Puntuación anti-spam de un mensaje: 1 por mensaje más el peso configurado de cada mención,
+        mención de rol (incluidas @everyone/@here), enlace, adjunto y salto de línea.
+        Solo usa contadores que discord.py ya ha calculado o `str.count`, sin crear objetos nuevos.
+        """
+        content = message.content
+        return (
+            1.0
+            + config["spam_weight_mention"] * len(message.mentions)
+            + config["spam_weight_role_mention"] * (len(message.role_mentions) + message.mention_everyone)
+            + config["spam_weight_link"] * content.count("://")
+            + config["spam_weight_attachment"] * len(message.attachments)
+            + config["spam_weight_newline"] * content.count("\n")
+        )
+
     @commands.Cog.listener()
-    async def on_message(self, message):
-        """Sistema Anti-Spam"""
-        if message.author.bot or isinstance(message.channel, discord.DMChannel):
-            return
+    async def on_guild_remove(self, guild):
+        self.content_hashes.pop(guild.id, None)
 
-        # Obtener los permisos del autor del mensaje
-        member_permissions = message.author.guild_permissions
-        if member_permissions.administrator or member_permissions.manage_messages:
-            return  # Ignorar mensajes de administradores y moderadores
+    async def anti_spam_stage(self, ctx) -> bool:
+        """
+        Etapa anti-spam de la tubería de mensajes (mensajes repetidos y puntuación por usuario).
+        Los bots, los mensajes directos y los moderadores ya se descartan antes de llegar aquí.
+        Devuelve True si se sancionó al autor.
+        """
+        message = ctx.message
+        config = ctx.config
+        if await self.check_duplicate(message, config, ctx.normalized_content):
+            return True
 
-        current_time = datetime.datetime.utcnow()
+        spam_threshold = config["spam_threshold"]
+        current_time = time.monotonic()
         user_id = message.author.id
 
-        if user_id not in self.user_messages:
-            self.user_messages[user_id] = []
+        window = self.user_messages.get(user_id)
+        if window is None:
+            window = self.user_messages[user_id] = collections.deque()
+
+        # Limpiar mensajes antiguos descontando su puntuación del total
+        score = self.user_scores.get(user_id, 0.0)
+        while window and current_time - window[0][0] >= config["spam_interval"]:
+            score -= window.popleft()[1]
+        if not window:
+            score = 0.0 # Evitar que se acumule el error de redondeo
 
-        # Limpiar mensajes antiguos
-        self.user_messages[user_id] = [msg_time for msg_time in self.user_messages[user_id] 
-                                     if (current_time - msg_time).total_seconds() < self.spam_interval]
-        
         # Añadir el mensaje actual
-        self.user_messages[user_id].append(current_time)
+        message_score = self.message_score(message, config)
+        window.append((current_time, message_score))
+        score += message_score
+        self.user_scores[user_id] = score
 
         # Comprobar spam
-        if len(self.user_messages[user_id]) >= self.spam_threshold:
+        if score >= spam_threshold:
+            window.clear()
+            self.user_scores[user_id] = 0.0
             try:
-                # Silenciar al usuario
-                muted_role = await self.get_or_create_muted_role(message.guild)
+                # Silenciar al usuario durante 5 minutos
+                muted_role = await self.mute_member(
+                    message.guild, message.author, 300,
+                    "Anti-Spam: Demasiados mensajes en poco tiempo", self.bot.user.id, "5m",
+                    notify_channel=message.channel,
+                    unmute_notice=f"{message.author.mention} ha sido desilenciado automáticamente después del spam."
+                )
                 if not muted_role:
-                    print(f"Anti-Spam: No se pudo obtener o crear el rol '{self.muted_role_name}' en el servidor {message.guild.name}.")
-                    return # No se puede silenciar si el rol no está disponible
+                    logger.warning("Anti-Spam: No se pudo obtener o crear el rol '%s' en el servidor %s.", config['muted_role_name'], message.guild.name)
+                    return False # No se puede silenciar si el rol no está disponible
 
-                await message.author.add_roles(muted_role, reason="Anti-Spam: Demasiados mensajes en poco tiempo")
-                
                 # Eliminar los mensajes de spam
-                async for msg in message.channel.history(limit=self.spam_threshold):
+                async for msg in message.channel.history(limit=spam_threshold):
                     if msg.author.id == user_id:
-                        await msg.delete()
+                        try:
+                            await msg.delete()
+                        except discord.NotFound:
+                            pass # Ya eliminado (p. ej. por el filtro de duplicados)
 
                 # Notificar
                 embed = discord.Embed(
@@ -289,17 +528,13 @@ class Moderation(commands.Cog):
                     color=discord.Color.red()
                 )
                 embed.add_field(name="Duración", value="5 minutos")
-                embed.add_field(name="Razón", value="Envío de mensajes demasiado rápido")
+                embed.add_field(name="Razón", value="Envío de mensajes demasiado rápido" if message_score < spam_threshold else "Mensaje con demasiadas menciones, enlaces o adjuntos")
                 await message.channel.send(embed=embed)
 
-                # Quitar el silencio después de 5 minutos
-                await asyncio.sleep(300)  # 5 minutos
-                if muted_role in message.author.roles: # Verificar si el usuario aún está silenciado
-                    await message.author.remove_roles(muted_role, reason="Anti-Spam: Tiempo de silencio cumplido")
-                    await message.channel.send(f"{message.author.mention} ha sido desilenciado automáticamente después del spam.")
-
             except Exception as e:
-                print(f"Error en el sistema anti-spam: {e}")
+                logger.exception("Error en el sistema anti-spam: %s", e)
+            return True
+        return False
 
 async def setup(bot):
     """Configuración del Cog de moderación."""
@@ -0,0 +1,93 @@
+import discord # type: ignore
+from discord.ext import commands # type: ignore
+
+from utils.message_pipeline import COMMANDS_ORDER, pipeline
+from utils.metrics import timed_listener
+
+
+class Pipeline(commands.Cog):
+    """
+    Único receptor de `on_message` para los mensajes de servidor.
+
+    Cada mensaje se pasa a la tubería de `utils.message_pipeline`, donde los cogs registran
+    sus etapas (filtro de contenido, enlaces, anti-spam, hilos). La última etapa procesa los
+    comandos, de modo que un mensaje eliminado por una etapa anterior no ejecuta ningún comando.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        pipeline.register("commands", self.commands_stage, COMMANDS_ORDER, include_mods=True)
+
+    def cog_unload(self):
+        pipeline.unregister("commands")
+        pipeline.exemptions.clear() # Sin este cog nadie invalidaría la caché
+
+    async def commands_stage(self, ctx) -> bool:
+        await self.bot.process_commands(ctx.message)
+        return False
+
+    @commands.Cog.listener()
+    @timed_listener
+    async def on_message(self, message):
+        await pipeline.run(message)
+
+    # Invalidación de la caché de moderadores exentos
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        if before.roles != after.roles:
+            pipeline.invalidate_member(after.guild.id, after.id)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        pipeline.invalidate_member(member.guild.id, member.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before, after):
+        if before.permissions != after.permissions:
+            pipeline.invalidate_guild(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        pipeline.invalidate_guild(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_update(self, before, after):
+        if before.owner_id != after.owner_id:
+            pipeline.invalidate_guild(after.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        pipeline.invalidate_guild(guild.id)
+
+    @commands.hybrid_command(name="pipeline", aliases=["tuberia"])
+    @commands.has_permissions(administrator=True)
+    async def pipeline_stats(self, ctx, accion: str = None):
+        """
+        Muestra el tiempo que pasa cada mensaje en cada etapa de la tubería.
+        Usa `!flex pipeline reset` para reiniciar las estadísticas.
+        """
+        if accion == "reset":
+            pipeline.reset_stats()
+            await ctx.send("Estadísticas de la tubería de mensajes reiniciadas.")
+            return
+
+        embed = discord.Embed(
+            title="📨 Tubería de Mensajes",
+            description=f"Mensajes procesados: {pipeline.messages} · Miembros en caché: {sum(map(len, pipeline.exemptions.values()))}",
+            color=discord.Color.blue()
+        )
+        for stage in pipeline.stages:
+            average_ms = stage.total_ns / stage.calls / 1e6 if stage.calls else 0.0
+            embed.add_field(
+                name=f"{stage.order} · {stage.name}",
+                value=f"Ejecuciones: {stage.calls}\n"
+                      f"Media: {average_ms:.3f} ms · Máx: {stage.max_ns / 1e6:.3f} ms\n"
+                      f"Detenidos: {stage.stops} · Errores: {stage.errors}",
+                inline=True
+            )
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(Pipeline(bot))
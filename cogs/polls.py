@@ -1,5 +1,11 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
+import logging
+
+from utils.converters import Snowflake
+
+logger = logging.getLogger(__name__)
 
 class Polls(commands.Cog):
     """
@@ -9,6 +15,15 @@ class Polls(commands.Cog):
         self.bot = bot
         self.active_polls = {} # Stores active polls: {message_id: {"question": "...", "options": [...], "author_id": ...}}
 
+    def export_state(self):
+        """Active polls are kept in memory only, so they are handed over on a hot reload."""
+        return {"active_polls": self.active_polls}
+
+    def import_state(self, state):
+        self.active_polls.update(state["active_polls"])
+
+    # createpoll takes a variable number of options, which slash commands can't express,
+    # so it is a prefix command plus a separate slash command with ten optional slots.
     @commands.command(name="createpoll")
     @commands.has_permissions(manage_messages=True) # Only users who can manage messages can create polls
     async def create_poll(self, ctx, question: str, *options: str):
@@ -17,6 +32,31 @@ class Polls(commands.Cog):
         Usage: !flex createpoll "Your question here" "Option 1" "Option 2" ... "Option N"
         Maximum of 10 options.
         """
+        await self.start_poll(ctx, question, options)
+
+    @app_commands.command(name="createpoll", description="Creates a new poll with up to 10 options.")
+    @app_commands.describe(question="The poll question", option1="First option")
+    @app_commands.guild_only()
+    @app_commands.default_permissions(manage_messages=True)
+    @app_commands.checks.has_permissions(manage_messages=True)
+    async def create_poll_slash(
+        self, interaction: discord.Interaction, question: str, option1: str,
+        option2: str = None, option3: str = None, option4: str = None, option5: str = None,
+        option6: str = None, option7: str = None, option8: str = None, option9: str = None, option10: str = None
+    ):
+        options = [option for option in (option1, option2, option3, option4, option5,
+                                         option6, option7, option8, option9, option10) if option]
+        ctx = await commands.Context.from_interaction(interaction)
+        await self.start_poll(ctx, question, options)
+
+    @create_poll_slash.error
+    async def create_poll_slash_error(self, interaction: discord.Interaction, error):
+        # Other errors are still logged by the command tree
+        if isinstance(error, app_commands.MissingPermissions):
+            await interaction.response.send_message("You need the Manage Messages permission to create polls.", ephemeral=True)
+
+    async def start_poll(self, ctx, question, options):
+        """Sends the poll embed, adds the vote reactions and registers the poll."""
         if not options:
             await ctx.send("Please provide at least one option for the poll.")
             return
@@ -58,9 +98,9 @@ class Polls(commands.Cog):
         except Exception as e:
             await ctx.send(f"An error occurred while creating the poll: {e}")
 
-    @commands.command(name="closepoll")
+    @commands.hybrid_command(name="closepoll")
     @commands.has_permissions(manage_messages=True)
-    async def close_poll(self, ctx, message_id: int):
+    async def close_poll(self, ctx, message_id: Snowflake):
         """
         Closes an active poll and shows the results.
         Usage: !flex closepoll <message_id_of_the_poll>
@@ -142,7 +182,7 @@ class Polls(commands.Cog):
         except discord.NotFound:
             pass # Message was already deleted, or we couldn't find it.
         except Exception as e:
-            print(f"Error updating original poll message: {e}")
+            logger.warning("Error updating original poll message: %s", e)
 
 
 async def setup(bot):
@@ -0,0 +1,498 @@
+import discord # type: ignore
+from discord.ext import commands # type: ignore
+import asyncio
+import collections
+import datetime
+import json
+import logging
+import os
+import time
+
+from utils.cluster import save_partitioned_json
+from utils.concurrency import run_bounded
+from utils.durations import parse_duration
+from utils.guild_config import guild_config
+from utils.member_cache import members
+from utils.metrics import timed_listener
+
+logger = logging.getLogger(__name__)
+
+LOCKDOWNS_FILE = 'data/lockdowns.json'
+
+# Cuentas nuevas recientes que se recuerdan por servidor (limita la memoria usada)
+RECENT_FRESH_JOINS = 50
+# Solo se agrupan cuentas nuevas que hayan entrado en este intervalo (segundos)
+CLUSTER_JOIN_WINDOW = 300
+# Máximo de usuarios mencionados en una alerta
+ALERT_MENTIONS = 15
+# Canales editados a la vez durante `lockdown`/`unlock`
+LOCKDOWN_CONCURRENCY = 5
+# Segundos mínimos entre ediciones del mensaje de progreso
+PROGRESS_EDIT_INTERVAL = 1.5
+# Permisos que se deniegan a @everyone durante un bloqueo de canales
+LOCKDOWN_PERMISSIONS = ("send_messages", "send_messages_in_threads")
+
+
+class JoinBucket:
+    """
+    Cubo de fichas (token bucket) para la tasa de entradas de un servidor.
+    Se permiten `capacity` entradas seguidas y el cubo se rellena a `capacity / window` fichas por segundo.
+    """
+
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, capacity):
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def consume(self, capacity, window) -> bool:
+        """Consume una ficha. Devuelve False si el cubo estaba vacío (tasa de entradas superada)."""
+        now = time.monotonic()
+        refill = (now - self.updated_at) * capacity / window
+        self.tokens = min(float(capacity), self.tokens + refill)
+        self.updated_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class RaidProtection(commands.Cog):
+    """
+    Detección de raids en las entradas de miembros.
+
+    Se detecta un raid cuando la tasa de entradas supera la configurada (token bucket por servidor)
+    o cuando entran varias cuentas nuevas creadas casi a la vez. Opcionalmente se activa el modo
+    bloqueo: se sube el nivel de verificación del servidor y se silencia a quien entre mientras dure.
+
+    También ofrece `lockdown`/`unlock`, que impiden escribir a @everyone en todos los canales de
+    texto. Los permisos anteriores de cada canal se guardan en `data/lockdowns.json` para poder
+    restaurarlos exactamente, incluso si el bot se reinicia entre ambos comandos.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.join_buckets = {}  # guild_id: JoinBucket
+        self.fresh_joins = {}   # guild_id: deque[(entrada, creación de la cuenta, member_id)]
+        self.lockdowns = {}     # guild_id: {"until", "previous_verification", "task"}
+        self.channel_snapshots = {}  # guild_id (str): {channel_id (str): [allow, deny] o None}
+
+    async def cog_load(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.load_channel_snapshots)
+
+    def load_channel_snapshots(self):
+        """Carga los permisos guardados de los bloqueos de canales en curso."""
+        if not os.path.exists(LOCKDOWNS_FILE):
+            return
+        try:
+            with open(LOCKDOWNS_FILE, 'r') as f:
+                content = f.read()
+                self.channel_snapshots = json.loads(content) if content.strip() else {}
+        except (json.JSONDecodeError, IOError) as e:
+            logger.error("Error al cargar %s: %s", LOCKDOWNS_FILE, e)
+            self.channel_snapshots = {}
+
+    def save_channel_snapshots(self):
+        """Guarda los permisos de los bloqueos de canales de forma atómica."""
+        if not os.path.exists('data'):
+            os.makedirs('data')
+        save_partitioned_json(LOCKDOWNS_FILE, self.channel_snapshots)
+
+    def cog_unload(self):
+        for lockdown in self.lockdowns.values():
+            lockdown["task"].cancel()
+
+    def export_state(self):
+        """Estado en memoria que se conserva al recargar el cog (ver utils/hot_reload.py)."""
+        return {
+            # Los cubos se exportan como tuplas: JoinBucket pertenece al módulo que se recarga
+            "join_buckets": {guild_id: (bucket.tokens, bucket.updated_at) for guild_id, bucket in self.join_buckets.items()},
+            "fresh_joins": self.fresh_joins,
+            "lockdowns": {guild_id: (lockdown["until"], lockdown["previous_verification"]) for guild_id, lockdown in self.lockdowns.items()}
+        }
+
+    def import_state(self, state):
+        for guild_id, (tokens, updated_at) in state["join_buckets"].items():
+            bucket = self.join_buckets[guild_id] = JoinBucket(0)
+            bucket.tokens = tokens
+            bucket.updated_at = updated_at
+        self.fresh_joins.update(state["fresh_joins"])
+        # El modo bloqueo sigue activo y termina cuando estaba previsto
+        for guild_id, (until, previous_verification) in state["lockdowns"].items():
+            guild = self.bot.get_guild(guild_id)
+            if guild is None:
+                continue
+            self.lockdowns[guild_id] = {
+                "until": until,
+                "previous_verification": previous_verification,
+                "task": asyncio.create_task(self.exit_lockdown_after(guild, max(0, until - time.time())))
+            }
+
+    def get_alert_channel(self, guild):
+        """Canal donde se publican las alertas: el de reportes o, si no existe, el del sistema."""
+        channel = discord.utils.get(guild.text_channels, name=guild_config.get(guild.id)["reports_channel_name"])
+        return channel or guild.system_channel
+
+    async def send_alert(self, guild, embed):
+        channel = self.get_alert_channel(guild)
+        if not channel:
+            return
+        try:
+            await channel.send(embed=embed)
+        except discord.HTTPException as e:
+            logger.warning("No se pudo enviar la alerta en %s: %s", guild.name, e)
+
+    def detect_raid(self, member, config):
+        """
+        Registra la entrada y devuelve (motivo, miembros sospechosos) si parece un raid,
+        o None en caso contrario.
+        """
+        guild_id = member.guild.id
+        now = time.time()
+
+        bucket = self.join_buckets.get(guild_id)
+        if bucket is None:
+            bucket = self.join_buckets[guild_id] = JoinBucket(config["raid_join_threshold"])
+        rate_exceeded = not bucket.consume(config["raid_join_threshold"], config["raid_join_window"])
+
+        created_at = member.created_at.timestamp()
+        suspects = []
+        if now - created_at < config["raid_new_account_days"] * 86400:
+            recent = self.fresh_joins.get(guild_id)
+            if recent is None:
+                recent = self.fresh_joins[guild_id] = collections.deque(maxlen=RECENT_FRESH_JOINS)
+            recent.append((now, created_at, member.id))
+
+            spread = config["raid_cluster_spread_minutes"] * 60
+            suspects = [
+                member_id for joined_at, other_created_at, member_id in recent
+                if now - joined_at <= CLUSTER_JOIN_WINDOW and abs(other_created_at - created_at) <= spread
+            ]
+
+        if len(suspects) >= config["raid_cluster_size"]:
+            return "Entrada de varias cuentas nuevas creadas casi a la vez", suspects
+        if rate_exceeded:
+            return f"Más de {config['raid_join_threshold']} entradas en {config['raid_join_window']} segundos", suspects
+        return None
+
+    @commands.Cog.listener()
+    @timed_listener
+    async def on_member_join(self, member):
+        if member.bot:
+            return
+
+        guild = member.guild
+        config = guild_config.get(guild.id)
+
+        lockdown = self.lockdowns.get(guild.id)
+        if lockdown:
+            await self.quarantine(member, lockdown["until"])
+
+        detection = self.detect_raid(member, config)
+        if not detection or lockdown:
+            return
+
+        reason, suspects = detection
+        embed = discord.Embed(
+            title="🚨 Posible Raid Detectado",
+            description=reason,
+            color=discord.Color.dark_red(),
+            timestamp=datetime.datetime.utcnow()
+        )
+        if suspects:
+            mentions = " ".join(f"<@{member_id}>" for member_id in suspects[-ALERT_MENTIONS:])
+            embed.add_field(name=f"Cuentas nuevas sospechosas ({len(suspects)})", value=mentions, inline=False)
+
+        if config["raid_auto_lockdown"]:
+            embed.add_field(name="Acción", value=f"Modo bloqueo activado durante {config['raid_lockdown_minutes']} minutos.", inline=False)
+            await self.send_alert(guild, embed)
+            await self.enter_lockdown(guild, config["raid_lockdown_minutes"] * 60, suspects)
+        else:
+            embed.add_field(name="Acción", value="Ninguna automática. Usa `!flex raid on` para activar el modo bloqueo o `!flex lockdown` para cerrar los canales.", inline=False)
+            await self.send_alert(guild, embed)
+
+    async def quarantine(self, member, until):
+        """Silencia a un miembro hasta que termine el modo bloqueo."""
+        moderation_cog = self.bot.get_cog("Moderation")
+        if not moderation_cog:
+            return
+        seconds = max(1, int(until - time.time()))
+        try:
+            await moderation_cog.mute_member(
+                member.guild, member, seconds, "Anti-Raid: entrada durante el modo bloqueo",
+                self.bot.user.id, f"{seconds // 60}m"
+            )
+        except discord.HTTPException as e:
+            logger.warning("No se pudo silenciar a %s en %s: %s", member, member.guild.name, e)
+
+    async def enter_lockdown(self, guild, seconds, suspects=()):
+        """Activa el modo bloqueo durante `seconds` segundos."""
+        if guild.id in self.lockdowns:
+            return
+
+        until = time.time() + seconds
+        previous_verification = guild.verification_level
+        try:
+            if previous_verification < discord.VerificationLevel.high:
+                await guild.edit(verification_level=discord.VerificationLevel.high, reason="Anti-Raid: modo bloqueo")
+        except discord.HTTPException as e:
+            logger.warning("No se pudo subir el nivel de verificación en %s: %s", guild.name, e)
+            previous_verification = None
+
+        self.lockdowns[guild.id] = {
+            "until": until,
+            "previous_verification": previous_verification,
+            "task": asyncio.create_task(self.exit_lockdown_after(guild, seconds))
+        }
+
+        # Silenciar también a las cuentas sospechosas que ya entraron
+        for member_id in suspects:
+            try:
+                member = await members.get_member(guild, member_id)
+            except discord.HTTPException as e:
+                logger.warning("No se pudo obtener al miembro %s en %s: %s", member_id, guild.name, e)
+                continue
+            if member:
+                await self.quarantine(member, until)
+
+    async def exit_lockdown_after(self, guild, seconds):
+        await asyncio.sleep(seconds)
+        await self.exit_lockdown(guild)
+
+    async def exit_lockdown(self, guild):
+        """Desactiva el modo bloqueo y restaura el nivel de verificación anterior."""
+        lockdown = self.lockdowns.pop(guild.id, None)
+        if not lockdown:
+            return False
+        if lockdown["task"] is not asyncio.current_task():
+            lockdown["task"].cancel()
+
+        previous_verification = lockdown["previous_verification"]
+        if previous_verification is not None and guild.verification_level != previous_verification:
+            try:
+                await guild.edit(verification_level=previous_verification, reason="Anti-Raid: fin del modo bloqueo")
+            except discord.HTTPException as e:
+                logger.warning("No se pudo restaurar el nivel de verificación en %s: %s", guild.name, e)
+
+        embed = discord.Embed(
+            title="✅ Modo Bloqueo Finalizado",
+            description="Las nuevas entradas ya no se silencian automáticamente.",
+            color=discord.Color.green(),
+            timestamp=datetime.datetime.utcnow()
+        )
+        await self.send_alert(guild, embed)
+        return True
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.join_buckets.pop(guild.id, None)
+        self.fresh_joins.pop(guild.id, None)
+
+    def progress_reporter(self, message, title):
+        """Devuelve una función de progreso que edita `message` como mucho cada PROGRESS_EDIT_INTERVAL segundos."""
+        last_edit = 0.0
+
+        async def report(done, total):
+            nonlocal last_edit
+            now = time.monotonic()
+            if done < total and now - last_edit < PROGRESS_EDIT_INTERVAL:
+                return
+            last_edit = now
+            try:
+                await message.edit(content=f"{title} {done}/{total} canales...")
+            except discord.HTTPException:
+                pass
+
+        return report
+
+    def format_failures(self, failures):
+        """Resume los canales que no se pudieron modificar."""
+        lines = [f"• {channel.mention}: {'sin permisos' if isinstance(error, discord.Forbidden) else error}" for channel, error in failures[:10]]
+        if len(failures) > 10:
+            lines.append(f"• ... y {len(failures) - 10} más")
+        return "\n".join(lines)
+
+    @commands.hybrid_command(name="lockdown", aliases=["bloquear"])
+    @commands.has_permissions(manage_channels=True)
+    @commands.guild_only()
+    async def lockdown(self, ctx, *, razon: str = "Bloqueo del servidor"):
+        """
+        Impide escribir a @everyone en todos los canales de texto.
+        Los permisos anteriores se guardan y se restauran con `!flex unlock`.
+        Ejemplo: !flex lockdown Raid en curso
+        """
+        await ctx.defer()
+        guild = ctx.guild
+        guild_key = str(guild.id)
+        if guild_key in self.channel_snapshots:
+            await ctx.send("El servidor ya está bloqueado. Usa `!flex unlock` para desbloquearlo.")
+            return
+
+        everyone = guild.default_role
+        snapshot = {}
+        channels = []
+        for channel in guild.text_channels:
+            overwrite = channel.overwrites_for(everyone)
+            if all(getattr(overwrite, permission) is False for permission in LOCKDOWN_PERMISSIONS):
+                continue # Ya estaba cerrado: no se toca ni al bloquear ni al desbloquear
+            allow, deny = overwrite.pair()
+            snapshot[str(channel.id)] = None if overwrite.is_empty() else [allow.value, deny.value]
+            channels.append(channel)
+
+        if not channels:
+            await ctx.send("No hay canales que bloquear: @everyone ya no puede escribir en ninguno.")
+            return
+
+        # La instantánea se guarda antes de tocar nada para poder deshacer un bloqueo interrumpido
+        self.channel_snapshots[guild_key] = snapshot
+        self.save_channel_snapshots()
+
+        audit_reason = f"Lockdown por {ctx.author}: {razon}"
+
+        async def lock_channel(channel):
+            overwrite = channel.overwrites_for(everyone)
+            for permission in LOCKDOWN_PERMISSIONS:
+                setattr(overwrite, permission, False)
+            await channel.set_permissions(everyone, overwrite=overwrite, reason=audit_reason)
+
+        message = await ctx.send(f"🔒 Bloqueando 0/{len(channels)} canales...")
+        results = await run_bounded(
+            channels, lock_channel, LOCKDOWN_CONCURRENCY,
+            on_progress=self.progress_reporter(message, "🔒 Bloqueando")
+        )
+
+        failures = [(channel, error) for channel, error in results if error]
+        # Los canales que no se pudieron bloquear no deben "restaurarse" al desbloquear
+        for channel, _ in failures:
+            snapshot.pop(str(channel.id), None)
+        if not snapshot:
+            del self.channel_snapshots[guild_key]
+        self.save_channel_snapshots()
+
+        content = f"🔒 Servidor bloqueado: {len(channels) - len(failures)}/{len(channels)} canales cerrados para @everyone."
+        if failures:
+            content += f"\n⚠️ No se pudieron bloquear {len(failures)} canal(es):\n{self.format_failures(failures)}"
+        content += "\nUsa `!flex unlock` para restaurar los permisos anteriores."
+        await message.edit(content=content)
+
+    @commands.hybrid_command(name="unlock", aliases=["desbloquear"])
+    @commands.has_permissions(manage_channels=True)
+    @commands.guild_only()
+    async def unlock(self, ctx):
+        """
+        Restaura exactamente los permisos de @everyone guardados por `!flex lockdown`.
+        Ejemplo: !flex unlock
+        """
+        await ctx.defer()
+        guild = ctx.guild
+        guild_key = str(guild.id)
+        snapshot = self.channel_snapshots.get(guild_key)
+        if not snapshot:
+            await ctx.send("El servidor no está bloqueado.")
+            return
+
+        everyone = guild.default_role
+        channels = []
+        for channel_id in list(snapshot):
+            channel = guild.get_channel(int(channel_id))
+            if channel is None:
+                del snapshot[channel_id] # El canal se borró durante el bloqueo
+            else:
+                channels.append(channel)
+
+        async def restore_channel(channel):
+            previous = snapshot[str(channel.id)]
+            if previous is None:
+                await channel.set_permissions(everyone, overwrite=None, reason=f"Unlock por {ctx.author}")
+            else:
+                overwrite = discord.PermissionOverwrite.from_pair(discord.Permissions(previous[0]), discord.Permissions(previous[1]))
+                await channel.set_permissions(everyone, overwrite=overwrite, reason=f"Unlock por {ctx.author}")
+
+        message = await ctx.send(f"🔓 Desbloqueando 0/{len(channels)} canales...")
+        results = await run_bounded(
+            channels, restore_channel, LOCKDOWN_CONCURRENCY,
+            on_progress=self.progress_reporter(message, "🔓 Desbloqueando")
+        )
+
+        failures = [(channel, error) for channel, error in results if error]
+        # Solo se conservan los canales pendientes, para poder reintentar con `!flex unlock`
+        for channel, error in results:
+            if not error:
+                snapshot.pop(str(channel.id), None)
+        if not snapshot:
+            del self.channel_snapshots[guild_key]
+        self.save_channel_snapshots()
+
+        content = f"🔓 Servidor desbloqueado: {len(channels) - len(failures)}/{len(channels)} canales restaurados."
+        if failures:
+            content += f"\n⚠️ No se pudieron restaurar {len(failures)} canal(es); vuelve a usar `!flex unlock` para reintentarlo:\n{self.format_failures(failures)}"
+        await message.edit(content=content)
+
+    @commands.hybrid_group(name="raid", invoke_without_command=True, fallback="ver")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def raid(self, ctx):
+        """
+        Muestra el estado de la protección anti-raid.
+
+        Subcomandos:
+        ------------
+        !flex raid on [duración]   Activa el modo bloqueo (por defecto, la duración configurada)
+        !flex raid off             Desactiva el modo bloqueo
+        """
+        config = guild_config.get(ctx.guild.id)
+        lockdown = self.lockdowns.get(ctx.guild.id)
+
+        embed = discord.Embed(title="🛡️ Protección Anti-Raid", color=discord.Color.blue())
+        if lockdown:
+            remaining = max(0, int(lockdown["until"] - time.time()))
+            embed.add_field(name="Modo bloqueo", value=f"Activo ({remaining // 60} min restantes)", inline=False)
+        else:
+            embed.add_field(name="Modo bloqueo", value="Inactivo", inline=False)
+        embed.add_field(name="Tasa de entradas", value=f"{config['raid_join_threshold']} en {config['raid_join_window']} s", inline=True)
+        embed.add_field(name="Grupo de cuentas nuevas", value=f"{config['raid_cluster_size']} cuentas de menos de {config['raid_new_account_days']} días", inline=True)
+        embed.add_field(name="Bloqueo automático", value="Sí" if config["raid_auto_lockdown"] else "No", inline=True)
+        embed.set_footer(text="Ajusta los umbrales con !flex config set raid_...")
+        await ctx.send(embed=embed)
+
+    @raid.command(name="on")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def raid_on(self, ctx, duracion: str = None):
+        """
+        Activa manualmente el modo bloqueo.
+        Ejemplo: !flex raid on 30m
+        """
+        await ctx.defer()
+        if ctx.guild.id in self.lockdowns:
+            await ctx.send("El modo bloqueo ya está activo.")
+            return
+        if duracion:
+            try:
+                seconds = parse_duration(duracion)
+            except ValueError as e:
+                await ctx.send(str(e))
+                return
+        else:
+            seconds = guild_config.get(ctx.guild.id)["raid_lockdown_minutes"] * 60
+
+        await self.enter_lockdown(ctx.guild, seconds)
+        await ctx.send(f"🔒 Modo bloqueo activado durante {seconds // 60} minutos. Los nuevos miembros serán silenciados automáticamente.")
+
+    @raid.command(name="off")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def raid_off(self, ctx):
+        """
+        Desactiva el modo bloqueo.
+        Ejemplo: !flex raid off
+        """
+        await ctx.defer()
+        if not await self.exit_lockdown(ctx.guild):
+            await ctx.send("El modo bloqueo no está activo.")
+            return
+        await ctx.send("🔓 Modo bloqueo desactivado. Los nuevos miembros ya no serán silenciados automáticamente.")
+
+
+async def setup(bot):
+    await bot.add_cog(RaidProtection(bot))
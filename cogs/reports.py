@@ -2,9 +2,18 @@ import discord # type: ignore
 from discord.ext import commands # type: ignore
 import datetime
 import json
+import logging
 import os
 import asyncio
 
+from utils.cluster import save_partitioned_json
+from utils.guild_config import guild_config
+from utils.logs import bind_context
+from utils.member_cache import members
+from utils.metrics import timed_listener
+
+logger = logging.getLogger(__name__)
+
 class Reports(commands.Cog):
     """
     Sistema de reportes para el servidor.
@@ -15,8 +24,18 @@ class Reports(commands.Cog):
         self.bot = bot
         self.reports_file = 'data/reports.json'
         self.pending_actions = {}  # Para almacenar acciones pendientes
-        self.muted_role_name = "Muted" # Consistente con Moderation cog
-        self.load_reports()
+        self.reports = {}
+
+    async def cog_load(self):
+        # Lectura del archivo en un hilo aparte para no bloquear el bucle de eventos
+        await asyncio.get_running_loop().run_in_executor(None, self.load_reports)
+
+    def export_state(self):
+        """Estado en memoria que se conserva al recargar el cog (los reportes ya están en disco)."""
+        return {"pending_actions": self.pending_actions}
+
+    def import_state(self, state):
+        self.pending_actions.update(state["pending_actions"])
 
     async def get_or_create_muted_role(self, guild: discord.Guild) -> discord.Role:
         """Obtiene o crea el rol 'Muted' y configura sus permisos."""
@@ -26,16 +45,17 @@ class Reports(commands.Cog):
             return await moderation_cog.get_or_create_muted_role(guild)
 
         # Fallback si el cog de Moderación no está disponible o no tiene el método
-        muted_role = discord.utils.get(guild.roles, name=self.muted_role_name)
+        muted_role_name = guild_config.get(guild.id)["muted_role_name"]
+        muted_role = discord.utils.get(guild.roles, name=muted_role_name)
         if muted_role is None:
-            muted_role = await guild.create_role(name=self.muted_role_name, reason="Rol para silenciar usuarios")
+            muted_role = await guild.create_role(name=muted_role_name, reason="Rol para silenciar usuarios")
             for channel in guild.channels:
                 try:
                     await channel.set_permissions(muted_role, send_messages=False, speak=False, add_reactions=False)
                 except discord.Forbidden:
-                    print(f"Reports Cog: No se pudieron establecer permisos para Muted en {channel.name}")
+                    logger.warning("No se pudieron establecer permisos para Muted en %s", channel.name)
                 except Exception as e:
-                    print(f"Reports Cog: Error estableciendo permisos para Muted en {channel.name}: {e}")
+                    logger.error("Error estableciendo permisos para Muted en %s: %s", channel.name, e)
         return muted_role
 
     def load_reports(self):
@@ -57,7 +77,7 @@ class Reports(commands.Cog):
                 self.reports = {}
             except Exception as e:
                 # Otro tipo de error al leer el archivo
-                print(f"Error inesperado al cargar reports.json: {e}")
+                logger.error("Error inesperado al cargar reports.json: %s", e)
                 self.reports = {}
         else:
             # Si el archivo no existe, inicializar con un diccionario vacío
@@ -67,11 +87,10 @@ class Reports(commands.Cog):
         self.save_reports()
 
     def save_reports(self):
-        """Guardar reportes en el archivo"""
-        with open(self.reports_file, 'w') as f:
-            json.dump(self.reports, f, indent=4)
+        """Guardar reportes en el archivo de forma atómica (en modo clúster, solo los servidores propios)"""
+        save_partitioned_json(self.reports_file, self.reports)
 
-    @commands.command(
+    @commands.hybrid_command(
         name="report",
         aliases=["reportar", "rep"],
         brief="Reporta a un usuario",
@@ -132,16 +151,25 @@ class Reports(commands.Cog):
             self.reports[server_id].append(report_data)
             self.save_reports()
 
+            # Mantener actualizado el índice de búsqueda
+            search_cog = self.bot.get_cog("Search")
+            if search_cog:
+                search_cog.index_report(server_id, len(self.reports[server_id]) - 1, report_data)
+
             # Enviar confirmación al usuario
-            try:
-                await ctx.message.delete()  # Eliminar el mensaje del reporte
-            except:
-                pass  # Ignorar si no se puede borrar el mensaje
-                
-            await ctx.send(f"{ctx.author.mention}, tu reporte ha sido enviado y será revisado por el equipo de moderación.", delete_after=10)
+            if ctx.interaction is None:
+                try:
+                    await ctx.message.delete()  # Eliminar el mensaje del reporte
+                except:
+                    pass  # Ignorar si no se puede borrar el mensaje
+                await ctx.send(f"{ctx.author.mention}, tu reporte ha sido enviado y será revisado por el equipo de moderación.", delete_after=10)
+            else:
+                # Con el comando de barra nadie más ve el reporte
+                await ctx.send("Tu reporte ha sido enviado y será revisado por el equipo de moderación.", ephemeral=True)
 
             # Buscar o crear canal de reportes
-            reports_channel = discord.utils.get(ctx.guild.channels, name="reportes")
+            reports_channel_name = guild_config.get(ctx.guild.id)["reports_channel_name"]
+            reports_channel = discord.utils.get(ctx.guild.channels, name=reports_channel_name)
             if not reports_channel:
                 try:
                     # Crear categoría si no existe
@@ -161,14 +189,14 @@ class Reports(commands.Cog):
                             overwrites[role] = discord.PermissionOverwrite(read_messages=True)
 
                     reports_channel = await ctx.guild.create_text_channel(
-                        'reportes',
+                        reports_channel_name,
                         category=category,
                         overwrites=overwrites,
                         topic="Canal para la gestión de reportes de usuarios."
                     )
                 except Exception as e:
                     await ctx.send(f"No se pudo crear el canal de reportes. Error: {e}", delete_after=10)
-                    print(f"Error creando canal de reportes: {e}")
+                    logger.error("Error creando canal de reportes: %s", e)
                     return
 
             # Crear embed para el reporte
@@ -206,11 +234,9 @@ class Reports(commands.Cog):
             
         except Exception as e:
             await ctx.send(f"Ocurrió un error al procesar tu reporte. Por favor, inténtalo de nuevo más tarde.", delete_after=10)
-            import traceback
-            print(f"Error en el comando report: {e}")
-            traceback.print_exc()
+            logger.exception("Error en el comando report: %s", e)
 
-    @commands.command()
+    @commands.hybrid_command()
     @commands.has_permissions(manage_messages=True)
     async def reports(self, ctx, status: str = "pendiente"):
         """
@@ -258,8 +284,9 @@ class Reports(commands.Cog):
         )
 
         for i, report in enumerate(reports_list[-10:], 1):  # Mostrar solo los últimos 10 reportes
-            reported_user = ctx.guild.get_member(report["reported_user"])
-            reporter = ctx.guild.get_member(report["reported_by"])
+            # Solo caché: el servidor ya se descargó antes del comando (ver cogs/member_cache.py)
+            reported_user = members.cached_member(ctx.guild, report["reported_user"])
+            reporter = members.cached_member(ctx.guild, report["reported_by"])
             
             if reported_user and reporter:
                 embed.add_field(
@@ -275,6 +302,7 @@ class Reports(commands.Cog):
         await ctx.send(embed=embed)
 
     @commands.Cog.listener()
+    @timed_listener
     async def on_raw_reaction_add(self, payload):
         """Manejar reacciones en los reportes"""
         if payload.member.bot:
@@ -282,8 +310,10 @@ class Reports(commands.Cog):
 
         # Verificar si es un canal de reportes
         channel = self.bot.get_channel(payload.channel_id)
-        if not channel or channel.name != "reportes":
+        if not channel or channel.name != guild_config.get(payload.guild_id)["reports_channel_name"]:
             return
+        # Cada evento se atiende en su propia tarea: no hace falta restaurar el contexto de los logs
+        bind_context(guild=payload.guild_id, channel=payload.channel_id, user=payload.user_id)
 
         # Verificar si el usuario tiene permisos
         if not payload.member.guild_permissions.manage_messages:
@@ -312,7 +342,7 @@ class Reports(commands.Cog):
 
         report = self.reports[server_id][report_id]
         reported_user_id = report["reported_user"]
-        reported_user = payload.member.guild.get_member(reported_user_id)
+        reported_user = await members.get_member(payload.member.guild, reported_user_id)
 
         # Procesar acción según la reacción
         if emoji == "✅":  # Marcar como resuelto
@@ -364,6 +394,10 @@ class Reports(commands.Cog):
 
         self.save_reports()
 
+        search_cog = self.bot.get_cog("Search")
+        if search_cog:
+            search_cog.update_report_status(server_id, report_id, report["status"])
+
     async def handle_mod_action(self, emoji, message, moderator, channel):
         """Manejar las acciones de moderación"""
         if emoji not in ["🔇", "👢", "🔨"]:
@@ -374,7 +408,7 @@ class Reports(commands.Cog):
             return
 
         guild = channel.guild
-        target_user = guild.get_member(user_id)
+        target_user = await members.get_member(guild, user_id)
         if not target_user:
             await channel.send("No se pudo encontrar al usuario reportado. Es posible que haya abandonado el servidor.")
             del self.pending_actions[message.id]
@@ -415,21 +449,28 @@ class Reports(commands.Cog):
             if emoji == "🔇":  # Silenciar
                 muted_role = await self.get_or_create_muted_role(guild)
                 if not muted_role:
-                    await channel.send(f"No se pudo obtener o crear el rol '{self.muted_role_name}'. Verifica los permisos del bot.")
+                    await channel.send(f"No se pudo obtener o crear el rol '{guild_config.get(guild.id)['muted_role_name']}'. Verifica los permisos del bot.")
                     del self.pending_actions[message.id]
                     return
                 
                 # Aplicar rol
                 await target_user.add_roles(muted_role, reason=reason)
                 action_type = "silenciado"
+                case_action = "mute"
                 
             elif emoji == "👢":  # Expulsar
                 await guild.kick(target_user, reason=reason)
                 action_type = "expulsado"
+                case_action = "kick"
                 
             elif emoji == "🔨":  # Banear
                 await guild.ban(target_user, reason=reason, delete_message_days=1)
                 action_type = "baneado"
+                case_action = "ban"
+
+            cases_cog = self.bot.get_cog("Cases")
+            if cases_cog:
+                cases_cog.record_case(guild.id, case_action, target_user.id, moderator.id, reason)
             
             # Registrar acción
             log_embed = discord.Embed(
@@ -450,7 +491,7 @@ class Reports(commands.Cog):
             await channel.send(f"Error de permisos al intentar {action_type} a {target_user.mention}. Asegúrate de que el bot tiene los permisos necesarios y que su rol está por encima del rol del usuario.")
         except Exception as e:
             await channel.send(f"Ocurrió un error al ejecutar la acción '{action_type}'. Error: {e}")
-            print(f"Error en handle_mod_action ({action_type}): {e}")
+            logger.exception("Error en handle_mod_action (%s): %s", action_type, e)
         
         # Limpiar acción pendiente
         if message.id in self.pending_actions:
@@ -0,0 +1,245 @@
+import discord # type: ignore
+from discord.ext import commands # type: ignore
+import asyncio
+import datetime
+import json
+import logging
+import os
+import re
+import time
+
+from utils.guild_config import guild_config
+from utils.search_index import SearchIndex, parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+REPORTS_FILE = 'data/reports.json'
+WARNINGS_FILE = 'data/warnings.json'
+WARNINGS_ARCHIVE_FILE = 'data/warnings_archive.jsonl'
+
+RESULTS_PER_PAGE = 10
+# Filtros admitidos dentro de la consulta (clave:valor)
+FILTER_RE = re.compile(r"(usuario|estado|tipo|pagina):(\S+)", re.IGNORECASE)
+KIND_ALIASES = {
+    "reporte": "report", "reportes": "report", "report": "report",
+    "advertencia": "warning", "advertencias": "warning", "warn": "warning", "warning": "warning"
+}
+KIND_LABELS = {"report": "Reporte", "warning": "Advertencia"}
+# Estados de las advertencias (no tienen flujo de revisión, solo caducan)
+WARNING_STATUS = "activa"
+WARNING_EXPIRED_STATUS = "expirada"
+
+
+def read_json_file(filepath):
+    """Lee un archivo JSON y devuelve {} si no existe o está corrupto."""
+    if not os.path.exists(filepath):
+        return {}
+    try:
+        with open(filepath, 'r') as f:
+            content = f.read()
+            return json.loads(content) if content.strip() else {}
+    except (json.JSONDecodeError, IOError) as e:
+        logger.error("Error al leer %s: %s", filepath, e)
+        return {}
+
+
+def read_index_sources():
+    """Lee reportes, advertencias y advertencias archivadas. Devuelve (reportes, advertencias, archivadas)."""
+    archived_warnings = []
+    if os.path.exists(WARNINGS_ARCHIVE_FILE):
+        with open(WARNINGS_ARCHIVE_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    archived_warnings.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return read_json_file(REPORTS_FILE), read_json_file(WARNINGS_FILE), archived_warnings
+
+
+class Search(commands.Cog):
+    """
+    Búsqueda de texto completo sobre las razones de reportes y advertencias.
+    El índice se construye una vez al cargar el cog y después se mantiene
+    de forma incremental desde los cogs de Reportes y Advertencias.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.index = SearchIndex()
+
+    async def cog_load(self):
+        # Los archivos se leen en un hilo aparte; la indexación se hace después en el bucle
+        sources = await asyncio.get_running_loop().run_in_executor(None, read_index_sources)
+        self.build_index(*sources)
+
+    def build_index(self, reports, warnings, archived_warnings):
+        """Construye el índice a partir de los datos de reportes y advertencias."""
+        for server_id, reports_list in reports.items():
+            if not isinstance(reports_list, list):
+                continue
+            for report_index, report in enumerate(reports_list):
+                self.index_report(server_id, report_index, report)
+
+        now = time.time()
+        for server_id, users in warnings.items():
+            if not isinstance(users, dict):
+                continue
+            ttl_seconds = guild_config.get(server_id)["warning_ttl_days"] * 86400
+            for user_id, user_warnings in users.items():
+                if not isinstance(user_warnings, list):
+                    continue
+                for warning_index, warning in enumerate(user_warnings):
+                    expired = ttl_seconds and warning.get("timestamp") and parse_timestamp(warning["timestamp"]) + ttl_seconds <= now
+                    status = WARNING_EXPIRED_STATUS if expired else WARNING_STATUS
+                    self.index_warning(server_id, user_id, warning, status=status, number=warning_index + 1)
+
+        # Advertencias caducadas que ya se movieron al archivo histórico
+        for warning in archived_warnings:
+            self.index_warning(warning["guild_id"], warning["user_id"], warning, status=WARNING_EXPIRED_STATUS)
+
+        logger.info("Índice construido con %d documentos.", len(self.index))
+
+    def index_report(self, server_id, report_index, report):
+        """Indexa (o reindexa) un reporte. `report_index` es su posición en la lista del servidor."""
+        self.index.add(
+            ("report", str(server_id), report_index),
+            report.get("reason", ""),
+            kind="report",
+            guild_id=server_id,
+            user_id=report.get("reported_user"),
+            status=report.get("status", "pendiente"),
+            timestamp=report.get("timestamp"),
+            author_id=report.get("reported_by"),
+            number=report_index + 1
+        )
+
+    def update_report_status(self, server_id, report_index, status):
+        """Refleja en el índice el cambio de estado de un reporte."""
+        self.index.update_status(("report", str(server_id), report_index), status)
+
+    def index_warning(self, server_id, user_id, warning, status=WARNING_STATUS, number=None):
+        """
+        Indexa una advertencia. Se identifica por su timestamp, ya que su posición en la
+        lista del usuario cambia cuando las advertencias caducadas se compactan.
+        """
+        self.index.add(
+            ("warning", str(server_id), str(user_id), warning.get("timestamp")),
+            warning.get("reason", ""),
+            kind="warning",
+            guild_id=server_id,
+            user_id=user_id,
+            status=status,
+            timestamp=warning.get("timestamp"),
+            author_id=warning.get("moderator"),
+            number=number
+        )
+
+    def mark_warning_expired(self, server_id, user_id, timestamp):
+        """Marca como caducada una advertencia indexada."""
+        self.index.update_status(("warning", str(server_id), str(user_id), timestamp), WARNING_EXPIRED_STATUS)
+
+    def mark_warning_active(self, server_id, user_id, timestamp):
+        """Vuelve a marcar como activa una advertencia indexada (p. ej. si se amplía la caducidad)."""
+        self.index.update_status(("warning", str(server_id), str(user_id), timestamp), WARNING_STATUS)
+
+    def parse_query(self, raw_query):
+        """Separa los filtros clave:valor del texto a buscar."""
+        filters = {}
+        for key, value in FILTER_RE.findall(raw_query):
+            filters[key.lower()] = value
+        text = FILTER_RE.sub(" ", raw_query).strip()
+        return text, filters
+
+    @commands.hybrid_command(name="search", aliases=["buscar"])
+    @commands.has_permissions(manage_messages=True)
+    @commands.guild_only()
+    async def search(self, ctx, *, query: str):
+        """
+        Busca reportes y advertencias cuya razón contenga todos los términos indicados.
+        Los resultados se ordenan del más reciente al más antiguo.
+
+        Filtros opcionales (dentro de la consulta):
+        -------------------------------------------
+        usuario:@usuario|ID       Solo casos sobre ese usuario
+        estado:pendiente|resuelto|descartado|activa|expirada
+        tipo:reporte|advertencia
+        pagina:N                  Página de resultados (10 por página)
+
+        Ejemplos:
+        ---------
+        !flex search spam enlaces
+        !flex search insultos usuario:@usuario estado:pendiente
+        !flex search estafa tipo:reporte pagina:2
+        """
+        text, filters = self.parse_query(query)
+        if not text:
+            await ctx.send("Debes indicar al menos un término de búsqueda. Ejemplo: `!flex search spam estado:pendiente`")
+            return
+
+        user_id = None
+        if "usuario" in filters:
+            user_match = re.search(r"\d+", filters["usuario"])
+            if not user_match:
+                await ctx.send("Filtro `usuario` no válido. Menciona al usuario o usa su ID.")
+                return
+            user_id = user_match.group(0)
+
+        kind = None
+        if "tipo" in filters:
+            kind = KIND_ALIASES.get(filters["tipo"].lower())
+            if kind is None:
+                await ctx.send("Filtro `tipo` no válido. Usa `reporte` o `advertencia`.")
+                return
+
+        status = filters["estado"].lower() if "estado" in filters else None
+
+        try:
+            page = int(filters.get("pagina", 1))
+        except ValueError:
+            await ctx.send("Filtro `pagina` no válido. Debe ser un número.")
+            return
+
+        results = self.index.search(text, ctx.guild.id, user_id=user_id, status=status, kind=kind)
+        if not results:
+            await ctx.send(f"No se encontraron reportes ni advertencias que coincidan con `{text}`.")
+            return
+
+        total_pages = (len(results) + RESULTS_PER_PAGE - 1) // RESULTS_PER_PAGE
+        page = max(1, min(page, total_pages))
+        start = (page - 1) * RESULTS_PER_PAGE
+
+        embed = discord.Embed(
+            title=f"🔎 Resultados para: {text}",
+            color=discord.Color.blue(),
+            timestamp=datetime.datetime.utcnow()
+        )
+
+        for document in results[start:start + RESULTS_PER_PAGE]:
+            date = document["timestamp"]
+            try:
+                date = datetime.datetime.fromisoformat(date).strftime('%d/%m/%Y %H:%M')
+            except (TypeError, ValueError):
+                pass
+            reason = document["reason"]
+            if len(reason) > 200:
+                reason = reason[:197] + "..."
+            label = KIND_LABELS[document['kind']]
+            if document["number"]:
+                label += f" #{document['number']}"
+            embed.add_field(
+                name=f"{label} · {document['status']}",
+                value=f"**Usuario:** <@{document['user_id']}>\n"
+                      f"**Por:** <@{document['author_id']}>\n"
+                      f"**Razón:** {reason}\n"
+                      f"**Fecha:** {date}",
+                inline=False
+            )
+
+        embed.set_footer(text=f"Página {page}/{total_pages} · {len(results)} resultado(s)")
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(Search(bot))
@@ -0,0 +1,118 @@
+import discord # type: ignore
+from discord.ext import commands, tasks # type: ignore
+import logging
+
+from utils.guild_config import DEFAULTS, DESCRIPTIONS, guild_config, parse_value
+
+logger = logging.getLogger(__name__)
+
+
+class Settings(commands.Cog):
+    """
+    Configuración por servidor (anti-spam, rol de silenciado, canal de reportes, advertencias...).
+    Los valores se leen desde la caché de `utils.guild_config`; este cog solo ofrece los
+    comandos para consultarlos y modificarlos, y recarga el archivo si se edita a mano.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.watch_config_file.start()
+
+    def cog_unload(self):
+        self.watch_config_file.cancel()
+
+    @tasks.loop(seconds=30)
+    async def watch_config_file(self):
+        """Recarga en caliente la configuración si `data/guild_config.json` cambia en disco."""
+        if guild_config.reload_if_changed():
+            logger.info("Configuración de servidores recargada desde el archivo.")
+
+    def format_value(self, value):
+        if isinstance(value, bool):
+            return "sí" if value else "no"
+        if isinstance(value, (dict, list)):
+            return f"{len(value)} entrada(s)"
+        return str(value)
+
+    @commands.hybrid_group(name="config", invoke_without_command=True, fallback="ver")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def config(self, ctx):
+        """
+        Muestra la configuración del servidor.
+
+        Subcomandos:
+        ------------
+        !flex config set <clave> <valor>
+        !flex config reset <clave>
+        !flex config reload
+        """
+        config = guild_config.get(ctx.guild.id)
+        overrides = guild_config.get_overrides(ctx.guild.id)
+
+        embed = discord.Embed(
+            title="⚙️ Configuración del Servidor",
+            description="Los valores marcados con ✏️ se han modificado; el resto son los predeterminados.",
+            color=discord.Color.blue()
+        )
+        for key in DEFAULTS:
+            marker = "✏️ " if key in overrides else ""
+            embed.add_field(
+                name=f"{marker}{key}",
+                value=f"`{self.format_value(config[key])}`\n{DESCRIPTIONS.get(key, '')}",
+                inline=False
+            )
+        embed.set_footer(text="Modifica un valor con !flex config set <clave> <valor>")
+        await ctx.send(embed=embed)
+
+    @config.command(name="set")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def config_set(self, ctx, clave: str, *, valor: str):
+        """
+        Modifica un valor de configuración del servidor.
+        Ejemplo: !flex config set spam_threshold 8
+        """
+        clave = clave.lower()
+        try:
+            value = parse_value(clave, valor)
+        except KeyError:
+            await ctx.send(f"La clave `{clave}` no existe. Usa `!flex config` para ver las claves disponibles.")
+            return
+        except ValueError as e:
+            await ctx.send(str(e))
+            return
+
+        guild_config.set(ctx.guild.id, clave, value)
+        await ctx.send(f"Configuración actualizada: `{clave}` = `{self.format_value(value)}`.")
+
+    @config.command(name="reset")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def config_reset(self, ctx, clave: str):
+        """
+        Restablece un valor de configuración a su valor predeterminado.
+        Ejemplo: !flex config reset spam_threshold
+        """
+        clave = clave.lower()
+        if clave not in DEFAULTS:
+            await ctx.send(f"La clave `{clave}` no existe. Usa `!flex config` para ver las claves disponibles.")
+            return
+
+        guild_config.reset(ctx.guild.id, clave)
+        await ctx.send(f"`{clave}` restablecido a su valor predeterminado: `{self.format_value(DEFAULTS[clave])}`.")
+
+    @config.command(name="reload")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def config_reload(self, ctx):
+        """
+        Recarga la configuración de todos los servidores desde el archivo.
+        Ejemplo: !flex config reload
+        """
+        guild_config.reload()
+        await ctx.send("Configuración recargada desde el archivo.")
+
+
+async def setup(bot):
+    await bot.add_cog(Settings(bot))
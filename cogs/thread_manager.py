@@ -1,8 +1,15 @@
 import discord
 from discord.ext import commands, tasks
 import json
+import logging
 import os
 import datetime
+import asyncio
+
+from utils.cluster import cluster, guild_key, save_partitioned_json
+from utils.message_pipeline import THREAD_TRACKING_ORDER, pipeline
+
+logger = logging.getLogger(__name__)
 
 # Rutas a los archivos de datos
 THREAD_CHANNELS_FILE = 'data/thread_channels.json'
@@ -21,26 +28,41 @@ def load_json_data(filepath, default_data=None):
         with open(filepath, 'r') as f:
             return json.load(f)
     except (json.JSONDecodeError, IOError) as e:
-        print(f"Error al cargar {filepath}: {e}. Usando datos por defecto.")
+        logger.error("Error al cargar %s: %s. Usando datos por defecto.", filepath, e)
         return default_data
 
-def save_json_data(filepath, data):
-    """Guarda datos en un archivo JSON."""
+def thread_guild(thread_id, thread_info):
+    """Servidor al que pertenece una entrada de `active_threads` (para el modo clúster)."""
+    return thread_info.get("guild_id", 0)
+
+def save_json_data(filepath, data, owner_of=guild_key):
+    """Guarda datos en un archivo JSON. En modo clúster solo se reemplazan las entradas de servidores propios."""
     try:
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=4)
+        save_partitioned_json(filepath, data, owner_of)
     except IOError as e:
-        print(f"Error al guardar en {filepath}: {e}")
+        logger.error("Error al guardar en %s: %s", filepath, e)
 
 class ThreadManager(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.thread_channels = load_json_data(THREAD_CHANNELS_FILE, {}) # guild_id: [channel_id]
-        self.active_threads = load_json_data(ACTIVE_THREADS_FILE, {}) # thread_id: {details}
+        self.thread_channels = {} # guild_id: [channel_id]
+        self.active_threads = {} # thread_id: {details}
+        # Los moderadores también participan en los hilos, así que esta etapa no los excluye
+        pipeline.register("thread_tracking", self.thread_stage, THREAD_TRACKING_ORDER, include_mods=True)
+
+    async def cog_load(self):
+        # Los archivos se leen en hilos aparte para no bloquear el bucle durante el arranque
+        loop = asyncio.get_running_loop()
+        self.thread_channels, self.active_threads = await asyncio.gather(
+            loop.run_in_executor(None, load_json_data, THREAD_CHANNELS_FILE, {}),
+            loop.run_in_executor(None, load_json_data, ACTIVE_THREADS_FILE, {})
+        )
+        # El archivado automático solo arranca cuando los hilos activos ya están cargados
         self.auto_archive_task.start()
 
     def cog_unload(self):
         self.auto_archive_task.cancel()
+        pipeline.unregister("thread_tracking")
 
     @tasks.loop(minutes=1) # Comprobar cada minuto
     async def auto_archive_task(self):
@@ -56,6 +78,10 @@ class ThreadManager(commands.Cog):
 
             if not thread_info or thread_info.get("status") != "open" or not thread_info.get("temporary"):
                 continue
+            # En modo clúster los hilos de otros servidores los archiva el proceso que los atiende
+            # (aquí get_guild devolvería None y el hilo se eliminaría por error)
+            if not cluster.owns_guild(thread_info.get("guild_id", 0)):
+                continue
 
             expires_at_str = thread_info.get("expires_at")
             if not expires_at_str:
@@ -64,15 +90,15 @@ class ThreadManager(commands.Cog):
             try:
                 expires_at_dt = datetime.datetime.fromisoformat(expires_at_str)
             except ValueError:
-                print(f"Error al parsear 'expires_at' para el hilo {thread_id_str}: {expires_at_str}")
+                logger.warning("Error al parsear 'expires_at' para el hilo %s: %s", thread_id_str, expires_at_str)
                 continue
 
             if now_utc >= expires_at_dt:
-                print(f"El hilo temporal {thread_id_str} ('{thread_info.get('name')}') ha expirado. Intentando archivar...")
+                logger.info("El hilo temporal %s ('%s') ha expirado. Intentando archivar...", thread_id_str, thread_info.get('name'))
                 try:
                     guild = self.bot.get_guild(int(thread_info["guild_id"]))
                     if not guild:
-                        print(f"No se encontró el servidor con ID {thread_info['guild_id']} para el hilo {thread_id_str}. Eliminando de hilos activos.")
+                        logger.warning("No se encontró el servidor con ID %s para el hilo %s. Eliminando de hilos activos.", thread_info['guild_id'], thread_id_str)
                         if thread_id_str in self.active_threads:
                             del self.active_threads[thread_id_str]
                             threads_updated = True
@@ -80,14 +106,14 @@ class ThreadManager(commands.Cog):
 
                     discord_thread = guild.get_thread(int(thread_id_str))
                     if not discord_thread:
-                        print(f"Hilo {thread_id_str} no encontrado en el servidor {guild.name}. Eliminando de hilos activos.")
+                        logger.warning("Hilo %s no encontrado en el servidor %s. Eliminando de hilos activos.", thread_id_str, guild.name)
                         if thread_id_str in self.active_threads:
                             del self.active_threads[thread_id_str]
                             threads_updated = True
                         continue
 
                     if discord_thread.archived:
-                        print(f"Hilo {thread_id_str} ('{thread_info.get('name')}') ya estaba archivado. Actualizando estado.")
+                        logger.info("Hilo %s ('%s') ya estaba archivado. Actualizando estado.", thread_id_str, thread_info.get('name'))
                         thread_info["status"] = "archived_externally" # O un estado similar
                         threads_updated = True
                         continue
@@ -97,35 +123,35 @@ class ThreadManager(commands.Cog):
                     try:
                         await discord_thread.send(f"Este hilo ('{thread_info['name']}') ha sido cerrado y archivado automáticamente porque su tiempo ha expirado.")
                     except discord.Forbidden:
-                        print(f"No se pudo enviar mensaje de cierre al hilo {thread_id_str} (probablemente ya estaba archivado/bloqueado o permisos insuficientes).")
+                        logger.warning("No se pudo enviar mensaje de cierre al hilo %s (probablemente ya estaba archivado/bloqueado o permisos insuficientes).", thread_id_str)
                     except Exception as e:
-                        print(f"Error enviando mensaje de cierre al hilo {thread_id_str}: {e}")
+                        logger.warning("Error enviando mensaje de cierre al hilo %s: %s", thread_id_str, e)
 
                     await discord_thread.edit(archived=True, locked=True)
                     thread_info["status"] = "archived_expired"
                     threads_updated = True
-                    print(f"Hilo {thread_id_str} ('{thread_info.get('name')}') archivado y bloqueado exitosamente.")
+                    logger.info("Hilo %s ('%s') archivado y bloqueado exitosamente.", thread_id_str, thread_info.get('name'))
 
                 except discord.Forbidden:
-                    print(f"Error de permisos al intentar archivar el hilo {thread_id_str} en el servidor {thread_info.get('guild_id')}.")
+                    logger.warning("Error de permisos al intentar archivar el hilo %s en el servidor %s.", thread_id_str, thread_info.get('guild_id'))
                     thread_info["status"] = "archival_failed_permissions"
                     threads_updated = True
                 except discord.NotFound:
-                    print(f"Hilo {thread_id_str} no encontrado (NotFound) al intentar archivar. Eliminando de hilos activos.")
+                    logger.warning("Hilo %s no encontrado (NotFound) al intentar archivar. Eliminando de hilos activos.", thread_id_str)
                     if thread_id_str in self.active_threads:
                         del self.active_threads[thread_id_str]
                     threads_updated = True
                 except Exception as e:
-                    print(f"Error inesperado al archivar el hilo {thread_id_str}: {e}")
+                    logger.exception("Error inesperado al archivar el hilo %s: %s", thread_id_str, e)
                     # Podríamos añadir un reintento o marcarlo como error para revisión manual
                     thread_info["status"] = "archival_failed_unknown"
                     threads_updated = True
 
 
         if threads_updated:
-            save_json_data(ACTIVE_THREADS_FILE, self.active_threads)
+            save_json_data(ACTIVE_THREADS_FILE, self.active_threads, thread_guild)
 
-    @commands.command(name="cerrarhilo")
+    @commands.hybrid_command(name="cerrarhilo")
     @commands.has_permissions(manage_threads=True) # O permiso más específico si se desea
     @commands.guild_only()
     async def close_thread_manually(self, ctx, *, mensaje_opcional: str = None):
@@ -165,7 +191,7 @@ class ThreadManager(commands.Cog):
 
             thread_info["status"] = "archived_manual"
             thread_info["closed_by"] = str(ctx.author.id) # Guardar quién lo cerró
-            save_json_data(ACTIVE_THREADS_FILE, self.active_threads)
+            save_json_data(ACTIVE_THREADS_FILE, self.active_threads, thread_guild)
 
             # Enviar confirmación al canal donde se ejecutó el comando (el hilo mismo)
             await ctx.send(f"El hilo '{thread_info['name']}' ({discord_thread.mention}) ha sido archivado y bloqueado manualmente por {ctx.author.mention}.")
@@ -177,17 +203,15 @@ class ThreadManager(commands.Cog):
             await ctx.send(f"Se produjo un error de comunicación con Discord al intentar cerrar el hilo: {e}")
         except Exception as e:
             await ctx.send(f"Ocurrió un error inesperado al intentar cerrar el hilo: {e}")
-            print(f"Error en el comando cerrarhilo: {e}")
+            logger.exception("Error en el comando cerrarhilo: %s", e)
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        # Ignorar mensajes del propio bot o DMs
-        if message.author.bot or not message.guild:
-            return
+    async def thread_stage(self, ctx) -> bool:
+        """Etapa de la tubería de mensajes que registra a los participantes de los hilos gestionados."""
+        message = ctx.message
 
         # Verificar si el mensaje está en un hilo gestionado
         if not isinstance(message.channel, discord.Thread):
-            return
+            return False
 
         thread_id_str = str(message.channel.id)
         thread_info = self.active_threads.get(thread_id_str)
@@ -204,8 +228,8 @@ class ThreadManager(commands.Cog):
                 # No es necesario guardar inmediatamente en cada mensaje para evitar escrituras frecuentes.
                 # Se podría guardar periódicamente o cuando el hilo se cierre,
                 # pero para simplicidad inicial, guardaremos al añadir un nuevo participante.
-                save_json_data(ACTIVE_THREADS_FILE, self.active_threads)
-                # print(f"Usuario {participant_id} añadido a notificaciones para el hilo {thread_id_str}") # Para depuración
+                save_json_data(ACTIVE_THREADS_FILE, self.active_threads, thread_guild)
+                logger.debug("Usuario %s añadido a notificaciones para el hilo %s", participant_id, thread_id_str)
 
             # Aquí es donde se implementaría la lógica de notificación real en el futuro.
             # Por ejemplo:
@@ -216,13 +240,14 @@ class ThreadManager(commands.Cog):
             #             try:
             #                 # await user.send(f"Nuevo mensaje de {message.author.name} en el hilo '{thread_info['name']}': {message.content[:50]}...")
             #             except discord.Forbidden:
-            #                 print(f"No se pudo enviar DM de notificación a {user.name}")
+            #                 logger.debug("No se pudo enviar DM de notificación a %s", user.name)
             pass # Marcador para la futura lógica de envío de notificaciones
+        return False
 
 
     # Aquí irán los comandos y la lógica del cog
 
-    @commands.command(name="designarhilocanal")
+    @commands.hybrid_command(name="designarhilocanal")
     @commands.has_permissions(manage_channels=True)
     @commands.guild_only()
     async def designate_thread_channel(self, ctx, channel: discord.TextChannel):
@@ -241,7 +266,7 @@ class ThreadManager(commands.Cog):
         save_json_data(THREAD_CHANNELS_FILE, self.thread_channels)
         await ctx.send(f"El canal {channel.mention} ha sido designado como un 'canal principal para hilos'. Ahora los moderadores pueden usar `!flex crearhilo` en este canal para iniciar nuevos hilos gestionados.")
 
-    @commands.command(name="quitarhilocanal")
+    @commands.hybrid_command(name="quitarhilocanal")
     @commands.has_permissions(manage_channels=True)
     @commands.guild_only()
     async def remove_thread_channel(self, ctx, channel: discord.TextChannel):
@@ -260,7 +285,7 @@ class ThreadManager(commands.Cog):
         save_json_data(THREAD_CHANNELS_FILE, self.thread_channels)
         await ctx.send(f"El canal {channel.mention} ha sido removido de la lista de 'canales principales para hilos'. Ya no se podrán crear hilos gestionados directamente en él con `!flex crearhilo`.")
 
-    @commands.command(name="crearhilo")
+    @commands.hybrid_command(name="crearhilo")
     @commands.has_permissions(manage_threads=True) # o manage_messages, o un rol custom
     @commands.guild_only()
     async def create_thread_in_channel(self, ctx, nombre_del_hilo: str, duracion_temporal: str = None, notificar_participantes: str = "no"):
@@ -271,6 +296,7 @@ class ThreadManager(commands.Cog):
         Duraciones: s (segundos), m (minutos), h (horas), d (días).
         Notificar participantes: si/no (actualmente no implementado, solo registra la intención)
         """
+        await ctx.defer()
         guild_id = str(ctx.guild.id)
         channel_id = str(ctx.channel.id)
 
@@ -363,7 +389,7 @@ class ThreadManager(commands.Cog):
                 "status": "open"
             }
             self.active_threads[str(discord_thread.id)] = thread_info
-            save_json_data(ACTIVE_THREADS_FILE, self.active_threads)
+            save_json_data(ACTIVE_THREADS_FILE, self.active_threads, thread_guild)
 
             embed = discord.Embed(
                 title="✅ ¡Hilo Creado Exitosamente!",
@@ -391,9 +417,7 @@ class ThreadManager(commands.Cog):
             await ctx.send(f"Se produjo un error de comunicación con Discord al intentar crear el hilo: {e}")
         except Exception as e:
             await ctx.send(f"Ocurrió un error inesperado al crear el hilo: {e}. Revisa los logs para más detalles.")
-            print(f"Error detallado en crearhilo: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error detallado en crearhilo: %s", e)
 
 
 async def setup(bot):
@@ -3,13 +3,114 @@ from discord.ext import commands # type: ignore
 import asyncio # type: ignore
 import datetime
 
+from utils.member_cache import members
+
+# Miembros recorridos entre cesiones del bucle de eventos al inicializar los contadores
+SEED_BATCH_SIZE = 5000
+
+
+class GuildCounters:
+    """Contadores de miembros de un servidor, mantenidos a partir de los eventos."""
+
+    __slots__ = ("online", "bots")
+
+    def __init__(self):
+        self.online = 0
+        self.bots = 0
+
+
 class Utilities(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Estadísticas de miembros por servidor para que serverinfo no recorra guild.members
+        self.guild_counters = {}  # guild_id: GuildCounters
+        # Con MEMBER_CACHE=lazy los contadores se recalculan cuando se descarga el servidor
+        members.add_listener(self.seed_counters)
+        if bot.is_ready():
+            # Cog recargado en caliente: on_ready ya no se volverá a emitir. Los servidores
+            # cuyos contadores se restauren con import_state no se vuelven a recorrer.
+            asyncio.create_task(self.seed_all_counters(only_missing=True))
+
+    def cog_unload(self):
+        members.remove_listener(self.seed_counters)
+
+    def export_state(self):
+        """Estado en memoria que se conserva al recargar el cog (ver utils/hot_reload.py)."""
+        return {"guild_counters": {guild_id: (c.online, c.bots) for guild_id, c in self.guild_counters.items()}}
+
+    def import_state(self, state):
+        for guild_id, (online, bots) in state["guild_counters"].items():
+            counters = self.guild_counters[guild_id] = GuildCounters()
+            counters.online = online
+            counters.bots = bots
+
+    async def seed_counters(self, guild):
+        """Cuenta una vez los miembros de un servidor; después los eventos mantienen los contadores."""
+        counters = GuildCounters()
+        for index, member in enumerate(guild.members, 1):
+            if member.bot:
+                counters.bots += 1
+            if member.status != discord.Status.offline:
+                counters.online += 1
+            if index % SEED_BATCH_SIZE == 0:
+                await asyncio.sleep(0) # Ceder el bucle de eventos en servidores grandes
+        self.guild_counters[guild.id] = counters
+        return counters
+
+    async def seed_all_counters(self, only_missing=False):
+        for guild in self.bot.guilds:
+            if not only_missing or guild.id not in self.guild_counters:
+                await self.seed_counters(guild)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        await self.seed_all_counters()
 
-    @commands.command()
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        await self.seed_counters(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.guild_counters.pop(guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        counters = self.guild_counters.get(member.guild.id)
+        if counters is None:
+            return
+        if member.bot:
+            counters.bots += 1
+        if member.status != discord.Status.offline:
+            counters.online += 1
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        counters = self.guild_counters.get(member.guild.id)
+        if counters is None:
+            return
+        if member.bot:
+            counters.bots = max(0, counters.bots - 1)
+        if member.status != discord.Status.offline:
+            counters.online = max(0, counters.online - 1)
+
+    @commands.Cog.listener()
+    async def on_presence_update(self, before, after):
+        was_online = before.status != discord.Status.offline
+        is_online = after.status != discord.Status.offline
+        if was_online == is_online:
+            return
+        counters = self.guild_counters.get(after.guild.id)
+        if counters is not None:
+            counters.online = max(0, counters.online + (1 if is_online else -1))
+
+    @commands.hybrid_command()
     @commands.has_permissions(manage_messages=True)
     async def clear(self, ctx, amount: int):
+        """
+        Elimina los últimos mensajes del canal (máximo 100).
+        Ejemplo: !flex clear 10
+        """
         if amount < 1:
             await ctx.send("Debes especificar un número positivo de mensajes para eliminar (ej: `!flex clear 5`).")
             return
@@ -18,6 +119,13 @@ class Utilities(commands.Cog):
             return
 
         try:
+            if ctx.interaction:
+                # Comando de barra: no hay mensaje del comando que borrar y la respuesta es efímera
+                # (si no, la propia purga podría borrar la respuesta diferida)
+                await ctx.defer(ephemeral=True)
+                deleted = await ctx.channel.purge(limit=amount)
+                await ctx.send(f"Se han eliminado {len(deleted)} mensajes correctamente.", ephemeral=True)
+                return
             deleted = await ctx.channel.purge(limit=amount + 1) # +1 para incluir el mensaje del comando
             message = await ctx.send(f"Se han eliminado {len(deleted) - 1} mensajes correctamente.")
             await asyncio.sleep(5)
@@ -28,9 +136,13 @@ class Utilities(commands.Cog):
             await ctx.send(f"Error al eliminar mensajes: {e}")
 
 
-    @commands.command()
+    @commands.hybrid_command()
     @commands.has_permissions(manage_channels=True)
     async def slowmode(self, ctx, seconds: int):
+        """
+        Establece el modo lento del canal en segundos (0 lo desactiva).
+        Ejemplo: !flex slowmode 10
+        """
         if not (0 <= seconds <= 21600): # 21600 segundos = 6 horas
             await ctx.send("El tiempo para el modo lento debe estar entre 0 segundos (desactivado) y 21600 segundos (6 horas).")
             return
@@ -47,7 +159,7 @@ class Utilities(commands.Cog):
             await ctx.send(f"Error al establecer el modo lento: {e}")
 
 
-    @commands.command()
+    @commands.hybrid_command()
     @commands.has_permissions(manage_messages=True)
     async def userinfo(self, ctx, member: discord.Member = None):
         """
@@ -100,7 +212,7 @@ class Utilities(commands.Cog):
 
         await ctx.send(embed=embed)
 
-    @commands.command()
+    @commands.hybrid_command()
     @commands.has_permissions(manage_messages=True)
     async def serverinfo(self, ctx):
         """
@@ -111,6 +223,7 @@ class Utilities(commands.Cog):
         --------
         !flex serverinfo
         """
+        await ctx.defer()
         guild = ctx.guild
         
         # Contar canales por tipo
@@ -118,9 +231,13 @@ class Utilities(commands.Cog):
         voice_channels = len(guild.voice_channels)
         categories = len(guild.categories)
         
-        # Contar miembros por estado
+        # Contadores de miembros mantenidos por eventos (solo se cuentan una vez por servidor)
+        counters = self.guild_counters.get(guild.id) or await self.seed_counters(guild)
         total_members = guild.member_count
-        online_members = len([m for m in guild.members if m.status != discord.Status.offline])
+        online_members = counters.online
+        # Con MEMBER_CACHE=lazy, hasta que termina la descarga solo se cuentan los miembros ya vistos;
+        # al terminar, seed_counters los vuelve a contar
+        partial = "" if guild.chunked else " (parcial)"
         
         # Contar roles (excluyendo @everyone)
         role_count = len(guild.roles) - 1
@@ -142,8 +259,9 @@ class Utilities(commands.Cog):
         
         # Estadísticas de miembros
         embed.add_field(name="Miembros Totales", value=total_members, inline=True)
-        embed.add_field(name="Miembros en Línea", value=online_members, inline=True)
-        embed.add_field(name="Bots", value=len([m for m in guild.members if m.bot]), inline=True)
+        embed.add_field(name="Miembros en Línea", value=f"{online_members}{partial}", inline=True)
+        embed.add_field(name="Bots", value=f"{counters.bots}{partial}", inline=True)
+        embed.add_field(name="Humanos", value=f"{max(0, (total_members or 0) - counters.bots)}{partial}", inline=True)
         
         # Estadísticas de canales
         embed.add_field(name="Categorías", value=categories, inline=True)
@@ -159,6 +277,9 @@ class Utilities(commands.Cog):
         features = [f.replace("_", " ").title() for f in guild.features]
         if features:
             embed.add_field(name="Características", value="\n".join(features), inline=False)
+
+        if partial:
+            embed.set_footer(text="Los miembros del servidor aún se están descargando: los contadores son parciales.")
         
         await ctx.send(embed=embed)
 
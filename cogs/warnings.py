@@ -1,13 +1,71 @@
 import discord # type: ignore
-from discord.ext import commands # type: ignore
+from discord.ext import commands, tasks # type: ignore
+import asyncio
+import collections
+import heapq
 import json
+import logging
 import os
 import datetime
+import tempfile
+import threading
+import time
+
+from utils.cluster import cluster, cluster_lock, save_partitioned_json
+from utils.durations import parse_duration
+from utils.guild_config import guild_config
+
+logger = logging.getLogger(__name__)
+
+ESCALATION_ACTIONS = {"mute": "Silenciar", "kick": "Expulsar", "ban": "Banear"}
+# Advertencias caducadas que se mueven al archivo histórico antes de ceder el bucle de eventos
+COMPACTION_BATCH_SIZE = 500
+
+
+def warning_epoch(warning):
+    """Momento (en segundos) en que se emitió una advertencia, o None si no tiene timestamp válido."""
+    try:
+        return datetime.datetime.fromisoformat(warning["timestamp"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
 
 class Warnings(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.warnings_file = 'data/warnings.json'
+        self.archive_file = 'data/warnings_archive.jsonl'
+        self.warnings = {}
+        # Contadores de advertencias activas por usuario: (server_id, user_id): int
+        self.active_counts = {}
+        # Índice temporal de caducidad (montículo): (expira_en, server_id, user_id, timestamp)
+        self.expiry_heap = []
+        # Advertencias caducadas pendientes de mover al archivo histórico: (server_id, user_id, timestamp)
+        self.pending_compaction = collections.deque()
+        # Se incrementa en cada guardado para detectar escrituras concurrentes con la compactación
+        self.save_version = 0
+        # Los guardados y la compactación escriben desde hilos del executor, uno cada vez
+        self.write_lock = threading.Lock()
+        self.pending_writes = set()
+        guild_config.add_listener(self.on_config_change)
+
+    async def cog_load(self):
+        # El archivo se lee en un hilo aparte; los índices se construyen después en el bucle
+        self.warnings = await asyncio.get_running_loop().run_in_executor(None, self.load_warnings)
+        self.rebuild_counts()
+        self.compaction_task.start()
+
+    async def cog_unload(self):
+        guild_config.remove_listener(self.on_config_change)
+        self.compaction_task.cancel()
+        # Tras una recarga el cog nuevo lee el archivo: tiene que estar ya escrito
+        if self.pending_writes:
+            await asyncio.gather(*self.pending_writes, return_exceptions=True)
+
+    def on_config_change(self, guild_id, key):
+        """Reconstruye el índice de caducidad si cambia el tiempo de vida de las advertencias."""
+        if key is None or key == "warning_ttl_days":
+            self.rebuild_counts()
 
     def load_warnings(self):
         if os.path.exists(self.warnings_file):
@@ -16,31 +74,272 @@ class Warnings(commands.Cog):
         return {}
 
     def save_warnings(self, warnings):
-        with open(self.warnings_file, 'w') as f:
-            json.dump(warnings, f)
+        """
+        Guarda las advertencias en un hilo del executor: la escritura (y en modo clúster el
+        bloqueo del archivo) nunca detiene el bucle de eventos. El contenido se serializa aquí,
+        así que se guarda el estado de este momento aunque la escritura termine más tarde.
+        """
+        self.save_version += 1
+        future = asyncio.get_running_loop().run_in_executor(
+            None, self.write_warnings_file, json.dumps(warnings), self.save_version
+        )
+        self.pending_writes.add(future)
+        future.add_done_callback(self.on_write_done)
 
-    @commands.command()
-    @commands.has_permissions(manage_messages=True)
-    async def warn(self, ctx, member: discord.Member, *, reason="No se proporcionó razón"):
-        warnings = self.load_warnings()
-        server_id = str(ctx.guild.id)
-        user_id = str(member.id)
+    def on_write_done(self, future):
+        self.pending_writes.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Error al guardar las advertencias: %s", future.exception(), exc_info=future.exception())
+
+    def write_warnings_file(self, content, version):
+        """
+        Escribe el archivo de advertencias de forma atómica (archivo temporal + reemplazo).
+        Si desde que se generó `content` se ha guardado una versión posterior, no se escribe nada
+        y devuelve False, para no sustituir datos más recientes por una instantánea antigua.
+        """
+        with self.write_lock:
+            if version != self.save_version:
+                return False
+            if cluster.enabled:
+                # Otros procesos guardan sus servidores en el mismo archivo: se combinan las entradas
+                save_partitioned_json(self.warnings_file, json.loads(content), indent=None)
+                return True
+            directory, name = os.path.split(self.warnings_file)
+            fd, temp_file = tempfile.mkstemp(prefix=f"{name}.", suffix=".tmp", dir=directory or ".")
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(content)
+                os.replace(temp_file, self.warnings_file)
+            except BaseException:
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    pass
+                raise
+            return True
+
+    def get_ttl_seconds(self, server_id) -> int:
+        """Tiempo de vida de las advertencias del servidor en segundos (0 = no caducan)."""
+        return guild_config.get(server_id)["warning_ttl_days"] * 86400
+
+    def rebuild_counts(self):
+        """
+        Reconstruye los contadores de advertencias activas y el índice de caducidad a partir
+        de los datos cargados. Se llama al iniciar y cuando cambia el tiempo de vida de un servidor.
+        El estado de cada advertencia en el índice de búsqueda se actualiza también: al reducir
+        la caducidad pasan a "expirada" y al ampliarla vuelven a "activa".
+        """
+        self.active_counts.clear()
+        self.expiry_heap.clear()
+        self.pending_compaction.clear()
+        now = time.time()
+        search_cog = self.bot.get_cog("Search")
 
-        if server_id not in warnings:
-            warnings[server_id] = {}
+        for server_id, users in self.warnings.items():
+            # Los servidores de otros procesos del clúster los compacta su propio proceso
+            if not isinstance(users, dict) or not cluster.owns_guild(server_id):
+                continue
+            ttl_seconds = self.get_ttl_seconds(server_id)
+            for user_id, user_warnings in users.items():
+                count = 0
+                for warning in user_warnings:
+                    issued_at = warning_epoch(warning) if ttl_seconds else None
+                    if issued_at is not None:
+                        expires_at = issued_at + ttl_seconds
+                        if expires_at <= now:
+                            self.pending_compaction.append((server_id, user_id, warning["timestamp"]))
+                            if search_cog:
+                                search_cog.mark_warning_expired(server_id, user_id, warning["timestamp"])
+                            continue
+                        self.expiry_heap.append((expires_at, server_id, user_id, warning["timestamp"]))
+                    if search_cog:
+                        search_cog.mark_warning_active(server_id, user_id, warning.get("timestamp"))
+                    count += 1
+                if count:
+                    self.active_counts[(server_id, user_id)] = count
 
-        if user_id not in warnings[server_id]:
-            warnings[server_id][user_id] = []
+        heapq.heapify(self.expiry_heap)
 
-        warnings[server_id][user_id].append({
+    def expire_due(self):
+        """
+        Retira del índice de caducidad las advertencias vencidas y descuenta cada una del
+        contador de su usuario. Cada advertencia se procesa una sola vez (O(log n)).
+        """
+        now = time.time()
+        search_cog = None
+        while self.expiry_heap and self.expiry_heap[0][0] <= now:
+            _, server_id, user_id, timestamp = heapq.heappop(self.expiry_heap)
+            key = (server_id, user_id)
+            count = self.active_counts.get(key, 0) - 1
+            if count > 0:
+                self.active_counts[key] = count
+            else:
+                self.active_counts.pop(key, None)
+            self.pending_compaction.append((server_id, user_id, timestamp))
+
+            search_cog = search_cog or self.bot.get_cog("Search")
+            if search_cog:
+                search_cog.mark_warning_expired(server_id, user_id, timestamp)
+
+    def get_warning_count(self, guild_id, user_id) -> int:
+        """Número de advertencias activas (no caducadas) de un usuario."""
+        self.expire_due()
+        return self.active_counts.get((str(guild_id), str(user_id)), 0)
+
+    @tasks.loop(minutes=10)
+    async def compaction_task(self):
+        """Mueve por lotes las advertencias caducadas a `data/warnings_archive.jsonl`."""
+        await self.bot.wait_until_ready()
+
+        self.expire_due()
+        if not self.pending_compaction:
+            return
+
+        archived = []
+        processed = 0
+        while self.pending_compaction:
+            server_id, user_id, timestamp = self.pending_compaction.popleft()
+            user_warnings = self.warnings.get(server_id, {}).get(user_id)
+            if user_warnings:
+                for i, warning in enumerate(user_warnings):
+                    if warning.get("timestamp") == timestamp:
+                        archived.append({"guild_id": server_id, "user_id": user_id, **warning})
+                        del user_warnings[i]
+                        break
+                if not user_warnings:
+                    del self.warnings[server_id][user_id]
+
+            processed += 1
+            if processed % COMPACTION_BATCH_SIZE == 0:
+                await asyncio.sleep(0) # Ceder el bucle de eventos entre lotes
+
+        if not archived:
+            return
+
+        # La escritura a disco se hace fuera del bucle de eventos
+        archive_lines = "".join(json.dumps(warning, ensure_ascii=False) + "\n" for warning in archived)
+        warnings_content = json.dumps(self.warnings)
+        version = self.save_version
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self.append_archive, archive_lines)
+            write = loop.run_in_executor(None, self.write_warnings_file, warnings_content, version)
+            self.pending_writes.add(write)
+            write.add_done_callback(self.pending_writes.discard)
+            written = await write
+            if not written:
+                # Un guardado posterior ya incluyó la compactación (se hace en memoria, antes de escribir)
+                logger.debug("Instantánea de la compactación descartada: ya se guardó una versión posterior.")
+            logger.info("%d advertencia(s) caducada(s) movidas al archivo histórico.", len(archived))
+        except IOError as e:
+            logger.exception("Error al compactar advertencias caducadas: %s", e)
+
+    def append_archive(self, lines):
+        with cluster_lock(self.archive_file), open(self.archive_file, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+    async def apply_escalation(self, guild, channel, member, warning_count):
+        """
+        Aplica la acción configurada en la política de escalado del servidor para este número
+        de advertencias, a través del cog de Moderación. Los avisos se envían a `channel`.
+        Devuelve la acción aplicada o None.
+        """
+        step = guild_config.get(guild.id)["escalation"].get(str(warning_count))
+        if not step:
+            return None
+
+        moderation_cog = self.bot.get_cog("Moderation")
+        if not moderation_cog:
+            await channel.send("⚠️ No se pudo aplicar el escalado automático: el módulo de moderación no está cargado.")
+            return None
+
+        action = step["action"]
+        reason = f"Escalado automático: {warning_count} advertencias"
+        try:
+            if action == "mute":
+                muted_role = await moderation_cog.mute_member(
+                    guild, member, parse_duration(step["duration"]), reason, self.bot.user.id, step["duration"],
+                    notify_channel=channel,
+                    unmute_notice=f"{member.mention} ha sido desilenciado automáticamente después de cumplir el tiempo."
+                )
+                if not muted_role:
+                    await channel.send("⚠️ No se pudo aplicar el escalado automático: no se pudo obtener o crear el rol 'Muted'.")
+                    return None
+            elif action == "kick":
+                await moderation_cog.kick_member(guild, member, reason, self.bot.user.id)
+            elif action == "ban":
+                await moderation_cog.ban_member(guild, member, reason, self.bot.user.id)
+            else:
+                return None
+        except discord.Forbidden:
+            await channel.send(f"⚠️ Error de permisos al aplicar el escalado automático a {member.mention}. Verifica que el rol del bot está por encima del usuario.")
+            return None
+        except Exception as e:
+            await channel.send(f"⚠️ No se pudo aplicar el escalado automático a {member.mention}. Error: {e}")
+            return None
+
+        embed = discord.Embed(
+            title="🔺 Escalado Automático",
+            description=f"{member.mention} ha alcanzado {warning_count} advertencias.",
+            color=discord.Color.dark_red()
+        )
+        embed.add_field(name="Acción", value=ESCALATION_ACTIONS[action])
+        if action == "mute":
+            embed.add_field(name="Duración", value=step["duration"])
+        await channel.send(embed=embed)
+        return action
+
+    def add_warning(self, guild_id, member_id, reason, moderator_id) -> int:
+        """
+        Registra una advertencia (archivo, caducidad, índice de búsqueda e historial de casos)
+        y devuelve el número de advertencias activas del usuario.
+        """
+        server_id = str(guild_id)
+        user_id = str(member_id)
+
+        if server_id not in self.warnings:
+            self.warnings[server_id] = {}
+
+        if user_id not in self.warnings[server_id]:
+            self.warnings[server_id][user_id] = []
+
+        warning = {
             "reason": reason,
             "timestamp": datetime.datetime.now().isoformat(),
-            "moderator": str(ctx.author.id)
-        })
+            "moderator": str(moderator_id)
+        }
+        self.warnings[server_id][user_id].append(warning)
 
-        self.save_warnings(warnings)
+        self.save_warnings(self.warnings)
 
-        warning_count = len(warnings[server_id][user_id])
+        ttl_seconds = self.get_ttl_seconds(server_id)
+        if ttl_seconds:
+            heapq.heappush(self.expiry_heap, (warning_epoch(warning) + ttl_seconds, server_id, user_id, warning["timestamp"]))
+
+        warning_count = self.get_warning_count(server_id, user_id) + 1
+        self.active_counts[(server_id, user_id)] = warning_count
+
+        # Mantener actualizado el índice de búsqueda
+        search_cog = self.bot.get_cog("Search")
+        if search_cog:
+            search_cog.index_warning(server_id, user_id, warning, number=len(self.warnings[server_id][user_id]))
+
+        cases_cog = self.bot.get_cog("Cases")
+        if cases_cog:
+            cases_cog.record_case(guild_id, "warn", member_id, moderator_id, reason)
+
+        return warning_count
+
+    @commands.hybrid_command()
+    @commands.has_permissions(manage_messages=True)
+    async def warn(self, ctx, member: discord.Member, *, reason="No se proporcionó razón"):
+        """
+        Advierte a un usuario. Al acumular advertencias se aplica la política de escalado.
+        Ejemplo: !flex warn @usuario Lenguaje inapropiado
+        """
+        # El escalado puede silenciar o expulsar: con un comando de barra se responde después
+        await ctx.defer()
+        warning_count = self.add_warning(ctx.guild.id, member.id, reason, ctx.author.id)
 
         embed = discord.Embed(
             title="⚠️ Usuario Advertido",
@@ -49,7 +348,7 @@ class Warnings(commands.Cog):
             timestamp=datetime.datetime.utcnow()
         )
         embed.add_field(name="Razón de la Advertencia", value=reason, inline=False)
-        embed.add_field(name="Número Total de Advertencias", value=str(warning_count), inline=False)
+        embed.add_field(name="Advertencias Activas", value=str(warning_count), inline=False)
         embed.set_footer(text=f"Advertencia emitida por: {ctx.author.display_name}", icon_url=ctx.author.display_avatar.url)
 
         try:
@@ -62,9 +361,124 @@ class Warnings(commands.Cog):
         except discord.HTTPException as e:
             await ctx.send(f"Error al enviar el mensaje de advertencia: {e}")
 
+        escalated = await self.apply_escalation(ctx.guild, ctx.channel, member, warning_count)
 
-        if warning_count >= 3: # Podría ser configurable
+        if not escalated and warning_count >= guild_config.get(ctx.guild.id)["warning_alert_threshold"]:
             await ctx.send(f"Atención moderadores: {member.mention} ha acumulado {warning_count} advertencias. Se recomienda revisar su caso y considerar medidas adicionales si es necesario.")
 
+    @commands.hybrid_command(name="caducidad")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def warning_ttl(self, ctx, dias: int = None):
+        """
+        Muestra o establece tras cuántos días caducan las advertencias del servidor.
+        Las advertencias caducadas dejan de contar para el escalado y se archivan.
+        Usa 0 para que no caduquen nunca.
+
+        Ejemplo:
+        --------
+        !flex caducidad
+        !flex caducidad 30
+        """
+        if dias is None:
+            ttl_days = guild_config.get(ctx.guild.id)["warning_ttl_days"]
+            if ttl_days:
+                await ctx.send(f"Las advertencias de este servidor caducan a los **{ttl_days}** días.")
+            else:
+                await ctx.send("Las advertencias de este servidor no caducan. Usa `!flex caducidad <días>` para configurarlo.")
+            return
+
+        if dias < 0:
+            await ctx.send("El número de días no puede ser negativo.")
+            return
+
+        guild_config.set(ctx.guild.id, "warning_ttl_days", dias) # Reconstruye el índice vía on_config_change
+        if dias:
+            await ctx.send(f"Las advertencias de este servidor caducarán a los **{dias}** días.")
+        else:
+            await ctx.send("Las advertencias de este servidor ya no caducan.")
+
+    @commands.hybrid_group(name="escalado", invoke_without_command=True, fallback="ver")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def escalation(self, ctx):
+        """
+        Muestra la política de escalado automático de advertencias del servidor.
+
+        Subcomandos:
+        ------------
+        !flex escalado set <advertencias> <mute|kick|ban> [duración]
+        !flex escalado quitar <advertencias>
+        """
+        policy = guild_config.get(ctx.guild.id)["escalation"]
+        if not policy:
+            await ctx.send("No hay política de escalado configurada. Usa `!flex escalado set 3 mute 1h` para añadir un paso.")
+            return
+
+        lines = []
+        for threshold in sorted(policy, key=int):
+            step = policy[threshold]
+            line = f"**{threshold} advertencias** → {ESCALATION_ACTIONS[step['action']]}"
+            if step["action"] == "mute":
+                line += f" ({step['duration']})"
+            lines.append(line)
+
+        embed = discord.Embed(
+            title="🔺 Política de Escalado",
+            description="\n".join(lines),
+            color=discord.Color.dark_red()
+        )
+        await ctx.send(embed=embed)
+
+    @escalation.command(name="set")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def escalation_set(self, ctx, advertencias: int, accion: str, duracion: str = None):
+        """
+        Añade o reemplaza un paso de la política de escalado.
+        Ejemplo: !flex escalado set 3 mute 1h
+        Ejemplo: !flex escalado set 5 kick
+        """
+        accion = accion.lower()
+        if accion not in ESCALATION_ACTIONS:
+            await ctx.send("Acción no válida. Usa `mute`, `kick` o `ban`.")
+            return
+        if advertencias < 1:
+            await ctx.send("El número de advertencias debe ser mayor que cero.")
+            return
+
+        step = {"action": accion}
+        if accion == "mute":
+            if not duracion:
+                await ctx.send("Debes indicar la duración del silencio. Ejemplo: `!flex escalado set 3 mute 1h`")
+                return
+            try:
+                parse_duration(duracion)
+            except ValueError as e:
+                await ctx.send(str(e))
+                return
+            step["duration"] = duracion
+
+        policy = dict(guild_config.get(ctx.guild.id)["escalation"])
+        policy[str(advertencias)] = step
+        guild_config.set(ctx.guild.id, "escalation", policy)
+        await ctx.send(f"Escalado actualizado: al llegar a **{advertencias}** advertencias se aplicará **{ESCALATION_ACTIONS[accion]}**" + (f" ({duracion})." if accion == "mute" else "."))
+
+    @escalation.command(name="quitar")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def escalation_remove(self, ctx, advertencias: int):
+        """
+        Elimina un paso de la política de escalado.
+        Ejemplo: !flex escalado quitar 3
+        """
+        policy = dict(guild_config.get(ctx.guild.id)["escalation"])
+        if str(advertencias) not in policy:
+            await ctx.send(f"No hay ningún paso de escalado configurado para {advertencias} advertencias.")
+            return
+        del policy[str(advertencias)]
+        guild_config.set(ctx.guild.id, "escalation", policy)
+        await ctx.send(f"Se ha eliminado el paso de escalado de {advertencias} advertencias.")
+
 async def setup(bot):
-    await bot.add_cog(Warnings(bot)) 
\ No newline at end of file
+    await bot.add_cog(Warnings(bot))
@@ -1,12 +1,36 @@
+import os
 import discord # type: ignore
 from discord.ext import commands # type: ignore
 
+from utils.cluster import ClusterBot, cluster
+from utils.member_cache import FULL, bot_options, members
+from utils.metrics import metrics
+
 
 def setup_bot():
     # Configuración del bot
     intents = discord.Intents.default()
     intents.members = True
     intents.message_content = True
+    prefix = commands.when_mentioned_or("!flex ")
+
+    # Caché de miembros: "full" descarga todos al arrancar, "lazy" cada servidor con su primer comando
+    members.configure(os.getenv("MEMBER_CACHE", FULL).lower())
+    options = bot_options(members.policy, intents)
+    # Cuenta las peticiones a la API por ruta y los 429 (cog Metrics)
+    options["http_trace"] = metrics.http_trace_config()
+    # Grabación de los eventos del gateway para el arnés (utils/gateway_trace.py, cog Diagnostics)
+    if os.getenv("GATEWAY_TRACE"):
+        options["enable_debug_events"] = True
+
+    # Modo clúster: `cluster.py` lanza un proceso por rango de shards (SHARD_IDS / SHARD_COUNT)
+    cluster.configure(os.environ)
+    if cluster.enabled:
+        return ClusterBot(command_prefix=prefix, intents=intents, shard_ids=cluster.shard_ids, shard_count=cluster.shard_count, **options)
+
+    # Varios shards en un único proceso (SHARD_COUNT vacío = los que recomiende Discord)
+    if os.getenv("BOT_SHARDED", "").lower() in ("1", "true", "si", "sí"):
+        return commands.AutoShardedBot(command_prefix=prefix, intents=intents, shard_count=cluster.shard_count, **options)
 
-    bot = commands.Bot(command_prefix=commands.when_mentioned_or("!flex "), intents=intents)
-    return bot 
\ No newline at end of file
+    bot = commands.Bot(command_prefix=prefix, intents=intents, **options)
+    return bot
@@ -0,0 +1,3 @@
+"""
+Arnés para ejecutar el bot completo sin conexión contra un Discord falso (ver harness/run.py).
+"""
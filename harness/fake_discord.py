@@ -0,0 +1,677 @@
+"""
+Discord falso en el mismo proceso: API REST, gateway y un modelo mínimo del servidor.
+
+La API es un servidor aiohttp en 127.0.0.1 al que se dirige el cliente HTTP real de
+discord.py (se sustituye `discord.http.Route.BASE` mientras está en marcha), así que las
+peticiones pasan por todo su código: buckets, cabeceras X-RateLimit, reintentos tras un 429
+y la TraceConfig de las métricas. Cada petición se registra en `calls` con su ruta, estado y
+duración; se puede añadir una latencia fija (más una variación aleatoria) y simular límites
+por ruta (`add_rate_limit`) o forzar respuestas 429 concretas (`inject_rate_limit`).
+
+El gateway no usa websocket: los eventos se entregan directamente a los parsers del estado de
+conexión de discord.py (`bot._connection.parsers`), que construyen los objetos y despachan los
+eventos igual que con una conexión real. Las peticiones que cambian algo (mensajes, roles,
+canales, miembros) generan además el evento del gateway correspondiente, como hace Discord.
+
+No se comprueban permisos ni se validan los cuerpos de las peticiones: el bot tiene un rol de
+administrador y las rutas no simuladas responden 501 (y quedan registradas como tales).
+"""
+import asyncio
+import collections
+import copy
+import datetime
+import fnmatch
+import itertools
+import json
+import logging
+import random
+import re
+import time
+from urllib.parse import unquote
+
+import discord # type: ignore
+from aiohttp import web # type: ignore
+from discord.http import Route # type: ignore
+
+from utils.metrics import normalize_route
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api/v10"
+# Parámetro principal de la ruta (como en Discord, los límites son por canal o por servidor)
+MAJOR_PARAMETER_RE = re.compile(r"^/(channels|guilds|webhooks)/(\d+)")
+MENTION_RE = re.compile(r"<@!?(\d+)>")
+ROLE_MENTION_RE = re.compile(r"<@&(\d+)>")
+
+# Permisos de @everyone en los servidores creados por el arnés
+EVERYONE_PERMISSIONS = discord.Permissions(
+    view_channel=True, send_messages=True, read_message_history=True, add_reactions=True,
+    embed_links=True, attach_files=True, use_external_emojis=True, connect=True, speak=True,
+)
+
+TEXT_CHANNEL = 0
+DM_CHANNEL = 1
+
+
+def iso_now():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+class RecordedCall:
+    """Una petición recibida por la API falsa."""
+
+    __slots__ = ("at", "method", "path", "route", "status", "seconds", "body")
+
+    def __init__(self, at, method, path, route, status, seconds, body):
+        self.at = at
+        self.method = method
+        self.path = path
+        self.route = route
+        self.status = status
+        self.seconds = seconds
+        self.body = body
+
+    @property
+    def key(self):
+        return f"{self.method} {self.route}"
+
+    def __repr__(self):
+        return f"<RecordedCall {self.key} {self.status} {self.seconds * 1000:.1f} ms>"
+
+
+class RateLimitRule:
+    """Límite de `limit` peticiones cada `per` segundos para las rutas que casan con `pattern`."""
+
+    def __init__(self, pattern, limit, per):
+        self.pattern = pattern
+        self.limit = limit
+        self.per = per
+        self.bucket = f"harness-{abs(hash(pattern)) % 10**8:08d}"
+        self.windows = {}  # parámetro principal: [peticiones restantes, fin de la ventana]
+
+
+class InjectedRateLimit:
+    """Las próximas `count` peticiones que casen con `pattern` reciben un 429."""
+
+    def __init__(self, pattern, count, retry_after, is_global):
+        self.pattern = pattern
+        self.count = count
+        self.retry_after = retry_after
+        self.is_global = is_global
+
+
+class FakeDiscord:
+    """
+    Modelo de los servidores (usuarios, roles, canales, miembros y mensajes, en el formato de
+    la API de Discord), la API REST que lo modifica y el gateway que se lo comunica al bot.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, gateway_delay=0.0, seed=1):
+        self.latency = latency
+        self.jitter = jitter
+        self.gateway_delay = gateway_delay
+        self.rng = random.Random(seed)
+        self.ids = itertools.count(discord.utils.time_snowflake(datetime.datetime.now(datetime.timezone.utc)))
+
+        self.users = {}     # user_id: usuario
+        self.guilds = {}    # guild_id: {"data": servidor, "roles": {...}, "members": {...}}
+        self.channels = {}  # channel_id: canal (con guild_id)
+        self.messages = collections.defaultdict(collections.OrderedDict)  # channel_id: {message_id: mensaje}
+        self.reactions = collections.defaultdict(dict)  # (channel_id, message_id): {emoji: {user_id}}
+        self.application_id = self.next_id()
+        self.owner = self.create_user("Propietario")
+        self.bot_user = self.create_user("FlexBot", bot=True)
+
+        self.calls = []
+        self.events = []  # (instante, tipo de evento) de los eventos entregados al bot
+        self.rate_limits = []
+        self.injected = []
+        self.bot = None
+        self.runner = None
+        self.previous_base = None
+        self.started_at = time.perf_counter()
+        self.in_flight = 0
+        self.last_activity = time.perf_counter()
+
+    def next_id(self):
+        return next(self.ids)
+
+    # Modelo
+
+    def create_user(self, name, bot=False):
+        user_id = self.next_id()
+        self.users[user_id] = {
+            "id": str(user_id), "username": name, "discriminator": "0", "global_name": None,
+            "avatar": None, "bot": bot, "system": False, "public_flags": 0,
+        }
+        return user_id
+
+    def create_guild(self, name):
+        """Crea un servidor con @everyone, el bot como administrador y el propietario como miembro."""
+        guild_id = self.next_id()
+        self.guilds[guild_id] = {
+            "data": {
+                "id": str(guild_id), "name": name, "icon": None, "owner_id": str(self.owner),
+                "features": [], "emojis": [], "stickers": [], "verification_level": 0,
+                "default_message_notifications": 0, "explicit_content_filter": 0, "mfa_level": 0,
+                "nsfw_level": 0, "premium_tier": 0, "preferred_locale": "es-ES", "afk_timeout": 300,
+                "system_channel_flags": 0, "large": False, "unavailable": False,
+            },
+            "roles": {},
+            "members": {},
+        }
+        # @everyone tiene el mismo ID que el servidor
+        self.guilds[guild_id]["roles"][guild_id] = self.role_data(guild_id, "@everyone", EVERYONE_PERMISSIONS.value, 0, role_id=guild_id)
+        bot_role = self.create_role(guild_id, "FlexBot", discord.Permissions.all().value, managed=True)
+        self.add_member(guild_id, self.bot_user, [bot_role])
+        self.add_member(guild_id, self.owner)
+        return guild_id
+
+    def role_data(self, guild_id, name, permissions, position, role_id=None, managed=False):
+        return {
+            "id": str(role_id or self.next_id()), "name": name, "color": 0, "colors": {"primary_color": 0},
+            "hoist": False, "icon": None, "unicode_emoji": None, "position": position,
+            "permissions": str(permissions), "managed": managed, "mentionable": False, "flags": 0,
+        }
+
+    def create_role(self, guild_id, name, permissions=0, managed=False):
+        roles = self.guilds[guild_id]["roles"]
+        role = self.role_data(guild_id, name, permissions, len(roles), managed=managed)
+        roles[int(role["id"])] = role
+        return int(role["id"])
+
+    def create_channel(self, guild_id, name, channel_type=TEXT_CHANNEL, parent_id=None, overwrites=(), topic=None):
+        channel_id = self.next_id()
+        self.channels[channel_id] = {
+            "id": str(channel_id), "type": channel_type, "guild_id": str(guild_id), "name": name,
+            "position": sum(1 for channel in self.channels.values() if channel.get("guild_id") == str(guild_id)),
+            "permission_overwrites": list(overwrites), "parent_id": str(parent_id) if parent_id else None,
+            "topic": topic, "nsfw": False, "rate_limit_per_user": 0, "last_message_id": None, "flags": 0,
+        }
+        return channel_id
+
+    def add_member(self, guild_id, user_id, roles=()):
+        self.guilds[guild_id]["members"][user_id] = {
+            "roles": [str(role_id) for role_id in roles], "nick": None, "avatar": None,
+            "joined_at": iso_now(), "premium_since": None, "deaf": False, "mute": False,
+            "pending": False, "flags": 0, "communication_disabled_until": None,
+        }
+
+    def member_data(self, guild_id, user_id, with_user=True):
+        member = dict(self.guilds[guild_id]["members"][user_id])
+        if with_user:
+            member["user"] = self.users[user_id]
+        return member
+
+    def guild_data(self, guild_id):
+        """Servidor completo, como en GUILD_CREATE."""
+        guild = self.guilds[guild_id]
+        channels = [channel for channel in self.channels.values() if channel.get("guild_id") == str(guild_id)]
+        return dict(
+            guild["data"],
+            roles=list(guild["roles"].values()),
+            channels=[{key: value for key, value in channel.items() if key != "guild_id"} for channel in channels],
+            members=[self.member_data(guild_id, user_id) for user_id in guild["members"]],
+            member_count=len(guild["members"]),
+            threads=[], voice_states=[], presences=[], stage_instances=[], guild_scheduled_events=[],
+            joined_at=iso_now(),
+        )
+
+    def find_channel(self, guild_id, name):
+        for channel_id, channel in self.channels.items():
+            if channel.get("guild_id") == str(guild_id) and channel["name"] == name:
+                return channel_id
+        return None
+
+    def find_role(self, guild_id, name):
+        for role_id, role in self.guilds[guild_id]["roles"].items():
+            if role["name"] == name:
+                return role_id
+        return None
+
+    def member_roles(self, guild_id, user_id):
+        """Nombres de los roles de un miembro (None si no está en el servidor)."""
+        guild = self.guilds[guild_id]
+        member = guild["members"].get(user_id)
+        if member is None:
+            return None
+        return [guild["roles"][int(role_id)]["name"] for role_id in member["roles"] if int(role_id) in guild["roles"]]
+
+    def find_messages(self, channel_id, check=None):
+        return [message for message in self.messages[channel_id].values() if check is None or check(message)]
+
+    def message_data(self, channel_id, author_id, content="", embeds=()):
+        channel = self.channels[channel_id]
+        guild_id = int(channel["guild_id"]) if channel.get("guild_id") else None
+        message = {
+            "id": str(self.next_id()), "type": 0, "channel_id": str(channel_id), "author": self.users[author_id],
+            "content": content, "timestamp": iso_now(), "edited_timestamp": None, "tts": False,
+            "mention_everyone": "@everyone" in content or "@here" in content,
+            "mentions": [], "mention_roles": ROLE_MENTION_RE.findall(content),
+            "attachments": [], "embeds": list(embeds), "pinned": False, "flags": 0, "components": [],
+        }
+        for user_id in dict.fromkeys(map(int, MENTION_RE.findall(content))):
+            if user_id not in self.users:
+                continue
+            mention = dict(self.users[user_id])
+            if guild_id and user_id in self.guilds[guild_id]["members"]:
+                mention["member"] = self.member_data(guild_id, user_id, with_user=False)
+            message["mentions"].append(mention)
+        if guild_id:
+            message["guild_id"] = str(guild_id)
+            if author_id in self.guilds[guild_id]["members"]:
+                message["member"] = self.member_data(guild_id, author_id, with_user=False)
+        return message
+
+    def store_message(self, message):
+        channel_id = int(message["channel_id"])
+        self.messages[channel_id][int(message["id"])] = message
+        if channel_id in self.channels:
+            self.channels[channel_id]["last_message_id"] = message["id"]
+
+    # Gateway
+
+    async def connect(self, bot, ready_timeout=10.0):
+        """Entrega READY y un GUILD_CREATE por servidor, como al conectar, y espera a que el bot esté listo."""
+        self.bot = bot
+        # Sin esperar los 2 s por defecto a que lleguen más servidores tras el último GUILD_CREATE
+        bot._connection.guild_ready_timeout = 0.05
+        self.dispatch("READY", {
+            "v": 10, "user": self.users[self.bot_user], "session_id": "harness", "resume_gateway_url": "ws://127.0.0.1",
+            "guilds": [{"id": str(guild_id), "unavailable": True} for guild_id in self.guilds],
+            "application": {"id": str(self.application_id), "flags": 0},
+        })
+        for guild_id in self.guilds:
+            self.dispatch("GUILD_CREATE", self.guild_data(guild_id))
+        await asyncio.wait_for(bot.wait_until_ready(), ready_timeout)
+
+    def dispatch(self, event, data):
+        """Entrega un evento del gateway al bot."""
+        self.last_activity = time.perf_counter()
+        self.events.append((self.last_activity - self.started_at, event))
+        if self.bot is None:
+            return
+        parser = self.bot._connection.parsers.get(event)
+        if parser is None:
+            logger.warning("Evento del gateway sin parser en discord.py: %s", event)
+            return
+        # Los parsers pueden guardar o modificar el diccionario recibido
+        parser(copy.deepcopy(data))
+
+    def echo(self, event, data):
+        """Evento del gateway que Discord envía tras una petición que cambia algo."""
+        if self.bot is not None:
+            asyncio.get_running_loop().call_later(self.gateway_delay, self.dispatch, event, data)
+
+    def send_message(self, channel_id, author_id, content, embeds=()):
+        """Un usuario escribe un mensaje (MESSAGE_CREATE). Devuelve el mensaje."""
+        message = self.message_data(channel_id, author_id, content, embeds)
+        self.store_message(message)
+        self.dispatch("MESSAGE_CREATE", message)
+        return message
+
+    def add_reaction(self, channel_id, message_id, user_id, emoji):
+        """Un usuario reacciona a un mensaje (MESSAGE_REACTION_ADD)."""
+        self.reactions[(channel_id, message_id)].setdefault(emoji, set()).add(user_id)
+        data = {
+            "user_id": str(user_id), "channel_id": str(channel_id), "message_id": str(message_id),
+            "emoji": {"id": None, "name": emoji}, "burst": False, "burst_colors": [], "type": 0,
+        }
+        guild_id = self.channels[channel_id].get("guild_id")
+        if guild_id:
+            data["guild_id"] = guild_id
+            data["member"] = self.member_data(int(guild_id), user_id)
+        self.dispatch("MESSAGE_REACTION_ADD", data)
+
+    async def wait_until(self, predicate, timeout=5.0, interval=0.005):
+        """Espera a que `predicate()` devuelva algo verdadero y lo devuelve (asyncio.TimeoutError si no llega)."""
+        deadline = time.perf_counter() + timeout
+        while True:
+            result = predicate()
+            if result:
+                return result
+            if time.perf_counter() > deadline:
+                raise asyncio.TimeoutError()
+            await asyncio.sleep(interval)
+
+    async def wait_idle(self, quiet=0.2, timeout=30.0):
+        """Espera a que pasen `quiet` segundos sin peticiones ni eventos."""
+        await self.wait_until(
+            lambda: self.in_flight == 0 and time.perf_counter() - self.last_activity >= quiet, timeout, interval=quiet / 4
+        )
+
+    # Límites de peticiones
+
+    def add_rate_limit(self, pattern, limit, per):
+        """Limita las rutas que casan con `pattern` ("POST /channels/*/messages") a `limit` peticiones cada `per` segundos."""
+        self.rate_limits.append(RateLimitRule(pattern, limit, per))
+
+    def inject_rate_limit(self, pattern="*", count=1, retry_after=0.5, is_global=False):
+        """Responde 429 a las próximas `count` peticiones que casen con `pattern`."""
+        self.injected.append(InjectedRateLimit(pattern, count, retry_after, is_global))
+
+    def rate_limit(self, key, path):
+        """(cabeceras, cuerpo del 429 o None) para una petición."""
+        for injected in self.injected:
+            if injected.count > 0 and fnmatch.fnmatchcase(key, injected.pattern):
+                injected.count -= 1
+                headers = {"Retry-After": str(injected.retry_after), "X-RateLimit-Scope": "global" if injected.is_global else "shared"}
+                if injected.is_global:
+                    headers["X-RateLimit-Global"] = "true"
+                return headers, {"message": "You are being rate limited.", "retry_after": injected.retry_after, "global": injected.is_global}
+
+        for rule in self.rate_limits:
+            if not fnmatch.fnmatchcase(key, rule.pattern):
+                continue
+            match = MAJOR_PARAMETER_RE.match(path)
+            major = match.group(2) if match else ""
+            now = time.time()
+            window = rule.windows.get(major)
+            if window is None or now >= window[1]:
+                window = rule.windows[major] = [rule.limit, now + rule.per]
+            reset_after = max(0.0, window[1] - now)
+            headers = {
+                "X-RateLimit-Limit": str(rule.limit), "X-RateLimit-Bucket": rule.bucket,
+                "X-RateLimit-Reset": f"{window[1]:.3f}", "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+            }
+            if window[0] <= 0:
+                headers.update({"X-RateLimit-Remaining": "0", "Retry-After": str(reset_after), "X-RateLimit-Scope": "user"})
+                return headers, {"message": "You are being rate limited.", "retry_after": reset_after, "global": False}
+            window[0] -= 1
+            headers["X-RateLimit-Remaining"] = str(window[0])
+            return headers, None
+        return {}, None
+
+    # API REST
+
+    async def start(self):
+        """Arranca la API en un puerto libre de 127.0.0.1 y dirige a ella las peticiones de discord.py."""
+        app = web.Application()
+        app.router.add_route("*", API_PREFIX + "/{tail:.*}", self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self.runner.addresses[0][:2]
+        self.previous_base = Route.BASE
+        Route.BASE = f"http://{host}:{port}{API_PREFIX}"
+
+    async def stop(self):
+        if self.previous_base is not None:
+            Route.BASE = self.previous_base
+            self.previous_base = None
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def handle(self, request):
+        self.in_flight += 1
+        start = time.perf_counter()
+        path = request.path[len(API_PREFIX):]
+        route = normalize_route(request.path) or path
+        key = f"{request.method} {route}"
+        body = None
+        try:
+            body = await self.read_body(request)
+            delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0)
+            if delay:
+                await asyncio.sleep(delay)
+
+            headers, limited = self.rate_limit(key, path)
+            if limited is not None:
+                # Sin la cabecera Via, discord.py lo trataría como un bloqueo de Cloudflare
+                headers["Via"] = "1.1 google"
+                status, payload = 429, limited
+            else:
+                status, payload = self.route(request.method, path, body, request.query)
+            response = json_response(status, payload, headers)
+        except Exception as e:
+            logger.exception("Error en la API falsa (%s): %s", key, e)
+            status = 500
+            response = json_response(status, {"message": str(e), "code": 0})
+        finally:
+            self.in_flight -= 1
+            self.last_activity = time.perf_counter()
+        self.calls.append(RecordedCall(start - self.started_at, request.method, path, route, status, self.last_activity - start, body))
+        return response
+
+    async def read_body(self, request):
+        if not request.can_read_body:
+            return None
+        if request.content_type == "application/json":
+            return await request.json()
+        if request.content_type.startswith("multipart/"):
+            # Mensajes con archivos: solo interesa el JSON del mensaje
+            reader = await request.multipart()
+            async for part in reader:
+                if part.name == "payload_json":
+                    return json.loads(await part.text())
+            return {}
+        return None
+
+    def route(self, method, path, body, query):
+        """(estado, respuesta JSON o None para 204) de una petición."""
+        for route_method, pattern, handler in ROUTES:
+            if route_method != method:
+                continue
+            match = pattern.fullmatch(path)
+            if match is not None:
+                return handler(self, body or {}, query, **{name: value for name, value in match.groupdict().items()})
+        logger.warning("Ruta no simulada por el arnés: %s %s", method, path)
+        return 501, {"message": f"Ruta no simulada por el arnés: {method} {path}", "code": 0}
+
+    def not_found(self, what, code):
+        return 404, {"message": f"Unknown {what}", "code": code}
+
+    def guild_or_none(self, guild_id):
+        return self.guilds.get(int(guild_id))
+
+    def get_current_user(self, body, query):
+        return 200, self.users[self.bot_user]
+
+    def get_application(self, body, query):
+        return 200, {
+            "id": str(self.application_id), "name": "FlexBot", "icon": None, "description": "", "rpc_origins": [],
+            "bot_public": True, "bot_require_code_grant": False, "owner": self.users[self.owner], "team": None,
+            "verify_key": "0" * 64, "flags": 0, "interactions_endpoint_url": None,
+        }
+
+    def get_commands(self, body, query, application_id):
+        return 200, []
+
+    def sync_commands(self, body, query, application_id):
+        return 200, [dict(command, id=str(self.next_id()), application_id=application_id, version="1") for command in body]
+
+    def create_dm(self, body, query):
+        recipient = int(body["recipient_id"])
+        channel_id = self.next_id()
+        self.channels[channel_id] = {"id": str(channel_id), "type": DM_CHANNEL, "recipients": [self.users[recipient]], "last_message_id": None}
+        return 200, self.channels[channel_id]
+
+    def create_message(self, body, query, channel_id):
+        channel_id = int(channel_id)
+        if channel_id not in self.channels:
+            return self.not_found("Channel", 10003)
+        embeds = body.get("embeds") or ([body["embed"]] if body.get("embed") else [])
+        message = self.message_data(channel_id, self.bot_user, body.get("content") or "", embeds)
+        self.store_message(message)
+        self.echo("MESSAGE_CREATE", message)
+        return 200, message
+
+    def get_messages(self, body, query, channel_id):
+        messages = list(reversed(self.messages[int(channel_id)].values()))
+        if "before" in query:
+            messages = [message for message in messages if int(message["id"]) < int(query["before"])]
+        return 200, messages[:int(query.get("limit", 50))]
+
+    def get_message(self, body, query, channel_id, message_id):
+        message = self.messages[int(channel_id)].get(int(message_id))
+        return (200, message) if message else self.not_found("Message", 10008)
+
+    def edit_message(self, body, query, channel_id, message_id):
+        message = self.messages[int(channel_id)].get(int(message_id))
+        if message is None:
+            return self.not_found("Message", 10008)
+        if "content" in body:
+            message["content"] = body["content"] or ""
+        if "embeds" in body:
+            message["embeds"] = body["embeds"] or []
+        message["edited_timestamp"] = iso_now()
+        self.echo("MESSAGE_UPDATE", message)
+        return 200, message
+
+    def delete_message(self, body, query, channel_id, message_id):
+        message = self.messages[int(channel_id)].pop(int(message_id), None)
+        if message is None:
+            return self.not_found("Message", 10008)
+        self.echo("MESSAGE_DELETE", {"id": message_id, "channel_id": channel_id, "guild_id": message.get("guild_id")})
+        return 204, None
+
+    def bulk_delete(self, body, query, channel_id):
+        for message_id in body.get("messages", []):
+            self.messages[int(channel_id)].pop(int(message_id), None)
+        self.echo("MESSAGE_DELETE_BULK", {"ids": body.get("messages", []), "channel_id": channel_id, "guild_id": self.channels[int(channel_id)].get("guild_id")})
+        return 204, None
+
+    def put_reaction(self, body, query, channel_id, message_id, emoji):
+        if int(message_id) not in self.messages[int(channel_id)]:
+            return self.not_found("Message", 10008)
+        self.reactions[(int(channel_id), int(message_id))].setdefault(unquote(emoji), set()).add(self.bot_user)
+        return 204, None
+
+    def clear_reactions(self, body, query, channel_id, message_id):
+        self.reactions.pop((int(channel_id), int(message_id)), None)
+        return 204, None
+
+    def edit_permissions(self, body, query, channel_id, target_id):
+        channel = self.channels.get(int(channel_id))
+        if channel is None:
+            return self.not_found("Channel", 10003)
+        overwrites = [overwrite for overwrite in channel["permission_overwrites"] if overwrite["id"] != target_id]
+        overwrites.append({"id": target_id, "type": body.get("type", 0), "allow": str(body.get("allow", 0)), "deny": str(body.get("deny", 0))})
+        channel["permission_overwrites"] = overwrites
+        self.echo("CHANNEL_UPDATE", channel)
+        return 204, None
+
+    def create_guild_channel(self, body, query, guild_id):
+        if self.guild_or_none(guild_id) is None:
+            return self.not_found("Guild", 10004)
+        overwrites = [
+            {"id": str(overwrite["id"]), "type": overwrite.get("type", 0), "allow": str(overwrite.get("allow", 0)), "deny": str(overwrite.get("deny", 0))}
+            for overwrite in body.get("permission_overwrites", [])
+        ]
+        channel_id = self.create_channel(int(guild_id), body["name"], body.get("type", TEXT_CHANNEL), body.get("parent_id"), overwrites, body.get("topic"))
+        self.echo("CHANNEL_CREATE", self.channels[channel_id])
+        return 201, self.channels[channel_id]
+
+    def create_guild_role(self, body, query, guild_id):
+        if self.guild_or_none(guild_id) is None:
+            return self.not_found("Guild", 10004)
+        role_id = self.create_role(int(guild_id), body.get("name", "new role"), int(body.get("permissions", 0)))
+        role = self.guilds[int(guild_id)]["roles"][role_id]
+        self.echo("GUILD_ROLE_CREATE", {"guild_id": guild_id, "role": role})
+        return 200, role
+
+    def get_guild_member(self, body, query, guild_id, user_id):
+        guild = self.guild_or_none(guild_id)
+        if guild is None or int(user_id) not in guild["members"]:
+            return self.not_found("Member", 10007)
+        return 200, self.member_data(int(guild_id), int(user_id))
+
+    def member_update(self, guild_id, user_id):
+        self.echo("GUILD_MEMBER_UPDATE", dict(self.member_data(guild_id, user_id), guild_id=str(guild_id)))
+
+    def add_member_role(self, body, query, guild_id, user_id, role_id):
+        guild = self.guild_or_none(guild_id)
+        if guild is None or int(user_id) not in guild["members"]:
+            return self.not_found("Member", 10007)
+        if int(role_id) not in guild["roles"]:
+            return self.not_found("Role", 10011)
+        roles = guild["members"][int(user_id)]["roles"]
+        if role_id not in roles:
+            roles.append(role_id)
+        self.member_update(int(guild_id), int(user_id))
+        return 204, None
+
+    def remove_member_role(self, body, query, guild_id, user_id, role_id):
+        guild = self.guild_or_none(guild_id)
+        if guild is None or int(user_id) not in guild["members"]:
+            return self.not_found("Member", 10007)
+        roles = guild["members"][int(user_id)]["roles"]
+        if role_id in roles:
+            roles.remove(role_id)
+        self.member_update(int(guild_id), int(user_id))
+        return 204, None
+
+    def edit_guild_member(self, body, query, guild_id, user_id):
+        guild = self.guild_or_none(guild_id)
+        if guild is None or int(user_id) not in guild["members"]:
+            return self.not_found("Member", 10007)
+        member = guild["members"][int(user_id)]
+        for field in ("nick", "communication_disabled_until", "mute", "deaf"):
+            if field in body:
+                member[field] = body[field]
+        if "roles" in body:
+            member["roles"] = [str(role_id) for role_id in body["roles"]]
+        self.member_update(int(guild_id), int(user_id))
+        return 200, self.member_data(int(guild_id), int(user_id))
+
+    def remove_member(self, guild_id, user_id):
+        guild = self.guild_or_none(guild_id)
+        if guild is None or guild["members"].pop(int(user_id), None) is None:
+            return False
+        self.echo("GUILD_MEMBER_REMOVE", {"guild_id": guild_id, "user": self.users[int(user_id)]})
+        return True
+
+    def kick_member(self, body, query, guild_id, user_id):
+        return (204, None) if self.remove_member(guild_id, user_id) else self.not_found("Member", 10007)
+
+    def ban_member(self, body, query, guild_id, user_id):
+        if self.guild_or_none(guild_id) is None:
+            return self.not_found("Guild", 10004)
+        self.echo("GUILD_BAN_ADD", {"guild_id": guild_id, "user": self.users[int(user_id)]})
+        self.remove_member(guild_id, user_id)
+        return 204, None
+
+
+def json_response(status, payload, headers=None):
+    """Respuesta de la API. discord.py solo decodifica el cuerpo si el Content-Type es exactamente application/json."""
+    headers = dict(headers or {})
+    if payload is None:
+        return web.Response(status=status, headers=headers)
+    headers["Content-Type"] = "application/json"
+    return web.Response(status=status, body=json.dumps(payload).encode(), headers=headers)
+
+
+def _route(method, pattern, handler):
+    return method, re.compile(pattern), handler
+
+
+_MESSAGE = r"/channels/(?P<channel_id>\d+)/messages/(?P<message_id>\d+)"
+_MEMBER = r"/guilds/(?P<guild_id>\d+)/members/(?P<user_id>\d+)"
+
+# Rutas simuladas: (método, expresión sobre la ruta sin /api/v10, manejador)
+ROUTES = (
+    _route("GET", r"/users/@me", FakeDiscord.get_current_user),
+    _route("GET", r"/oauth2/applications/@me", FakeDiscord.get_application),
+    _route("POST", r"/users/@me/channels", FakeDiscord.create_dm),
+    _route("GET", r"/applications/(?P<application_id>\d+)/commands", FakeDiscord.get_commands),
+    _route("PUT", r"/applications/(?P<application_id>\d+)/commands", FakeDiscord.sync_commands),
+    _route("POST", r"/channels/(?P<channel_id>\d+)/messages", FakeDiscord.create_message),
+    _route("GET", r"/channels/(?P<channel_id>\d+)/messages", FakeDiscord.get_messages),
+    _route("POST", r"/channels/(?P<channel_id>\d+)/messages/bulk-delete", FakeDiscord.bulk_delete),
+    _route("GET", _MESSAGE, FakeDiscord.get_message),
+    _route("PATCH", _MESSAGE, FakeDiscord.edit_message),
+    _route("DELETE", _MESSAGE, FakeDiscord.delete_message),
+    _route("PUT", _MESSAGE + r"/reactions/(?P<emoji>[^/]+)/@me", FakeDiscord.put_reaction),
+    _route("DELETE", _MESSAGE + r"/reactions", FakeDiscord.clear_reactions),
+    _route("PUT", r"/channels/(?P<channel_id>\d+)/permissions/(?P<target_id>\d+)", FakeDiscord.edit_permissions),
+    _route("POST", r"/guilds/(?P<guild_id>\d+)/channels", FakeDiscord.create_guild_channel),
+    _route("POST", r"/guilds/(?P<guild_id>\d+)/roles", FakeDiscord.create_guild_role),
+    _route("GET", _MEMBER, FakeDiscord.get_guild_member),
+    _route("PATCH", _MEMBER, FakeDiscord.edit_guild_member),
+    _route("DELETE", _MEMBER, FakeDiscord.kick_member),
+    _route("PUT", _MEMBER + r"/roles/(?P<role_id>\d+)", FakeDiscord.add_member_role),
+    _route("DELETE", _MEMBER + r"/roles/(?P<role_id>\d+)", FakeDiscord.remove_member_role),
+    _route("PUT", r"/guilds/(?P<guild_id>\d+)/bans/(?P<user_id>\d+)", FakeDiscord.ban_member),
+)
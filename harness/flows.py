@@ -0,0 +1,122 @@
+"""
+Flujos completos de comandos para ejecutar contra el Discord falso.
+
+Cada flujo crea su servidor en el Discord falso (`build`) y después hace de los usuarios
+(`run`): escribe mensajes y añade reacciones a través del gateway y espera a que el estado
+del Discord falso refleje lo que el bot debería haber hecho. Si un paso no se completa a
+tiempo o el resultado no es el esperado, lanza FlowFailed.
+"""
+import asyncio
+import time
+
+import discord # type: ignore
+
+from utils.guild_config import guild_config
+
+# Tiempo máximo de cada paso; con latencia y 429 simulados los pasos tardan bastante más
+STEP_TIMEOUT = 15.0
+
+
+class FlowFailed(Exception):
+    """Un paso del flujo no se completó o su resultado no es el esperado."""
+
+
+class Flow:
+    name = None
+    description = None
+
+    def __init__(self):
+        self.steps = []  # (paso, segundos)
+
+    def build(self, fake):
+        raise NotImplementedError
+
+    async def run(self, fake, bot):
+        raise NotImplementedError
+
+    async def step(self, name, fake, predicate, timeout=STEP_TIMEOUT):
+        """Espera a que `predicate()` se cumpla y anota cuánto ha tardado el paso."""
+        start = time.perf_counter()
+        try:
+            result = await fake.wait_until(predicate, timeout)
+        except asyncio.TimeoutError:
+            raise FlowFailed(f"{name}: no se completó en {timeout:.0f} s") from None
+        self.steps.append((name, time.perf_counter() - start))
+        return result
+
+
+def embed_titled(message, title):
+    return any(embed.get("title") == title for embed in message["embeds"])
+
+
+class ReportMuteFlow(Flow):
+    """Un usuario reporta a otro, un moderador abre las acciones del reporte y lo silencia."""
+
+    name = "report_mute"
+    description = "reporte → revisión (🔨) → silencio (🔇) con razón"
+    reason = "Spam en el canal general"
+    mute_reason = "Spam repetido tras el aviso"
+
+    def build(self, fake):
+        self.guild = fake.create_guild("Servidor del arnés")
+        self.general = fake.create_channel(self.guild, "general")
+        self.moderators_role = fake.create_role(self.guild, "Moderadores", discord.Permissions(manage_messages=True, kick_members=True).value)
+        self.reporter = fake.create_user("reportador")
+        self.target = fake.create_user("reportado")
+        self.moderator = fake.create_user("moderador")
+        fake.add_member(self.guild, self.reporter)
+        fake.add_member(self.guild, self.target)
+        fake.add_member(self.guild, self.moderator, [self.moderators_role])
+
+    def bot_reacted(self, fake, channel_id, message_id, emoji):
+        return fake.bot_user in fake.reactions.get((channel_id, message_id), {}).get(emoji, ())
+
+    async def run(self, fake, bot):
+        config = guild_config.get(self.guild)
+
+        command = fake.send_message(self.general, self.reporter, f"!flex report <@{self.target}> {self.reason}")
+        reports_channel = await self.step(
+            "canal de reportes", fake, lambda: fake.find_channel(self.guild, config["reports_channel_name"])
+        )
+        report = await self.step("reporte publicado", fake, lambda: next(iter(
+            message for message in fake.find_messages(reports_channel, lambda m: embed_titled(m, "Nuevo Reporte"))
+            if self.bot_reacted(fake, reports_channel, int(message["id"]), "🔨")
+        ), None))
+        if len(fake.find_messages(reports_channel, lambda m: embed_titled(m, "Nuevo Reporte"))) != 1:
+            raise FlowFailed("el reporte se publicó más de una vez")
+        if int(command["id"]) in fake.messages[self.general]:
+            raise FlowFailed("el mensaje con el comando del reporte no se borró")
+
+        fake.add_reaction(reports_channel, int(report["id"]), self.moderator, "🔨")
+        action = await self.step("acciones de moderación", fake, lambda: next(iter(
+            message for message in fake.find_messages(reports_channel, lambda m: embed_titled(m, "Acciones de Moderación"))
+            if self.bot_reacted(fake, reports_channel, int(message["id"]), "🔇")
+        ), None))
+
+        fake.add_reaction(reports_channel, int(action["id"]), self.moderator, "🔇")
+        await self.step("petición de la razón", fake, lambda: fake.find_messages(
+            reports_channel, lambda m: "escribe la razón" in m["content"]
+        ))
+        fake.send_message(reports_channel, self.moderator, self.mute_reason)
+        # El mensaje de acciones se borra justo después de publicar el registro
+        await self.step("silencio registrado", fake, lambda: int(action["id"]) not in fake.messages[reports_channel] and fake.find_messages(
+            reports_channel, lambda m: embed_titled(m, "Usuario silenciado")
+        ))
+
+        roles = fake.member_roles(self.guild, self.target) or []
+        if config["muted_role_name"] not in roles:
+            raise FlowFailed(f"el usuario reportado no tiene el rol {config['muted_role_name']} (roles: {roles})")
+        if fake.find_messages(reports_channel, lambda m: "escribe la razón" in m["content"] or m["content"] == self.mute_reason):
+            raise FlowFailed("la petición de la razón o la respuesta del moderador no se borraron")
+
+        reports = bot.get_cog("Reports").reports.get(str(self.guild), [])
+        if len(reports) != 1 or reports[-1]["reported_user"] != self.target or reports[-1]["reason"] != self.reason:
+            raise FlowFailed(f"se esperaba un reporte guardado en el cog Reports y hay {len(reports)}")
+        cases_cog = bot.get_cog("Cases")
+        if cases_cog is not None:
+            cases = cases_cog.case_log.cases_for_target(self.guild, self.target)
+            if not cases or cases[0]["action"] != "mute" or cases[0]["reason"] != self.mute_reason:
+                raise FlowFailed("no se registró el caso de silencio")
+
+
+FLOWS = {flow.name: flow for flow in (ReportMuteFlow,)}
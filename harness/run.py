@@ -0,0 +1,237 @@
+"""
+Ejecuta el bot completo (todas las cogs de cogs/, con la configuración de config/config.py)
+sin conexión, contra el Discord falso de harness/fake_discord.py, y muestra qué peticiones
+hizo a la API, cuánto tardó cada paso y, opcionalmente, el perfil de cProfile.
+
+Se puede ejecutar un flujo completo de comandos (harness/flows.py) o reproducir una traza del
+gateway grabada con GATEWAY_TRACE (harness/traces.py). Los archivos de data/ se crean en un
+directorio temporal, así que no se tocan los del bot.
+
+Uso:
+    python -m harness.run --flow report_mute
+    python -m harness.run --flow report_mute --latency 80 --jitter 40 --inject-429 "POST /channels/*/messages"
+    python -m harness.run --flow report_mute --rate-limit "PUT /channels/*/messages/*/reactions/*=1/0.25" --profile
+    python -m harness.run --trace trazas/gateway.jsonl --speed 10
+
+Los patrones de --rate-limit y --inject-429 se comparan (con comodines, como fnmatch) con
+"MÉTODO /ruta/normalizada", por ejemplo "POST /guilds/{id}/roles" o "* /channels/*".
+"""
+import argparse
+import asyncio
+import collections
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+from config.config import setup_bot
+from harness.fake_discord import FakeDiscord
+from harness.flows import FLOWS, FlowFailed
+from harness import traces
+from utils.logs import setup_logging
+from utils.loop_monitor import loop_monitor
+from utils.metrics import rest_requests
+from utils.startup import discover_extensions, load_extensions_timed
+
+logger = logging.getLogger(__name__)
+
+# Funciones del perfil que se muestran (solo código del bot, no de discord.py ni aiohttp)
+PROFILE_PATHS = ("cogs", "utils", "main.py")
+PROFILE_LINES = 25
+
+
+class ErrorCounter(logging.Handler):
+    """Cuenta los registros de nivel ERROR o superior emitidos durante la ejecución."""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+def parse_rate_limit(value):
+    """"PATRÓN=LÍMITE/SEGUNDOS" -> (patrón, límite, segundos)."""
+    try:
+        pattern, rule = value.rsplit("=", 1)
+        limit, per = rule.split("/")
+        return pattern, int(limit), float(per)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"límite no válido: {value!r} (formato: PATRÓN=LÍMITE/SEGUNDOS)") from None
+
+
+def format_rest_summary(fake):
+    """Tabla con las peticiones recibidas por la API falsa, agrupadas por ruta."""
+    by_route = collections.OrderedDict()
+    for call in fake.calls:
+        by_route.setdefault(call.key, []).append(call)
+    lines = [f"Peticiones a la API: {len(fake.calls)}"]
+    for key, calls in sorted(by_route.items(), key=lambda item: -len(item[1])):
+        statuses = collections.Counter(call.status for call in calls)
+        seconds = [call.seconds for call in calls]
+        lines.append(
+            f"  {len(calls):>4} × {key:<58} "
+            f"{' '.join(f'{status}×{count}' for status, count in sorted(statuses.items())):<16} "
+            f"media {sum(seconds) / len(seconds) * 1000:>6.1f} ms · máx {max(seconds) * 1000:>6.1f} ms"
+        )
+    return "\n".join(lines)
+
+
+def format_handler_summary(before):
+    """Peticiones por comando o listener (métrica flexbot_rest_requests_total) durante la ejecución."""
+    by_handler = collections.Counter()
+    for (handler, method, route, status), value in rest_requests.values.items():
+        by_handler[handler] += value - before.get((handler, method, route, status), 0)
+    lines = ["Peticiones por comando/listener:"]
+    lines.extend(f"  {count:>4} · {handler}" for handler, count in by_handler.most_common() if count)
+    return "\n".join(lines)
+
+
+def format_profile(profile, output=None):
+    if output:
+        profile.dump_stats(output)
+    stream = io.StringIO()
+    stats = pstats.Stats(profile, stream=stream).sort_stats("cumulative")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    pattern = "|".join(re.escape(os.path.join(root, path)) for path in PROFILE_PATHS)
+    stats.print_stats(pattern, PROFILE_LINES)
+    return stream.getvalue().rstrip()
+
+
+async def run(args, extensions):
+    fake = FakeDiscord(latency=args.latency / 1000, jitter=args.jitter / 1000, seed=args.seed)
+    for pattern, limit, per in args.rate_limit:
+        fake.add_rate_limit(pattern, limit, per)
+    for pattern in args.inject_429:
+        fake.inject_rate_limit(pattern, retry_after=args.retry_after)
+
+    flow = None
+    events = []
+    delivered = 0
+    if args.trace:
+        events = traces.seed(fake, traces.load_trace(args.trace))
+    else:
+        flow = FLOWS[args.flow]()
+        flow.build(fake)
+
+    bot = setup_bot()
+
+    # Igual que en main.py: los mensajes de servidor los procesa la tubería (cogs/pipeline.py)
+    @bot.event
+    async def on_message(message):
+        if message.guild is None or bot.get_cog("Pipeline") is None:
+            await bot.process_commands(message)
+
+    await fake.start()
+    failure = None
+    profile = cProfile.Profile() if args.profile else None
+    try:
+        async with bot:
+            results = await load_extensions_timed(bot, extensions)
+            failed = [result["extension"] for result in results if result["error"]]
+            if failed:
+                logger.error("No se cargaron: %s", ", ".join(failed))
+            loaded = len(bot.extensions)
+            await bot.login("token-del-arnes")
+            await fake.connect(bot)
+            # Lo que el bot hace al arrancar no cuenta en el resumen
+            await fake.wait_idle()
+            startup_calls = len(fake.calls)
+            metrics_before = dict(rest_requests.values)
+
+            start = time.perf_counter()
+            if profile:
+                profile.enable()
+            try:
+                try:
+                    if flow:
+                        await flow.run(fake, bot)
+                    else:
+                        delivered = await traces.replay(fake, events, args.speed)
+                except FlowFailed as e:
+                    failure = e
+                # También tras un fallo: cerrar el bot con peticiones en curso solo añadiría errores
+                await fake.wait_idle()
+            finally:
+                if profile:
+                    profile.disable()
+            elapsed = time.perf_counter() - start
+    finally:
+        await fake.stop()
+
+    print(f"Arranque: {startup_calls} peticiones a la API, {loaded} extensiones cargadas")
+    del fake.calls[:startup_calls]
+    if flow:
+        print(f"Flujo {flow.name} ({flow.description}): {'FALLÓ · ' + str(failure) if failure else 'completado'} en {elapsed:.3f} s")
+        for name, seconds in flow.steps:
+            print(f"  {seconds * 1000:>8.1f} ms · {name}")
+    else:
+        print(f"Traza {args.trace}: {delivered} de {len(events)} eventos reproducidos en {elapsed:.3f} s")
+    print(format_rest_summary(fake))
+    print(format_handler_summary(metrics_before))
+    gateway = collections.Counter(event for _, event in fake.events)
+    print(f"Eventos del gateway entregados: {sum(gateway.values())} ({', '.join(f'{event}×{count}' for event, count in gateway.most_common())})")
+    current, average, p99, maximum = loop_monitor.lag_summary()
+    print(f"Retraso del bucle: media {average * 1000:.1f} ms · p99 {p99 * 1000:.1f} ms · máx {maximum * 1000:.1f} ms")
+    if profile:
+        print(format_profile(profile, args.profile_output))
+    return failure
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ejecuta el bot sin conexión contra un Discord falso.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--flow", choices=sorted(FLOWS), default="report_mute", help="Flujo de comandos a ejecutar (por defecto: report_mute)")
+    source.add_argument("--trace", help="Traza del gateway (JSONL, grabada con GATEWAY_TRACE) a reproducir en vez de un flujo")
+    parser.add_argument("--speed", type=float, default=1.0, help="Velocidad de reproducción de la traza; 0 = sin esperas (por defecto: 1)")
+    parser.add_argument("--latency", type=float, default=0, help="Latencia de cada petición a la API en ms (por defecto: 0)")
+    parser.add_argument("--jitter", type=float, default=0, help="Variación aleatoria añadida a la latencia, en ms (por defecto: 0)")
+    parser.add_argument("--rate-limit", type=parse_rate_limit, action="append", default=[], metavar="PATRÓN=LÍMITE/SEGUNDOS",
+                        help="Límite de peticiones por ruta, como los buckets de Discord (se puede repetir)")
+    parser.add_argument("--inject-429", action="append", default=[], metavar="PATRÓN",
+                        help="Responde 429 a la primera petición que case con el patrón (se puede repetir)")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="retry_after de los 429 de --inject-429 en segundos (por defecto: 0.5)")
+    parser.add_argument("--profile", action="store_true", help="Perfila el flujo con cProfile y muestra las funciones del bot más costosas")
+    parser.add_argument("--profile-output", help="Guarda el perfil completo en este archivo (para snakeviz, pstats...)")
+    parser.add_argument("--seed", type=int, default=1, help="Semilla de la variación de la latencia (por defecto: 1)")
+    parser.add_argument("--log-level", default="WARNING", help="Nivel de los logs del bot (por defecto: WARNING)")
+    args = parser.parse_args()
+
+    trace = os.path.abspath(args.trace) if args.trace else None
+    args.trace = trace
+    args.profile_output = os.path.abspath(args.profile_output) if args.profile_output else None
+    if args.profile_output:
+        args.profile = True
+
+    listener = setup_logging(level=args.log_level.upper(), log_file=None)
+    logging.getLogger("discord").setLevel(logging.ERROR)  # Avisos de voz sin PyNaCl, etc.
+    errors = ErrorCounter()
+    logging.getLogger().addHandler(errors)
+
+    # Las extensiones se buscan con rutas relativas al repositorio, antes de cambiar de directorio
+    extensions = discover_extensions('cogs')
+    original_dir = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix="flexbot-harness-")
+    os.makedirs(os.path.join(work_dir, "data"))
+    os.chdir(work_dir)
+    try:
+        failure = asyncio.run(run(args, extensions))
+    finally:
+        os.chdir(original_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        listener.stop()
+
+    print(f"Errores registrados: {errors.count}")
+    if failure is not None:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
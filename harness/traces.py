@@ -0,0 +1,128 @@
+"""
+Reproducción de trazas del gateway grabadas con GATEWAY_TRACE (ver utils/gateway_trace.py).
+
+Los GUILD_CREATE y GUILD_MEMBERS_CHUNK de la traza dan el estado inicial del Discord falso
+(servidores, roles, canales y miembros) y el resto de eventos se entregan al bot respetando
+los intervalos grabados, divididos por `speed` (0 = sin esperas). El bot del arnés suplanta
+al que grabó la traza, así que sus propios mensajes y reacciones no se reproducen: los vuelve
+a generar el bot del arnés al procesar los eventos.
+"""
+import asyncio
+import json
+import logging
+import time
+
+import discord # type: ignore
+
+from harness.fake_discord import TEXT_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+# Parte de los datos de cada evento que no forma parte del servidor al reproducirlo
+GUILD_EXTRA_FIELDS = ("roles", "channels", "members", "threads", "voice_states", "presences", "member_count",
+                      "stage_instances", "guild_scheduled_events", "joined_at", "soundboard_sounds")
+
+
+def load_trace(path):
+    """Lista de eventos ({"at", "t", "d"}) de un archivo JSONL, en orden de llegada."""
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{number}: línea no válida ({e})") from e
+    return sorted(events, key=lambda event: event["at"])
+
+
+def seed(fake, events):
+    """Carga en `fake` el estado inicial de la traza. Devuelve los eventos a reproducir."""
+    replay = []
+    for event in events:
+        data = event["d"]
+        if event["t"] == "READY":
+            user = data["user"]
+            fake.users[int(user["id"])] = user
+            fake.bot_user = int(user["id"])
+        elif event["t"] == "GUILD_CREATE":
+            seed_guild(fake, data)
+        elif event["t"] == "GUILD_MEMBERS_CHUNK":
+            for member in data["members"]:
+                seed_member(fake, int(data["guild_id"]), member)
+        else:
+            replay.append(event)
+
+    # Sin READY en la traza, el bot del arnés entra en cada servidor con el rol de administrador
+    for guild_id, guild in fake.guilds.items():
+        if fake.bot_user not in guild["members"]:
+            fake.add_member(guild_id, fake.bot_user, [fake.create_role(guild_id, "FlexBot", discord.Permissions.all().value, managed=True)])
+    return replay
+
+
+def seed_guild(fake, data):
+    guild_id = int(data["id"])
+    fake.guilds[guild_id] = {
+        "data": {key: value for key, value in data.items() if key not in GUILD_EXTRA_FIELDS},
+        "roles": {int(role["id"]): role for role in data.get("roles", [])},
+        "members": {},
+    }
+    for channel in data.get("channels", []):
+        fake.channels[int(channel["id"])] = dict(channel, guild_id=str(guild_id))
+    for member in data.get("members", []):
+        seed_member(fake, guild_id, member)
+
+
+def seed_member(fake, guild_id, member):
+    user = member["user"]
+    fake.users[int(user["id"])] = user
+    fake.guilds[guild_id]["members"][int(user["id"])] = {key: value for key, value in member.items() if key != "user"}
+
+
+def is_own_event(fake, event):
+    """Si el evento lo provocó el bot que grabó la traza (el del arnés lo generará de nuevo)."""
+    data = event["d"]
+    author = data.get("author") or {}
+    return str(fake.bot_user) in (author.get("id"), data.get("user_id"))
+
+
+def apply(fake, event):
+    """Actualiza el modelo del Discord falso con un evento de la traza antes de entregarlo."""
+    data = event["d"]
+    kind = event["t"]
+    if kind == "MESSAGE_CREATE":
+        fake.store_message(data)
+    elif kind == "MESSAGE_DELETE":
+        fake.messages[int(data["channel_id"])].pop(int(data["id"]), None)
+    elif kind == "MESSAGE_REACTION_ADD":
+        fake.reactions[(int(data["channel_id"]), int(data["message_id"]))].setdefault(data["emoji"]["name"], set()).add(int(data["user_id"]))
+    elif kind == "GUILD_MEMBER_ADD":
+        seed_member(fake, int(data["guild_id"]), {key: value for key, value in data.items() if key != "guild_id"})
+    elif kind == "GUILD_MEMBER_REMOVE":
+        fake.guilds[int(data["guild_id"])]["members"].pop(int(data["user"]["id"]), None)
+    elif kind in ("CHANNEL_CREATE", "CHANNEL_UPDATE") and data.get("type") == TEXT_CHANNEL and data.get("guild_id"):
+        fake.channels[int(data["id"])] = data
+
+
+async def replay(fake, events, speed=1.0):
+    """Entrega los eventos al bot. Devuelve cuántos se entregaron."""
+    if not events:
+        return 0
+    first = events[0]["at"]
+    start = time.perf_counter()
+    delivered = 0
+    for event in events:
+        if is_own_event(fake, event):
+            continue
+        if speed:
+            delay = (event["at"] - first) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        apply(fake, event)
+        fake.dispatch(event["t"], event["d"])
+        delivered += 1
+        # Los manejadores del evento empiezan antes de entregar el siguiente, como con el websocket
+        await asyncio.sleep(0)
+    logger.info("Traza reproducida: %d eventos en %.2f s", delivered, time.perf_counter() - start)
+    return delivered
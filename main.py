@@ -1,24 +1,70 @@
 import os
+import time
+import asyncio
+import logging
 from dotenv import load_dotenv # type: ignore
 from config.config import setup_bot
 from discord.ext import commands # type: ignore
 import discord
+from discord import app_commands # type: ignore
+from utils.cluster import cluster
+from utils.command_sync import sync_command_tree
+from utils.hot_reload import reload_with_state, resolve_extension
+from utils.logs import context_from, setup_logging_from_env
+from utils.member_cache import members
+from utils.startup import STARTUP_REPORT_FILE, discover_extensions, memory_usage_mb, load_extensions_timed, print_startup_report, write_startup_report
+
+# Momento de inicio del proceso, para el informe de arranque
+STARTED_AT = time.perf_counter()
+startup_report = {}
 
 # Cargar variables de entorno
 load_dotenv()
 
+# Registro: formato y escritura en un hilo aparte (consola y logs/flexbot.log en JSON)
+log_listener = setup_logging_from_env(os.environ)
+logger = logging.getLogger("flexbot")
+
 # Inicializar el bot
 bot = setup_bot()
 
+# Sincroniza los comandos de barra al iniciar sesión, antes de conectar con el gateway
+# (solo hace la petición si sus definiciones cambiaron desde la última vez)
+async def setup_hook():
+    await sync_command_tree(bot)
+
+bot.setup_hook = setup_hook
+
 # Evento de inicialización
 @bot.event
 async def on_ready():
-    print(f'Bot conectado como {bot.user.name}')
-    print(f'ID del Bot: {bot.user.id}')
-    print('------')
+    logger.info("Bot conectado como %s (ID %s) · Servidores: %d · %s", bot.user.name, bot.user.id, len(bot.guilds), cluster.describe())
+    # on_ready se repite tras cada reconexión; el informe solo se completa la primera vez
+    if startup_report and "ready_seconds" not in startup_report:
+        startup_report["ready_seconds"] = round(time.perf_counter() - STARTED_AT, 4)
+        startup_report["cluster"] = cluster.describe()
+        startup_report["member_cache"] = members.policy
+        startup_report["cached_members"] = members.cached_count(bot.guilds)
+        startup_report["rss_mb"] = memory_usage_mb()
+        logger.info("Bot listo %.3f s después de iniciar el proceso (caché de miembros: %s, %d en memoria, %s MB).",
+                    startup_report["ready_seconds"], members.policy, startup_report["cached_members"], startup_report["rss_mb"])
+        try:
+            # En modo clúster cada proceso guarda su propio informe
+            report_file = f"data/startup_report_{cluster.cluster_id}.json" if cluster.enabled else STARTUP_REPORT_FILE
+            await asyncio.get_running_loop().run_in_executor(None, write_startup_report, startup_report, report_file)
+        except OSError as e:
+            logger.error("No se pudo guardar el informe de arranque: %s", e)
+
+# Los mensajes de servidor los procesa la tubería de mensajes (cogs/pipeline.py), que ejecuta
+# los comandos como última etapa. Aquí solo se procesan los mensajes directos, o todos si la
+# tubería no está cargada.
+@bot.event
+async def on_message(message):
+    if message.guild is None or bot.get_cog("Pipeline") is None:
+        await bot.process_commands(message)
 
 # Comando de depuración para listar todos los comandos disponibles
-@bot.command(name="comandos")
+@bot.hybrid_command(name="comandos")
 @commands.has_permissions(administrator=True)
 async def list_commands(ctx):
     """
@@ -37,9 +83,44 @@ async def list_commands(ctx):
         embed.add_field(name="Comandos:", value="\n".join(chunk), inline=False)
         await ctx.send(embed=embed)
 
+# Recarga en caliente de un cog. Está aquí y no en un cog para que el propio comando no se recargue.
+@bot.hybrid_command(name="reload", aliases=["recargar"])
+@commands.is_owner()
+async def reload_cog(ctx, cog: str):
+    """
+    Recarga un cog sin reiniciar el bot, conservando su estado en memoria
+    (encuestas activas, acciones pendientes, silencios en curso...).
+    Solo puede usarlo el propietario del bot.
+    Ejemplo: !flex reload moderation
+    Los cambios en utils/ no se aplican con una recarga: requieren reiniciar el bot.
+    """
+    await ctx.defer()
+    extension = resolve_extension(bot, cog)
+    if extension is None:
+        await ctx.send(f"❌ No hay ningún cog cargado llamado `{cog}`.")
+        return
+
+    start = time.perf_counter()
+    restored, error = await reload_with_state(bot, extension)
+    elapsed = time.perf_counter() - start
+    restored_text = f" Estado restaurado: {', '.join(restored)}." if restored else ""
+    if error:
+        logger.error("Error al recargar %s: %s", extension, error)
+        await ctx.send(f"❌ No se pudo recargar `{extension}`; sigue cargada la versión anterior.{restored_text}\n`{error}`")
+    else:
+        logger.info("Recargado: %s (%.3f s)", extension, elapsed)
+        synced_text = " Comandos de barra actualizados." if await sync_command_tree(bot) else ""
+        await ctx.send(f"🔄 `{extension}` recargado en {elapsed:.2f} s.{restored_text}{synced_text}")
+
 # Manejo de errores
 @bot.event
 async def on_command_error(ctx, error):
+    # En los comandos de barra el error llega envuelto; los de los conversores, además, como TransformerError
+    if isinstance(error, commands.HybridCommandError):
+        error = error.original
+        if isinstance(error, app_commands.TransformerError) and isinstance(error.__cause__, commands.CommandError):
+            error = error.__cause__
+
     # Extraer el comando original si es un error de un subcomando/grupo
     invoked_command = ctx.command
     if hasattr(ctx.command, 'parent') and ctx.command.parent is not None:
@@ -73,18 +154,17 @@ async def on_command_error(ctx, error):
 
     if error_message:
         try:
-            await ctx.send(f"❌ **Error:** {error_message}")
+            await ctx.send(f"❌ **Error:** {error_message}", ephemeral=True)
         except discord.Forbidden:
-            print(f"No se pudo enviar mensaje de error al canal {ctx.channel.id} en el servidor {ctx.guild.id} por falta de permisos.")
+            logger.warning("No se pudo enviar mensaje de error al canal por falta de permisos.", extra=context_from(ctx))
         except Exception as e:
-            print(f"Error enviando mensaje de error: {e}")
+            logger.warning("Error enviando mensaje de error: %s", e, extra=context_from(ctx))
 
 
     if log_error:
         # Registrar el error completo para depuración, especialmente si no fue manejado arriba
-        print(f"Error no manejado en el comando '{ctx.command.qualified_name if ctx.command else 'desconocido'}':")
-        import traceback
-        traceback.print_exception(type(error), error, error.__traceback__)
+        logger.error("Error no manejado en el comando '%s': %s", ctx.command.qualified_name if ctx.command else 'desconocido', error,
+                     exc_info=(type(error), error, error.__traceback__), extra=context_from(ctx))
         
         # Opcionalmente, enviar un mensaje genérico si no se envió uno específico antes
         if not error_message:
@@ -93,15 +173,17 @@ async def on_command_error(ctx, error):
             except: # Ignorar si no se puede enviar
                 pass
 
-# Cargar cogs
+# Cargar cogs (todas a la vez) y medir el tiempo de carga de cada una
 async def load_extensions():
-    for filename in os.listdir('./cogs'):
-        if filename.endswith('.py') and not filename.startswith('__'):
-            try:
-                await bot.load_extension(f'cogs.{filename[:-3]}')
-                print(f'Cargado: cogs.{filename[:-3]}')
-            except Exception as e:
-                print(f'Error al cargar {filename}: {e}')
+    start = time.perf_counter()
+    results = await load_extensions_timed(bot, discover_extensions('cogs'))
+    total_seconds = time.perf_counter() - start
+    print_startup_report(results, total_seconds)
+    startup_report.update({
+        "extensions": results,
+        "extensions_seconds": round(total_seconds, 4),
+        "failed": [result["extension"] for result in results if result["error"]]
+    })
 
 # Ejecutar el bot
 async def main():
@@ -110,5 +192,7 @@ async def main():
         await bot.start(os.getenv('DISCORD_TOKEN'))
 
 if __name__ == "__main__":
-    import asyncio
-    asyncio.run(main()) 
\ No newline at end of file
+    try:
+        asyncio.run(main())
+    finally:
+        log_listener.stop() 
\ No newline at end of file
@@ -68,7 +68,9 @@ async def load_all_extensions():
     return cogs_loaded_successfully
 
 async def main():
-    await load_all_extensions()
+    # Igual que en main.py: el cliente se inicializa antes de cargar las extensiones
+    async with bot:
+        await load_all_extensions()
     # No es necesario iniciar el bot con bot.start() para este test
 
 if __name__ == "__main__":
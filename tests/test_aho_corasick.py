@@ -0,0 +1,46 @@
+import unittest
+
+from utils.aho_corasick import AhoCorasick
+
+
+class AhoCorasickTests(unittest.TestCase):
+    def matches(self, automaton, text):
+        return sorted(automaton.iter_matches(text))
+
+    def test_overlapping_terms(self):
+        automaton = AhoCorasick(["he", "she", "his", "hers"])
+        self.assertEqual(self.matches(automaton, "ushers"), [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")])
+
+    def test_matches_agree_with_naive_search(self):
+        terms = ["aa", "aab", "b", "abba", "ba"]
+        text = "aabbaabaaabba"
+        automaton = AhoCorasick(terms)
+        expected = sorted(
+            (start, start + len(term), term)
+            for term in terms
+            for start in range(len(text))
+            if text.startswith(term, start)
+        )
+        self.assertEqual(self.matches(automaton, text), expected)
+
+    def test_add_and_remove_are_applied_lazily(self):
+        automaton = AhoCorasick(["spam"])
+        self.assertEqual(self.matches(automaton, "spam y scam"), [(0, 4, "spam")])
+
+        automaton.add("scam")
+        self.assertEqual(len(automaton), 2)
+        self.assertEqual(self.matches(automaton, "spam y scam"), [(0, 4, "spam"), (7, 11, "scam")])
+
+        automaton.remove("spam")
+        self.assertEqual(self.matches(automaton, "spam y scam"), [(7, 11, "scam")])
+
+    def test_empty_and_duplicate_terms_are_ignored(self):
+        automaton = AhoCorasick(["", "x", "x"])
+        self.assertEqual(len(automaton), 1)
+        self.assertEqual(self.matches(automaton, ""), [])
+        automaton.remove("no existe")
+        self.assertEqual(len(automaton), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
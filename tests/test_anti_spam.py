@@ -0,0 +1,230 @@
+import asyncio
+import itertools
+import types
+import unittest
+from unittest import mock
+
+import discord # type: ignore
+
+from cogs.moderation import Moderation
+from utils.guild_config import DEFAULTS
+
+IDS = itertools.count(1000)
+
+
+def make_message(author_id, content, channel_id=1, mentions=(), role_mentions=(), mention_everyone=False, attachments=0):
+    return types.SimpleNamespace(
+        id=next(IDS), guild=types.SimpleNamespace(id=1), channel=types.SimpleNamespace(id=channel_id),
+        author=types.SimpleNamespace(id=author_id), content=content, mentions=list(mentions),
+        role_mentions=list(role_mentions), mention_everyone=mention_everyone, attachments=[object()] * attachments
+    )
+
+
+def users(count):
+    return [types.SimpleNamespace(id=user_id) for user_id in range(100, 100 + count)]
+
+
+class DuplicateTests(unittest.TestCase):
+    def setUp(self):
+        self.cog = Moderation(types.SimpleNamespace(user=types.SimpleNamespace(id=1)))
+        self.config = dict(DEFAULTS)
+
+    def tearDown(self):
+        self.cog.cog_unload()
+
+    def track(self, message):
+        return self.cog.track_duplicate(message, self.config, message.content.lower())
+
+    def test_different_accounts_typing_the_same_greeting_are_not_spam(self):
+        for author_id in (10, 11, 12, 13):
+            self.assertIsNone(self.track(make_message(author_id, "buenos días a todos")))
+
+    def test_same_account_repeating_is_spam(self):
+        self.assertIsNone(self.track(make_message(11, "feliz cumpleaños!")))
+        self.assertIsNone(self.track(make_message(10, "feliz cumpleaños!")))
+        self.assertIsNone(self.track(make_message(10, "feliz cumpleaños!", channel_id=2)))
+        occurrences = self.track(make_message(10, "feliz cumpleaños!", channel_id=3))
+        self.assertEqual([user_id for _, user_id, _, _ in occurrences], [10, 10, 10])
+
+        # La copia de la otra cuenta sigue contando por separado, pero no basta para actuar
+        self.assertIsNone(self.track(make_message(11, "feliz cumpleaños!")))
+
+    def test_accounts_sharing_a_link_are_spam(self):
+        content = "regalo nitro gratis https://example.com/nitro"
+        self.assertIsNone(self.track(make_message(10, content)))
+        self.assertIsNone(self.track(make_message(11, content, channel_id=2)))
+        occurrences = self.track(make_message(12, content, channel_id=3))
+        self.assertEqual({user_id for _, user_id, _, _ in occurrences}, {10, 11, 12})
+
+    def test_accounts_sharing_mentions_are_spam(self):
+        victim = types.SimpleNamespace(id=50)
+        for author_id in (10, 11):
+            self.assertIsNone(self.track(make_message(author_id, "mirad esto <@50> jaja", mentions=[victim])))
+        self.assertIsNotNone(self.track(make_message(12, "mirad esto <@50> jaja", mentions=[victim])))
+
+    def test_cross_account_enforcement_is_opt_in(self):
+        self.config["duplicate_cross_account"] = True
+        self.assertIsNone(self.track(make_message(10, "buenos días a todos")))
+        self.assertIsNone(self.track(make_message(11, "buenos días a todos")))
+        self.assertIsNotNone(self.track(make_message(12, "buenos días a todos")))
+
+    def test_short_messages_are_ignored(self):
+        for _ in range(5):
+            self.assertIsNone(self.track(make_message(10, "jaja")))
+
+
+class MessageScoreTests(unittest.TestCase):
+    def setUp(self):
+        self.cog = Moderation(types.SimpleNamespace(user=types.SimpleNamespace(id=1)))
+        self.config = dict(DEFAULTS)
+
+    def tearDown(self):
+        self.cog.cog_unload()
+
+    def score(self, message):
+        return self.cog.message_score(message, self.config)
+
+    def test_ordinary_messages_stay_under_the_threshold(self):
+        ordinary = {
+            "20 líneas": make_message(10, "\n".join(["línea"] * 20)),
+            "4 menciones": make_message(10, "hola " + " ".join(f"<@{u.id}>" for u in users(4)), mentions=users(4)),
+            "4 enlaces": make_message(10, " ".join(f"https://example.com/{i}" for i in range(4))),
+            "10 adjuntos": make_message(10, "fotos de la quedada", attachments=10),
+            "@everyone y un rol": make_message(10, "@everyone reunión <@&5>", role_mentions=[object()], mention_everyone=True),
+            "todo junto": make_message(10, "\n".join(["línea"] * 10) + " https://example.com", mentions=users(2), attachments=2),
+        }
+        for name, message in ordinary.items():
+            with self.subTest(name):
+                self.assertLess(self.score(message), self.config["spam_threshold"])
+
+    def test_abusive_messages_reach_the_threshold(self):
+        abusive = {
+            "30 menciones": make_message(10, "", mentions=users(30)),
+            "8 enlaces": make_message(10, " ".join(f"https://spam.example/{i}" for i in range(8))),
+            "4 menciones de rol": make_message(10, "", role_mentions=[object()] * 4),
+            "100 líneas": make_message(10, "\n" * 100),
+        }
+        for name, message in abusive.items():
+            with self.subTest(name):
+                self.assertGreaterEqual(self.score(message), self.config["spam_threshold"])
+
+    def test_plain_messages_score_one(self):
+        self.assertEqual(self.score(make_message(10, "hola a todos")), 1.0)
+
+
+class Clock:
+    """Sustituye a `time` en cogs.moderation para avanzar el reloj a mano."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class AntiSpamStageTests(unittest.TestCase):
+    def setUp(self):
+        self.cog = Moderation(types.SimpleNamespace(user=types.SimpleNamespace(id=1)))
+        self.config = dict(DEFAULTS, spam_threshold=1)
+        self.clock = Clock()
+        for target, value in (("cogs.moderation.time", self.clock),
+                              ("cogs.moderation.members.get_member", mock.AsyncMock(side_effect=self.get_member))):
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.mute_member = mock.AsyncMock(return_value=object())
+        self.cog.mute_member = self.mute_member
+        self.channels = {}
+        self.guild = types.SimpleNamespace(id=1, name="Servidor", get_channel_or_thread=self.get_channel)
+
+    def tearDown(self):
+        self.cog.cog_unload()
+
+    async def get_member(self, guild, user_id):
+        return types.SimpleNamespace(id=user_id, mention=f"<@{user_id}>")
+
+    def get_channel(self, channel_id):
+        channel = self.channels.get(channel_id)
+        if channel is None:
+            channel = self.channels[channel_id] = types.SimpleNamespace(
+                id=channel_id, send=mock.AsyncMock(), deleted=[], history=None
+            )
+            channel.get_partial_message = lambda message_id, channel=channel: types.SimpleNamespace(
+                delete=mock.AsyncMock(side_effect=lambda: channel.deleted.append(message_id))
+            )
+        return channel
+
+    def send(self, message):
+        """Pasa un mensaje por la etapa anti-spam. Devuelve True si se sancionó al autor."""
+        message.guild = self.guild
+        message.channel = self.get_channel(message.channel.id)
+        message.author.mention = f"<@{message.author.id}>"
+        ctx = types.SimpleNamespace(message=message, config=self.config, normalized_content=message.content.lower())
+        return asyncio.run(self.cog.anti_spam_stage(ctx))
+
+    def test_messages_deleted_meanwhile_do_not_skip_the_notice(self):
+        deleted = mock.AsyncMock(side_effect=discord.NotFound(mock.Mock(status=404, reason="Not Found"), "Unknown Message"))
+        remaining = mock.AsyncMock()
+        history = [types.SimpleNamespace(author=types.SimpleNamespace(id=10), delete=deleted),
+                   types.SimpleNamespace(author=types.SimpleNamespace(id=10), delete=remaining)]
+
+        async def fake_history(limit):
+            for msg in history:
+                yield msg
+
+        self.get_channel(1).history = fake_history
+        self.assertTrue(self.send(make_message(10, "hola")))
+        remaining.assert_awaited_once()
+        self.channels[1].send.assert_awaited_once()
+
+    def test_repeated_link_mutes_every_account_and_deletes_every_copy(self):
+        self.config["spam_threshold"] = 100 # Solo actúa el filtro de duplicados
+        content = "regalo nitro gratis https://example.com/nitro"
+        copies = [make_message(author_id, content, channel_id=author_id) for author_id in (10, 11, 12)]
+        self.assertEqual([self.send(message) for message in copies], [False, False, True])
+
+        self.assertEqual([call.args[1].id for call in self.mute_member.call_args_list], [10, 11, 12])
+        self.assertEqual({channel_id: channel.deleted for channel_id, channel in self.channels.items()},
+                         {message.channel.id: [message.id] for message in copies})
+        embed = self.channels[12].send.call_args.kwargs["embed"]
+        self.assertIn("3 copias del mismo mensaje en 3 canal(es)", embed.description)
+        self.assertEqual(embed.fields[0].value, "<@10> <@11> <@12>")
+
+    def test_copies_outside_the_window_do_not_count(self):
+        self.config["spam_threshold"] = 100
+        for _ in range(5):
+            self.assertFalse(self.send(make_message(10, "feliz cumpleaños!")))
+            self.clock.now += self.config["duplicate_window"] + 1
+        self.mute_member.assert_not_awaited()
+
+    def test_score_accumulates_within_the_interval(self):
+        self.config["spam_threshold"] = DEFAULTS["spam_threshold"]
+        self.get_channel(1).history = self.empty_history
+        results = []
+        for i in range(5):
+            results.append(self.send(make_message(10, f"mensaje {i}")))
+            self.clock.now += 0.5
+        self.assertEqual(results, [False, False, False, False, True])
+        self.assertEqual(self.cog.user_scores[10], 0.0) # Se empieza de cero tras sancionar
+
+    def test_messages_spread_over_the_interval_do_not_add_up(self):
+        self.config["spam_threshold"] = DEFAULTS["spam_threshold"]
+        for i in range(20):
+            self.assertFalse(self.send(make_message(10, f"mensaje {i}")))
+            self.clock.now += self.config["spam_interval"] / 2
+        self.assertLessEqual(self.cog.user_scores[10], 2.0)
+
+    def test_one_abusive_message_is_enough(self):
+        self.config["spam_threshold"] = DEFAULTS["spam_threshold"]
+        self.get_channel(1).history = self.empty_history
+        self.assertTrue(self.send(make_message(10, "", mentions=users(30))))
+        embed = self.channels[1].send.call_args.kwargs["embed"]
+        self.assertEqual(embed.fields[1].value, "Mensaje con demasiadas menciones, enlaces o adjuntos")
+
+    @staticmethod
+    async def empty_history(limit):
+        return
+        yield
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils.case_log import CaseLog
+
+
+class CaseLogTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filepath = os.path.join(self.directory, "data", "cases.jsonl")
+        self.case_log = CaseLog(self.filepath)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_case_numbers_are_per_guild(self):
+        first = self.case_log.record(1, "warn", 10, 99, "Spam")
+        second = self.case_log.record(1, "mute", 10, 99, "Spam repetido", duration="1h")
+        other = self.case_log.record(2, "ban", 20, 98, "Raid")
+        self.assertEqual((first["case"], second["case"], other["case"]), (1, 2, 1))
+        self.assertEqual(self.case_log.get_case(1, 2)["action"], "mute")
+        self.assertIsNone(self.case_log.get_case(1, 3))
+        self.assertIsNone(self.case_log.get_case(1, 0))
+
+    def test_indexes_return_most_recent_first(self):
+        self.case_log.record(1, "warn", 10, 99, "a")
+        self.case_log.record(1, "warn", 11, 99, "b")
+        self.case_log.record(1, "kick", 10, 98, "c")
+        self.assertEqual([case["reason"] for case in self.case_log.cases_for_target(1, 10)], ["c", "a"])
+        self.assertEqual([case["reason"] for case in self.case_log.cases_by_moderator("1", "99")], ["b", "a"])
+        self.assertEqual(self.case_log.cases_for_target(2, 10), [])
+
+    def test_load_rebuilds_from_file_and_skips_corrupt_lines(self):
+        self.case_log.record(1, "warn", 10, 99, "Razón con acentos: ñ")
+        with open(self.filepath, 'a', encoding='utf-8') as f:
+            f.write("{no es json\n\n")
+        self.case_log.record(1, "ban", 10, 99, "Reincidente")
+
+        reloaded = CaseLog(self.filepath)
+        with self.assertLogs("utils.case_log", "WARNING"):
+            reloaded.load()
+        self.assertEqual([case["action"] for case in reloaded.cases_for_target(1, 10)], ["ban", "warn"])
+        self.assertEqual(reloaded.get_case(1, 1)["reason"], "Razón con acentos: ñ")
+
+    def test_numbers_continue_after_a_corrupt_line(self):
+        for reason in ("a", "b", "c"):
+            self.case_log.record(1, "warn", 10, 99, reason)
+        with open(self.filepath, encoding='utf-8') as f:
+            lines = f.readlines()
+        lines[1] = "{corrupta\n"
+        with open(self.filepath, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+
+        reloaded = CaseLog(self.filepath)
+        reloaded.load()
+        ban = reloaded.record(1, "ban", 10, 99, "d")
+
+        self.assertEqual(ban["case"], 4)
+        self.assertIsNone(reloaded.get_case(1, 2))
+        self.assertEqual(reloaded.get_case(1, 3)["reason"], "c")
+        self.assertEqual([case["case"] for case in reloaded.cases_for_target(1, 10)], [4, 3, 1])
+        self.assertEqual([case["case"] for case in reloaded.cases_by_moderator(1, 99)], [4, 3, 1])
+
+    def test_duplicate_numbers_are_ignored(self):
+        self.case_log.record(1, "warn", 10, 99, "original")
+        with open(self.filepath, encoding='utf-8') as f:
+            line = f.read()
+        with open(self.filepath, 'a', encoding='utf-8') as f:
+            f.write(line.replace("original", "copia"))
+
+        reloaded = CaseLog(self.filepath)
+        with self.assertLogs("utils.case_log", "WARNING"):
+            reloaded.load()
+        self.assertEqual([case["reason"] for case in reloaded.cases_for_target(1, 10)], ["original"])
+        self.assertEqual(reloaded.record(1, "mute", 10, 99, "x")["case"], 2)
+
+    def test_file_is_append_only_json_lines(self):
+        self.case_log.record(1, "warn", 10, 99, "Spam")
+        self.case_log.record(1, "mute", 10, 99, "Spam")
+        with open(self.filepath, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual([line["case"] for line in lines], [1, 2])
+
+    def test_load_without_file(self):
+        self.case_log.load()
+        self.assertEqual(self.case_log.cases, {})
+        self.assertEqual(self.case_log.record(1, "warn", 10, 99, "a")["case"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from utils.cluster import parse_shard_ids, shard_for_guild
+
+
+class ParseShardIdsTests(unittest.TestCase):
+    def test_ranges_and_lists(self):
+        self.assertEqual(parse_shard_ids("0-3"), [0, 1, 2, 3])
+        self.assertEqual(parse_shard_ids("0,1, 2"), [0, 1, 2])
+        self.assertEqual(parse_shard_ids("6-7,0-1,7"), [0, 1, 6, 7])
+
+    def test_empty_parts_are_ignored(self):
+        self.assertEqual(parse_shard_ids(""), [])
+        self.assertEqual(parse_shard_ids("1,,2,"), [1, 2])
+
+    def test_invalid_values(self):
+        with self.assertRaises(ValueError):
+            parse_shard_ids("a-b")
+        with self.assertRaises(ValueError):
+            parse_shard_ids("1;2")
+
+
+class ShardForGuildTests(unittest.TestCase):
+    def test_discord_formula(self):
+        guild_id = (123 << 22) | 456
+        self.assertEqual(shard_for_guild(guild_id, 10), 3)
+        self.assertEqual(shard_for_guild(str(guild_id), 1), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import asyncio
+import unittest
+
+from utils.concurrency import run_bounded
+
+
+class RunBoundedTests(unittest.TestCase):
+    def test_limit_failures_and_progress(self):
+        running = 0
+        peak = 0
+        progress = []
+
+        async def worker(item):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if item == 3:
+                raise RuntimeError("fallo")
+
+        async def on_progress(done, total):
+            progress.append((done, total))
+
+        results = asyncio.run(run_bounded(range(10), worker, limit=3, on_progress=on_progress))
+
+        self.assertEqual(peak, 3)
+        self.assertEqual(sorted(item for item, _ in results), list(range(10)))
+        errors = {item: error for item, error in results if error is not None}
+        self.assertEqual(list(errors), [3])
+        self.assertIsInstance(errors[3], RuntimeError)
+        self.assertEqual(progress, [(done, 10) for done in range(1, 11)])
+
+    def test_empty(self):
+        async def worker(item):
+            raise AssertionError("no se debe llamar")
+
+        self.assertEqual(asyncio.run(run_bounded([], worker)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
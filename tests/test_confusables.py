@@ -0,0 +1,26 @@
+import unittest
+
+from utils.confusables import normalize_confusables
+
+
+class NormalizeConfusablesTests(unittest.TestCase):
+    def test_leet_substitutions(self):
+        self.assertEqual(normalize_confusables("$P4M"), "spam")
+        self.assertEqual(normalize_confusables("h0l@"), "hola")
+
+    def test_cyrillic_and_greek_lookalikes(self):
+        # "ѕрам" con letras cirílicas y "ρορ" con letras griegas
+        self.assertEqual(normalize_confusables("ѕрам"), "spam")
+        self.assertEqual(normalize_confusables("ρορ"), "pop")
+
+    def test_compatibility_forms_and_diacritics(self):
+        self.assertEqual(normalize_confusables("ＳＰＡＭ"), "spam")
+        self.assertEqual(normalize_confusables("Spám Ñandú"), "spam nandu")
+
+    def test_invisible_characters_and_spaces(self):
+        self.assertEqual(normalize_confusables("s\u200bp\u00ada\u200dm"), "spam")
+        self.assertEqual(normalize_confusables("  mucho   espacio \n aquí "), "mucho espacio aqui")
+
+
+if __name__ == "__main__":
+    unittest.main()
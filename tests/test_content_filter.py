@@ -0,0 +1,56 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+from cogs.content_filter import ContentFilter
+from utils.guild_config import GuildConfigStore
+
+GUILD_ID = 1
+
+
+class FilterCommandTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.config = GuildConfigStore(os.path.join(self.directory, "guild_config.json"))
+        patcher = mock.patch("cogs.content_filter.guild_config", self.config)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cog = ContentFilter(types.SimpleNamespace())
+
+    def tearDown(self):
+        self.cog.cog_unload()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def run_command(self, command, termino):
+        ctx = types.SimpleNamespace(guild=types.SimpleNamespace(id=GUILD_ID), send=mock.AsyncMock())
+        asyncio.run(command.callback(self.cog, ctx, termino=termino))
+        return ctx.send.call_args.args[0]
+
+    def terms(self):
+        return self.config.get(GUILD_ID)["filter_terms"]
+
+    def test_variants_of_a_term_are_duplicates(self):
+        self.run_command(ContentFilter.filter_add, "  Pálabra ")
+        self.assertEqual(self.terms(), ["palabra"])
+        for variant in ("palabra", "PALABRA", "p4labra", "ｐａｌａｂｒａ"):
+            with self.subTest(variant):
+                self.assertIn("ya está", self.run_command(ContentFilter.filter_add, variant))
+        self.assertEqual(self.terms(), ["palabra"])
+        self.assertEqual(self.cog.find_violation(GUILD_ID, "una PALABRA"), "palabra")
+
+    def test_removing_a_variant_removes_the_term(self):
+        # Términos guardados sin normalizar por versiones anteriores
+        self.config.set(GUILD_ID, "filter_terms", ["Pálabra", "otra"])
+        self.assertEqual(self.cog.find_violation(GUILD_ID, "palabra"), "palabra")
+        self.assertIn("quitado", self.run_command(ContentFilter.filter_remove, "PALABRA"))
+        self.assertEqual(self.terms(), ["otra"])
+        self.assertIsNone(self.cog.find_violation(GUILD_ID, "palabra"))
+        self.assertIn("no está", self.run_command(ContentFilter.filter_remove, "palabra"))
+
+
+if __name__ == "__main__":
+    unittest.main()
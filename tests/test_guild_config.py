@@ -0,0 +1,43 @@
+import unittest
+
+from utils.guild_config import parse_value
+
+
+class ParseValueTests(unittest.TestCase):
+    def test_booleans(self):
+        self.assertIs(parse_value("raid_auto_lockdown", "Sí"), True)
+        self.assertIs(parse_value("raid_auto_lockdown", "off"), False)
+        with self.assertRaises(ValueError):
+            parse_value("raid_auto_lockdown", "quizá")
+
+    def test_integers_respect_minimum(self):
+        self.assertEqual(parse_value("spam_threshold", "8"), 8)
+        with self.assertRaises(ValueError):
+            parse_value("spam_threshold", "0")
+        with self.assertRaises(ValueError):
+            parse_value("spam_threshold", "2.5")
+
+    def test_floats_accept_decimal_comma(self):
+        self.assertEqual(parse_value("spam_weight_link", "1,5"), 1.5)
+        with self.assertRaises(ValueError):
+            parse_value("spam_weight_link", "nan")
+        with self.assertRaises(ValueError):
+            parse_value("spam_weight_link", "-1")
+
+    def test_strings(self):
+        self.assertEqual(parse_value("muted_role_name", "  Silenciado "), "Silenciado")
+        with self.assertRaises(ValueError):
+            parse_value("muted_role_name", "   ")
+
+    def test_allowed_values(self):
+        self.assertEqual(parse_value("filter_action", "MUTE"), "mute")
+        with self.assertRaises(ValueError):
+            parse_value("filter_action", "ban")
+
+    def test_unknown_key(self):
+        with self.assertRaises(KeyError):
+            parse_value("no_existe", "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
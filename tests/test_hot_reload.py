@@ -0,0 +1,126 @@
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import discord # type: ignore
+from discord.ext import commands # type: ignore
+
+from utils.hot_reload import reload_with_state, resolve_extension
+
+EXTENSION = "contador_de_prueba"
+
+# Extensión mínima con estado; `VERSION` permite distinguir el código antes y después de recargar
+SOURCE = """
+from discord.ext import commands
+
+VERSION = {version}
+
+
+class Contador(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.hits = {{}}
+        self.version = VERSION
+
+    def export_state(self):
+        return {{"hits": self.hits}}
+
+    def import_state(self, state):
+        self.hits.update(state["hits"])
+
+
+async def setup(bot):
+    await bot.add_cog(Contador(bot))
+"""
+
+
+class ReloadWithStateTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        sys.path.insert(0, self.directory)
+        self.addCleanup(sys.path.remove, self.directory)
+        self.addCleanup(sys.modules.pop, EXTENSION, None)
+        # Sin .pyc: dos versiones escritas en el mismo segundo podrían confundirse
+        patcher = mock.patch.object(sys, "dont_write_bytecode", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.write(SOURCE.format(version=1))
+
+    def write(self, source):
+        with open(os.path.join(self.directory, f"{EXTENSION}.py"), "w") as f:
+            f.write(source)
+
+    def run_bot(self, scenario):
+        async def main():
+            bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())
+            try:
+                return await scenario(bot)
+            finally:
+                await bot.close()
+
+        return asyncio.run(main())
+
+    def test_state_survives_a_reload(self):
+        async def scenario(bot):
+            await bot.load_extension(EXTENSION)
+            before = bot.get_cog("Contador")
+            before.hits[1] = 5
+            self.write(SOURCE.format(version=2))
+            restored, error = await reload_with_state(bot, resolve_extension(bot, "contador"))
+            return before, bot.get_cog("Contador"), restored, error
+
+        before, after, restored, error = self.run_bot(scenario)
+        self.assertIsNone(error)
+        self.assertEqual(restored, ["Contador"])
+        self.assertIsNot(after, before)
+        self.assertEqual(after.version, 2)
+        self.assertEqual(after.hits, {1: 5})
+
+    def test_state_returns_to_the_previous_code_if_the_reload_fails(self):
+        async def scenario(bot):
+            await bot.load_extension(EXTENSION)
+            bot.get_cog("Contador").hits[1] = 5
+            self.write("esto no es python")
+            restored, error = await reload_with_state(bot, EXTENSION)
+            return bot.get_cog("Contador"), restored, error
+
+        cog, restored, error = self.run_bot(scenario)
+        self.assertIsInstance(error, commands.ExtensionFailed)
+        self.assertEqual(restored, ["Contador"])
+        self.assertEqual(cog.version, 1)
+        self.assertEqual(cog.hits, {1: 5})
+
+    def test_import_errors_do_not_abort_the_reload(self):
+        async def scenario(bot):
+            await bot.load_extension(EXTENSION)
+            self.write(SOURCE.format(version=2).replace('state["hits"]', 'state["otra_clave"]'))
+            with self.assertLogs("utils.hot_reload", "ERROR"):
+                restored, error = await reload_with_state(bot, EXTENSION)
+            return bot.get_cog("Contador"), restored, error
+
+        cog, restored, error = self.run_bot(scenario)
+        self.assertIsNone(error)
+        self.assertEqual(restored, [])
+        self.assertEqual(cog.version, 2)
+
+
+class ResolveExtensionTests(unittest.TestCase):
+    def test_cog_names_and_module_names_resolve(self):
+        async def scenario():
+            bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())
+            try:
+                await bot.load_extension("cogs.utilities")
+                return [resolve_extension(bot, name) for name in ("Utilities", "utilities", "cogs.utilities", "moderation")]
+            finally:
+                await bot.close()
+
+        self.assertEqual(asyncio.run(scenario()), ["cogs.utilities", "cogs.utilities", "cogs.utilities", None])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from unittest import mock
+
+from utils.link_scanner import TTLCache, check_redirect_target, domain_in, extract_links, is_public_address
+
+
+class ExtractLinksTests(unittest.TestCase):
+    def test_domains_are_normalized(self):
+        links = extract_links("Mira https://WWW.Example.com/ruta?x=1, y http://sub.ejemplo.org.")
+        self.assertEqual(links, [
+            ("example.com", "https://WWW.Example.com/ruta?x=1", None),
+            ("sub.ejemplo.org", "http://sub.ejemplo.org", None),
+        ])
+
+    def test_invites_without_scheme(self):
+        links = extract_links("únete: discord.gg/abc-123 o https://discord.com/invite/XyZ")
+        self.assertEqual(links, [
+            ("discord.gg", "https://discord.gg/abc-123", "abc-123"),
+            ("discord.com", "https://discord.com/invite/XyZ", "XyZ"),
+        ])
+
+    def test_text_without_links(self):
+        self.assertEqual(extract_links("nada por aquí: example.com no tiene esquema"), [])
+
+    def test_domain_in_matches_parent_domains(self):
+        self.assertTrue(domain_in("a.b.ejemplo.com", {"ejemplo.com"}))
+        self.assertFalse(domain_in("ejemplo.com.evil", {"ejemplo.com"}))
+
+
+class RedirectTargetTests(unittest.TestCase):
+    def test_public_addresses(self):
+        self.assertTrue(is_public_address("93.184.216.34"))
+        self.assertTrue(is_public_address("2606:4700:4700::1111"))
+        for address in ("127.0.0.1", "10.0.0.1", "192.168.1.1", "169.254.169.254", "::1", "fc00::1", "224.0.0.1", "0.0.0.0", "localhost"):
+            with self.subTest(address=address):
+                self.assertFalse(is_public_address(address))
+
+    def test_allowed_targets(self):
+        check_redirect_target("https://example.com/a")
+        check_redirect_target("http://93.184.216.34/")
+
+    def test_rejected_targets(self):
+        for url in ("ftp://example.com/", "file:///etc/passwd", "http:///sin-host", "http://127.0.0.1:8080/",
+                    "http://[::1]/", "https://169.254.169.254/latest/meta-data/", "http://[::1"):
+            with self.subTest(url=url):
+                with self.assertRaises(ValueError):
+                    check_redirect_target(url)
+
+
+class TTLCacheTests(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)  # "a" pasa a ser la más reciente
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b", None))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual(len(cache), 2)
+
+    def test_expiry_and_stats(self):
+        cache = TTLCache(ttl=10)
+        with mock.patch("utils.link_scanner.time.monotonic", return_value=100.0):
+            cache.set("corta", "x", ttl=1)
+            cache.set("larga", None)  # None también es un valor válido
+        with mock.patch("utils.link_scanner.time.monotonic", return_value=105.0):
+            self.assertEqual(cache.get("corta", "caducada"), "caducada")
+            self.assertIsNone(cache.get("larga", "caducada"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(len(cache), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
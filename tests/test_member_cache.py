@@ -0,0 +1,57 @@
+import types
+import unittest
+
+from utils.member_cache import LAZY, MemberResolver
+
+
+class FakeGuild:
+    def __init__(self):
+        self.id = 1
+        self.chunked = False
+        self.cached = {}  # Miembros en la caché de discord.py
+
+    def get_member(self, member_id):
+        return self.cached.get(member_id)
+
+
+def make_member(guild, member_id, roles):
+    return types.SimpleNamespace(id=member_id, guild=guild, roles=roles)
+
+
+class RememberTests(unittest.TestCase):
+    def setUp(self):
+        self.members = MemberResolver()
+        self.members.configure(LAZY)
+        self.guild = FakeGuild()
+
+    def test_moderator_losing_role_is_unpinned(self):
+        self.members.remember(make_member(self.guild, 10, ["Moderadores"]), pinned=True)
+        self.assertIn(10, self.members.pinned[self.guild.id])
+
+        # Su siguiente mensaje ya no lo marca como moderador
+        member = make_member(self.guild, 10, [])
+        self.members.remember(member, pinned=False)
+
+        self.assertNotIn(10, self.members.pinned[self.guild.id])
+        self.assertIs(self.members.cached_member(self.guild, 10), member)
+
+    def test_new_moderator_is_pinned(self):
+        self.members.remember(make_member(self.guild, 10, []))
+        member = make_member(self.guild, 10, ["Moderadores"])
+        self.members.remember(member, pinned=True)
+
+        self.assertNotIn(10, self.members.recent[self.guild.id])
+        self.assertIs(self.members.cached_member(self.guild, 10), member)
+
+    def test_copy_is_dropped_once_discord_tracks_member(self):
+        self.members.remember(make_member(self.guild, 10, ["Moderadores"]), pinned=True)
+        updated = make_member(self.guild, 10, [])
+        self.guild.cached[10] = updated
+        self.members.remember(updated, pinned=False)
+
+        self.assertNotIn(10, self.members.pinned[self.guild.id])
+        self.assertIs(self.members.cached_member(self.guild, 10), updated)
+
+
+if __name__ == "__main__":
+    unittest.main()
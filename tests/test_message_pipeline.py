@@ -0,0 +1,68 @@
+import asyncio
+import types
+import unittest
+from unittest import mock
+
+import discord # type: ignore
+
+from cogs.pipeline import Pipeline
+from utils.message_pipeline import MessagePipeline
+
+
+class FakeGuild:
+    def __init__(self):
+        self.id = 1
+        self.cached = {}  # Miembros en la caché de discord.py
+
+    def get_member(self, member_id):
+        return self.cached.get(member_id)
+
+
+def make_member(guild, member_id, roles, permissions):
+    return types.SimpleNamespace(id=member_id, guild=guild, roles=roles, guild_permissions=permissions)
+
+
+class IsExemptTests(unittest.TestCase):
+    def setUp(self):
+        self.pipeline = MessagePipeline()
+        self.guild = FakeGuild()
+
+    def test_cached_member_is_reevaluated_after_role_change(self):
+        member = make_member(self.guild, 10, [], discord.Permissions.none())
+        self.guild.cached[member.id] = member
+        self.assertFalse(self.pipeline.is_exempt(self.guild.id, member))
+
+        # Recibe el rol de moderador y discord.py despacha on_member_update
+        after = make_member(self.guild, 10, ["Moderadores"], discord.Permissions(manage_messages=True))
+        self.guild.cached[member.id] = after
+        with mock.patch("cogs.pipeline.pipeline", self.pipeline):
+            asyncio.run(Pipeline.on_member_update(None, member, after))
+
+        self.assertTrue(self.pipeline.is_exempt(self.guild.id, after))
+
+    def test_uncached_member_is_reevaluated_without_events(self):
+        # Con MEMBER_CACHE=lazy el autor puede no estar en caché y no hay on_member_update
+        member = make_member(self.guild, 20, ["Moderadores"], discord.Permissions(manage_messages=True))
+        self.assertTrue(self.pipeline.is_exempt(self.guild.id, member))
+
+        # El siguiente mensaje trae los roles actuales del autor, ya sin el de moderador
+        member = make_member(self.guild, 20, [], discord.Permissions.none())
+        self.assertFalse(self.pipeline.is_exempt(self.guild.id, member))
+        self.assertNotIn(20, self.pipeline.exemptions.get(self.guild.id, {}))
+
+    def test_role_permission_change_invalidates_guild(self):
+        member = make_member(self.guild, 30, ["Ayudantes"], discord.Permissions.none())
+        self.guild.cached[member.id] = member
+        self.assertFalse(self.pipeline.is_exempt(self.guild.id, member))
+
+        member.guild_permissions = discord.Permissions(administrator=True)
+        before = types.SimpleNamespace(guild=self.guild, permissions=discord.Permissions.none())
+        after = types.SimpleNamespace(guild=self.guild, permissions=discord.Permissions(administrator=True))
+        with mock.patch("cogs.pipeline.pipeline", self.pipeline):
+            asyncio.run(Pipeline.on_guild_role_update(None, before, after))
+
+        self.assertTrue(self.pipeline.is_exempt(self.guild.id, member))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import asyncio
+import types
+import unittest
+
+import discord # type: ignore
+from discord.ext import commands # type: ignore
+
+from cogs.content_filter import ContentFilter
+from cogs.link_scanner import LinkScanner
+from cogs.raid import RaidProtection
+from cogs.settings import Settings
+from cogs.warnings import Warnings
+
+# Grupos de comandos de administración. Con invoke_without_command=True, discord.py no ejecuta
+# las comprobaciones del grupo al invocar uno de sus subcomandos, así que cada subcomando
+# declara las suyas; estas pruebas comprueban que ninguno se quede sin ellas.
+ADMIN_GROUPS = {
+    Warnings: "escalado",
+    Settings: "config",
+    RaidProtection: "raid",
+    ContentFilter: "filtro",
+    LinkScanner: "enlaces",
+}
+
+
+def make_context(permissions, guild=True):
+    return types.SimpleNamespace(guild=object() if guild else None, permissions=permissions)
+
+
+async def run_checks(command, ctx):
+    for check in command.checks:
+        await discord.utils.maybe_coroutine(check, ctx)
+
+
+def admin_groups():
+    for cog, name in ADMIN_GROUPS.items():
+        yield next(command for command in cog.__cog_commands__ if command.name == name)
+
+
+def admin_subcommands():
+    for group in admin_groups():
+        yield from group.walk_commands()
+
+
+class AdminSubcommandTests(unittest.TestCase):
+    def test_every_group_has_subcommands(self):
+        for group in admin_groups():
+            with self.subTest(group=group.name):
+                self.assertTrue(group.commands)
+
+    def test_subcommands_require_administrator(self):
+        moderator = discord.Permissions(manage_messages=True, kick_members=True, ban_members=True)
+        for command in admin_subcommands():
+            with self.subTest(command=command.qualified_name):
+                with self.assertRaises(commands.MissingPermissions):
+                    asyncio.run(run_checks(command, make_context(moderator)))
+                asyncio.run(run_checks(command, make_context(discord.Permissions(administrator=True))))
+
+    def test_subcommands_are_guild_only(self):
+        for command in admin_subcommands():
+            with self.subTest(command=command.qualified_name):
+                with self.assertRaises(commands.CheckFailure):
+                    asyncio.run(run_checks(command, make_context(discord.Permissions(administrator=True), guild=False)))
+
+
+if __name__ == "__main__":
+    unittest.main()
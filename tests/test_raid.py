@@ -0,0 +1,189 @@
+import asyncio
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import discord # type: ignore
+
+from cogs.raid import JoinBucket, RaidProtection
+from utils.guild_config import DEFAULTS
+
+GUILD_ID = 1
+START = 1_700_000_000.0
+
+
+class Clock:
+    """Sustituye a `time` en cogs.raid: monotonic y time avanzan juntos y a mano."""
+
+    def __init__(self):
+        self.now = START
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+def make_member(member_id, account_age_days):
+    created_at = datetime.datetime.fromtimestamp(START - account_age_days * 86400, datetime.timezone.utc)
+    return types.SimpleNamespace(id=member_id, guild=types.SimpleNamespace(id=GUILD_ID), created_at=created_at)
+
+
+class RaidTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch("cogs.raid.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cog = RaidProtection(types.SimpleNamespace())
+        self.config = dict(DEFAULTS, raid_join_threshold=3, raid_join_window=30, raid_cluster_size=3)
+
+
+class JoinBucketTests(RaidTestCase):
+    def test_bucket_allows_a_burst_and_refills_over_the_window(self):
+        bucket = JoinBucket(3)
+        self.assertEqual([bucket.consume(3, 30) for _ in range(4)], [True, True, True, False])
+        self.clock.now += 10 # Una ficha cada 10 segundos
+        self.assertEqual([bucket.consume(3, 30) for _ in range(2)], [True, False])
+        self.clock.now += 3600 # Nunca se acumulan más de `capacity`
+        self.assertEqual([bucket.consume(3, 30) for _ in range(4)], [True, True, True, False])
+
+
+class JoinRateTests(RaidTestCase):
+    def join(self, member_id, account_age_days=365):
+        return self.cog.detect_raid(make_member(member_id, account_age_days), self.config)
+
+    def test_joins_over_the_rate_are_a_raid(self):
+        self.assertEqual([self.join(i) for i in range(3)], [None, None, None])
+        reason, suspects = self.join(3)
+        self.assertIn("Más de 3 entradas en 30 segundos", reason)
+        self.assertEqual(suspects, []) # Cuentas antiguas: no se señala a nadie
+
+    def test_joins_spread_over_time_are_not_a_raid(self):
+        for member_id in range(10):
+            self.assertIsNone(self.join(member_id))
+            self.clock.now += 10
+
+    def test_new_accounts_created_together_are_a_raid(self):
+        self.assertIsNone(self.join(1, account_age_days=1))
+        self.clock.now += 60
+        self.assertIsNone(self.join(2, account_age_days=1.01))
+        self.clock.now += 60
+        self.assertIsNone(self.join(3, account_age_days=30)) # Cuenta antigua: no cuenta para el grupo
+        self.clock.now += 60
+        reason, suspects = self.join(4, account_age_days=1.02)
+        self.assertIn("cuentas nuevas", reason)
+        self.assertEqual(suspects, [1, 2, 4])
+
+    def test_new_accounts_created_far_apart_are_not_a_raid(self):
+        for member_id, age in enumerate((1, 3, 5)):
+            self.assertIsNone(self.join(member_id, account_age_days=age))
+            self.clock.now += 60
+
+    def test_guilds_are_tracked_separately(self):
+        for _ in range(3):
+            self.join(1)
+        other = make_member(2, 365)
+        other.guild = types.SimpleNamespace(id=GUILD_ID + 1)
+        self.assertIsNone(self.cog.detect_raid(other, self.config))
+
+
+class FakeChannel:
+    """Canal de texto que guarda los permisos de @everyone como discord.py."""
+
+    def __init__(self, channel_id, overwrite=None, fail=False):
+        self.id = channel_id
+        self.mention = f"<#{channel_id}>"
+        self.overwrite = overwrite
+        self.fail = fail
+
+    def overwrites_for(self, role):
+        if self.overwrite is None:
+            return discord.PermissionOverwrite()
+        return discord.PermissionOverwrite.from_pair(*self.overwrite.pair())
+
+    async def set_permissions(self, role, overwrite=None, reason=None):
+        if self.fail:
+            raise discord.Forbidden(mock.Mock(status=403, reason="Forbidden"), "Missing Permissions")
+        self.overwrite = overwrite
+
+
+class LockdownTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.lockdowns_file = os.path.join(self.directory, "lockdowns.json")
+        patcher = mock.patch("cogs.raid.LOCKDOWNS_FILE", self.lockdowns_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.custom = discord.PermissionOverwrite(view_channel=True, send_messages=True, attach_files=False)
+        self.channels = {
+            "sin_permisos": FakeChannel(1),
+            "personalizado": FakeChannel(2, overwrite=self.custom),
+            "cerrado": FakeChannel(3, overwrite=discord.PermissionOverwrite(send_messages=False, send_messages_in_threads=False)),
+            "sin_acceso": FakeChannel(4, fail=True),
+        }
+        self.guild = types.SimpleNamespace(
+            id=GUILD_ID, default_role=object(), text_channels=list(self.channels.values()),
+            get_channel=lambda channel_id: next((c for c in self.channels.values() if c.id == channel_id), None)
+        )
+
+    def run_command(self, cog, command, **kwargs):
+        message = types.SimpleNamespace(edit=mock.AsyncMock())
+        ctx = types.SimpleNamespace(guild=self.guild, author="admin", defer=mock.AsyncMock(),
+                                    send=mock.AsyncMock(return_value=message))
+        asyncio.run(command.callback(cog, ctx, **kwargs))
+        return message.edit.call_args.kwargs["content"]
+
+    def new_cog(self):
+        """Cog recién cargado (como tras reiniciar el bot), con los permisos guardados en disco."""
+        cog = RaidProtection(types.SimpleNamespace())
+        cog.load_channel_snapshots()
+        return cog
+
+    def test_unlock_restores_the_exact_permissions_after_a_restart(self):
+        content = self.run_command(self.new_cog(), RaidProtection.lockdown, razon="raid")
+        self.assertIn("2/3 canales cerrados", content)
+        self.assertIn("<#4>: sin permisos", content)
+        for name in ("sin_permisos", "personalizado"):
+            overwrite = self.channels[name].overwrite
+            self.assertIs(overwrite.send_messages, False)
+            self.assertIs(overwrite.send_messages_in_threads, False)
+
+        # Solo se guardan los canales que se bloquearon
+        with open(self.lockdowns_file) as f:
+            snapshot = json.load(f)[str(GUILD_ID)]
+        self.assertEqual(snapshot, {"1": None, "2": [value.value for value in self.custom.pair()]})
+
+        content = self.run_command(self.new_cog(), RaidProtection.unlock)
+        self.assertIn("2/2 canales restaurados", content)
+        self.assertIsNone(self.channels["sin_permisos"].overwrite)
+        self.assertEqual(self.channels["personalizado"].overwrite, self.custom)
+        self.assertIs(self.channels["cerrado"].overwrite.send_messages, False) # Ya estaba cerrado: no se toca
+        with open(self.lockdowns_file) as f:
+            self.assertEqual(json.load(f), {})
+
+    def test_failed_restores_are_kept_for_a_retry(self):
+        cog = self.new_cog()
+        self.run_command(cog, RaidProtection.lockdown, razon="raid")
+        self.channels["personalizado"].fail = True
+
+        content = self.run_command(cog, RaidProtection.unlock)
+        self.assertIn("1/2 canales restaurados", content)
+        self.assertEqual(cog.channel_snapshots, {str(GUILD_ID): {"2": [value.value for value in self.custom.pair()]}})
+
+        self.channels["personalizado"].fail = False
+        self.assertIn("1/1 canales restaurados", self.run_command(cog, RaidProtection.unlock))
+        self.assertEqual(self.channels["personalizado"].overwrite, self.custom)
+        self.assertEqual(cog.channel_snapshots, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import re
+import time
+import unittest
+
+from utils.safe_regex import MAX_PATTERN_COST, pattern_cost
+
+
+class PatternCostTests(unittest.TestCase):
+    def test_accepted_patterns(self):
+        self.assertEqual(pattern_cost(r"discord\.gg/\w+"), 1)
+        self.assertEqual(pattern_cost(r"https?://\S+"), 2)
+        self.assertEqual(pattern_cost(r"(?:www\.)?example\.com"), 2)
+        self.assertEqual(pattern_cost(r"x\w{0,9}y\w{0,9}z"), MAX_PATTERN_COST)
+        self.assertEqual(pattern_cost(r"spam|scam"), 2)
+
+    def test_rejected_patterns(self):
+        for pattern in (r"(a+)+$", r"\w*\w*$", r"\w*$", r"(a|aa)+", r"(\w)\1", r"(?=x)y", r"(?<!a)b",
+                        r"\w{1,30}\w{1,30}!", r"(", r"(?(1)a|b)"):
+            with self.subTest(pattern=pattern):
+                with self.assertRaises(ValueError):
+                    pattern_cost(pattern)
+
+    def test_accepted_patterns_run_fast_on_hostile_input(self):
+        text = "a" * 5000 + "!"
+        for pattern in (r"a\w{0,9}b\w{0,9}c", r"(?:a{0,4})?a{0,9}x", r"\w+"):
+            pattern_cost(pattern)
+            start = time.perf_counter()
+            re.search(pattern, text)
+            self.assertLess(time.perf_counter() - start, 0.5, pattern)
+
+
+if __name__ == "__main__":
+    unittest.main()
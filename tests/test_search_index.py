@@ -0,0 +1,53 @@
+import unittest
+
+from utils.search_index import SearchIndex, tokenize
+
+
+class TokenizeTests(unittest.TestCase):
+    def test_lowercases_and_strips_accents(self):
+        self.assertEqual(tokenize("Spam en CANAL de Música!"), ["spam", "en", "canal", "de", "musica"])
+
+    def test_empty_reason(self):
+        self.assertEqual(tokenize(None), [])
+
+
+class SearchIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.add("r1", "Spam de enlaces", kind="report", guild_id=1, user_id=10, status="pending", timestamp="2024-01-01T10:00:00")
+        self.index.add("r2", "Insultos y spam", kind="report", guild_id=1, user_id=11, status="closed", timestamp="2024-02-01T10:00:00")
+        self.index.add("w1", "spam", kind="warning", guild_id=1, user_id=10, status="active", timestamp="2024-03-01T10:00:00")
+        self.index.add("o1", "spam", kind="report", guild_id=2, user_id=10, status="pending", timestamp="2024-04-01T10:00:00")
+
+    def test_search_is_scoped_to_guild_and_sorted_by_recency(self):
+        results = self.index.search("SPAM", 1)
+        self.assertEqual([document["timestamp"][:7] for document in results], ["2024-03", "2024-02", "2024-01"])
+
+    def test_all_terms_must_match(self):
+        results = self.index.search("spam enlaces", 1)
+        self.assertEqual([document["reason"] for document in results], ["Spam de enlaces"])
+        self.assertEqual(self.index.search("spam inexistente", 1), [])
+        self.assertEqual(self.index.search("", 1), [])
+
+    def test_filters(self):
+        self.assertEqual(len(self.index.search("spam", 1, user_id=10)), 2)
+        self.assertEqual(len(self.index.search("spam", 1, kind="warning")), 1)
+        self.assertEqual(len(self.index.search("spam", 1, status="closed")), 1)
+
+    def test_update_status(self):
+        self.index.update_status("r1", "closed")
+        self.assertEqual(len(self.index.search("spam", 1, status="closed")), 2)
+
+    def test_remove_and_replace(self):
+        self.index.remove("r1")
+        self.assertEqual(self.index.search("enlaces", 1), [])
+        self.assertNotIn(("1", "enlaces"), self.index.postings)
+
+        self.index.add("r2", "Flood", kind="report", guild_id=1, user_id=11, status="closed", timestamp="2024-02-01T10:00:00")
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(len(self.index.search("insultos", 1)), 0)
+        self.assertEqual(len(self.index.search("flood", 1)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
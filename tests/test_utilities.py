@@ -0,0 +1,113 @@
+import asyncio
+import datetime
+import types
+import unittest
+from unittest import mock
+
+import discord # type: ignore
+
+from cogs.utilities import Utilities
+from utils.member_cache import members
+
+GUILD_ID = 1
+
+
+def make_member(member_id, bot=False, status=discord.Status.online):
+    return types.SimpleNamespace(id=member_id, bot=bot, status=status, guild=types.SimpleNamespace(id=GUILD_ID))
+
+
+def make_guild(member_list, chunked=True, member_count=None):
+    return types.SimpleNamespace(
+        id=GUILD_ID, name="Servidor", members=member_list, chunked=chunked,
+        member_count=len(member_list) if member_count is None else member_count,
+        text_channels=[], voice_channels=[], categories=[], roles=[object()], emojis=[], features=[],
+        icon=None, owner=types.SimpleNamespace(mention="<@1>"), premium_tier=0,
+        created_at=datetime.datetime(2020, 1, 1)
+    )
+
+
+class UtilitiesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cog = Utilities(types.SimpleNamespace(is_ready=lambda: False, guilds=[]))
+
+    def tearDown(self):
+        self.cog.cog_unload()
+
+    def serverinfo(self, guild):
+        ctx = types.SimpleNamespace(guild=guild, defer=mock.AsyncMock(), send=mock.AsyncMock())
+        asyncio.run(Utilities.serverinfo.callback(self.cog, ctx))
+        embed = ctx.send.call_args.kwargs["embed"]
+        return {field.name: field.value for field in embed.fields}, embed.footer.text
+
+
+class ServerInfoTests(UtilitiesTestCase):
+    def test_counts_are_marked_partial_until_the_guild_is_chunked(self):
+        guild = make_guild([make_member(1), make_member(2, bot=True)], chunked=False, member_count=10)
+        fields, footer = self.serverinfo(guild)
+        self.assertEqual((fields["Miembros en Línea"], fields["Bots"], fields["Humanos"]),
+                         ("2 (parcial)", "1 (parcial)", "9 (parcial)"))
+        self.assertIsNotNone(footer)
+
+        guild.members += [make_member(3, bot=True)] + [make_member(i, status=discord.Status.offline) for i in range(4, 11)]
+
+        async def chunk(cache):
+            guild.chunked = True
+
+        guild.chunk = chunk
+        asyncio.run(members._chunk(guild)) # Al terminar la descarga se vuelven a contar
+        fields, footer = self.serverinfo(guild)
+        self.assertEqual((fields["Miembros en Línea"], fields["Bots"], fields["Humanos"]), ("3", "2", "8"))
+        self.assertIsNone(footer)
+
+
+class CounterTests(UtilitiesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.guild = make_guild([make_member(1), make_member(2, bot=True), make_member(3, status=discord.Status.offline)])
+        asyncio.run(self.cog.seed_counters(self.guild))
+
+    def counts(self):
+        counters = self.cog.guild_counters[GUILD_ID]
+        return counters.online, counters.bots
+
+    def test_events_keep_the_counters_up_to_date(self):
+        self.assertEqual(self.counts(), (2, 1))
+        asyncio.run(self.cog.on_member_join(make_member(4, bot=True)))
+        asyncio.run(self.cog.on_member_join(make_member(5, status=discord.Status.offline)))
+        self.assertEqual(self.counts(), (3, 2))
+
+        asyncio.run(self.cog.on_presence_update(make_member(5, status=discord.Status.offline), make_member(5)))
+        asyncio.run(self.cog.on_presence_update(make_member(1), make_member(1, status=discord.Status.idle))) # Sigue en línea
+        self.assertEqual(self.counts(), (4, 2))
+
+        asyncio.run(self.cog.on_member_remove(make_member(4, bot=True)))
+        asyncio.run(self.cog.on_presence_update(make_member(1), make_member(1, status=discord.Status.offline)))
+        self.assertEqual(self.counts(), (2, 1))
+
+        fields, _ = self.serverinfo(self.guild)
+        self.assertEqual((fields["Miembros en Línea"], fields["Bots"]), ("2", "1"))
+
+    def test_counters_never_go_negative(self):
+        for _ in range(5):
+            asyncio.run(self.cog.on_member_remove(make_member(2, bot=True)))
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_unseeded_guilds_are_counted_on_demand(self):
+        asyncio.run(self.cog.on_guild_remove(self.guild))
+        self.assertNotIn(GUILD_ID, self.cog.guild_counters)
+        asyncio.run(self.cog.on_member_join(make_member(4))) # Sin contadores: se ignora
+        self.assertNotIn(GUILD_ID, self.cog.guild_counters)
+
+        fields, _ = self.serverinfo(self.guild)
+        self.assertEqual((fields["Miembros en Línea"], fields["Bots"], fields["Humanos"]), ("2", "1", "2"))
+
+    def test_counters_survive_a_reload(self):
+        reloaded = Utilities(types.SimpleNamespace(is_ready=lambda: False, guilds=[]))
+        self.addCleanup(reloaded.cog_unload)
+        reloaded.import_state(self.cog.export_state())
+        counters = reloaded.guild_counters[GUILD_ID]
+        self.assertEqual((counters.online, counters.bots), (2, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+import asyncio
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import discord # type: ignore
+
+from cogs.search import Search
+from cogs.warnings import Warnings
+from utils.guild_config import GuildConfigStore
+
+GUILD_ID = "1"
+
+
+class FakeBot:
+    def __init__(self):
+        self.cogs = {}
+        self.user = types.SimpleNamespace(id=1)
+
+    def get_cog(self, name):
+        return self.cogs.get(name)
+
+    async def wait_until_ready(self):
+        pass
+
+
+def days_ago(days):
+    return (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
+
+
+class WarningsTestCase(unittest.TestCase):
+    """Cog de advertencias con sus archivos y su configuración en un directorio temporal."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.config = GuildConfigStore(os.path.join(self.directory, "guild_config.json"))
+        for module in ("cogs.warnings", "cogs.search"):
+            patcher = mock.patch(f"{module}.guild_config", self.config)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.bot = FakeBot()
+        self.cog = Warnings(self.bot)
+        self.cog.warnings_file = os.path.join(self.directory, "warnings.json")
+        self.cog.archive_file = os.path.join(self.directory, "warnings_archive.jsonl")
+        self.search = self.bot.cogs["Search"] = Search(self.bot)
+
+    def tearDown(self):
+        self.config.remove_listener(self.cog.on_config_change)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def load(self, warnings):
+        """Carga advertencias como si vinieran del archivo e indexa la búsqueda."""
+        self.cog.warnings = warnings
+        self.search.build_index({}, warnings, [])
+        self.cog.rebuild_counts()
+
+    def statuses(self):
+        return sorted((document["reason"], document["status"]) for document in self.search.index.documents.values())
+
+
+class SearchStatusTests(WarningsTestCase):
+    def test_ttl_changes_update_search_status(self):
+        self.load({GUILD_ID: {"10": [
+            {"reason": "antigua", "timestamp": days_ago(10), "moderator": "99"},
+            {"reason": "reciente", "timestamp": days_ago(1), "moderator": "99"},
+        ]}})
+        self.assertEqual(self.statuses(), [("antigua", "activa"), ("reciente", "activa")])
+
+        # Al reducir la caducidad, la advertencia antigua caduca en cuanto se reconstruyen los índices
+        self.config.set(GUILD_ID, "warning_ttl_days", 5)
+        self.assertEqual(self.statuses(), [("antigua", "expirada"), ("reciente", "activa")])
+        self.assertEqual(self.cog.get_warning_count(GUILD_ID, "10"), 1)
+
+        # Al ampliarla antes de compactar, vuelve a estar activa
+        self.config.set(GUILD_ID, "warning_ttl_days", 30)
+        self.assertEqual(self.statuses(), [("antigua", "activa"), ("reciente", "activa")])
+        self.assertEqual(self.cog.get_warning_count(GUILD_ID, "10"), 2)
+
+
+class EscalationTests(WarningsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.moderation = self.bot.cogs["Moderation"] = types.SimpleNamespace(
+            mute_member=mock.AsyncMock(return_value=object()), kick_member=mock.AsyncMock(), ban_member=mock.AsyncMock()
+        )
+        self.channel = types.SimpleNamespace(send=mock.AsyncMock())
+        self.guild = types.SimpleNamespace(id=int(GUILD_ID))
+        self.member = types.SimpleNamespace(id=10, mention="<@10>")
+        self.config.set(GUILD_ID, "escalation", {"2": {"action": "mute", "duration": "1h"}, "3": {"action": "kick"}})
+
+    def warn(self, times):
+        """Advierte al miembro `times` veces y devuelve la acción aplicada en cada una."""
+        async def scenario():
+            actions = []
+            for _ in range(times):
+                count = self.cog.add_warning(GUILD_ID, self.member.id, "razón", 99)
+                actions.append(await self.cog.apply_escalation(self.guild, self.channel, self.member, count))
+            await asyncio.gather(*self.cog.pending_writes)
+            return actions
+
+        return asyncio.run(scenario())
+
+    def test_policy_steps_apply_at_their_warning_count(self):
+        self.assertEqual(self.warn(4), [None, "mute", "kick", None])
+        self.moderation.mute_member.assert_awaited_once()
+        self.assertEqual(self.moderation.mute_member.call_args.args[:3], (self.guild, self.member, 3600))
+        self.moderation.kick_member.assert_awaited_once()
+        self.moderation.ban_member.assert_not_awaited()
+
+    def test_failed_actions_are_reported_and_not_applied(self):
+        self.moderation.mute_member.return_value = None # Sin rol de silenciado
+        self.moderation.kick_member.side_effect = discord.Forbidden(mock.Mock(status=403, reason="Forbidden"), "Missing Permissions")
+        self.assertEqual(self.warn(3), [None, None, None])
+        notices = [call.args[0] for call in self.channel.send.call_args_list]
+        self.assertEqual(len(notices), 2)
+        self.assertIn("'Muted'", notices[0])
+        self.assertIn("permisos", notices[1])
+
+    def test_missing_moderation_cog_is_reported(self):
+        del self.bot.cogs["Moderation"]
+        self.assertEqual(self.warn(2), [None, None])
+        self.assertIn("moderación no está cargado", self.channel.send.call_args.args[0])
+
+
+class ExpiryTests(WarningsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.config.set(GUILD_ID, "warning_ttl_days", 5)
+
+    def test_warnings_stop_counting_when_they_expire(self):
+        self.load({GUILD_ID: {"10": [
+            {"reason": "a", "timestamp": days_ago(4), "moderator": "99"},
+            {"reason": "b", "timestamp": days_ago(2), "moderator": "99"},
+        ]}})
+        self.assertEqual(self.cog.get_warning_count(GUILD_ID, "10"), 2)
+
+        later = datetime.datetime.now() + datetime.timedelta(days=2)
+        with mock.patch("cogs.warnings.time.time", return_value=later.timestamp()):
+            self.assertEqual(self.cog.get_warning_count(GUILD_ID, "10"), 1)
+        self.assertEqual(self.statuses(), [("a", "expirada"), ("b", "activa")])
+        self.assertEqual(len(self.cog.pending_compaction), 1)
+
+    def test_compaction_moves_expired_warnings_to_the_archive(self):
+        self.load({GUILD_ID: {
+            "10": [{"reason": "antigua", "timestamp": days_ago(10), "moderator": "99"},
+                   {"reason": "reciente", "timestamp": days_ago(1), "moderator": "99"}],
+            "11": [{"reason": "caducada", "timestamp": days_ago(6), "moderator": "99"}],
+        }})
+        with mock.patch("cogs.warnings.COMPACTION_BATCH_SIZE", 1): # Cede el bucle en cada advertencia
+            asyncio.run(self.cog.compaction_task.coro(self.cog))
+
+        self.assertEqual(self.cog.warnings, {GUILD_ID: {"10": [{"reason": "reciente", "timestamp": mock.ANY, "moderator": "99"}]}})
+        self.assertFalse(self.cog.pending_compaction)
+        with open(self.cog.warnings_file) as f:
+            self.assertEqual(json.load(f), self.cog.warnings)
+        with open(self.cog.archive_file, encoding="utf-8") as f:
+            archived = [json.loads(line) for line in f]
+        self.assertEqual(sorted((w["user_id"], w["reason"]) for w in archived), [("10", "antigua"), ("11", "caducada")])
+        self.assertTrue(all(w["guild_id"] == GUILD_ID for w in archived))
+
+    def test_compaction_without_expired_warnings_writes_nothing(self):
+        self.load({GUILD_ID: {"10": [{"reason": "reciente", "timestamp": days_ago(1), "moderator": "99"}]}})
+        asyncio.run(self.cog.compaction_task.coro(self.cog))
+        self.assertEqual(os.listdir(self.directory), ["guild_config.json"])
+
+
+class SaveTests(WarningsTestCase):
+    def test_saves_run_off_the_event_loop_and_keep_the_latest_version(self):
+        async def scenario():
+            self.cog.save_warnings({GUILD_ID: {"10": [{"reason": "a"}]}})
+            self.cog.save_warnings({GUILD_ID: {"10": [{"reason": "a"}, {"reason": "b"}]}})
+            self.assertTrue(self.cog.pending_writes)
+            await self.cog.cog_unload()  # Espera a las escrituras pendientes
+            self.assertFalse(self.cog.pending_writes)
+
+        asyncio.run(scenario())
+        with open(self.cog.warnings_file) as f:
+            self.assertEqual(len(json.load(f)[GUILD_ID]["10"]), 2)
+        self.assertEqual(os.listdir(self.directory), ["warnings.json"])
+
+    def test_stale_snapshot_is_not_written(self):
+        async def scenario():
+            version = self.cog.save_version
+            self.cog.save_warnings({"nuevo": {}})
+            await asyncio.gather(*self.cog.pending_writes)
+            return self.cog.write_warnings_file(json.dumps({"viejo": {}}), version)
+
+        self.assertFalse(asyncio.run(scenario()))
+        with open(self.cog.warnings_file) as f:
+            self.assertEqual(json.load(f), {"nuevo": {}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import collections
+
+
+class AhoCorasick:
+    """
+    Autómata de Aho-Corasick para buscar muchos términos a la vez.
+
+    Una búsqueda recorre el texto una sola vez, así que su coste es lineal en la longitud
+    del texto (más el número de coincidencias) sin importar cuántos términos haya.
+    Añadir un término lo inserta en el trie existente y solo obliga a recalcular los enlaces
+    de fallo; quitar uno reconstruye el autómata. Ambos se aplican de forma perezosa en la
+    siguiente búsqueda.
+    """
+
+    def __init__(self, terms=()):
+        self.terms = set()
+        self.goto = [{}]      # nodo: {carácter: nodo hijo}
+        self.terminal = [None]  # nodo: término que termina exactamente en ese nodo
+        self.fail = [0]
+        self.output = [()]    # nodo: términos que terminan en ese nodo o en sus sufijos
+        self.dirty = False
+        for term in terms:
+            self.add(term)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def add(self, term):
+        """Inserta un término en el trie."""
+        if not term or term in self.terms:
+            return
+        self.terms.add(term)
+        node = 0
+        for char in term:
+            child = self.goto[node].get(char)
+            if child is None:
+                child = len(self.goto)
+                self.goto[node][char] = child
+                self.goto.append({})
+                self.terminal.append(None)
+                self.fail.append(0)
+                self.output.append(())
+            node = child
+        self.terminal[node] = term
+        self.dirty = True
+
+    def remove(self, term):
+        """Quita un término reconstruyendo el trie con los restantes."""
+        if term not in self.terms:
+            return
+        remaining = self.terms - {term}
+        self.__init__(remaining)
+
+    def build(self):
+        """Calcula los enlaces de fallo y las salidas con un recorrido en anchura."""
+        queue = collections.deque()
+        for child in self.goto[0].values():
+            self.fail[child] = 0
+            queue.append(child)
+        self.output[0] = ()
+
+        while queue:
+            node = queue.popleft()
+            own = (self.terminal[node],) if self.terminal[node] is not None else ()
+            self.output[node] = own + self.output[self.fail[node]]
+            for char, child in self.goto[node].items():
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(char, 0)
+                queue.append(child)
+
+        self.dirty = False
+
+    def iter_matches(self, text):
+        """Genera (inicio, fin, término) para cada aparición de un término en `text`."""
+        if self.dirty:
+            self.build()
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for term in output[node]:
+                yield index + 1 - len(term), index + 1, term
@@ -0,0 +1,101 @@
+import datetime
+import json
+import logging
+import os
+
+from utils.cluster import cluster_lock
+
+logger = logging.getLogger(__name__)
+
+CASES_FILE = 'data/cases.jsonl'
+
+
+class CaseLog:
+    """
+    Registro de casos de moderación de solo inserción.
+
+    Cada caso se añade como una línea JSON al final de `data/cases.jsonl` y nunca se modifica.
+    En memoria se mantienen los casos por servidor y número de caso, y dos índices, por usuario
+    sancionado y por moderador, para responder consultas sin recorrer todo el historial. Los
+    números no dependen de la posición en el archivo: si se descarta una línea corrupta, el
+    siguiente caso sigue al número más alto registrado.
+    """
+
+    def __init__(self, filepath=CASES_FILE):
+        self.filepath = filepath
+        self.cases = {}         # guild_id: {número de caso: caso}
+        self.next_number = {}   # guild_id: número del próximo caso
+        self.by_target = {}     # (guild_id, target_id): [número de caso, ...]
+        self.by_moderator = {}  # (guild_id, moderator_id): [número de caso, ...]
+
+    def load(self):
+        """Carga el historial desde el archivo y reconstruye los índices."""
+        self.cases.clear()
+        self.next_number.clear()
+        self.by_target.clear()
+        self.by_moderator.clear()
+
+        if not os.path.exists(self.filepath):
+            return
+
+        with open(self.filepath, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    case = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Línea %s corrupta en %s, se ignora.", line_number, self.filepath)
+                    continue
+                self._index(case)
+
+    def _index(self, case):
+        guild_id = case["guild_id"]
+        number = case["case"]
+        guild_cases = self.cases.setdefault(guild_id, {})
+        if number in guild_cases:
+            logger.warning("Caso %s duplicado en el servidor %s de %s, se ignora.", number, guild_id, self.filepath)
+            return
+        guild_cases[number] = case
+        self.next_number[guild_id] = max(self.next_number.get(guild_id, 1), number + 1)
+        self.by_target.setdefault((guild_id, case["target_id"]), []).append(number)
+        self.by_moderator.setdefault((guild_id, case["moderator_id"]), []).append(number)
+
+    def record(self, guild_id, action, target_id, moderator_id, reason, duration=None):
+        """Registra un nuevo caso y devuelve sus datos."""
+        guild_id = str(guild_id)
+        case = {
+            "case": self.next_number.get(guild_id, 1),
+            "guild_id": guild_id,
+            "action": action,
+            "target_id": str(target_id),
+            "moderator_id": str(moderator_id),
+            "reason": reason,
+            "duration": duration,
+            "timestamp": datetime.datetime.utcnow().isoformat()
+        }
+
+        directory = os.path.dirname(self.filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with cluster_lock(self.filepath), open(self.filepath, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(case, ensure_ascii=False) + "\n")
+
+        self._index(case)
+        return case
+
+    def get_case(self, guild_id, case_number):
+        """Devuelve un caso concreto o None si no existe."""
+        return self.cases.get(str(guild_id), {}).get(case_number)
+
+    def cases_for_target(self, guild_id, target_id):
+        """Casos sobre un usuario, del más reciente al más antiguo."""
+        guild_cases = self.cases.get(str(guild_id), {})
+        numbers = self.by_target.get((str(guild_id), str(target_id)), [])
+        return [guild_cases[number] for number in reversed(numbers)]
+
+    def cases_by_moderator(self, guild_id, moderator_id):
+        """Casos aplicados por un moderador, del más reciente al más antiguo."""
+        guild_cases = self.cases.get(str(guild_id), {})
+        numbers = self.by_moderator.get((str(guild_id), str(moderator_id)), [])
+        return [guild_cases[number] for number in reversed(numbers)]
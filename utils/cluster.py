@@ -0,0 +1,192 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+
+from discord.ext import commands # type: ignore
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Windows: el modo clúster solo está soportado en sistemas POSIX
+    fcntl = None
+
+IDENTIFY_TIME_FILE = 'data/last_identify'
+# Discord permite un IDENTIFY cada 5 segundos por bot (con max_concurrency = 1)
+IDENTIFY_INTERVAL = 5.0
+
+
+def parse_shard_ids(text):
+    """Convierte "0-3" o "0,1,2,3" (o una mezcla: "0-3,8") en una lista de IDs de shard."""
+    shard_ids = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            shard_ids.extend(range(int(first), int(last) + 1))
+        else:
+            shard_ids.append(int(part))
+    return sorted(set(shard_ids))
+
+
+def shard_for_guild(guild_id, shard_count):
+    """Shard que recibe los eventos de un servidor (fórmula de Discord)."""
+    return (int(guild_id) >> 22) % shard_count
+
+
+class ClusterInfo:
+    """
+    Shards que atiende este proceso cuando el bot se ejecuta en modo clúster (`cluster.py`).
+
+    Cada proceso recibe solo los eventos de sus shards, así que solo debe actuar sobre los
+    servidores de esos shards: el resto de datos compartidos en `data/` pertenecen a otro proceso.
+    Sin modo clúster (un único proceso) todos los servidores son propios.
+    """
+
+    def __init__(self):
+        self.cluster_id = None
+        self.shard_ids = None   # None = un único proceso para todos los shards
+        self.shard_count = None
+
+    @property
+    def enabled(self):
+        return self.shard_ids is not None
+
+    def configure(self, environ):
+        """Lee CLUSTER_ID, SHARD_COUNT y SHARD_IDS (los define `cluster.py` para cada proceso)."""
+        shard_ids = environ.get("SHARD_IDS")
+        shard_count = environ.get("SHARD_COUNT")
+        if shard_ids:
+            if not shard_count:
+                raise ValueError("SHARD_IDS requiere también SHARD_COUNT.")
+            self.shard_ids = parse_shard_ids(shard_ids)
+            self.shard_count = int(shard_count)
+            if not self.shard_ids or self.shard_ids[-1] >= self.shard_count:
+                raise ValueError(f"SHARD_IDS ({shard_ids}) no es válido para SHARD_COUNT={shard_count}.")
+        else:
+            self.shard_ids = None
+            self.shard_count = int(shard_count) if shard_count else None
+        self.cluster_id = environ.get("CLUSTER_ID")
+
+    def owns_guild(self, guild_id):
+        """
+        True si los eventos del servidor llegan a este proceso. Las claves que no son IDs
+        de servidor (datos antiguos o globales) pertenecen al proceso del shard 0.
+        """
+        if not self.enabled:
+            return True
+        try:
+            shard_id = shard_for_guild(guild_id, self.shard_count)
+        except (TypeError, ValueError):
+            shard_id = 0
+        return shard_id in self.shard_ids
+
+    def describe(self):
+        if not self.enabled:
+            return "proceso único"
+        return f"clúster {self.cluster_id} (shards {self.shard_ids[0]}-{self.shard_ids[-1]} de {self.shard_count})"
+
+
+# Instancia compartida por todos los cogs
+cluster = ClusterInfo()
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Bloqueo exclusivo entre procesos sobre `<path>.lock` (bloqueante)."""
+    if fcntl is None:
+        yield
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(f"{path}.lock", 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def cluster_lock(path):
+    """Bloqueo entre procesos solo en modo clúster; con un único proceso no hace nada."""
+    return file_lock(path) if cluster.enabled else contextlib.nullcontext()
+
+
+def write_json_atomic(path, data, indent=4):
+    temp_file = f"{path}.tmp"
+    with open(temp_file, 'w') as f:
+        json.dump(data, f, indent=indent)
+    os.replace(temp_file, path)
+
+
+def guild_key(key, value):
+    """Propietario de una entrada cuya clave es el ID del servidor."""
+    return key
+
+
+def merge_partitions(current, ours, owner_of=guild_key):
+    """
+    Combina el contenido en disco con el de este proceso: las entradas de servidores propios
+    salen de `ours` (incluidas las eliminadas) y las del resto se conservan de `current`.
+    """
+    merged = {key: value for key, value in current.items() if not cluster.owns_guild(owner_of(key, value))}
+    merged.update((key, value) for key, value in ours.items() if cluster.owns_guild(owner_of(key, value)))
+    return merged
+
+
+def save_partitioned_json(path, data, owner_of=guild_key, indent=4):
+    """
+    Guarda un diccionario JSON compartido entre procesos.
+
+    Con un único proceso es una escritura atómica normal. En modo clúster cada proceso solo
+    es dueño de las entradas de sus servidores: se bloquea el archivo, se relee y se reemplazan
+    únicamente esas entradas, para no pisar lo que hayan guardado los demás procesos.
+    `owner_of(clave, valor)` devuelve el ID del servidor al que pertenece cada entrada.
+    """
+    if not cluster.enabled:
+        write_json_atomic(path, data, indent)
+        return
+    with file_lock(path):
+        current = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    content = f.read()
+                    current = json.loads(content) if content.strip() else {}
+            except (json.JSONDecodeError, IOError) as e:
+                logger.warning("No se pudo releer %s antes de guardar (%s); se conservan solo los datos propios.", path, e)
+        write_json_atomic(path, merge_partitions(current, data, owner_of), indent)
+
+
+def wait_identify_slot(path=IDENTIFY_TIME_FILE, interval=IDENTIFY_INTERVAL):
+    """
+    Espera (bloqueando) a que hayan pasado `interval` segundos desde el último IDENTIFY de
+    cualquier proceso del clúster y registra el actual. El archivo guarda la marca de tiempo.
+    """
+    with file_lock(path):
+        try:
+            with open(path, 'r') as f:
+                last_identify = float(f.read().strip() or 0)
+        except (IOError, ValueError):
+            last_identify = 0.0
+        delay = last_identify + interval - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        with open(path, 'w') as f:
+            f.write(str(time.time()))
+
+
+class ClusterBot(commands.AutoShardedBot):
+    """
+    Bot con varios shards en un proceso del clúster. Los IDENTIFY se coordinan entre
+    procesos para no superar el límite de conexiones de Discord al arrancar todos a la vez.
+    """
+
+    async def before_identify_hook(self, shard_id, *, initial=False):
+        await asyncio.get_running_loop().run_in_executor(None, wait_identify_slot)
@@ -0,0 +1,62 @@
+import hashlib
+import json
+import logging
+import os
+
+import discord # type: ignore
+
+from utils.cluster import cluster, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+COMMAND_TREE_HASH_FILE = 'data/command_tree_hash.json'
+
+
+def tree_hash(tree):
+    """Huella de las definiciones de los comandos de barra, tal y como se envían a Discord."""
+    payload = sorted((command.to_dict(tree) for command in tree.get_commands()), key=lambda c: (c.get("type", 1), c["name"]))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def read_hashes(filepath=COMMAND_TREE_HASH_FILE):
+    if not os.path.exists(filepath):
+        return {}
+    try:
+        with open(filepath, 'r') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {}
+
+
+async def sync_command_tree(bot, force=False):
+    """
+    Sincroniza los comandos de barra con Discord solo si sus definiciones cambiaron.
+
+    Discord limita mucho las sincronizaciones, así que la huella del árbol sincronizado se
+    guarda en `data/command_tree_hash.json` (una por aplicación) y, si coincide con la actual,
+    no se hace ninguna petición. En modo clúster solo sincroniza el proceso del shard 0.
+    Devuelve True si se sincronizó.
+    """
+    if cluster.enabled and 0 not in cluster.shard_ids:
+        return False
+
+    application_id = str(bot.application_id)
+    digest = tree_hash(bot.tree)
+    hashes = read_hashes(COMMAND_TREE_HASH_FILE)
+    if not force and hashes.get(application_id) == digest:
+        logger.info("Comandos de barra sin cambios; no se sincronizan.")
+        return False
+
+    try:
+        synced = await bot.tree.sync()
+    except discord.HTTPException as e:
+        logger.error("No se pudieron sincronizar los comandos de barra: %s", e)
+        return False
+
+    hashes[application_id] = digest
+    try:
+        write_json_atomic(COMMAND_TREE_HASH_FILE, hashes)
+    except IOError as e:
+        logger.error("No se pudo guardar %s: %s", COMMAND_TREE_HASH_FILE, e)
+    logger.info("Comandos de barra sincronizados: %d.", len(synced))
+    return True
@@ -0,0 +1,32 @@
+import asyncio
+
+# Peticiones simultáneas por defecto al editar muchos canales a la vez. discord.py respeta
+# los límites de la API por ruta, así que esto solo evita saturar la cola de peticiones.
+DEFAULT_CONCURRENCY = 5
+
+
+async def run_bounded(items, worker, limit=DEFAULT_CONCURRENCY, on_progress=None):
+    """
+    Ejecuta `await worker(item)` para cada elemento con como máximo `limit` llamadas en curso.
+
+    Devuelve una lista de (item, excepción o None) en orden de finalización: un fallo en un
+    elemento no interrumpe el resto. Si se indica, `await on_progress(completados, total)`
+    se llama tras cada elemento terminado.
+    """
+    items = list(items)
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(item):
+        async with semaphore:
+            try:
+                await worker(item)
+            except Exception as e:
+                return item, e
+            return item, None
+
+    results = []
+    for future in asyncio.as_completed([run(item) for item in items]):
+        results.append(await future)
+        if on_progress:
+            await on_progress(len(results), len(items))
+    return results
@@ -0,0 +1,30 @@
+import unicodedata
+
+# Caracteres que se usan para esquivar filtros sustituyendo letras latinas:
+# sustituciones "leet" y letras cirílicas/griegas con la misma forma.
+CONFUSABLES = {
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b",
+    "@": "a", "$": "s", "!": "i", "|": "l", "€": "e",
+    "а": "a", "в": "b", "е": "e", "к": "k", "м": "m", "н": "h", "о": "o", "р": "p",
+    "с": "c", "т": "t", "у": "y", "х": "x", "і": "i", "ј": "j", "ѕ": "s", "ԁ": "d",
+    "α": "a", "β": "b", "ε": "e", "ι": "i", "κ": "k", "ν": "v", "ο": "o", "ρ": "p",
+    "τ": "t", "υ": "u", "χ": "x",
+}
+
+# Caracteres invisibles que se intercalan para partir palabras
+INVISIBLE = {"\u200b", "\u200c", "\u200d", "\u2060", "\ufeff", "\u00ad"}
+
+_TRANSLATION = str.maketrans({**CONFUSABLES, **{c: None for c in INVISIBLE}})
+
+
+def normalize_confusables(text: str) -> str:
+    """
+    Normaliza un texto para compararlo con el filtro de contenido: formas de compatibilidad
+    (letras de ancho completo, ligaduras...), minúsculas, sin diacríticos, sin caracteres
+    invisibles, con los espacios repetidos reducidos a uno y con los caracteres confundibles
+    sustituidos por su letra latina.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.translate(_TRANSLATION).split())
@@ -0,0 +1,21 @@
+import re
+
+from discord.ext import commands # type: ignore
+
+SNOWFLAKE_RE = re.compile(r"<[@#][!&]?(\d{15,20})>|(\d{15,20})$")
+
+
+class Snowflake(commands.Converter):
+    """
+    ID de Discord (usuario, mensaje, canal...) escrito como número o como mención.
+
+    Se usa en lugar de `int` en los comandos híbridos: como comando de barra, un `int` se
+    convierte en una opción entera de Discord, que no admite números tan grandes como un ID.
+    Con un conversor la opción es de texto y la conversión es la misma en ambos casos.
+    """
+
+    async def convert(self, ctx, argument):
+        match = SNOWFLAKE_RE.match(argument.strip())
+        if match is None:
+            raise commands.BadArgument(f"`{argument}` no es un ID de Discord válido.")
+        return int(match.group(1) or match.group(2))
@@ -0,0 +1,21 @@
+# Segundos por unidad de tiempo admitida en las duraciones (ej: 10m, 1h, 2d)
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_duration(duration: str) -> int:
+    """
+    Convierte una duración en formato número + unidad (s, m, h, d) a segundos.
+    Lanza ValueError con un mensaje apto para mostrar al usuario si el formato no es válido.
+    """
+    if not duration:
+        raise ValueError("Formato de duración incorrecto. Usa un número seguido de 's', 'm', 'h' o 'd' (ej: 10m, 1h, 2d).")
+
+    time_unit = duration[-1].lower()
+    try:
+        time_value = int(duration[:-1])
+    except ValueError:
+        raise ValueError("Formato de duración incorrecto. Usa un número seguido de 's', 'm', 'h' o 'd' (ej: 10m, 1h, 2d).")
+
+    if time_unit not in DURATION_UNITS:
+        raise ValueError("Unidad de tiempo no válida. Usa 's' (segundos), 'm' (minutos), 'h' (horas) o 'd' (días).")
+    return time_value * DURATION_UNITS[time_unit]
@@ -0,0 +1,216 @@
+"""
+Exportación del historial de moderación de un servidor (reportes, advertencias, casos e hilos)
+a un archivo JSONL o CSV comprimido con gzip.
+
+Los registros se generan uno a uno y se escriben según se producen, de modo que el
+archivo de salida nunca se construye completo en memoria.
+
+Uso desde la línea de comandos:
+    python -m utils.export --guild 123456789 --format csv --output historial.csv.gz
+"""
+import argparse
+import csv
+import datetime
+import gzip
+import itertools
+import json
+import os
+
+DATA_DIR = 'data'
+EXPORTS_DIR = os.path.join(DATA_DIR, 'exports')
+FORMATS = ("jsonl", "csv")
+
+# Columnas del CSV (unión de los campos de todos los tipos de registro)
+CSV_FIELDS = [
+    "type", "guild_id", "number", "user_id", "author_id", "reason",
+    "status", "timestamp", "channel_id", "thread_id", "name", "expires_at",
+    "action", "duration"
+]
+
+
+def read_json_file(filepath):
+    """Lee un archivo JSON y devuelve {} si no existe o está vacío."""
+    if not os.path.exists(filepath):
+        return {}
+    with open(filepath, 'r') as f:
+        content = f.read()
+    return json.loads(content) if content.strip() else {}
+
+
+def iter_reports(guild_id, data_dir=DATA_DIR):
+    """Genera los reportes del servidor en orden de creación."""
+    reports = read_json_file(os.path.join(data_dir, 'reports.json'))
+    for number, report in enumerate(reports.get(str(guild_id), []), 1):
+        yield {
+            "type": "report",
+            "guild_id": str(guild_id),
+            "number": number,
+            "user_id": str(report.get("reported_user")),
+            "author_id": str(report.get("reported_by")),
+            "reason": report.get("reason"),
+            "status": report.get("status"),
+            "timestamp": report.get("timestamp"),
+            "channel_id": str(report.get("channel_id"))
+        }
+
+
+def iter_warnings(guild_id, data_dir=DATA_DIR):
+    """Genera las advertencias del servidor agrupadas por usuario, seguidas de las ya archivadas."""
+    warnings = read_json_file(os.path.join(data_dir, 'warnings.json'))
+    users = warnings.get(str(guild_id), {})
+    if isinstance(users, dict):
+        for user_id, user_warnings in users.items():
+            for number, warning in enumerate(user_warnings, 1):
+                yield {
+                    "type": "warning",
+                    "guild_id": str(guild_id),
+                    "number": number,
+                    "user_id": str(user_id),
+                    "author_id": warning.get("moderator"),
+                    "reason": warning.get("reason"),
+                    "status": "activa",
+                    "timestamp": warning.get("timestamp")
+                }
+
+    # Advertencias caducadas movidas al archivo histórico por la compactación
+    archive_path = os.path.join(data_dir, 'warnings_archive.jsonl')
+    if not os.path.exists(archive_path):
+        return
+    with open(archive_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                warning = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if warning.get("guild_id") != str(guild_id):
+                continue
+            yield {
+                "type": "warning",
+                "guild_id": str(guild_id),
+                "user_id": warning.get("user_id"),
+                "author_id": warning.get("moderator"),
+                "reason": warning.get("reason"),
+                "status": "expirada",
+                "timestamp": warning.get("timestamp")
+            }
+
+
+def iter_cases(guild_id, data_dir=DATA_DIR):
+    """Genera los casos de moderación del servidor leyendo el registro línea a línea."""
+    filepath = os.path.join(data_dir, 'cases.jsonl')
+    if not os.path.exists(filepath):
+        return
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                case = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if case.get("guild_id") != str(guild_id):
+                continue
+            yield {
+                "type": "case",
+                "guild_id": str(guild_id),
+                "number": case.get("case"),
+                "user_id": case.get("target_id"),
+                "author_id": case.get("moderator_id"),
+                "reason": case.get("reason"),
+                "timestamp": case.get("timestamp"),
+                "action": case.get("action"),
+                "duration": case.get("duration")
+            }
+
+
+def iter_threads(guild_id, data_dir=DATA_DIR):
+    """Genera los hilos gestionados del servidor."""
+    threads = read_json_file(os.path.join(data_dir, 'active_threads.json'))
+    for thread_id, thread_info in threads.items():
+        if str(thread_info.get("guild_id")) != str(guild_id):
+            continue
+        yield {
+            "type": "thread",
+            "guild_id": str(guild_id),
+            "thread_id": str(thread_id),
+            "name": thread_info.get("name"),
+            "author_id": thread_info.get("creator_id"),
+            "status": thread_info.get("status"),
+            "timestamp": thread_info.get("created_at"),
+            "expires_at": thread_info.get("expires_at"),
+            "channel_id": thread_info.get("parent_channel_id")
+        }
+
+
+def iter_guild_records(guild_id, data_dir=DATA_DIR):
+    """Encadena todos los generadores de registros de un servidor."""
+    return itertools.chain(
+        iter_reports(guild_id, data_dir),
+        iter_warnings(guild_id, data_dir),
+        iter_cases(guild_id, data_dir),
+        iter_threads(guild_id, data_dir)
+    )
+
+
+def write_jsonl(records, f):
+    """Escribe un registro JSON por línea. Devuelve el número de registros escritos."""
+    count = 0
+    for record in records:
+        f.write(json.dumps(record, ensure_ascii=False))
+        f.write("\n")
+        count += 1
+    return count
+
+
+def write_csv(records, f):
+    """Escribe los registros como CSV con las columnas de CSV_FIELDS. Devuelve el número de registros."""
+    writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+    return count
+
+
+def default_export_path(guild_id, fmt):
+    """Ruta por defecto del archivo exportado dentro de data/exports."""
+    stamp = datetime.datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+    return os.path.join(EXPORTS_DIR, f"{guild_id}_{stamp}.{fmt}.gz")
+
+
+def export_guild(guild_id, fmt="jsonl", output_path=None, data_dir=DATA_DIR):
+    """
+    Exporta el historial de un servidor a un archivo gzip.
+    Devuelve una tupla (ruta del archivo, número de registros).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt}. Usa uno de: {', '.join(FORMATS)}")
+
+    output_path = output_path or default_export_path(guild_id, fmt)
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    writer = write_jsonl if fmt == "jsonl" else write_csv
+    with gzip.open(output_path, 'wt', encoding='utf-8', newline='') as f:
+        count = writer(iter_guild_records(guild_id, data_dir), f)
+    return output_path, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta el historial de moderación de un servidor.")
+    parser.add_argument("--guild", required=True, help="ID del servidor a exportar")
+    parser.add_argument("--format", choices=FORMATS, default="jsonl", help="Formato de salida (por defecto: jsonl)")
+    parser.add_argument("--output", help="Ruta del archivo .gz de salida (por defecto: data/exports/...)")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Directorio con los archivos JSON del bot")
+    args = parser.parse_args()
+
+    path, count = export_guild(args.guild, args.format, args.output, args.data_dir)
+    print(f"Exportados {count} registros a {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Grabación de los eventos del gateway en un archivo JSONL, para reproducirlos sin conexión con
+el arnés (`python -m harness.run --trace archivo`).
+
+Se activa con GATEWAY_TRACE=ruta en el `.env`: el bot se crea con `enable_debug_events` para
+que discord.py despache `on_socket_raw_receive`, y el cog Diagnostics pasa cada mensaje a
+`gateway_trace.record`. Cada línea es {"at": segundos desde el inicio, "t": evento, "d": datos}.
+La escritura la hace el hilo de un QueueListener, como los logs, para no bloquear el bucle.
+
+Las trazas contienen el contenido de los mensajes y los datos de los miembros: no conviene
+activarlo en servidores reales sin avisar ni compartir los archivos.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+
+logger = logging.getLogger(__name__)
+
+# Eventos que no se graban: los de la sesión, que el arnés genera por su cuenta. De READY solo
+# se guarda el usuario del bot, para que el arnés lo suplante al reproducir la traza.
+SKIPPED_EVENTS = frozenset({"RESUMED"})
+
+
+class GatewayTrace:
+    def __init__(self):
+        self.path = None
+        self.started_at = None
+        self.recorded = 0
+        self._writer = None
+        self._listener = None
+
+    @property
+    def enabled(self):
+        return self._listener is not None
+
+    def start(self, path):
+        """Empieza a grabar en `path` (se añade al final si ya existe)."""
+        if self.enabled:
+            return
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        file_handler = logging.FileHandler(path, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+        trace_queue = queue.SimpleQueue()
+        # Logger propio, sin propagar al raíz: las líneas no deben mezclarse con los logs
+        self._writer = logging.getLogger("flexbot.gateway_trace.writer")
+        self._writer.propagate = False
+        self._writer.setLevel(logging.INFO)
+        self._writer.addHandler(logging.handlers.QueueHandler(trace_queue))
+        self._listener = logging.handlers.QueueListener(trace_queue, file_handler)
+        self._listener.start()
+        self.path = path
+        self.started_at = time.perf_counter()
+        self.recorded = 0
+        logger.warning("Grabando los eventos del gateway en %s (incluyen el contenido de los mensajes)", path)
+
+    def stop(self):
+        if not self.enabled:
+            return
+        self._listener.stop()
+        for handler in list(self._writer.handlers):
+            self._writer.removeHandler(handler)
+            handler.close()
+        self._listener = None
+        self._writer = None
+        logger.info("Grabación del gateway terminada: %d eventos en %s", self.recorded, self.path)
+
+    def record(self, raw):
+        """Graba un mensaje del gateway tal como lo recibe `on_socket_raw_receive`."""
+        if not self.enabled or not isinstance(raw, str):
+            return
+        message = json.loads(raw)
+        if message.get("op") != 0 or message.get("t") in SKIPPED_EVENTS:
+            return
+        data = {"user": message["d"]["user"]} if message["t"] == "READY" else message["d"]
+        self.recorded += 1
+        line = {"at": round(time.perf_counter() - self.started_at, 4), "t": message["t"], "d": data}
+        self._writer.info(json.dumps(line, ensure_ascii=False, separators=(",", ":")))
+
+
+gateway_trace = GatewayTrace()
@@ -0,0 +1,305 @@
+import copy
+import json
+import logging
+import os
+
+from utils.cluster import save_partitioned_json
+
+logger = logging.getLogger(__name__)
+
+GUILD_CONFIG_FILE = 'data/guild_config.json'
+
+# Valores por defecto de la configuración de cada servidor. El tipo de cada valor
+# por defecto es también el tipo que se exige al modificarlo.
+DEFAULTS = {
+    # Anti-spam: puntuación (1 por mensaje sin pesos) permitida en el intervalo (segundos)
+    "spam_threshold": 5,
+    "spam_interval": 3,
+    # Anti-spam: cada mensaje puntúa 1 más estos pesos por cada elemento; se actúa cuando
+    # la puntuación acumulada en el intervalo alcanza spam_threshold. Un solo mensaje normal
+    # (20 líneas, 4 menciones o enlaces, 10 adjuntos, @everyone) queda por debajo del umbral;
+    # hacen falta 8 menciones o enlaces, 4 menciones de rol u 80 líneas en un mensaje
+    "spam_weight_mention": 0.5,
+    "spam_weight_role_mention": 1.0,
+    "spam_weight_link": 0.5,
+    "spam_weight_attachment": 0.25,
+    "spam_weight_newline": 0.05,
+    # Anti-spam: copias del mismo mensaje en la ventana (segundos), en cualquier canal, que se
+    # consideran spam, y longitud mínima para tenerlo en cuenta. Las copias de varias cuentas solo
+    # cuentan juntas si llevan enlaces o menciones, o si se activa duplicate_cross_account
+    "duplicate_threshold": 3,
+    "duplicate_window": 60,
+    "duplicate_min_length": 10,
+    "duplicate_cross_account": False,
+    # Nombre del rol usado para silenciar usuarios
+    "muted_role_name": "Muted",
+    # Número de advertencias a partir del cual se avisa a los moderadores
+    "warning_alert_threshold": 3,
+    # Nombre del canal donde se publican los reportes
+    "reports_channel_name": "reportes",
+    # Política de escalado: {"número de advertencias": {"action": "mute|kick|ban", "duration": "1h"}}
+    "escalation": {},
+    # Días tras los que una advertencia deja de contar (0 = nunca caducan)
+    "warning_ttl_days": 0,
+    # Anti-raid: entradas permitidas en la ventana (segundos) antes de considerar un raid
+    "raid_join_threshold": 10,
+    "raid_join_window": 10,
+    # Anti-raid: cuentas "nuevas" (menos de N días) creadas con poca diferencia entre sí
+    "raid_new_account_days": 7,
+    "raid_cluster_size": 5,
+    "raid_cluster_spread_minutes": 60,
+    # Anti-raid: activar el modo bloqueo automáticamente y su duración (minutos)
+    "raid_auto_lockdown": False,
+    "raid_lockdown_minutes": 15,
+    # Filtro de contenido: términos prohibidos, expresiones regulares y acción al detectarlos
+    "filter_terms": [],
+    "filter_patterns": [],
+    "filter_action": "delete",
+    "filter_mute_minutes": 10,
+    # Escáner de enlaces: dominios bloqueados/permitidos e invitaciones a otros servidores
+    "links_blocked_domains": [],
+    "links_allowed_domains": [],
+    "links_block_invites": False
+}
+
+# Descripciones mostradas por `!flex config`
+DESCRIPTIONS = {
+    "spam_threshold": "Puntuación anti-spam (1 por mensaje más los pesos) que provoca el silencio",
+    "spam_interval": "Intervalo del anti-spam (segundos)",
+    "spam_weight_mention": "Puntuación anti-spam de cada mención a un usuario",
+    "spam_weight_role_mention": "Puntuación anti-spam de cada mención a un rol, @everyone o @here",
+    "spam_weight_link": "Puntuación anti-spam de cada enlace",
+    "spam_weight_attachment": "Puntuación anti-spam de cada archivo adjunto",
+    "spam_weight_newline": "Puntuación anti-spam de cada salto de línea",
+    "duplicate_threshold": "Copias del mismo mensaje en la ventana que se consideran spam",
+    "duplicate_window": "Ventana de mensajes repetidos (segundos)",
+    "duplicate_min_length": "Longitud mínima de un mensaje para detectar repeticiones",
+    "duplicate_cross_account": "Sancionar también las copias de texto sin enlaces ni menciones publicadas por varias cuentas",
+    "muted_role_name": "Nombre del rol de silenciado",
+    "warning_alert_threshold": "Advertencias para avisar a los moderadores",
+    "reports_channel_name": "Nombre del canal de reportes",
+    "escalation": "Política de escalado (usa `!flex escalado`)",
+    "warning_ttl_days": "Días hasta que caduca una advertencia (0 = nunca)",
+    "raid_join_threshold": "Entradas permitidas en la ventana anti-raid",
+    "raid_join_window": "Ventana anti-raid (segundos)",
+    "raid_new_account_days": "Antigüedad (días) por debajo de la cual una cuenta se considera nueva",
+    "raid_cluster_size": "Cuentas nuevas creadas casi a la vez que se consideran un raid",
+    "raid_cluster_spread_minutes": "Diferencia máxima (minutos) entre las fechas de creación de un grupo",
+    "raid_auto_lockdown": "Activar el modo bloqueo automáticamente al detectar un raid",
+    "raid_lockdown_minutes": "Duración del modo bloqueo (minutos)",
+    "filter_terms": "Términos prohibidos (usa `!flex filtro`)",
+    "filter_patterns": "Expresiones regulares prohibidas (usa `!flex filtro`)",
+    "filter_action": "Acción del filtro de contenido: delete, warn o mute",
+    "filter_mute_minutes": "Duración del silencio aplicado por el filtro (minutos)",
+    "links_blocked_domains": "Dominios bloqueados (usa `!flex enlaces`)",
+    "links_allowed_domains": "Dominios permitidos aunque coincidan con uno bloqueado (usa `!flex enlaces`)",
+    "links_block_invites": "Bloquear invitaciones a otros servidores de Discord"
+}
+
+# Valores mínimos admitidos para las claves numéricas
+MIN_VALUES = {
+    "spam_threshold": 1,
+    "spam_interval": 1,
+    "spam_weight_mention": 0,
+    "spam_weight_role_mention": 0,
+    "spam_weight_link": 0,
+    "spam_weight_attachment": 0,
+    "spam_weight_newline": 0,
+    "duplicate_threshold": 2,
+    "duplicate_window": 1,
+    "duplicate_min_length": 1,
+    "warning_alert_threshold": 1,
+    "warning_ttl_days": 0,
+    "raid_join_threshold": 2,
+    "raid_join_window": 1,
+    "raid_new_account_days": 0,
+    "raid_cluster_size": 2,
+    "raid_cluster_spread_minutes": 1,
+    "raid_lockdown_minutes": 1,
+    "filter_mute_minutes": 1
+}
+
+# Valores admitidos para las claves de texto con opciones cerradas
+ALLOWED_VALUES = {
+    "filter_action": ("delete", "warn", "mute")
+}
+
+TRUE_VALUES = ("si", "sí", "yes", "true", "on", "1", "activado")
+FALSE_VALUES = ("no", "false", "off", "0", "desactivado")
+
+
+def parse_value(key, text):
+    """
+    Convierte el texto introducido en un comando al tipo del valor por defecto de `key`.
+    Lanza KeyError si la clave no existe y ValueError con un mensaje para el usuario si el valor no es válido.
+    """
+    if key not in DEFAULTS:
+        raise KeyError(key)
+
+    default = DEFAULTS[key]
+    if isinstance(default, bool):
+        lowered = text.lower()
+        if lowered in TRUE_VALUES:
+            return True
+        if lowered in FALSE_VALUES:
+            return False
+        raise ValueError(f"`{key}` debe ser si/no.")
+    if isinstance(default, float):
+        try:
+            value = float(text.replace(",", "."))
+        except ValueError:
+            raise ValueError(f"`{key}` debe ser un número.")
+        if value != value or value < MIN_VALUES.get(key, 0):
+            raise ValueError(f"`{key}` debe ser como mínimo {MIN_VALUES.get(key, 0)}.")
+        return value
+    if isinstance(default, int):
+        try:
+            value = int(text)
+        except ValueError:
+            raise ValueError(f"`{key}` debe ser un número entero.")
+        if value < MIN_VALUES.get(key, 0):
+            raise ValueError(f"`{key}` debe ser como mínimo {MIN_VALUES.get(key, 0)}.")
+        return value
+    if isinstance(default, str):
+        if not text.strip():
+            raise ValueError(f"`{key}` no puede estar vacío.")
+        if key in ALLOWED_VALUES:
+            value = text.strip().lower()
+            if value not in ALLOWED_VALUES[key]:
+                raise ValueError(f"`{key}` debe ser uno de: {', '.join(ALLOWED_VALUES[key])}.")
+            return value
+        return text.strip()
+    raise ValueError(f"`{key}` no se puede modificar con este comando.")
+
+
+class GuildConfigStore:
+    """
+    Configuración por servidor persistida en `data/guild_config.json`.
+
+    En el archivo solo se guardan los valores que difieren de DEFAULTS. La configuración
+    completa de cada servidor se construye una vez y se guarda en caché, de modo que leerla
+    desde las rutas calientes (cada mensaje) es una única búsqueda en un diccionario.
+    El diccionario devuelto por `get` es compartido: no debe modificarse.
+    """
+
+    def __init__(self, filepath=GUILD_CONFIG_FILE):
+        self.filepath = filepath
+        self.data = None   # guild_id (str): {clave: valor} (solo valores modificados)
+        self.cache = {}    # guild_id (int o str, según se consulte): configuración completa
+        self.mtime = None  # Última modificación del archivo conocida
+        self.listeners = []
+
+    def load(self):
+        """Carga la configuración desde el archivo y vacía la caché."""
+        data = {}
+        mtime = None
+        if os.path.exists(self.filepath):
+            try:
+                mtime = os.path.getmtime(self.filepath)
+                with open(self.filepath, 'r') as f:
+                    content = f.read()
+                    data = json.loads(content) if content.strip() else {}
+            except (json.JSONDecodeError, IOError) as e:
+                logger.error("Error al cargar %s: %s. Usando configuración por defecto.", self.filepath, e)
+                if self.data is not None:
+                    return # Conservar la configuración anterior si la recarga falla
+        self.data = data
+        self.mtime = mtime
+        self.cache.clear()
+
+    def save(self):
+        """Guarda la configuración en el archivo de forma atómica (en modo clúster, solo los servidores propios)."""
+        save_partitioned_json(self.filepath, self.data)
+        self.mtime = os.path.getmtime(self.filepath)
+
+    def reload(self):
+        """Recarga la configuración desde el archivo y notifica a los cogs suscritos."""
+        self.load()
+        self.notify(None, None)
+
+    def reload_if_changed(self) -> bool:
+        """Recarga la configuración si el archivo se modificó fuera del bot. Devuelve True si se recargó."""
+        try:
+            mtime = os.path.getmtime(self.filepath)
+        except OSError:
+            return False
+        if mtime == self.mtime:
+            return False
+        self.reload()
+        return True
+
+    def get(self, guild_id) -> dict:
+        """Devuelve la configuración completa de un servidor (valores por defecto incluidos)."""
+        config = self.cache.get(guild_id)
+        if config is None:
+            if self.data is None:
+                self.load()
+            config = copy.deepcopy(DEFAULTS)
+            config.update(self.data.get(str(guild_id), {}))
+            self.cache[guild_id] = config
+        return config
+
+    def get_overrides(self, guild_id) -> dict:
+        """Valores del servidor que difieren de los predeterminados."""
+        if self.data is None:
+            self.load()
+        return self.data.get(str(guild_id), {})
+
+    def set(self, guild_id, key, value):
+        """Establece un valor de configuración para un servidor y lo persiste."""
+        if key not in DEFAULTS:
+            raise KeyError(key)
+        expected_type = type(DEFAULTS[key])
+        if not isinstance(value, expected_type) or (expected_type is int and isinstance(value, bool)):
+            raise TypeError(f"{key} debe ser de tipo {expected_type.__name__}")
+        if self.data is None:
+            self.load()
+        self.data.setdefault(str(guild_id), {})[key] = value
+        self.save()
+        self.invalidate(guild_id)
+        self.notify(guild_id, key)
+
+    def reset(self, guild_id, key):
+        """Restablece un valor a su valor por defecto."""
+        if key not in DEFAULTS:
+            raise KeyError(key)
+        if self.data is None:
+            self.load()
+        overrides = self.data.get(str(guild_id), {})
+        if key in overrides:
+            del overrides[key]
+            if not overrides:
+                del self.data[str(guild_id)]
+            self.save()
+        self.invalidate(guild_id)
+        self.notify(guild_id, key)
+
+    def invalidate(self, guild_id):
+        """Descarta la configuración en caché de un servidor."""
+        self.cache.pop(str(guild_id), None)
+        try:
+            self.cache.pop(int(guild_id), None)
+        except ValueError:
+            pass
+
+    def add_listener(self, callback):
+        """
+        Registra una función `callback(guild_id, key)` que se llama cuando cambia la configuración.
+        En una recarga completa se llama con (None, None).
+        """
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def notify(self, guild_id, key):
+        for callback in list(self.listeners):
+            try:
+                callback(guild_id, key)
+            except Exception as e:
+                logger.exception("Error notificando un cambio de configuración: %s", e)
+
+
+# Instancia compartida por todos los cogs
+guild_config = GuildConfigStore()
@@ -0,0 +1,56 @@
+from discord.ext import commands # type: ignore
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_extension(bot, name):
+    """
+    Devuelve el nombre de la extensión cargada (`cogs.x`) a partir de `x`, `cogs.x` o el
+    nombre del cog (`Moderation`, sin distinguir mayúsculas). None si no está cargada.
+    """
+    for cog_name, cog in bot.cogs.items():
+        if cog_name.lower() == name.lower():
+            return cog.__module__
+    extension = name if name.startswith("cogs.") else f"cogs.{name.lower()}"
+    return extension if extension in bot.extensions else None
+
+
+def cogs_in_extension(bot, extension):
+    return {cog_name: cog for cog_name, cog in bot.cogs.items() if cog.__module__ == extension}
+
+
+async def reload_with_state(bot, extension):
+    """
+    Recarga una extensión conservando el estado en memoria de sus cogs.
+
+    Antes de recargar se llama a `export_state()` de cada cog que lo defina; después,
+    `import_state(estado)` del cog nuevo. El estado se pasa dentro del mismo proceso, así que
+    puede contener objetos de discord.py o de `utils/` (que no se recargan), pero no instancias
+    de clases definidas en el propio módulo del cog, que quedarían con el código anterior.
+
+    Si la recarga falla, discord.py vuelve a cargar la versión anterior y el estado se le
+    devuelve igualmente. Devuelve (cogs con el estado restaurado, excepción o None).
+    """
+    states = {}
+    for cog_name, cog in cogs_in_extension(bot, extension).items():
+        if hasattr(cog, "export_state"):
+            states[cog_name] = cog.export_state()
+
+    error = None
+    try:
+        await bot.reload_extension(extension)
+    except commands.ExtensionError as e:
+        error = e
+
+    restored = []
+    for cog_name, state in states.items():
+        cog = bot.get_cog(cog_name)
+        if cog is None or not hasattr(cog, "import_state"):
+            continue
+        try:
+            cog.import_state(state)
+            restored.append(cog_name)
+        except Exception as e:
+            logger.exception("No se pudo restaurar el estado de %s: %s", cog_name, e)
+    return restored, error
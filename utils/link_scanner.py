@@ -0,0 +1,160 @@
+import collections
+import ipaddress
+import re
+import socket
+import time
+from urllib.parse import urlsplit
+
+from aiohttp.abc import AbstractResolver # type: ignore
+from aiohttp.resolver import DefaultResolver # type: ignore
+
+# Enlaces http(s) y también invitaciones de Discord escritas sin esquema
+URL_RE = re.compile(r"https?://[^\s<>]+|(?:discord(?:app)?\.com/invite|discord\.gg)/[\w-]+", re.IGNORECASE)
+INVITE_RE = re.compile(r"(?:discord(?:app)?\.com/invite|discord\.gg)/([\w-]+)", re.IGNORECASE)
+
+# Acortadores cuyo destino real solo se conoce siguiendo las redirecciones
+SHORTENER_DOMAINS = frozenset({
+    "bit.ly", "tinyurl.com", "t.co", "goo.gl", "is.gd", "cutt.ly", "rebrand.ly",
+    "ow.ly", "shorturl.at", "buff.ly", "tiny.cc", "rb.gy"
+})
+
+MISSING = object()
+
+# Esquemas que se siguen al resolver un acortador
+FOLLOWED_SCHEMES = ("http", "https")
+
+
+def extract_links(content):
+    """
+    Devuelve una lista de (dominio, url, código de invitación o None) con los enlaces de un texto.
+    Los dominios se devuelven en minúsculas y sin "www.".
+    """
+    links = []
+    for match in URL_RE.finditer(content):
+        url = match.group(0).rstrip(".,;:!?)>\"'")
+        if not url.lower().startswith(("http://", "https://")):
+            url = "https://" + url
+        try:
+            domain = urlsplit(url).hostname or ""
+        except ValueError:
+            continue
+        if domain.startswith("www."):
+            domain = domain[4:]
+        invite = INVITE_RE.search(url)
+        links.append((domain, url, invite.group(1) if invite else None))
+    return links
+
+
+def domain_in(domain, domains):
+    """True si `domain` o alguno de sus dominios padre está en `domains` (sub.ejemplo.com → ejemplo.com)."""
+    while domain:
+        if domain in domains:
+            return True
+        _, _, domain = domain.partition(".")
+    return False
+
+
+def is_public_address(address):
+    """True si `address` es una IP pública (no privada, de loopback, link-local, reservada ni multicast)."""
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return ip.is_global and not ip.is_multicast
+
+
+def check_redirect_target(url):
+    """
+    Lanza ValueError si no se debe hacer una petición a `url` al seguir un acortador: solo se
+    admiten http(s) y, si el host es una IP, tiene que ser pública. Los nombres de dominio los
+    comprueba PublicOnlyResolver al conectar.
+    """
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        raise ValueError(f"URL no válida: {url}") from None
+    if parts.scheme.lower() not in FOLLOWED_SCHEMES:
+        raise ValueError(f"Esquema no admitido: {parts.scheme or '(ninguno)'}")
+    host = parts.hostname
+    if not host:
+        raise ValueError(f"URL sin host: {url}")
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return  # Nombre de dominio
+    if not is_public_address(host):
+        raise ValueError(f"Dirección no pública: {host}")
+
+
+class PublicOnlyResolver(AbstractResolver):
+    """
+    Resolutor DNS para aiohttp que descarta las direcciones no públicas. Así una redirección
+    (o un dominio que apunte a 127.0.0.1 o a la red interna) no puede hacer que el bot haga
+    peticiones a su propia red, aunque el DNS cambie entre una comprobación y la conexión.
+    """
+
+    def __init__(self):
+        self.resolver = DefaultResolver()
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        addresses = [address for address in await self.resolver.resolve(host, port, family) if is_public_address(address["host"])]
+        if not addresses:
+            raise OSError(f"{host} no resuelve a ninguna dirección pública")
+        return addresses
+
+    async def close(self):
+        await self.resolver.close()
+
+
+class TTLCache:
+    """
+    Caché LRU con caducidad. Guarda como mucho `maxsize` entradas; al superar el límite se
+    descarta la usada hace más tiempo. Cada entrada puede tener su propio tiempo de vida.
+    """
+
+    def __init__(self, maxsize=2048, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data = collections.OrderedDict()  # clave: (caduca_en, valor)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def get(self, key, default=MISSING):
+        entry = self.data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self.data[key]
+            self.misses += 1
+            return default
+        self.data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value, ttl=None):
+        self.data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self.data.move_to_end(key)
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def clear(self):
+        self.data.clear()
+
+
+class StaticResolver:
+    """
+    Resolutor local para pruebas: responde desde diccionarios en lugar de consultar
+    Discord o seguir redirecciones HTTP.
+    """
+
+    def __init__(self, invites=None, redirects=None):
+        self.invites = invites or {}      # código: guild_id (o None si no es válida)
+        self.redirects = redirects or {}  # url: dominio final
+
+    async def resolve_invite(self, code):
+        return self.invites.get(code)
+
+    async def resolve_redirect(self, url):
+        return self.redirects.get(url)
@@ -0,0 +1,186 @@
+import contextvars
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+
+from utils.metrics import current_handler
+
+DEFAULT_LOG_FILE = 'logs/flexbot.log'
+LOG_MAX_BYTES = 10 * 2**20
+LOG_BACKUP_COUNT = 5
+# Un mismo mensaje (mismo logger, nivel, línea y texto) se escribe como mucho DUPLICATE_BURST
+# veces cada DUPLICATE_WINDOW segundos; el siguiente tras la ventana indica cuántos se omitieron
+DUPLICATE_WINDOW = 60
+DUPLICATE_BURST = 3
+DUPLICATE_KEYS_LIMIT = 2048
+
+# Campos de contexto que se añaden a cada registro
+CONTEXT_FIELDS = ("guild", "channel", "user", "command", "handler")
+
+# Contexto de la tarea actual (servidor, canal, usuario, comando); lo fijan la tubería de
+# mensajes y los hooks de comandos con `bind_context`
+log_context = contextvars.ContextVar("log_context", default=None)
+
+
+def bind_context(**fields):
+    """Añade campos al contexto de los logs de la tarea actual. Devuelve el token para `reset_context`."""
+    current = log_context.get()
+    return log_context.set(dict(current, **fields) if current else fields)
+
+
+def reset_context(token):
+    log_context.reset(token)
+
+
+def context_from(ctx):
+    """Campos de contexto de un `commands.Context`, para pasarlos como `extra` fuera de la tarea del comando."""
+    return {
+        "guild": ctx.guild.id if ctx.guild else None,
+        "channel": ctx.channel.id if ctx.channel else None,
+        "user": ctx.author.id if ctx.author else None,
+        "command": ctx.command.qualified_name if ctx.command else None,
+    }
+
+
+class ContextFilter(logging.Filter):
+    """Copia en el registro el contexto de la tarea que lo emite (se ejecuta en el hilo del bucle)."""
+
+    def filter(self, record):
+        context = log_context.get()
+        if context:
+            for key, value in context.items():
+                if getattr(record, key, None) is None:
+                    setattr(record, key, value)
+        if getattr(record, "handler", None) is None:
+            record.handler = current_handler.get()
+        return True
+
+
+class DuplicateFilter(logging.Filter):
+    """Descarta las repeticiones de un mismo mensaje por encima de DUPLICATE_BURST por ventana."""
+
+    def __init__(self, window=DUPLICATE_WINDOW, burst=DUPLICATE_BURST):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.seen = {}  # (logger, nivel, línea, mensaje): [inicio de la ventana, apariciones]
+
+    def filter(self, record):
+        # El mensaje se formatea una sola vez; el resto de la cadena ya no necesita los argumentos
+        record.msg = record.getMessage()
+        record.args = None
+        key = (record.name, record.levelno, record.lineno, record.msg)
+        now = record.created
+        entry = self.seen.get(key)
+        if entry is not None and now - entry[0] < self.window:
+            entry[1] += 1
+            return entry[1] <= self.burst
+        if entry is not None and entry[1] > self.burst:
+            record.suppressed = entry[1] - self.burst
+        if len(self.seen) >= DUPLICATE_KEYS_LIMIT:
+            self.seen = {k: v for k, v in self.seen.items() if now - v[0] < self.window}
+        self.seen[key] = [now, 1]
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Un objeto JSON por línea: hora, nivel, logger, mensaje, contexto y excepción."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS + ("suppressed",):
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Formato legible para la consola, con el contexto entre corchetes."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%Y-%m-%d %H:%M:%S")
+
+    def formatMessage(self, record):
+        text = super().formatMessage(record)
+        context = " ".join(f"{field}={getattr(record, field)}" for field in CONTEXT_FIELDS if getattr(record, field, None) is not None)
+        if context:
+            text = f"{text} [{context}]"
+        suppressed = getattr(record, "suppressed", None)
+        if suppressed:
+            text = f"{text} ({suppressed} repeticiones omitidas)"
+        return text
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Encola los registros sin formatearlos: el formato (incluidas las trazas de las excepciones)
+    y la escritura los hace el hilo del QueueListener, fuera del bucle de eventos.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup_logging(level="INFO", log_file=DEFAULT_LOG_FILE, console_json=False):
+    """
+    Configura el logger raíz: los registros se encolan en el hilo que los emite (con su contexto)
+    y un QueueListener los escribe en la consola y, si se indica, en `log_file` en JSON con
+    rotación. Devuelve el listener, que hay que parar (`stop()`) al terminar para vaciar la cola.
+    """
+    console = logging.StreamHandler()
+    console.setFormatter(JsonFormatter() if console_json else ConsoleFormatter())
+    handlers = [console]
+    if log_file:
+        directory = os.path.dirname(log_file)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = ContextQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(DuplicateFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def setup_logging_from_env(environ, default_file=DEFAULT_LOG_FILE):
+    """
+    `setup_logging` con la configuración del `.env`: LOG_LEVEL (INFO), LOG_FILE (vacío = sin
+    archivo) y LOG_FORMAT=json para la consola. En modo clúster cada proceso usa su propio archivo.
+    """
+    log_file = environ.get("LOG_FILE", default_file)
+    cluster_id = environ.get("CLUSTER_ID")
+    if log_file and cluster_id:
+        root, extension = os.path.splitext(log_file)
+        log_file = f"{root}_{cluster_id}{extension}"
+    return setup_logging(
+        level=environ.get("LOG_LEVEL", "INFO").upper(),
+        log_file=log_file,
+        console_json=environ.get("LOG_FORMAT", "").lower() == "json",
+    )
@@ -0,0 +1,210 @@
+import asyncio
+import collections
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+
+from discord import app_commands # type: ignore
+
+from utils.message_pipeline import pipeline
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Cada cuánto se despierta la tarea que mide el retraso del bucle de eventos
+WATCHDOG_INTERVAL = 0.25
+# Retraso a partir del cual se considera que algo bloqueó el bucle (variable de entorno LOOP_SLOW_MS)
+DEFAULT_SLOW_THRESHOLD = 0.1
+# Muestras de retraso que se guardan (5 minutos con el intervalo por defecto)
+LAG_SAMPLES = 1200
+# Bloqueos recientes que se guardan para `!flex diag`
+RECENT_SPANS = 50
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UNKNOWN_HANDLER = "desconocido"
+
+loop_lag_seconds = metrics.histogram(
+    "flexbot_event_loop_lag_seconds", "Retraso del bucle de eventos medido por el vigilante.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+slow_spans_total = metrics.counter(
+    "flexbot_slow_spans_total", "Bloqueos del bucle de eventos por comando, listener o etapa.", ("handler",))
+
+
+def _code_of(callback):
+    """Objeto de código de un callback (método, función o listener envuelto con `timed_listener`)."""
+    return inspect.unwrap(getattr(callback, "__func__", callback)).__code__
+
+
+class SlowSpan:
+    """Un bloqueo del bucle de eventos: cuánto duró y qué se estaba ejecutando."""
+
+    __slots__ = ("at", "seconds", "handler", "location")
+
+    def __init__(self, at, seconds, handler, location):
+        self.at = at
+        self.seconds = seconds
+        self.handler = handler
+        self.location = location
+
+
+class LoopMonitor:
+    """
+    Vigilante del bucle de eventos.
+
+    Una tarea se despierta cada `WATCHDOG_INTERVAL` segundos y mide cuánto tarde lo hace
+    (el retraso del bucle). Mientras tanto, un hilo comprueba que la tarea siga despertándose:
+    si lleva más del umbral sin hacerlo, el bucle está bloqueado y el hilo toma la pila del
+    hilo del bucle para saber qué se ejecutaba. El bloqueo se atribuye al comando, listener o
+    etapa de la tubería cuya función aparece en la pila, y a la línea del proyecto más interna
+    (p. ej. una escritura de JSON síncrona).
+
+    Opcionalmente activa también el modo debug de asyncio, que registra en el logger `asyncio`
+    cada callback que tarde más que el umbral (`loop.slow_callback_duration`).
+    """
+
+    def __init__(self):
+        self.bot = None
+        self.threshold = DEFAULT_SLOW_THRESHOLD
+        self.interval = WATCHDOG_INTERVAL
+        self.debug = False
+        self.task = None
+        self.thread = None
+        self.stopping = threading.Event()
+        self.loop_thread_id = None
+        self.heartbeat = time.monotonic()
+        self.pending = None  # (handler, ubicación) tomados por el hilo durante el bloqueo en curso
+        self.lags = collections.deque(maxlen=LAG_SAMPLES)
+        self.max_lag = 0.0
+        self.spans = collections.deque(maxlen=RECENT_SPANS)
+        self.by_handler = {}  # handler: [bloqueos, segundos en total, máximo, última ubicación]
+        self.handler_codes = {}
+        self.codes_key = None
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    def start(self, bot, threshold=DEFAULT_SLOW_THRESHOLD, debug=False):
+        """Arranca el vigilante en el bucle actual."""
+        loop = asyncio.get_running_loop()
+        self.bot = bot
+        self.threshold = threshold
+        self.debug = debug
+        loop.slow_callback_duration = threshold
+        if debug:
+            loop.set_debug(True)
+
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self.pending = None
+        self.stopping.clear()
+        self.task = asyncio.create_task(self._watch())
+        self.thread = threading.Thread(target=self._sample, name="loop-monitor", daemon=True)
+        self.thread.start()
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        self.stopping.set()
+        if self.thread is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.thread.join, 1)
+            self.thread = None
+        if self.debug:
+            asyncio.get_running_loop().set_debug(False)
+            self.debug = False
+
+    def reset(self):
+        self.lags.clear()
+        self.max_lag = 0.0
+        self.spans.clear()
+        self.by_handler.clear()
+
+    async def _watch(self):
+        while True:
+            self.refresh_handler_codes()
+            start = time.monotonic()
+            self.heartbeat = start
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.heartbeat = now
+            lag = max(0.0, now - start - self.interval)
+            self.lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            loop_lag_seconds.observe(lag)
+            if lag >= self.threshold:
+                handler, location = self.pending or (None, None)
+                self.record_span(lag, handler, location)
+            self.pending = None
+
+    def _sample(self):
+        """Hilo de muestreo: si el bucle no despierta a tiempo, guarda qué se está ejecutando."""
+        period = min(self.threshold, self.interval) / 2
+        while not self.stopping.wait(period):
+            stalled = time.monotonic() - self.heartbeat - self.interval
+            if stalled < self.threshold or self.pending is not None:
+                continue
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is not None:
+                self.pending = self.describe_stack(frame)
+
+    def describe_stack(self, frame):
+        """(handler, ubicación) de la pila: el primer comando/listener/etapa y la línea del proyecto más interna."""
+        handler = location = None
+        while frame is not None and (handler is None or location is None):
+            code = frame.f_code
+            if handler is None:
+                handler = self.handler_codes.get(code)
+            # (sin contar el nivel superior de main.py, que está en la base de todas las pilas)
+            if location is None and code.co_filename.startswith(PROJECT_ROOT) and code.co_name != "<module>":
+                location = f"{os.path.relpath(code.co_filename, PROJECT_ROOT)}:{frame.f_lineno} ({code.co_name})"
+            frame = frame.f_back
+        return handler, location
+
+    def refresh_handler_codes(self):
+        """Relaciona el código de cada comando, listener y etapa con su nombre (tras cargar o recargar cogs)."""
+        bot = self.bot
+        key = (tuple(map(id, bot.extensions.values())), tuple(id(stage.callback) for stage in pipeline.stages))
+        if key == self.codes_key:
+            return
+        codes = {}
+        for cog in bot.cogs.values():
+            for name, method in cog.get_listeners():
+                codes[_code_of(method)] = f"{type(cog).__name__}.{name}"
+        for stage in pipeline.stages:
+            codes[_code_of(stage.callback)] = stage.handler_name
+        for command in bot.tree.walk_commands():
+            if isinstance(command, app_commands.Command):
+                codes[_code_of(command.callback)] = f"/{command.qualified_name}"
+        for command in bot.walk_commands():
+            codes[_code_of(command.callback)] = command.qualified_name
+        self.handler_codes = codes
+        self.codes_key = key
+
+    def record_span(self, seconds, handler, location):
+        handler = handler or UNKNOWN_HANDLER
+        self.spans.append(SlowSpan(time.time(), seconds, handler, location))
+        stats = self.by_handler.get(handler)
+        if stats is None:
+            stats = self.by_handler[handler] = [0, 0.0, 0.0, None]
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+        stats[3] = location or stats[3]
+        slow_spans_total.inc(handler)
+        logger.warning("Bucle de eventos bloqueado %.0f ms por %s en %s", seconds * 1000, handler, location or "?")
+
+    def lag_summary(self):
+        """(actual, media, p99, máximo) en segundos de las muestras guardadas."""
+        if not self.lags:
+            return 0.0, 0.0, 0.0, self.max_lag
+        ordered = sorted(self.lags)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        return self.lags[-1], sum(ordered) / len(ordered), p99, self.max_lag
+
+
+# Instancia compartida (sobrevive a la recarga del cog Diagnostics)
+loop_monitor = LoopMonitor()
@@ -0,0 +1,159 @@
+import asyncio
+import collections
+import logging
+
+import discord # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Políticas de caché de miembros (variable de entorno MEMBER_CACHE)
+FULL = "full"  # discord.py descarga todos los miembros de todos los servidores al arrancar
+LAZY = "lazy"  # Cada servidor se descarga con su primer comando; mientras, solo se guardan los vistos
+POLICIES = (FULL, LAZY)
+
+# Miembros vistos recientemente que se guardan por servidor en modo lazy (LRU)
+RECENT_MEMBERS_PER_GUILD = 500
+
+
+def bot_options(policy, intents):
+    """Argumentos del constructor del bot para la política de caché indicada."""
+    if policy == LAZY:
+        # Sin descarga al arrancar; se siguen guardando los miembros que entran y los de canales de voz
+        return {"chunk_guilds_at_startup": False, "member_cache_flags": discord.MemberCacheFlags.from_intents(intents)}
+    return {}
+
+
+class MemberResolver:
+    """
+    Acceso a miembros que funciona con cualquier política de caché.
+
+    Con la política `lazy` la caché de discord.py solo contiene los servidores ya descargados,
+    así que `get_member` busca primero ahí, después entre los miembros vistos recientemente
+    (autores de mensajes; los moderadores no se descartan nunca) y, si no, los pide a la API
+    con `fetch_member`. Cada servidor se descarga una sola vez aunque se pida a la vez desde
+    varios comandos; al terminar se avisa a los suscritos (`add_listener`).
+    """
+
+    def __init__(self):
+        self.policy = FULL
+        self.recent = {}     # guild_id: OrderedDict(member_id: Member)
+        self.pinned = {}     # guild_id: {member_id: Member} (moderadores)
+        self.chunking = {}   # guild_id: asyncio.Task
+        self.listeners = []
+        self.fetches = 0
+
+    def configure(self, policy):
+        if policy not in POLICIES:
+            raise ValueError(f"MEMBER_CACHE debe ser uno de: {', '.join(POLICIES)}.")
+        self.policy = policy
+
+    @property
+    def lazy(self):
+        return self.policy == LAZY
+
+    def add_listener(self, callback):
+        """Registra `callback(guild)`, que se llama al terminar la descarga de un servidor."""
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def remember(self, member, pinned=False):
+        """
+        Guarda un miembro visto (p. ej. el autor de un mensaje) mientras su servidor no esté descargado.
+
+        discord.py no avisa de los cambios de roles de los miembros que no tiene en caché, así que la
+        copia guardada se sustituye en cada mensaje y pasa de `pinned` a `recent` (o al revés) si el
+        autor deja de ser moderador (o empieza a serlo). Si discord.py ya tiene al miembro (lo añade
+        al recibir una actualización suya), la copia propia se descarta: la suya está al día.
+        """
+        guild = member.guild
+        if guild.chunked:
+            return
+        if guild.get_member(member.id) is not None:
+            self.forget(guild.id, member.id)
+            return
+        if pinned:
+            recent = self.recent.get(guild.id)
+            if recent:
+                recent.pop(member.id, None)
+            self.pinned.setdefault(guild.id, {})[member.id] = member
+            return
+        moderators = self.pinned.get(guild.id)
+        if moderators:
+            moderators.pop(member.id, None)
+        recent = self.recent.get(guild.id)
+        if recent is None:
+            recent = self.recent[guild.id] = collections.OrderedDict()
+        recent[member.id] = member
+        recent.move_to_end(member.id)
+        if len(recent) > RECENT_MEMBERS_PER_GUILD:
+            recent.popitem(last=False)
+
+    def forget(self, guild_id, member_id):
+        for members in (self.recent.get(guild_id), self.pinned.get(guild_id)):
+            if members:
+                members.pop(member_id, None)
+
+    def forget_guild(self, guild_id):
+        self.recent.pop(guild_id, None)
+        self.pinned.pop(guild_id, None)
+        task = self.chunking.pop(guild_id, None)
+        if task:
+            task.cancel()
+
+    def cached_member(self, guild, member_id):
+        """Busca un miembro sin hacer peticiones a la API."""
+        member = guild.get_member(member_id)
+        if member is None:
+            member = self.pinned.get(guild.id, {}).get(member_id) or self.recent.get(guild.id, {}).get(member_id)
+        return member
+
+    async def get_member(self, guild, member_id):
+        """Devuelve el miembro (pidiéndolo a la API si no está en caché) o None si no está en el servidor."""
+        member_id = int(member_id)
+        member = self.cached_member(guild, member_id)
+        if member is not None:
+            return member
+        try:
+            member = await guild.fetch_member(member_id)
+        except discord.NotFound:
+            return None
+        self.fetches += 1
+        self.remember(member)
+        return member
+
+    def ensure_chunked(self, guild):
+        """Lanza (una sola vez) la descarga de los miembros del servidor. Devuelve la tarea o None si ya está."""
+        if guild.chunked:
+            return None
+        task = self.chunking.get(guild.id)
+        if task is None:
+            task = self.chunking[guild.id] = asyncio.create_task(self._chunk(guild))
+        return task
+
+    async def _chunk(self, guild):
+        try:
+            await guild.chunk(cache=True)
+        finally:
+            self.chunking.pop(guild.id, None)
+        # Ya están todos en la caché de discord.py
+        self.recent.pop(guild.id, None)
+        self.pinned.pop(guild.id, None)
+        for callback in list(self.listeners):
+            try:
+                result = callback(guild)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.exception("Error en un suscriptor tras descargar %s: %s", guild.name, e)
+
+    def cached_count(self, guilds):
+        """Miembros en memoria: caché de discord.py más los vistos recientemente."""
+        return sum(len(guild.members) for guild in guilds) + sum(map(len, self.recent.values())) + sum(map(len, self.pinned.values()))
+
+
+# Instancia compartida por todos los cogs
+members = MemberResolver()
@@ -0,0 +1,157 @@
+import logging
+import time
+
+from utils.confusables import normalize_confusables
+from utils.guild_config import guild_config
+from utils.logs import bind_context, reset_context
+from utils.metrics import current_handler
+
+logger = logging.getLogger(__name__)
+
+# Orden de las etapas registradas por los cogs (menor = antes)
+MEMBER_CACHE_ORDER = 50
+CONTENT_FILTER_ORDER = 100
+LINK_SCANNER_ORDER = 200
+ANTI_SPAM_ORDER = 300
+THREAD_TRACKING_ORDER = 400
+COMMANDS_ORDER = 1000
+
+
+class MessageContext:
+    """
+    Datos de un mensaje calculados una sola vez y compartidos por todas las etapas.
+    El contenido normalizado se calcula solo si alguna etapa lo pide.
+    """
+
+    __slots__ = ("message", "guild", "author", "channel", "config", "is_mod", "_normalized_content")
+
+    def __init__(self, message, is_mod):
+        self.message = message
+        self.guild = message.guild
+        self.author = message.author
+        self.channel = message.channel
+        self.config = guild_config.get(message.guild.id)
+        self.is_mod = is_mod
+        self._normalized_content = None
+
+    @property
+    def normalized_content(self):
+        if self._normalized_content is None:
+            self._normalized_content = normalize_confusables(self.message.content)
+        return self._normalized_content
+
+
+class Stage:
+    """Etapa registrada en la tubería, con sus estadísticas de ejecución."""
+
+    __slots__ = ("name", "handler_name", "callback", "order", "include_mods", "calls", "stops", "errors", "total_ns", "max_ns")
+
+    def __init__(self, name, callback, order, include_mods):
+        self.name = name
+        self.handler_name = f"pipeline:{name}"
+        self.callback = callback
+        self.order = order
+        self.include_mods = include_mods
+        self.calls = 0
+        self.stops = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+
+class MessagePipeline:
+    """
+    Tubería única para los mensajes de servidor.
+
+    Los cogs registran etapas `async def etapa(ctx) -> bool` con un orden; cada mensaje
+    pasa por el prefiltro (bots y mensajes directos) y después por las etapas en orden.
+    Si una etapa devuelve True (p. ej. eliminó el mensaje), las siguientes no se ejecutan.
+    Las etapas sin `include_mods` se saltan para administradores y moderadores.
+
+    Saber si el autor es moderador obliga a recorrer sus roles (`guild_permissions`), así que
+    el resultado se guarda por servidor y miembro. El cog Pipeline invalida la caché cuando
+    cambian los roles de un miembro o los permisos de un rol. discord.py solo avisa de los
+    cambios de roles de los miembros que tiene en caché (con MEMBER_CACHE=lazy puede no tenerlos),
+    así que para el resto no se guarda nada: se calcula con los roles que trae cada mensaje.
+    """
+
+    def __init__(self):
+        self.stages = []
+        self.messages = 0
+        self.exemptions = {}  # guild_id: {member_id: True si es administrador o moderador}
+
+    def is_exempt(self, guild_id, member):
+        """True si el miembro es administrador o puede gestionar mensajes (con caché)."""
+        if member.guild.get_member(member.id) is None:
+            # Sin on_member_update para este miembro la caché no se invalidaría nunca
+            permissions = member.guild_permissions
+            return permissions.administrator or permissions.manage_messages
+        guild_exemptions = self.exemptions.get(guild_id)
+        if guild_exemptions is None:
+            guild_exemptions = self.exemptions[guild_id] = {}
+        exempt = guild_exemptions.get(member.id)
+        if exempt is None:
+            permissions = member.guild_permissions
+            exempt = guild_exemptions[member.id] = permissions.administrator or permissions.manage_messages
+        return exempt
+
+    def invalidate_member(self, guild_id, member_id):
+        guild_exemptions = self.exemptions.get(guild_id)
+        if guild_exemptions:
+            guild_exemptions.pop(member_id, None)
+
+    def invalidate_guild(self, guild_id):
+        self.exemptions.pop(guild_id, None)
+
+    def register(self, name, callback, order, include_mods=False):
+        """Registra (o reemplaza, si ya existe con ese nombre) una etapa."""
+        self.unregister(name)
+        self.stages.append(Stage(name, callback, order, include_mods))
+        self.stages.sort(key=lambda stage: stage.order)
+
+    def unregister(self, name):
+        self.stages = [stage for stage in self.stages if stage.name != name]
+
+    async def run(self, message):
+        """Pasa un mensaje por todas las etapas. Devuelve el contexto o None si el prefiltro lo descartó."""
+        if message.author.bot or message.guild is None:
+            return None
+
+        self.messages += 1
+        ctx = MessageContext(message, self.is_exempt(message.guild.id, message.author))
+        # Los logs de las etapas (y de los comandos que ejecute la última) llevan el servidor, canal y autor
+        log_token = bind_context(guild=ctx.guild.id, channel=ctx.channel.id, user=ctx.author.id)
+        try:
+            for stage in self.stages:
+                if ctx.is_mod and not stage.include_mods:
+                    continue
+                # Las peticiones a la API que haga la etapa se atribuyen a ella en las métricas
+                token = current_handler.set(stage.handler_name)
+                start = time.perf_counter_ns()
+                try:
+                    stop = await stage.callback(ctx)
+                except Exception as e:
+                    stage.errors += 1
+                    stop = False
+                    logger.exception("Error en la etapa '%s' de la tubería de mensajes: %s", stage.name, e)
+                elapsed = time.perf_counter_ns() - start
+                current_handler.reset(token)
+                stage.calls += 1
+                stage.total_ns += elapsed
+                if elapsed > stage.max_ns:
+                    stage.max_ns = elapsed
+                if stop:
+                    stage.stops += 1
+                    break
+        finally:
+            reset_context(log_token)
+        return ctx
+
+    def reset_stats(self):
+        self.messages = 0
+        for stage in self.stages:
+            stage.calls = stage.stops = stage.errors = stage.total_ns = stage.max_ns = 0
+
+
+# Instancia compartida por todos los cogs
+pipeline = MessagePipeline()
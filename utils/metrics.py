@@ -0,0 +1,269 @@
+import bisect
+import contextvars
+import functools
+import logging
+import re
+import time
+
+import aiohttp # type: ignore
+from aiohttp import web # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Límites (en segundos) de los histogramas de duración
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Comando o listener que se está ejecutando en la tarea actual ("report", "Reports.on_raw_reaction_add"...).
+# Lo fijan los hooks de comandos y `timed_listener`; sirve para atribuir las peticiones a la API.
+current_handler = contextvars.ContextVar("current_handler", default=None)
+
+# Normalización de las rutas de la API: sin IDs, tokens ni códigos, para no crear una serie por URL
+API_PREFIX_RE = re.compile(r"^/api/v\d+")
+ROUTE_PATTERNS = (
+    (re.compile(r"/\d{15,22}(?=/|$)"), "/{id}"),
+    (re.compile(r"/(webhooks|interactions)/\{id\}/[^/]+"), r"/\1/{id}/{token}"),
+    (re.compile(r"/reactions/[^/]+"), "/reactions/{emoji}"),
+    (re.compile(r"/invites/[^/]+"), "/invites/{code}"),
+)
+
+
+def normalize_route(path):
+    """`/api/v10/channels/123/messages/456` -> `/channels/{id}/messages/{id}`. None si no es de la API."""
+    match = API_PREFIX_RE.match(path)
+    if match is None:
+        return None
+    route = path[match.end():] or "/"
+    for pattern, replacement in ROUTE_PATTERNS:
+        route = pattern.sub(replacement, route)
+    return route
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Contador con etiquetas: `inc(valor_etiqueta1, ...)`."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.values = {}
+
+    def inc(self, *label_values, amount=1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        for label_values, value in self.values.items():
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+
+class Histogram:
+    """Histograma con etiquetas: `observe(segundos, valor_etiqueta1, ...)`."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.series = {}  # valores de las etiquetas: [recuentos por intervalo (no acumulados), suma, total]
+
+    def observe(self, value, *label_values):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        for label_values, (counts, total, count) in self.series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket{_format_labels(self.labels, label_values, ('le', _format_value(bound)))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, label_values)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labels, label_values)} {count}"
+
+
+class CallbackMetric:
+    """
+    Métrica cuyo valor se calcula al consultarla (tamaños de cachés, estadísticas ya
+    contadas en otro sitio). `callback()` devuelve un número o un dict {valores de las etiquetas: número}.
+    """
+
+    def __init__(self, name, help_text, callback, labels=(), kind="gauge"):
+        self.name = name
+        self.help = help_text
+        self.callback = callback
+        self.labels = tuple(labels)
+        self.kind = kind
+
+    def render(self):
+        values = self.callback()
+        if values is None:
+            return
+        if not isinstance(values, dict):
+            values = {(): values}
+        for label_values, value in values.items():
+            if not isinstance(label_values, tuple):
+                label_values = (label_values,)
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas del bot en el formato de texto de Prometheus.
+
+    Las métricas de comandos, eventos y peticiones a la API están definidas en este módulo y
+    se actualizan desde los hooks del cog Metrics, `timed_listener` y `http_trace_config()`.
+    Los cogs pueden registrar además métricas calculadas al vuelo con `callback()`.
+    `start_server` sirve `GET /metrics` en el puerto indicado.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.runner = None
+
+    def _add(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._add(Counter(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help_text, labels, buckets))
+
+    def callback(self, name, help_text, callback, labels=(), kind="gauge"):
+        """Registra (o reemplaza, si ya existe con ese nombre) una métrica calculada al consultarla."""
+        return self._add(CallbackMetric(name, help_text, callback, labels, kind))
+
+    def unregister(self, name):
+        self.metrics.pop(name, None)
+
+    def render(self):
+        lines = []
+        for metric in list(self.metrics.values()):
+            try:
+                samples = list(metric.render())
+            except Exception as e:
+                # Una caché que no se puede leer (p. ej. su cog se está recargando) no debe dejar sin métricas al resto
+                logger.warning("No se pudo calcular %s: %s", metric.name, e)
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    async def _handle_metrics(self, request):
+        return web.Response(body=self.render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    async def start_server(self, host, port):
+        """Sirve las métricas en http://host:port/metrics."""
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, host, port).start()
+        except OSError:
+            await runner.cleanup()
+            raise
+        self.runner = runner
+
+    async def stop_server(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    def http_trace_config(self):
+        """
+        TraceConfig de aiohttp para el cliente HTTP de discord.py (argumento `http_trace` del bot):
+        cuenta las peticiones a la API por ruta y por comando/listener, su duración y los 429.
+        """
+        async def on_request_start(session, context, params):
+            context.start = time.perf_counter()
+            context.route = normalize_route(params.url.raw_path)
+            context.handler = current_handler.get() or "-"
+
+        async def on_request_end(session, context, params):
+            if context.route is None:
+                return
+            status = params.response.status
+            rest_requests.inc(context.handler, params.method, context.route, str(status))
+            rest_seconds.observe(time.perf_counter() - context.start, params.method, context.route)
+            if status == 429:
+                rest_rate_limited.inc(context.route, params.response.headers.get("X-RateLimit-Scope", "unknown"))
+
+        async def on_request_exception(session, context, params):
+            if context.route is not None:
+                rest_requests.inc(context.handler, params.method, context.route, "error")
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        return trace_config
+
+
+# Instancia compartida por todos los cogs
+metrics = MetricsRegistry()
+
+command_seconds = metrics.histogram(
+    "flexbot_command_duration_seconds", "Duración de los comandos (prefijo y barra).", ("command", "status"))
+event_seconds = metrics.histogram(
+    "flexbot_event_handler_duration_seconds", "Duración de los listeners de eventos instrumentados.", ("handler",))
+event_errors = metrics.counter(
+    "flexbot_event_handler_errors_total", "Excepciones no capturadas en los listeners instrumentados.", ("handler",))
+gateway_events = metrics.counter(
+    "flexbot_gateway_events_total", "Eventos recibidos del gateway por tipo.", ("event",))
+rest_requests = metrics.counter(
+    "flexbot_rest_requests_total", "Peticiones a la API REST por comando/listener, método, ruta y estado.",
+    ("handler", "method", "route", "status"))
+rest_seconds = metrics.histogram(
+    "flexbot_rest_request_duration_seconds", "Duración de las peticiones a la API REST.", ("method", "route"))
+rest_rate_limited = metrics.counter(
+    "flexbot_rest_rate_limited_total", "Respuestas 429 de la API REST por ruta y ámbito del límite.", ("route", "scope"))
+
+
+def timed_listener(func):
+    """
+    Mide la duración de un listener (`flexbot_event_handler_duration_seconds`) y lo marca como
+    el código en ejecución mientras dura. Va debajo de `@commands.Cog.listener()`.
+    """
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = current_handler.set(name)
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            event_errors.inc(name)
+            raise
+        finally:
+            event_seconds.observe(time.perf_counter() - start, name)
+            current_handler.reset(token)
+
+    return wrapper
@@ -0,0 +1,90 @@
+"""
+Validación de las expresiones regulares del filtro de contenido.
+
+Las expresiones se ejecutan con `re.search` sobre cada mensaje, en el bucle de eventos, y el
+motor de `re` puede tardar un tiempo exponencial (o polinómico de grado alto) con expresiones
+como `(a+)+$` o `\\w*\\w*$`: unos pocos miles de caracteres bastan para bloquear el bot durante
+minutos. Solo se admite un subconjunto en el que el coste por posición del texto está acotado:
+
+- los cuantificadores solo se aplican a un carácter o una clase (`\\w+`, `[a-z]{2,5}`), salvo
+  `?` sobre un grupo (`(?:www\\.)?`);
+- los cuantificadores sin límite (`*`, `+`, `{n,}`) solo pueden ir al final de la expresión,
+  donde nunca hace falta retroceder; en el resto se usa un límite (`\\w{0,20}`);
+- no se admiten referencias a grupos, lookarounds ni grupos condicionales.
+
+El coste de una expresión es el número de caminos que puede probar el motor desde una misma
+posición del texto; `pattern_cost` lo calcula y lanza ValueError (con un mensaje para el
+usuario) si la expresión no cumple las reglas.
+"""
+import re
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse  # type: ignore
+
+SINGLE_CHARACTER = {sre_parse.LITERAL, sre_parse.NOT_LITERAL, sre_parse.ANY, sre_parse.IN, sre_parse.CATEGORY}
+REPEATS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT}
+REJECTED = {
+    sre_parse.GROUPREF: "referencias a grupos",
+    sre_parse.GROUPREF_EXISTS: "grupos condicionales",
+    sre_parse.ASSERT: "lookaheads ni lookbehinds",
+    sre_parse.ASSERT_NOT: "lookaheads ni lookbehinds",
+}
+# Cuantificadores posesivos y grupos atómicos (Python 3.11+)
+if hasattr(sre_parse, "POSSESSIVE_REPEAT"):
+    REPEATS.add(sre_parse.POSSESSIVE_REPEAT)
+ATOMIC_GROUP = getattr(sre_parse, "ATOMIC_GROUP", None)
+
+# Coste máximo de una expresión y de todas las de un servidor juntas
+MAX_PATTERN_COST = 100
+MAX_TOTAL_COST = 400
+
+
+def pattern_cost(pattern):
+    """Coste de `pattern` (ver el docstring del módulo). ValueError si no es válida o no es segura."""
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error as e:
+        raise ValueError(f"Expresión regular no válida: {e}") from None
+    cost = _sequence_cost(list(parsed), tail=True)
+    if cost > MAX_PATTERN_COST:
+        raise ValueError(
+            f"La expresión es demasiado costosa de evaluar (coste {cost}, máximo {MAX_PATTERN_COST}). "
+            "Reduce los límites de los cuantificadores."
+        )
+    return cost
+
+
+def _sequence_cost(items, tail):
+    cost = 1
+    for index, (op, av) in enumerate(items):
+        cost *= _item_cost(op, av, tail and index == len(items) - 1)
+    return cost
+
+
+def _item_cost(op, av, tail):
+    if op in REJECTED:
+        raise ValueError(f"El filtro no admite {REJECTED[op]}.")
+    if op in REPEATS:
+        minimum, maximum, body = av
+        body = list(body)
+        if len(body) == 1 and body[0][0] in SINGLE_CHARACTER:
+            if maximum == sre_parse.MAXREPEAT:
+                if not tail:
+                    raise ValueError(
+                        "Los cuantificadores sin límite (`*`, `+`, `{n,}`) solo se admiten al final de la expresión; "
+                        "usa un límite, por ejemplo `\\w{0,20}`."
+                    )
+                return 1
+            return maximum - minimum + 1
+        if maximum > 1:
+            raise ValueError("Los cuantificadores solo se admiten sobre un carácter o una clase (`?` también sobre un grupo).")
+        return 1 + _sequence_cost(body, tail)
+    if op == sre_parse.SUBPATTERN:
+        return _sequence_cost(list(av[-1]), tail)
+    if ATOMIC_GROUP is not None and op == ATOMIC_GROUP:
+        return _sequence_cost(list(av), tail)
+    if op == sre_parse.BRANCH:
+        return sum(_sequence_cost(list(branch), tail) for branch in av[1])
+    return 1
@@ -0,0 +1,120 @@
+import datetime
+import re
+import unicodedata
+
+# Un término es cualquier secuencia de caracteres alfanuméricos
+TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """Pasa el texto a minúsculas y elimina acentos/diacríticos."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list:
+    """Divide un texto normalizado en términos indexables."""
+    return TOKEN_RE.findall(normalize_text(text or ""))
+
+
+def parse_timestamp(value) -> float:
+    """Convierte un timestamp ISO a segundos para ordenar por recencia. Devuelve 0 si no es válido."""
+    try:
+        return datetime.datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class SearchIndex:
+    """
+    Índice invertido en memoria sobre las razones de reportes y advertencias.
+
+    Las listas de aparición se guardan por (servidor, término), de modo que filtrar
+    por servidor no tiene coste y una búsqueda solo intersecta los documentos de
+    ese servidor. El índice se mantiene de forma incremental: cada alta llama a `add`.
+    """
+
+    def __init__(self):
+        self.documents = {}  # doc_id: {"kind", "guild_id", "user_id", "status", "reason", "timestamp", ...}
+        self.postings = {}   # (guild_id, término): set(doc_id)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, doc_id, reason, *, kind, guild_id, user_id, status, timestamp, **extra):
+        """Añade (o reemplaza) un documento en el índice."""
+        if doc_id in self.documents:
+            self.remove(doc_id)
+
+        guild_id = str(guild_id)
+        self.documents[doc_id] = {
+            "kind": kind,
+            "guild_id": guild_id,
+            "user_id": str(user_id),
+            "status": status,
+            "reason": reason,
+            "timestamp": timestamp,
+            "sort_key": parse_timestamp(timestamp),
+            **extra
+        }
+        for term in set(tokenize(reason)):
+            self.postings.setdefault((guild_id, term), set()).add(doc_id)
+
+    def remove(self, doc_id):
+        """Elimina un documento del índice si existe."""
+        document = self.documents.pop(doc_id, None)
+        if document is None:
+            return
+        for term in set(tokenize(document["reason"])):
+            key = (document["guild_id"], term)
+            doc_ids = self.postings.get(key)
+            if doc_ids is None:
+                continue
+            doc_ids.discard(doc_id)
+            if not doc_ids:
+                del self.postings[key]
+
+    def update_status(self, doc_id, status):
+        """Actualiza el estado de un documento sin reindexar su texto."""
+        document = self.documents.get(doc_id)
+        if document is not None:
+            document["status"] = status
+
+    def search(self, query, guild_id, *, user_id=None, status=None, kind=None):
+        """
+        Devuelve los documentos del servidor que contienen todos los términos de la consulta,
+        ordenados del más reciente al más antiguo.
+        """
+        guild_id = str(guild_id)
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        # Intersectar empezando por la lista más corta
+        posting_lists = []
+        for term in terms:
+            doc_ids = self.postings.get((guild_id, term))
+            if not doc_ids:
+                return []
+            posting_lists.append(doc_ids)
+        posting_lists.sort(key=len)
+
+        candidates = set(posting_lists[0])
+        for doc_ids in posting_lists[1:]:
+            candidates &= doc_ids
+            if not candidates:
+                return []
+
+        results = []
+        for doc_id in candidates:
+            document = self.documents[doc_id]
+            if user_id is not None and document["user_id"] != str(user_id):
+                continue
+            if status is not None and document["status"] != status:
+                continue
+            if kind is not None and document["kind"] != kind:
+                continue
+            results.append(document)
+
+        results.sort(key=lambda d: d["sort_key"], reverse=True)
+        return results
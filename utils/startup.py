@@ -0,0 +1,84 @@
+import asyncio
+import datetime
+import json
+import logging
+import os
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STARTUP_REPORT_FILE = 'data/startup_report.json'
+
+
+def discover_extensions(directory='cogs'):
+    """Devuelve los nombres de extensión (`cogs.x`) de los archivos .py del directorio, en orden."""
+    return sorted(
+        f"{directory}.{filename[:-3]}"
+        for filename in os.listdir(f"./{directory}")
+        if filename.endswith('.py') and not filename.startswith('__')
+    )
+
+
+async def load_extensions_timed(bot, extensions):
+    """
+    Carga las extensiones a la vez y mide cuánto tarda cada una.
+
+    Las extensiones no dependen unas de otras al cargarse (solo se comunican con `bot.get_cog`
+    en tiempo de ejecución), así que mientras una espera su `cog_load` se importan las demás.
+    Devuelve una lista de {"extension", "seconds", "error"} en el orden de `extensions`;
+    un fallo en una extensión no impide cargar el resto.
+    """
+    async def load(name):
+        start = time.perf_counter()
+        error = None
+        try:
+            await bot.load_extension(name)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        return {"extension": name, "seconds": round(time.perf_counter() - start, 4), "error": error}
+
+    return list(await asyncio.gather(*(load(name) for name in extensions)))
+
+
+def memory_usage_mb():
+    """
+    Memoria residente (RSS) del proceso en MB: la actual en Linux y, en otros sistemas,
+    el máximo alcanzado. None si no se puede medir.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return round(int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20, 1)
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está en bytes en macOS y en KB en el resto
+    return round(peak / 2**20 if sys.platform == 'darwin' else peak / 2**10, 1)
+
+
+def print_startup_report(results, total_seconds):
+    """Muestra por consola el tiempo de carga de cada extensión, de la más lenta a la más rápida."""
+    lines = [f"Extensiones cargadas en {total_seconds:.3f} s:"]
+    for result in sorted(results, key=lambda r: r["seconds"], reverse=True):
+        status = f"ERROR ({result['error']})" if result["error"] else "ok"
+        lines.append(f"  {result['seconds']:8.3f} s  {result['extension']:<28} {status}")
+    logger.info("\n".join(lines))
+
+
+def write_startup_report(report, filepath=STARTUP_REPORT_FILE):
+    """Guarda el informe de arranque de forma atómica para poder comparar entre versiones."""
+    report = dict(report, generated_at=datetime.datetime.utcnow().isoformat())
+    directory = os.path.dirname(filepath)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    temp_file = f"{filepath}.tmp"
+    with open(temp_file, 'w') as f:
+        json.dump(report, f, indent=4)
+    os.replace(temp_file, filepath)